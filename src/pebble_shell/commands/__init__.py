@@ -57,6 +57,7 @@ from .builtin import (
     EchoCommand,
     EditCommand,
     EnvCommand,
+    ExplainCommand,
     FalseCommand,
     GrepCommand,
     HdCommand,
@@ -120,6 +121,8 @@ from .file_utils import (
     CommCommand,
     DirnameCommand,
     FindfsCommand,
+    IndexCommand,
+    IsearchCommand,
     LsattrCommand,
     MktempCommand,
     MountpointCommand,
@@ -175,11 +178,13 @@ from .other_utils import (
     LzmacatCommand,
     NmeterCommand,
     PipeProgressCommand,
+    PvCommand,
     ReformineCommand,
     ResetCommand,
     SedCommand,
     StringsCommand,
     UnlzopCommand,
+    ZgrepCommand,
 )
 from .pebble_cli import (
     AddCommand,
@@ -314,6 +319,7 @@ __all__ = [
     "EnvdirCommand",
     "ExecCommand",
     "ExpandCommand",
+    "ExplainCommand",
     "ExprCommand",
     "FalseCommand",
     "FdinfoCommand",
@@ -336,6 +342,7 @@ __all__ = [
     "HostnameCommand",
     "IdCommand",
     "IfconfigCommand",
+    "IndexCommand",
     "InfoCommand",
     "IostatCommand",
     "IpCommand",
@@ -345,6 +352,7 @@ __all__ = [
     "IplinkCommand",
     "IprouteCommand",
     "IpruleCommand",
+    "IsearchCommand",
     "JqCommand",
     "LastCommand",
     "LessCommand",
@@ -393,6 +401,7 @@ __all__ = [
     "PstreeCommand",
     "PullCommand",
     "PushCommand",
+    "PvCommand",
     "PwdCommand",
     "ReadlinkCommand",
     "ReadprofileCommand",
@@ -468,4 +477,5 @@ __all__ = [
     "YesCommand",
     "YqCommand",
     "ZcatCommand",
+    "ZgrepCommand",
 ]
@@ -5,6 +5,7 @@ from __future__ import annotations
 import abc
 from typing import TYPE_CHECKING, ClassVar
 
+from ..utils.output_writer import OutputWriter
 from ..utils.theme import get_theme
 
 if TYPE_CHECKING:
@@ -87,6 +88,21 @@ class Command(abc.ABC, metaclass=CommandMeta):
 
         return True
 
+    def output(self, plain: bool = False) -> OutputWriter:
+        """Create a writer for printing a lot of plain text.
+
+        The writer batches the output, and writes it straight to the
+        console's file when that is not an interactive display (or when
+        ``plain`` is true), rather than printing each line through rich.
+
+        Args:
+            plain: Bypass rich even when the console is a terminal
+
+        Returns:
+            An OutputWriter, to be used as a context manager
+        """
+        return OutputWriter(self.console, plain)
+
     def show_help(self):
         """Display help for this command."""
         from ..utils.theme import get_theme
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import re
 from typing import TYPE_CHECKING, Union
 
 import ops
 
-from ...utils.command_helpers import handle_help_flag, parse_flags, safe_read_file
+from ...utils import resolve_path
+from ...utils.command_helpers import handle_help_flag, parse_flags, print_text_chunks
+from ...utils.line_index import LineIndex
+from ...utils.streaming import MAX_CHUNK_SIZE, iter_remote_chunks
 from .._base import Command
 
 if TYPE_CHECKING:
@@ -31,23 +35,27 @@ class LessCommand(Command):
 Usage: less [OPTIONS] [FILE...]
 
 Description:
-    Display file contents one screen at a time.
-    Navigate with arrow keys, page up/down, or commands.
+    Display file contents one screen at a time. Type a command and press
+    Enter. The file is read lazily, so even very large files open at once,
+    and compressed files are shown decompressed. When the output is not a
+    terminal, the files are copied to it unchanged.
 
 Options:
     -n              Don't use line numbers
-    -S              Don't wrap long lines
+    -S              Chop long lines instead of wrapping them
     -i              Ignore case in searches
+    -E              Quit at the end of the file
     -X              Don't clear screen on exit
     -h, --help      Show this help message
 
 Navigation:
-    Space/PageDown  Next page
-    b/PageUp        Previous page
-    j/Down          Next line
-    k/Up            Previous line
-    g/Home          Go to beginning
-    G/End           Go to end
+    Enter/f         Next page
+    b               Previous page
+    j               Next line
+    k               Previous line
+    g               Go to beginning
+    NUMBERg         Go to line NUMBER
+    G               Go to end
     q               Quit
     /pattern        Search forward
     ?pattern        Search backward
@@ -72,6 +80,7 @@ Examples:
                 "n": bool,  # no line numbers
                 "S": bool,  # no wrap
                 "i": bool,  # ignore case
+                "E": bool,  # quit at end of file
                 "X": bool,  # no clear screen
             },
             self.shell,
@@ -80,97 +89,129 @@ Examples:
             return 1
         flags, positional_args = parse_result
 
-        no_line_numbers = flags.get("n", False)
-        no_wrap = flags.get("S", False)
-        ignore_case = flags.get("i", False)
-        no_clear = flags.get("X", False)
-
         if not positional_args:
             self.console.print("[red]less: missing file argument[/red]")
             return 1
 
-        file_path = positional_args[0]
-
-        try:
-            # Read file content
-            content = safe_read_file(client, file_path)
-            if content is None:
+        for file_path in positional_args:
+            path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+            try:
+                if not self.console.is_terminal:
+                    # Like less, act as cat when the output isn't a terminal.
+                    print_text_chunks(
+                        self.console,
+                        iter_remote_chunks(
+                            client, path, max_chunk_size=MAX_CHUNK_SIZE, decompress=True
+                        ),
+                    )
+                    continue
+                index = LineIndex(client, path)
+                try:
+                    if not self._paginate(index, flags):
+                        break
+                finally:
+                    index.close()
+            except ops.pebble.PathError as e:
+                message = "No such file" if e.kind == "not-found" else e.message
+                self.console.print(f"[red]less: cannot open '{file_path}': {message}[/red]")
                 return 1
+            except (ops.pebble.APIError, ValueError) as e:
+                self.console.print(f"[red]less: {file_path}: {e}[/red]")
+                return 1
+        return 0
 
-            lines = content.splitlines()
-
-            # Simple pagination implementation
-            self._paginate_content(lines, no_line_numbers, no_wrap, ignore_case, no_clear)
-            return 0
-
-        except ops.pebble.PathError:
-            self.console.print(f"[red]less: cannot open '{file_path}': No such file[/red]")
-            return 1
-        except Exception as e:
-            self.console.print(f"[red]less: {e}[/red]")
-            return 1
+    def _paginate(self, index: LineIndex, flags: dict) -> bool:
+        """Page through a file until the user quits or moves on.
 
-    def _paginate_content(
-        self,
-        lines: list[str],
-        no_line_numbers: bool,
-        no_wrap: bool,
-        ignore_case: bool,
-        no_clear: bool,
-    ):
-        """Return simple pagination of content."""
-        # This is a simplified implementation - real less is much more complex
-        page_size = 20  # Number of lines per page
-        current_line = 0
-        search_pattern = None
-
-        while current_line < len(lines):
-            # Display current page
-            end_line = min(current_line + page_size, len(lines))
-
-            for i in range(current_line, end_line):
-                line = lines[i]
-                if not no_wrap and len(line) > 80:
-                    line = line[:77] + "..."
-
-                if not no_line_numbers:
-                    self.console.print(f"{i + 1:6d}: {line}")
-                else:
-                    self.console.print(line)
-
-            # Show status line
-            if end_line >= len(lines):
-                self.console.print(
-                    f"[dim](END) lines {current_line + 1}-{len(lines)} of {len(lines)}[/dim]"
-                )
-                break
+        Returns:
+            False if the user asked to quit
+        """
+        page_size = max(self.console.size.height - 1, 1)
+        top = 0
+        search: re.Pattern[str] | None = None
+        backward = False
+
+        while True:
+            lines = index.lines(top, page_size)
+            if not lines and top:
+                # Past the end (the file is shorter than it looked): show the last page.
+                top = max(index.count_lines() - page_size, 0)
+                lines = index.lines(top, page_size)
+            self._show_page(top, lines, flags)
+
+            end = top + len(lines)
+            at_end = index.total_lines is not None and end >= index.total_lines
+            known = f"{index.known_lines}" if index.total_lines is not None else "?"
+            if at_end:
+                self.console.print(f"[dim](END) lines {top + 1}-{end} of {known}[/dim]")
+                if flags.get("E"):
+                    return True
             else:
                 self.console.print(
-                    f"[dim]:{current_line + 1}-{end_line} of {len(lines)} (press 'q' to quit, space for next page)[/dim]"
+                    f"[dim]:{top + 1}-{end} of {known} (press 'q' to quit, Enter for next page)[/dim]"
                 )
 
-            # Wait for user input (simplified)
-            try:
-                user_input = input()
-                if user_input.lower() == "q":
-                    break
-                elif user_input == "":  # Space or enter for next page
-                    current_line = end_line
-                elif user_input.startswith("/"):
-                    # Simple search
-                    search_pattern = user_input[1:]
-                    # Find next occurrence
-                    found = False
-                    for i in range(current_line + 1, len(lines)):
-                        if (
-                            ignore_case and search_pattern.lower() in lines[i].lower()
-                        ) or search_pattern in lines[i]:
-                            current_line = max(0, i - page_size // 2)
-                            found = True
-                            break
-                    if not found:
-                        self.console.print(f"[yellow]Pattern not found: {search_pattern}[/yellow]")
+            command = self._prompt()
+            if command is None or command == "q":
+                return False
+            if command in ("", " ", "f"):
+                if at_end:
+                    return True
+                top = end
+            elif command == "b":
+                top = max(top - page_size, 0)
+            elif command == "j":
+                top += 0 if at_end else 1
+            elif command == "k":
+                top = max(top - 1, 0)
+            elif command == "g":
+                top = 0
+            elif command[:-1].isdigit() and command.endswith("g"):
+                top = max(int(command[:-1]) - 1, 0)
+            elif command == "G":
+                top = max(index.count_lines() - page_size, 0)
+            elif command[:1] in ("/", "?") or command in ("n", "N"):
+                if command[:1] in ("/", "?"):
+                    search = self._compile(command[1:], flags.get("i", False))
+                    backward = command[0] == "?"
+                    reverse = False
                 else:
-                    current_line = end_line
-            except (EOFError, KeyboardInterrupt):
-                break
+                    reverse = command == "N"
+                if search is None:
+                    self.console.print("[yellow]No previous search pattern[/yellow]")
+                    continue
+                found = index.search(search, top, backward=backward != reverse)
+                if found is None:
+                    self.console.print(f"[yellow]Pattern not found: {search.pattern}[/yellow]")
+                else:
+                    top = found
+            else:
+                top = end
+
+    def _show_page(self, top: int, lines: list[str], flags: dict) -> None:
+        """Print a page of lines, numbered unless -n was given."""
+        width = self.console.width
+        output: list[str] = []
+        for number, line in enumerate(lines, start=top + 1):
+            if not flags.get("n"):
+                line = f"{number:6d}: {line}"
+            if flags.get("S"):
+                line = line[:width]
+            output.append(line)
+        if output:
+            self.console.print("\n".join(output), markup=False, highlight=False)
+
+    def _compile(self, pattern: str, ignore_case: bool) -> re.Pattern[str]:
+        """Compile a search pattern, as a literal string if it isn't a valid expression."""
+        flags = re.IGNORECASE if ignore_case else 0
+        try:
+            return re.compile(pattern, flags)
+        except re.error:
+            return re.compile(re.escape(pattern), flags)
+
+    def _prompt(self) -> str | None:
+        """Read a command, or None if input has ended."""
+        try:
+            return input()
+        except (EOFError, KeyboardInterrupt):
+            return None
@@ -2,14 +2,24 @@
 
 from __future__ import annotations
 
+import itertools
 from typing import TYPE_CHECKING, Union
 
 import ops
 
-from ...utils.command_helpers import handle_help_flag, parse_flags, safe_read_file
+from ...utils import resolve_path
+from ...utils.command_helpers import handle_help_flag, parse_flags, print_text_chunks
+from ...utils.streaming import (
+    MAX_CHUNK_SIZE,
+    iter_decompressed,
+    iter_lines,
+    iter_remote_chunks,
+)
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     import shimmer
 
 
@@ -32,7 +42,9 @@ Usage: more [OPTIONS] [FILE...]
 
 Description:
     Display file contents one screen at a time.
-    Less featured than 'less' but simpler to use.
+    Less featured than 'less' but simpler to use. The file is read as it
+    is shown, so very large files open at once. When the output is not a
+    terminal, the files are copied to it unchanged.
 
 Options:
     -d              Show help prompt
@@ -44,13 +56,13 @@ Options:
 Navigation:
     Space           Next page
     Enter           Next line
+    /pattern        Skip forward to the next line matching pattern
     q               Quit
     h               Help
 
 Examples:
     more file.txt
     more -s file.txt
-    cat file.txt | more
         """
         self.console.print(help_text)
 
@@ -82,55 +94,69 @@ Examples:
             self.console.print("[red]more: missing file argument[/red]")
             return 1
 
-        file_path = positional_args[0]
-
-        try:
-            content = safe_read_file(client, file_path)
-            if content is None:
+        for file_path in positional_args:
+            path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+            try:
+                if not self.console.is_terminal:
+                    print_text_chunks(
+                        self.console,
+                        iter_remote_chunks(
+                            client, path, max_chunk_size=MAX_CHUNK_SIZE, decompress=True
+                        ),
+                    )
+                    continue
+                size = self._file_size(client, path)
+                progress = _ReadProgress(
+                    iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE)
+                )
+                lines: Iterator[str] = (
+                    line.decode("utf-8", errors="replace")
+                    for line in iter_lines(iter_decompressed(progress))
+                )
+                if squeeze_blanks:
+                    lines = _squeeze(lines)
+                if not self._simple_paginate(lines, show_help, progress, size):
+                    break
+            except ops.pebble.PathError as e:
+                message = "No such file" if e.kind == "not-found" else e.message
+                self.console.print(f"[red]more: cannot open '{file_path}': {message}[/red]")
                 return 1
-
-            lines = content.splitlines()
-
-            # Process lines based on options
-            if squeeze_blanks:
-                processed_lines = []
-                prev_blank = False
-                for line in lines:
-                    is_blank = not line.strip()
-                    if not (is_blank and prev_blank):
-                        processed_lines.append(line)
-                    prev_blank = is_blank
-                lines = processed_lines
-
-            # Simple pagination
-            self._simple_paginate(lines, show_help)
-            return 0
-
-        except ops.pebble.PathError:
-            self.console.print(f"[red]more: cannot open '{file_path}': No such file[/red]")
-            return 1
-        except Exception as e:
-            self.console.print(f"[red]more: {e}[/red]")
-            return 1
-
-    def _simple_paginate(self, lines: list[str], show_help: bool):
-        """Return simple pagination for more command."""
-        page_size = 20
-        current_line = 0
-
-        while current_line < len(lines):
-            # Display current page
-            end_line = min(current_line + page_size, len(lines))
-
-            for i in range(current_line, end_line):
-                self.console.print(lines[i])
+            except (ops.pebble.APIError, ValueError) as e:
+                self.console.print(f"[red]more: {file_path}: {e}[/red]")
+                return 1
+        return 0
+
+    @staticmethod
+    def _file_size(client: ClientType, path: str) -> int | None:
+        info = client.list_files(path, itself=True)
+        return info[0].size if info else None
+
+    def _simple_paginate(
+        self,
+        lines: Iterator[str],
+        show_help: bool,
+        progress: _ReadProgress,
+        size: int | None,
+    ) -> bool:
+        """Page through the lines as they are read.
+
+        Returns:
+            False if the user asked to quit
+        """
+        page_size = max(self.console.size.height - 1, 1)
+        count = page_size
+        lines = iter(lines)
+        while True:
+            page = list(itertools.islice(lines, count))
+            if page:
+                self.console.print("\n".join(page), markup=False, highlight=False)
+            if len(page) < count:
+                return True
 
             # Show prompt
-            if end_line >= len(lines):
-                break
-
-            remaining_percent = int((len(lines) - end_line) / len(lines) * 100)
-            prompt = f"--More--({remaining_percent}%)"
+            prompt = "--More--"
+            if size:
+                prompt += f"({min(progress.bytes_read * 100 // size, 100)}%)"
             if show_help:
                 prompt += " (h for help)"
 
@@ -138,14 +164,48 @@ Examples:
 
             try:
                 user_input = input()
-                if user_input.lower() == "q":
-                    break
-                elif user_input.lower() == "h":
-                    self.console.print("\nHelp: Space=next page, Enter=next line, q=quit, h=help")
-                    continue
-                elif user_input == "":  # Enter for next line
-                    current_line += 1
-                else:  # Space or any other key for next page
-                    current_line = end_line
             except (EOFError, KeyboardInterrupt):
-                break
+                return False
+            if user_input.lower() == "q":
+                return False
+            elif user_input.lower() == "h":
+                self.console.print(
+                    "\nHelp: Space=next page, Enter=next line, /pattern=search, q=quit, h=help"
+                )
+                count = 0
+            elif user_input == "":  # Enter for next line
+                count = 1
+            elif user_input.startswith("/"):
+                lines = _skip_to_match(lines, user_input[1:])
+                self.console.print("[dim]...skipping[/dim]")
+                count = page_size
+            else:  # Space or any other key for next page
+                count = page_size
+
+
+class _ReadProgress:
+    """Pass chunks through, counting the bytes read so far."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = chunks
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._chunks:
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+def _skip_to_match(lines: Iterator[str], text: str) -> Iterator[str]:
+    """Skip the lines before the first one containing ``text``."""
+    return itertools.dropwhile(lambda line: text not in line, lines)
+
+
+def _squeeze(lines: Iterable[str]) -> Iterator[str]:
+    """Replace runs of blank lines with a single blank line."""
+    prev_blank = False
+    for line in lines:
+        is_blank = not line.strip()
+        if not (is_blank and prev_blank):
+            yield line
+        prev_blank = is_blank
@@ -10,6 +10,7 @@ from .date import DateCommand
 from .echo import EchoCommand
 from .edit import EditCommand
 from .env import EnvCommand
+from .explain import ExplainCommand
 from .false import FalseCommand
 from .grep import GrepCommand
 from .hd import HdCommand
@@ -55,6 +56,7 @@ __all__ = [
     "EchoCommand",
     "EditCommand",
     "EnvCommand",
+    "ExplainCommand",
     "FalseCommand",
     "GrepCommand",
     "HdCommand",
@@ -2,21 +2,54 @@
 
 from __future__ import annotations
 
+import collections
+import posixpath
 from typing import TYPE_CHECKING, Any
 
 import ops
 
-from ...utils.command_helpers import (
-    process_file_arguments,
-    validate_min_args,
+from ...utils import resolve_path
+from ...utils.checksums import (
+    ChecksumEntry,
+    FileChecksum,
+    checksum_files,
+    new_checksum,
+    parse_checksum_line,
+    tag_name,
+    verify_checksums,
 )
+from ...utils.command_helpers import parse_flags, validate_min_args
+from ...utils.remote_offload import offload, split_offload_mode
+from ...utils.streaming import DEFAULT_WORKERS, iter_lines, iter_remote_chunks, walk_remote_files
 from .._base import Command
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterator
 
     import shimmer
 
+# Flags understood by every checksum command.
+_CHECKSUM_FLAGS: dict[str, type] = {
+    "c": bool,  # check checksums listed in the given files
+    "check": bool,
+    "R": bool,  # recurse into directories
+    "quiet": bool,  # with -c, don't print OK for each verified file
+    "status": bool,  # with -c, print nothing; the exit code reports the result
+    "j": int,  # number of files to read concurrently
+}
+
+
+def _plural(count: int, noun: str) -> str:
+    return f"{count} {noun}" if count == 1 else f"{count} {noun}s"
+
+
+def _is_directory(client: ops.pebble.Client | shimmer.PebbleCliClient, path: str) -> bool:
+    try:
+        info = client.list_files(path, itself=True)
+    except (ops.pebble.PathError, ops.pebble.APIError):
+        return False
+    return bool(info) and info[0].type == ops.pebble.FileType.DIRECTORY
+
 
 class _HashCommand(Command):
     """Compute hash of a file or stdin."""
@@ -29,31 +62,177 @@ class _HashCommand(Command):
         args: list[str],
         hash_func: Callable[..., Any],
     ):
+        algorithm = hash_func().name
+        mode, args = split_offload_mode(args)
+        parse_result = parse_flags(
+            args,
+            {**_CHECKSUM_FLAGS, "r": bool, "tag": bool},
+            self.shell,
+        )
+        if parse_result is None:
+            return 1
+        flags, positional_args = parse_result
+
         # Validate file arguments
-        if not validate_min_args(self.shell, args, 1, f"{self.name} <file> [file2...]"):
+        if not validate_min_args(self.shell, positional_args, 1, f"{self.name} <file> [file2...]"):
             return 1
 
-        # Process file arguments with path resolution
-        file_paths = process_file_arguments(
-            self.shell, client, args, allow_globs=False, min_files=1
+        recursive = flags["r"] or flags["R"]
+        checking = flags["c"] or flags["check"]
+        if not recursive and flags["j"] is None and not checking and not flags["tag"]:
+            # Recursion, -j, -c and --tag are features of the local
+            # implementation that a container's md5sum or sha*sum may lack.
+            paths = [
+                resolve_path(self.shell.current_directory, arg, self.shell.home_dir)
+                for arg in positional_args
+            ]
+            remote_exit = offload(self, client, [self.name, *args], paths, mode)
+            if remote_exit is not None:
+                return remote_exit
+
+        if checking:
+            return self._check(client, positional_args, algorithm, flags)
+
+        def format_line(display: str, result: FileChecksum) -> str:
+            digest = result.hexdigest(algorithm)
+            if flags["tag"]:
+                return f"{tag_name(algorithm)} ({display}) = {digest}"
+            return f"{digest}  {display}"
+
+        return self._print_checksums(
+            client, positional_args, [algorithm], recursive, flags, format_line
         )
-        if file_paths is None:
-            return 1
 
+    @staticmethod
+    def _describe_error(error: Exception) -> str:
+        if isinstance(error, ops.pebble.PathError) and error.kind == "not-found":
+            return "No such file or directory"
+        return str(error)
+
+    def _print_checksums(
+        self,
+        client: ops.pebble.Client | shimmer.PebbleCliClient,
+        file_args: list[str],
+        algorithms: list[str],
+        recursive: bool,
+        flags: dict[str, Any],
+        format_line: Callable[[str, FileChecksum], str],
+    ) -> int:
+        """Checksum the files (concurrently) and print one line per file, in order."""
         exit_code = 0
-        for file_path in file_paths:
+        # Output uses the names as given (plus the path below them when recursing);
+        # results come back in the order the paths were produced.
+        displays: collections.deque[str] = collections.deque()
+
+        def report(path: str, error: Exception) -> None:
+            nonlocal exit_code
+            self.console.print(f"{self.name}: {path}: {self._describe_error(error)}", markup=False)
+            exit_code = 1
+
+        def paths() -> Iterator[str]:
+            for arg in file_args:
+                path = resolve_path(self.shell.current_directory, arg, self.shell.home_dir)
+                if not recursive:
+                    displays.append(arg)
+                    yield path
+                    continue
+                for file_path, _ in walk_remote_files(client, path, on_error=report):
+                    relative = posixpath.relpath(file_path, path)
+                    displays.append(arg if relative == "." else posixpath.join(arg, relative))
+                    yield file_path
+
+        workers = flags["j"] or DEFAULT_WORKERS
+        for path, result in checksum_files(client, paths(), algorithms, workers):
+            display = displays.popleft()
+            if isinstance(result, Exception):
+                # Directories are only looked for once reading fails, to
+                # save a round trip per file.
+                if (
+                    not recursive
+                    and isinstance(result, ops.pebble.PathError)
+                    and result.kind != "not-found"
+                    and _is_directory(client, path)
+                ):
+                    result = IsADirectoryError("Is a directory")
+                report(display, result)
+                continue
+            self.console.print(format_line(display, result), markup=False, highlight=False)
+        return exit_code
+
+    def _check(
+        self,
+        client: ops.pebble.Client | shimmer.PebbleCliClient,
+        manifests: list[str],
+        default_algorithm: str,
+        flags: dict[str, Any],
+    ) -> int:
+        """Verify the files listed in checksum manifests."""
+        # Untagged lines must have a digest of the right length for the default algorithm.
+        digest_length = len(new_checksum(default_algorithm).hexdigest())
+        entries: list[tuple[ChecksumEntry, str]] = []
+        exit_code = 0
+        bad_lines = 0
+        for manifest in manifests:
+            path = resolve_path(self.shell.current_directory, manifest, self.shell.home_dir)
+            found = 0
             try:
-                with client.pull(file_path, encoding=None) as f:
-                    h = hash_func()
-                    while True:
-                        chunk = f.read(8192)
-                        if not chunk:
-                            break
-                        h.update(chunk)
-                # Use original filename from args for output, not resolved path
-                original_name = args[file_paths.index(file_path)]
-                self.console.print(f"{h.hexdigest()}  {original_name}")
+                for raw_line in iter_lines(iter_remote_chunks(client, path)):
+                    line = raw_line.decode("utf-8", errors="replace").rstrip("\r")
+                    entry = parse_checksum_line(line)
+                    if entry is None or (
+                        entry.algorithm is None and len(entry.digest) != digest_length
+                    ):
+                        bad_lines += bool(line.strip())
+                        continue
+                    entries.append(
+                        (
+                            entry,
+                            resolve_path(
+                                self.shell.current_directory, entry.path, self.shell.home_dir
+                            ),
+                        )
+                    )
+                    found += 1
             except (ops.pebble.PathError, ops.pebble.APIError) as e:
-                self.console.print(f"{self.name}: {file_path}: {e}")
+                self.console.print(
+                    f"{self.name}: {manifest}: {self._describe_error(e)}", markup=False
+                )
                 exit_code = 1
-        return exit_code
+                continue
+            if not found:
+                self.console.print(
+                    f"{self.name}: {manifest}: no properly formatted checksum lines found",
+                    markup=False,
+                )
+                exit_code = 1
+
+        failed = unreadable = 0
+        workers = flags["j"] or DEFAULT_WORKERS
+        for entry, result in verify_checksums(client, entries, default_algorithm, workers):
+            if isinstance(result, Exception):
+                unreadable += 1
+                message = f"{entry.path}: FAILED open or read"
+            elif result:
+                if flags["quiet"]:
+                    continue
+                message = f"{entry.path}: OK"
+            else:
+                failed += 1
+                message = f"{entry.path}: FAILED"
+            if not flags["status"]:
+                self.console.print(message, markup=False, highlight=False)
+
+        if not flags["status"]:
+            if bad_lines:
+                self.console.print(
+                    f"{self.name}: WARNING: {_plural(bad_lines, 'line')} improperly formatted"
+                )
+            if unreadable:
+                self.console.print(
+                    f"{self.name}: WARNING: {_plural(unreadable, 'listed file')} could not be read"
+                )
+            if failed:
+                self.console.print(
+                    f"{self.name}: WARNING: {_plural(failed, 'computed checksum')} did NOT match"
+                )
+        return 1 if exit_code or failed or unreadable else 0
@@ -0,0 +1,82 @@
+"""Implementation of ExplainCommand."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Union
+
+import ops
+
+from ...utils.command_helpers import handle_help_flag
+from ...utils.parser import CommandType, get_shell_parser
+from ...utils.pipeline_fusion import explain_pipeline
+from .._base import Command
+
+if TYPE_CHECKING:
+    import shimmer
+
+    from ...utils.parser import ParsedCommand
+
+# TODO: Use the prototype from Shimmer.
+ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
+
+
+class ExplainCommand(Command):
+    """Show how a command line will be executed."""
+
+    name = "explain"
+    help = "Show the execution plan for a command line. Usage: explain 'CMD | CMD ...'"
+    category = "Built-in Commands"
+
+    def show_help(self):
+        """Show command help."""
+        help_text = """Show the execution plan for a command line, without running it.
+
+Usage: explain 'COMMAND LINE'
+
+Description:
+    Pipelines made of commands the shell can fuse (cat, grep, sort, uniq,
+    head, wc, and ps piped into grep) are rewritten into streaming
+    operators: for example, sort | uniq -c counts lines in a hash table and
+    sort | head keeps only the top lines in a heap. Other pipelines run
+    stage by stage. Quote the command line so that its pipes are passed to
+    explain rather than run.
+
+Examples:
+    explain 'cat app.log | grep ERROR | wc -l'
+    explain 'sort access.log | uniq -c | sort -rn | head'
+    explain 'ps aux | grep nginx'
+"""
+        self.console.print(help_text, markup=False)
+
+    def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
+        """Execute the explain command."""
+        if handle_help_flag(self, args):
+            return 0
+        if not args:
+            self.console.print("Usage: explain 'COMMAND LINE'")
+            return 1
+
+        try:
+            parsed = get_shell_parser().parse_command_line(" ".join(args))
+        except ValueError as e:
+            self.console.print(f"explain: {e}", markup=False)
+            return 1
+
+        # Later stages of a pipeline are reached through next_command.
+        later_stages = {id(cmd.next_command) for cmd in parsed if cmd.type == CommandType.PIPE}
+        lines: list[str] = []
+        for cmd in parsed:
+            if id(cmd) in later_stages:
+                continue
+            lines.extend(explain_pipeline(self._pipeline(cmd), self.shell.commands))
+        self.console.print("\n".join(lines), markup=False, highlight=False)
+        return 0
+
+    @staticmethod
+    def _pipeline(start: ParsedCommand) -> list[ParsedCommand]:
+        """Collect the stages of the pipeline that starts with ``start``."""
+        parser = get_shell_parser()
+        stages = [start]
+        while stages[-1].type == CommandType.PIPE and stages[-1].next_command is not None:
+            stages.append(stages[-1].next_command)
+        return [parser.expand_globs(stage) for stage in stages]
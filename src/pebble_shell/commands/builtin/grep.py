@@ -2,83 +2,669 @@
 
 from __future__ import annotations
 
+import collections
+import contextlib
+import dataclasses
+import fnmatch
+import itertools
+import os
 import re
-from typing import TYPE_CHECKING, Union
+import threading
+from typing import TYPE_CHECKING, Any, Union
 
 import ops
 
 from ...utils.command_helpers import (
     handle_help_flag,
+    parse_flags,
     process_file_arguments,
-    safe_read_file,
     validate_min_args,
 )
+from ...utils.pattern_matching import (
+    MultiPatternMatcher,
+    compile_patterns,
+    split_pattern_options,
+    strip_regex_delimiters,
+)
+from ...utils.remote_offload import OffloadMode, offload, split_offload_mode
+from ...utils.streaming import (
+    bounded_map,
+    has_compressed_suffix,
+    is_binary,
+    iter_lines,
+    iter_remote_chunks,
+    walk_remote_files,
+)
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
     import shimmer
 
+    from ...utils.output_writer import OutputWriter
+
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+_USAGE = "grep <pattern> <file> [file2...]"
+
+# How matches in piped input are labelled (e.g. by -l and -c with -H).
+_STDIN_LABEL = "(standard input)"
+
+# Options (other than -e and -f) that take a value.
+_VALUE_FLAGS = "mABC"
+
+_FLAGS: dict[str, type] = {
+    "r": bool,  # recurse into directories
+    "R": bool,  # same as -r (symbolic links are not followed)
+    "l": bool,  # list files with matches
+    "L": bool,  # list files without matches
+    "c": bool,  # count selected lines
+    "m": int,  # stop after NUM selected lines
+    "v": bool,  # select non-matching lines
+    "i": bool,  # ignore case
+    "w": bool,  # match whole words
+    "x": bool,  # match whole lines
+    "n": bool,  # line numbers (always shown for files)
+    "q": bool,  # quiet, exit status only
+    "s": bool,  # suppress error messages
+    "A": int,  # trailing context
+    "B": int,  # leading context
+    "C": int,  # leading and trailing context
+    "E": bool,  # extended regular expression
+    "F": bool,  # fixed string
+    "a": bool,  # treat binary files as text
+    "I": bool,  # skip binary files
+    "H": bool,  # always show file names
+    "no-filename": bool,
+    "include": str,
+    "exclude": str,
+    "pattern-counts": bool,  # report how many lines each pattern matched
+}
+
+# Options passed unchanged to the container's grep when offloading.
+_NATIVE_FLAGS = "lLcvqiwxsaI"
+
+# Regular expression syntax that Python and POSIX extended regular
+# expressions (grep -E) read the same way. Searches using anything else
+# (escapes such as \d or \b, groups starting "(?", lazy quantifiers,
+# backslashes or classes inside brackets, ...) are not offloaded.
+_PORTABLE_REGEX = re.compile(
+    r"""
+    (?:
+        [^\\\[\](){}?*+|]                     # ordinary characters and . ^ $
+      | \\[^A-Za-z0-9]                       # escaped punctuation
+      | [()|]
+      | (?<![(|\\])[*+?](?![?+])              # quantifiers, not lazy or possessive
+      | (?<![(|\\])\{\d+(?:,\d*)?\}(?![?+])   # bounded repetition
+      | \[\^?\]?[^\]\\\[]*\]                 # bracket expressions
+    )*
+    """,
+    re.VERBOSE,
+)
+
+
+@dataclasses.dataclass
+class _GrepOptions:
+    """Options controlling how matching lines are selected and reported."""
+
+    invert: bool = False
+    count_only: bool = False
+    files_with_matches: bool = False
+    files_without_match: bool = False
+    quiet: bool = False
+    max_count: int | None = None
+    before: int = 0
+    after: int = 0
+    show_filename: bool = False
+    line_numbers: bool = True
+    binary_files: str = "binary"  # "binary", "text" or "without-match"
+    pattern_counts: bool = False
+
+    @property
+    def first_match_decides(self) -> bool:
+        """Whether a single selected line is enough to finish with a file."""
+        return self.quiet or self.files_with_matches or self.files_without_match
+
+    @property
+    def selects_nothing(self) -> bool:
+        """Whether -m 0 means grep can finish without reading anything.
+
+        As with GNU grep, only -L still has output: every file is listed.
+        """
+        return self.max_count == 0 and not self.files_without_match
+
+
+@dataclasses.dataclass
+class _GrepRequest:
+    """A parsed grep command line."""
+
+    flags: dict[str, Any]
+    patterns: list[str]
+    regex: re.Pattern[bytes] | MultiPatternMatcher
+    file_args: list[str]
+    recursive: bool
+
+
+@dataclasses.dataclass
+class _FileResult:
+    """Outcome of searching a single file."""
+
+    lines: list[str] = dataclasses.field(default_factory=list)
+    count: int = 0
+    binary_match: bool = False
+    error: str | None = None
+    pattern_hits: collections.Counter[int] = dataclasses.field(default_factory=collections.Counter)
+
+
+class _FileSearcher:
+    """Searches individual files; safe to run from several worker threads at once."""
+
+    def __init__(
+        self,
+        client: ClientType,
+        regex: re.Pattern[bytes] | MultiPatternMatcher,
+        options: _GrepOptions,
+        stop: threading.Event,
+    ):
+        self._client = client
+        self._regex = regex
+        self._options = options
+        self._stop = stop
+
+    def search(self, path: str) -> _FileResult:
+        """Search a remote file, reading only as much of it as is needed.
+
+        Compressed files are decompressed as they are read.
+        """
+        result = _FileResult()
+        try:
+            with contextlib.closing(
+                iter_remote_chunks(self._client, path, stop=self._stop, decompress=True)
+            ) as chunks:
+                self._search_chunks(path, chunks, result)
+        except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
+            result.error = str(e)
+        return result
+
+    def search_data(self, label: str, data: bytes) -> _FileResult:
+        """Search data that has already been read, such as piped input."""
+        result = _FileResult()
+        self._search_chunks(label, iter((data,)), result)
+        return result
+
+    def stream(self, path: str) -> Iterator[str]:
+        """Yield the selected lines of a remote file, formatted, as they are found.
+
+        Raises:
+            ops.pebble.PathError, ops.pebble.APIError, ValueError: If the file
+                can't be read
+        """
+        result = _FileResult()
+        with contextlib.closing(
+            iter_remote_chunks(self._client, path, stop=self._stop, decompress=True)
+        ) as chunks:
+            yield from self._select_chunks(path, chunks, result)
+        if result.binary_match:
+            yield f"Binary file {path} matches"
+
+    def _search_chunks(self, path: str, chunks: Iterator[bytes], result: _FileResult) -> None:
+        result.lines.extend(self._select_chunks(path, chunks, result))
+
+    def _select_chunks(
+        self, path: str, chunks: Iterator[bytes], result: _FileResult
+    ) -> Iterator[str]:
+        first = next(chunks, b"")
+        binary = self._options.binary_files != "text" and is_binary(first)
+        if binary and self._options.binary_files == "without-match":
+            return
+        yield from self._select(path, itertools.chain((first,), chunks), binary, result)
+
+    def _select(
+        self, path: str, chunks: Iterable[bytes], binary: bool, result: _FileResult
+    ) -> Iterator[str]:
+        """Yield the output lines for the selected lines (and their context)."""
+        options = self._options
+        context = options.before or options.after
+        if options.invert or context:
+            numbered = self._all_lines(chunks)
+        else:
+            numbered = self._matching_lines(chunks)
+
+        before: collections.deque[tuple[int, bytes]] = collections.deque(maxlen=options.before)
+        after_left = 0
+        last_emitted = 0
+        limit_reached = options.max_count == 0
+
+        def emit(line_no: int, line: bytes, sep: str) -> Iterator[str]:
+            nonlocal last_emitted
+            if context and last_emitted and line_no > last_emitted + 1:
+                yield "--"
+            prefix = f"{path}{sep}" if options.show_filename else ""
+            number = f"{line_no}{sep}" if options.line_numbers else ""
+            text = line.decode("utf-8", errors="replace")
+            yield f"{prefix}{number}{text}"
+            last_emitted = line_no
+
+        for line_no, line, selected in numbered:
+            if selected and not limit_reached:
+                result.count += 1
+                if options.pattern_counts and isinstance(self._regex, MultiPatternMatcher):
+                    result.pattern_hits.update(self._regex.matching_patterns(line))
+                if options.first_match_decides:
+                    return
+                if binary:
+                    if not options.count_only:
+                        result.binary_match = True
+                        return
+                elif not options.count_only:
+                    for context_no, context_line in before:
+                        yield from emit(context_no, context_line, "-")
+                    before.clear()
+                    yield from emit(line_no, line, ":")
+                    after_left = options.after
+                if options.max_count is not None and result.count >= options.max_count:
+                    limit_reached = True
+                    if not after_left or options.count_only:
+                        return
+            elif after_left:
+                yield from emit(line_no, line, "-")
+                after_left -= 1
+                if limit_reached and not after_left:
+                    return
+            elif limit_reached:
+                return
+            elif options.before:
+                before.append((line_no, line))
+
+    def _all_lines(self, chunks: Iterable[bytes]) -> Iterator[tuple[int, bytes, bool]]:
+        """Yield every line with whether it is selected (used for -v and context)."""
+        search = self._regex.search
+        invert = self._options.invert
+        for line_no, line in enumerate(iter_lines(chunks), 1):
+            yield line_no, line, (search(line) is not None) != invert
+
+    def _matching_lines(self, chunks: Iterable[bytes]) -> Iterator[tuple[int, bytes, bool]]:
+        """Yield only the matching lines, scanning whole buffers rather than line by line.
+
+        The regex is run across each buffer of complete lines; line boundaries
+        (and line numbers) are only worked out around the places it matches.
+        """
+        search = self._regex.search
+        pending = b""
+        lines_before = 0  # Complete lines consumed before the current buffer.
+
+        def scan(buf: bytes, end: int) -> Iterator[tuple[int, bytes, bool]]:
+            pos = 0
+            counted_to = 0
+            line_no = lines_before
+            while pos < end:
+                match = search(buf, pos, end)
+                # A pattern matching an empty line also matches at ``end``,
+                # just past the last newline; that is not a line of its own.
+                if match is None or match.start() >= end:
+                    return
+                start = buf.rfind(b"\n", pos, match.start()) + 1 or pos
+                stop = buf.find(b"\n", match.start(), end)
+                if stop < 0:
+                    stop = end
+                # A match can span a newline (e.g. with \s); make sure the line
+                # on its own matches before reporting it.
+                if match.end() <= stop or search(buf, start, stop) is not None:
+                    line_no += buf.count(b"\n", counted_to, start)
+                    counted_to = start
+                    yield line_no + 1, buf[start:stop], True
+                pos = stop + 1
+
+        for chunk in chunks:
+            buf = pending + chunk if pending else chunk
+            end = buf.rfind(b"\n") + 1
+            if not end:
+                pending = buf
+                continue
+            yield from scan(buf, end)
+            lines_before += buf.count(b"\n", 0, end)
+            pending = buf[end:]
+        if pending:
+            yield from scan(pending, len(pending))
+
 
 class GrepCommand(Command):
     """Command for searching patterns in files using regex or string matching."""
 
     name = "grep"
-    help = "Search for pattern in files"
+    help = (
+        "Search for pattern in files. Usage: grep [-rlLcvqiwxsIaFE] [-m NUM] "
+        "[-A/-B/-C NUM] [-e PATTERN | -f PATTERNFILE] [--include/--exclude GLOB] "
+        "[--pattern-counts] [--local|--remote] <pattern> <file>..."
+    )
     category = "Filesystem Commands"
 
     def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
         """Execute the grep command to search for patterns in files."""
         if handle_help_flag(self, args):
             return 0
+        mode, args = split_offload_mode(args)
+        request = self._parse(client, args, piped=False)
+        if request is None:
+            return 1
+        return self._search_files(client, request, mode)
+
+    def execute_piped(self, client: ClientType, args: list[str], data: str) -> int:
+        """Search text piped in from another command, as grep searches its standard input.
+
+        Files named on the command line are searched instead, as with grep.
+        """
+        if handle_help_flag(self, args):
+            return 0
+        mode, args = split_offload_mode(args)
+        request = self._parse(client, args, piped=True)
+        if request is None:
+            return 1
+        if request.file_args:
+            return self._search_files(client, request, mode)
 
-        if not validate_min_args(self.shell, args, 2, "grep <pattern> <file> [file2...]"):
+        options = self._make_options(request.flags, multiple=False)
+        if options is None or options.selects_nothing:
             return 1
+        options.line_numbers = bool(request.flags["n"])
+        searcher = _FileSearcher(client, request.regex, options, threading.Event())
+        result = searcher.search_data(_STDIN_LABEL, data.encode("utf-8"))
+        with self.output() as writer:
+            if not options.quiet:
+                writer.write_lines(self._format_result(_STDIN_LABEL, result, options))
+            self._write_pattern_counts(writer, request.regex, options, result.pattern_hits)
+        return 0 if result.count else 1
+
+    def stream_lines(
+        self,
+        client: ClientType,
+        args: list[str],
+        on_error: Callable[[str, Exception], None],
+    ) -> Iterator[str]:
+        """Yield the lines grep prints for ``args``, as the files are read.
 
-        pattern = args[0]
-        file_args = args[1:]
+        A fused pipeline reads ``grep PATTERN FILE... | ...`` this way: the lines
+        are formatted exactly as grep prints them, but a ``head`` later in
+        the pipeline stops the search early. Only selected lines are produced,
+        so options that report counts or file names instead are not supported.
 
+        Args:
+            client: Pebble client
+            args: The grep arguments, which must name at least one file
+            on_error: Called with the path and the error for a file that
+                can't be read
+        """
+        request = self._parse(client, args, piped=False)
+        if request is None:
+            return
         file_paths = process_file_arguments(
-            self.shell, client, file_args, allow_globs=False, min_files=1
+            self.shell, client, request.file_args, allow_globs=False, min_files=1
         )
         if file_paths is None:
-            return 1
+            return
+        options = self._make_options(request.flags, multiple=len(file_paths) > 1)
+        if options is None:
+            return
+        searcher = _FileSearcher(client, request.regex, options, threading.Event())
+        for path in file_paths:
+            try:
+                yield from searcher.stream(path)
+            except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
+                on_error(path, e)
+
+    def _parse(self, client: ClientType, args: list[str], piped: bool) -> _GrepRequest | None:
+        """Parse the arguments and compile the patterns, reporting any problem."""
+        try:
+            patterns_given, pattern_files, args = split_pattern_options(args, _VALUE_FLAGS)
+        except ValueError as e:
+            self.console.print(f"grep: {e}")
+            return None
+        parsed = parse_flags(args, _FLAGS, self.shell)
+        if parsed is None:
+            return None
+        flags, positional = parsed
+
+        recursive = flags["r"] or flags["R"]
+        explicit = bool(patterns_given or pattern_files)
+        min_args = (0 if explicit else 1) + (0 if recursive or piped else 1)
+        if min_args and not validate_min_args(self.shell, positional, min_args, _USAGE):
+            return None
+        patterns: list[str] = []
+        for pattern_file in pattern_files:
+            from_file = self._read_patterns(client, pattern_file)
+            if from_file is None:
+                return None
+            patterns.extend(from_file)
+        for pattern in patterns_given:
+            patterns.extend(pattern.split("\n"))
+        if explicit:
+            file_args = positional
+        else:
+            patterns.extend(positional[0].split("\n"))
+            file_args = positional[1:]
+        if not file_args and recursive and not piped:
+            file_args = ["."]
 
         try:
-            if pattern.startswith("/") and pattern.endswith("/"):
-                # Regex pattern
-                regex = re.compile(pattern[1:-1])
-            else:
-                # Simple string search (escape special chars)
-                regex = re.compile(re.escape(pattern))
+            regex = compile_patterns(
+                patterns,
+                fixed=bool(flags["F"]),
+                ignore_case=bool(flags["i"]),
+                word=bool(flags["w"]),
+                line=bool(flags["x"]),
+                per_pattern=bool(flags["pattern-counts"]),
+            )
         except re.error as e:
             self.console.print(f"grep: invalid pattern: {e}")
+            return None
+        return _GrepRequest(flags, patterns, regex, file_args, recursive)
+
+    def _search_files(self, client: ClientType, request: _GrepRequest, mode: OffloadMode) -> int:
+        """Search the files named on the command line, locally or in the container."""
+        flags = request.flags
+        file_paths = process_file_arguments(
+            self.shell, client, request.file_args, allow_globs=False, min_files=1
+        )
+        if file_paths is None:
+            return 1
+        options = self._make_options(flags, multiple=request.recursive or len(file_paths) > 1)
+        if options is None or options.selects_nothing:
             return 1
+        if not flags["pattern-counts"] and not any(map(has_compressed_suffix, file_paths)):
+            # Only the local implementation can count matches per pattern, or
+            # look inside compressed files.
+            native_args = self._native_args(request, options, file_paths)
+            if native_args is not None:
+                remote_exit = offload(self, client, native_args, file_paths, mode)
+                if remote_exit is not None:
+                    return remote_exit
+            elif mode == OffloadMode.REMOTE:
+                self.console.print(
+                    "grep: the container's grep can't run this search, running locally",
+                    markup=False,
+                    highlight=False,
+                )
+        return self._search(client, request.regex, options, file_paths, request.recursive, flags)
 
-        total_matches = 0
-        show_filename = len(file_paths) > 1
+    @staticmethod
+    def _native_args(
+        request: _GrepRequest, options: _GrepOptions, file_paths: list[str]
+    ) -> list[str] | None:
+        """Translate the search into a command line for the container's grep.
 
-        for file_path in file_paths:
-            content = safe_read_file(client, file_path, self.shell)
-            if content is None:
-                continue
+        The local search uses Python regular expressions, accepts /regex/,
+        and always numbers lines from files, so the translation strips the
+        delimiters and spells out -E (or -F), -n and -H/-h.
 
-            lines = content.splitlines()
-            file_matches = 0
+        Returns:
+            The command line, or None if the container's grep might select
+            different lines or not accept the options (the search should
+            then run locally).
+        """
+        flags = request.flags
+        fixed = bool(flags["F"])
+        if fixed:
+            patterns = request.patterns
+        else:
+            patterns = [strip_regex_delimiters(pattern) for pattern in request.patterns]
+        if not patterns:
+            return None
+        for pattern in patterns:
+            # Case folding and "." differ outside ASCII.
+            if not pattern.isascii() and (flags["i"] or not fixed):
+                return None
+            if not fixed and _PORTABLE_REGEX.fullmatch(pattern) is None:
+                return None
 
-            for line_num, line in enumerate(lines, 1):
-                if regex.search(line):
-                    file_matches += 1
-                    if show_filename:
-                        self.console.print(f"{file_path}:{line_num}:{line}")
-                    else:
-                        self.console.print(f"{line_num}:{line}")
+        # busybox grep has no --include or --exclude.
+        if flags["include"] is not None or flags["exclude"] is not None:
+            return None
 
-            total_matches += file_matches
+        # Only short options, which busybox grep accepts as well as GNU grep.
+        argv = ["grep", "-F" if fixed else "-E", "-n", "-H" if options.show_filename else "-h"]
+        if request.recursive:
+            argv.append("-r")
+        argv.extend(f"-{letter}" for letter in _NATIVE_FLAGS if flags[letter])
+        if options.max_count is not None:
+            argv.extend(("-m", str(options.max_count)))
+        if options.before:
+            argv.extend(("-B", str(options.before)))
+        if options.after:
+            argv.extend(("-A", str(options.after)))
+        for pattern in patterns:
+            argv.extend(("-e", pattern))
+        argv.append("--")
+        argv.extend(file_paths)
+        return argv
 
-        if total_matches == 0:
-            return 1
+    def _read_patterns(self, client: ClientType, pattern_file: str) -> list[str] | None:
+        """Read the patterns (one per line) from a file in the container."""
+        paths = process_file_arguments(
+            self.shell, client, [pattern_file], allow_globs=False, min_files=1, max_files=1
+        )
+        if paths is None:
+            return None
+        try:
+            return [
+                line.decode("utf-8", errors="replace").rstrip("\r")
+                for line in iter_lines(iter_remote_chunks(client, paths[0]))
+            ]
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            self.console.print(f"grep: {pattern_file}: {e}", markup=False, highlight=False)
+            return None
+
+    def _make_options(self, flags: dict[str, Any], multiple: bool) -> _GrepOptions | None:
+        """Build the search options from the parsed flags."""
+        context = flags["C"] or 0
+        before = flags["B"] if flags["B"] is not None else context
+        after = flags["A"] if flags["A"] is not None else context
+        max_count = flags["m"]
+        if before < 0 or after < 0 or (max_count is not None and max_count < 0):
+            self.console.print("grep: context and count arguments must not be negative")
+            return None
+        show_filename = not flags["no-filename"] and (flags["H"] or multiple)
+        if flags["a"]:
+            binary_files = "text"
+        elif flags["I"]:
+            binary_files = "without-match"
+        else:
+            binary_files = "binary"
+        return _GrepOptions(
+            invert=bool(flags["v"]),
+            count_only=bool(flags["c"]),
+            files_with_matches=bool(flags["l"]),
+            files_without_match=bool(flags["L"]),
+            quiet=bool(flags["q"]),
+            max_count=max_count,
+            before=before,
+            after=after,
+            show_filename=show_filename,
+            binary_files=binary_files,
+            pattern_counts=bool(flags["pattern-counts"]),
+        )
+
+    def _search(
+        self,
+        client: ClientType,
+        regex: re.Pattern[bytes] | MultiPatternMatcher,
+        options: _GrepOptions,
+        file_paths: list[str],
+        recursive: bool,
+        flags: dict[str, Any],
+    ) -> int:
+        """Search the files concurrently and print the results in order."""
+        silent = bool(flags["s"])
+        include: str | None = flags["include"]
+        exclude: str | None = flags["exclude"]
+        writer = self.output()
+        any_selected = False
+        pattern_hits: collections.Counter[int] = collections.Counter()
+
+        def report_error(path: str, error: object) -> None:
+            if not silent:
+                writer.flush()
+                self.console.print(f"grep: {path}: {error}", markup=False, highlight=False)
+
+        def wanted(path: str) -> bool:
+            name = os.path.basename(path)
+            if include is not None and not fnmatch.fnmatch(name, include):
+                return False
+            return exclude is None or not fnmatch.fnmatch(name, exclude)
+
+        def candidates() -> Iterator[str]:
+            for path in file_paths:
+                if recursive:
+                    for found, _ in walk_remote_files(client, path, on_error=report_error):
+                        if wanted(found):
+                            yield found
+                elif wanted(path):
+                    yield path
+
+        stop = threading.Event()
+        searcher = _FileSearcher(client, regex, options, stop)
+        results = bounded_map(searcher.search, candidates())
+        with writer:
+            try:
+                for path, result in results:
+                    if result.error is not None:
+                        report_error(path, result.error)
+                        continue
+                    if result.count:
+                        any_selected = True
+                    pattern_hits.update(result.pattern_hits)
+                    if options.quiet:
+                        if any_selected:
+                            break
+                        continue
+                    writer.write_lines(self._format_result(path, result, options))
+            finally:
+                stop.set()
+                results.close()
+            self._write_pattern_counts(writer, regex, options, pattern_hits)
+
+        return 0 if any_selected else 1
+
+    @staticmethod
+    def _write_pattern_counts(
+        writer: OutputWriter,
+        regex: re.Pattern[bytes] | MultiPatternMatcher,
+        options: _GrepOptions,
+        pattern_hits: collections.Counter[int],
+    ) -> None:
+        """Report how many lines each pattern matched, for --pattern-counts."""
+        if options.pattern_counts and isinstance(regex, MultiPatternMatcher):
+            writer.write_lines(f"{pattern_hits[i]:7} {p}" for i, p in enumerate(regex.patterns))
 
-        return 0
+    def _format_result(self, path: str, result: _FileResult, options: _GrepOptions) -> list[str]:
+        """Produce the output lines for one searched file."""
+        if options.files_with_matches:
+            return [path] if result.count else []
+        if options.files_without_match:
+            return [] if result.count else [path]
+        if options.count_only:
+            return [f"{path}:{result.count}" if options.show_filename else str(result.count)]
+        if result.binary_match:
+            return [f"Binary file {path} matches"]
+        return result.lines
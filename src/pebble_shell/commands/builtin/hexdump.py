@@ -2,68 +2,159 @@
 
 from __future__ import annotations
 
-import io
-from typing import TYPE_CHECKING, BinaryIO, Union
+from typing import TYPE_CHECKING, Union
 
 import ops
 
 from ...utils import resolve_path
-from ...utils.command_helpers import handle_help_flag
+from ...utils.binary_dump import (
+    CHAR_TABLE,
+    dump_lines,
+    hex_bytes,
+    parse_byte_count,
+    printable,
+    table_bytes,
+    words,
+)
+from ...utils.command_helpers import handle_help_flag, parse_flags
+from ...utils.streaming import iter_byte_range, iter_remote_chunks
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     import shimmer
 
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+# Number of input bytes shown on each line.
+_WIDTH = 16
+
+# Number of output lines to collect before writing them to the console in one go.
+_OUTPUT_BATCH_LINES = 1000
+
+_OCTAL_TABLE = [f"{b:03o}" for b in range(256)]
+
+# Renderers for the util-linux display formats, in the order they are shown
+# when several are requested.
+_FORMATS: dict[str, Callable[[int, bytes], str]] = {
+    "C": lambda address, line: f"{address:08x}  {hex_bytes(line, 8):<48}  |{printable(line)}|",
+    "b": lambda address, line: f"{address:07x}" + table_bytes(line, _OCTAL_TABLE, " %s"),
+    "c": lambda address, line: f"{address:07x}" + table_bytes(line, CHAR_TABLE, " %3s"),
+    "d": lambda address, line: f"{address:07x} " + words(line, 2, "  %05u ").rstrip(),
+    "o": lambda address, line: f"{address:07x} " + words(line, 2, " %06o ").rstrip(),
+    "x": lambda address, line: f"{address:07x} " + words(line, 2, "   %04x ").rstrip(),
+}
+
+
+def _default_format(address: int, line: bytes) -> str:
+    return f"{address:08x}: {hex_bytes(line):<47}  {printable(line)}"
+
 
 class HexdumpCommand(Command):
     """Display file contents in hexadecimal (hexdump)."""
 
     name = "hexdump"
-    help = "Display file contents in hexadecimal. Usage: hexdump [-C] [file]"
+    help = (
+        "Display file contents in hexadecimal. "
+        "Usage: hexdump [-Cbcdoxv] [-s OFFSET] [-n LENGTH] file..."
+    )
     category = "Built-in Commands"
 
+    def show_help(self):
+        """Show command help."""
+        help_text = f"""{self.help}
+
+Options:
+    -C              Canonical hex+ASCII display
+    -b              One-byte octal display
+    -c              One-byte character display
+    -d              Two-byte decimal display
+    -o              Two-byte octal display
+    -x              Two-byte hexadecimal display
+    -s OFFSET       Skip OFFSET bytes from the start of the input
+    -n LENGTH       Only read LENGTH bytes of input
+    -v              Show all data (don't replace repeated lines with '*')
+    -h, --help      Show this help message
+
+OFFSET and LENGTH may be given in hex (0x...), octal (0...) or with a
+b (512), k (1024), m or g suffix. Reading stops as soon as LENGTH bytes
+have been dumped, so only that much of a large file is pulled.
+"""
+        self.console.print(help_text, markup=False)
+
     def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
         """Execute hexdump command."""
         if handle_help_flag(self, args):
             return 0
-        canonical = False
-        files: list[str] = []
-        for arg in args:
-            if arg == "-C":
-                canonical = True
-            else:
-                files.append(arg)
+        parse_result = parse_flags(
+            args,
+            {**dict.fromkeys(_FORMATS, bool), "v": bool, "s": str, "n": str},
+            self.shell,
+        )
+        if parse_result is None:
+            return 1
+        flags, files = parse_result
+        try:
+            skip = parse_byte_count(flags["s"]) if flags["s"] else 0
+            length = parse_byte_count(flags["n"]) if flags["n"] is not None else None
+        except ValueError as e:
+            self.console.print(f"{self.name}: {e}")
+            return 1
         if not files:
-            self.console.print("hexdump: no files specified")
+            self.console.print(f"{self.name}: no files specified")
             return 1
+
+        renderers = [render for name, render in _FORMATS.items() if flags[name]]
+        if renderers:
+            end_address = ("{:08x}" if flags["C"] else "{:07x}").format
+        else:
+            renderers = [_default_format]
+            end_address = None
+
         exit_code = 0
         for filename in files:
             path = resolve_path(self.shell.current_directory, filename, self.shell.home_dir)
+            chunks = iter_byte_range(iter_remote_chunks(client, path), skip, length)
             try:
-                with client.pull(path, encoding=None) as f:
-                    assert isinstance(f, bytes)
-                    self._hexdump(io.BytesIO(f), canonical)
+                self._print_lines(
+                    dump_lines(
+                        chunks,
+                        _WIDTH,
+                        renderers,
+                        offset=skip,
+                        squeeze=not flags["v"],
+                        end_address=end_address,
+                    ),
+                    skip_lone_end=end_address is not None,
+                )
             except (ops.pebble.PathError, ops.pebble.APIError) as e:
-                self.console.print(f"hexdump: {filename}: {e}")
+                self.console.print(f"{self.name}: {filename}: {e}", markup=False)
                 exit_code = 1
         return exit_code
 
-    def _hexdump(self, f: BinaryIO, canonical: bool):
-        offset = 0
-        while True:
-            chunk = f.read(16)
-            if not chunk:
-                break
-            hex_bytes = " ".join(f"{b:02x}" for b in chunk)
-            ascii_bytes = "".join(chr(b) if 32 <= b < 127 else "." for b in chunk)
-            if canonical:
-                # Group hex bytes for -C
-                hex_groups = [hex_bytes[i : i + 8] for i in range(0, len(hex_bytes), 8)]
-                hex_str = "  ".join(hex_groups)
-                self.console.print(f"{offset:08x}  {hex_str:<23}  |{ascii_bytes}|")
-            else:
-                self.console.print(f"{offset:08x}: {hex_bytes:<47}  {ascii_bytes}")
-            offset += len(chunk)
+    def _print_lines(self, lines: Iterable[str], skip_lone_end: bool = False) -> None:
+        """Print lines in batches; an end address with no data before it is dropped."""
+        batch: list[str] = []
+        printed = False
+        try:
+            for line in lines:
+                batch.append(line)
+                if len(batch) >= _OUTPUT_BATCH_LINES:
+                    self._flush(batch)
+                    printed = True
+        except (ops.pebble.PathError, ops.pebble.APIError):
+            self._flush(batch)
+            raise
+        if skip_lone_end and not printed and len(batch) == 1:
+            # Empty input: like hexdump, print nothing at all.
+            return
+        self._flush(batch)
+
+    def _flush(self, batch: list[str]) -> None:
+        if batch:
+            self.console.print(
+                "\n".join(batch), markup=False, highlight=False, emoji=False, soft_wrap=True
+            )
+            batch.clear()
@@ -4,133 +4,197 @@ from __future__ import annotations
 
 import json
 import sys
-from typing import TYPE_CHECKING, Any, Union, cast
+from typing import TYPE_CHECKING, Any, Union
 
 import ops
 from rich.panel import Panel
 from rich.syntax import Syntax
 
 from ...utils import resolve_path
-from ...utils.command_helpers import handle_help_flag
+from ...utils.command_helpers import handle_help_flag, parse_flags, print_text_chunks
+from ...utils.file_ops import file_exists
+from ...utils.json_query import compile_filter, iter_json_values, split_filter_args
+from ...utils.streaming import MAX_CHUNK_SIZE, iter_remote_chunks
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
     import shimmer
 
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+# Outputs to highlight together on a terminal.
+_HIGHLIGHT_BATCH = 100
+
 
 class JqCommand(Command):
-    """Command for pretty-printing JSON files with optional keypath filtering."""
+    """Command for filtering and pretty-printing JSON files."""
 
     name = "jq"
-    help = "Pretty-print JSON files with optional jq-like keypath filtering. Usage: jq <file> [.foo.bar]"
+    help = "Filter and pretty-print JSON and NDJSON files. Usage: jq [FILTER] <file>..."
     category = "Built-in Commands"
 
-    def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
-        """Execute the jq command to format and filter JSON files."""
+    def show_help(self):
+        """Show command help."""
+        help_text = """Filter and pretty-print JSON.
+
+Usage: jq [OPTIONS] FILTER FILE...
+       jq [OPTIONS] FILE [FILTER]
+
+Description:
+    Run FILTER over each JSON value in each FILE and print the results.
+    A file may hold one document or a stream of values, such as NDJSON;
+    values are read and filtered one at a time, so files of any size can
+    be processed. Compressed files are decompressed.
+
+    Filters are a subset of the jq language: paths (.a.b, .[0], .[],
+    .a[1:3]), pipes, commas, comparisons, and/or, //, arithmetic, array
+    and object construction, if/then/elif/else/end, and functions such
+    as select, map, has, test, length, keys and join.
+
+Options:
+    -c              Print each result on one line
+    -r              Print strings without quotes
+    -s              Read all the values into an array and filter it once
+    -S              Sort the keys of objects
+    -h, --help      Show this help message
+
+Results are highlighted only when printed to a terminal without -c or -r.
+
+Examples:
+    jq . config.json
+    jq -c 'select(.level == "error")' /var/log/app.ndjson
+    jq -r '.items[] | .name' data.json
+    jq -s 'length' events.ndjson
+    jq 'if .code then .msg else empty end' app.ndjson
+        """
+        self.console.print(help_text)
+
+    def _error(self, message: str) -> None:
+        self.console.print(Panel(message, title="[b red]jq Error[/b red]", style="red"))
+
+    def execute(self, client: ClientType, args: list[str]) -> int:
+        """Execute the jq command to filter and format JSON files."""
         if handle_help_flag(self, args):
             return 0
 
-        if not args:
-            self.console.print(
-                Panel(
-                    "No file specified. Usage: jq <file> [.foo.bar]",
-                    title="[b red]jq Error[/b red]",
-                    style="red",
-                )
-            )
+        result = parse_flags(
+            args,
+            {
+                "c": bool,  # compact output
+                "r": bool,  # raw strings
+                "s": bool,  # slurp
+                "S": bool,  # sort keys
+            },
+            self.shell,
+        )
+        if result is None:
             return 1
+        flags, positional_args = result
 
-        file_path = args[0]
-        keypath = args[1] if len(args) > 1 else None
-
-        # Resolve path
-        if file_path == "-":
-            # Read from stdin
-            content = sys.stdin.read()
-        else:
-            try:
-                resolved_path = resolve_path(
-                    self.shell.current_directory, file_path, self.shell.home_dir
-                )
-                with client.pull(resolved_path) as file:
-                    content = file.read()
-                    if isinstance(content, bytes):
-                        content = content.decode("utf-8")
-            except Exception as e:
-                self.console.print(
-                    Panel(
-                        f"Error reading file {file_path}: {e}",
-                        title="[b red]jq Error[/b red]",
-                        style="red",
-                    )
-                )
-                return 1
+        expression, file_paths = split_filter_args(
+            positional_args, lambda name: self._is_file(client, name)
+        )
+        if not file_paths:
+            self._error("No file specified. Usage: jq <file> [.foo.bar]")
+            return 1
 
-        # Parse JSON
         try:
-            data = json.loads(content)
-        except Exception as e:
-            self.console.print(
-                Panel(
-                    f"Error parsing JSON: {e}",
-                    title="[b red]jq Error[/b red]",
-                    style="red",
-                )
-            )
+            run = compile_filter(expression)
+        except ValueError as e:
+            self._error(f"Invalid filter: {expression}: {e}")
             return 1
 
-        # Apply keypath filter if provided
-        if keypath:
-            if keypath.startswith("."):
-                keys = [k for k in keypath.lstrip(".").split(".") if k]
-                try:
-                    for k in keys:
-                        if isinstance(data, dict):
-                            data = cast("dict[Any, Any]", data)
-                            data = data[k]
-                        elif isinstance(data, list) and k.isdigit():
-                            data = cast("list[Any]", data)
-                            data = data[int(k)]
-                        else:
-                            raise KeyError(k)
-                except Exception as e:
-                    self.console.print(
-                        Panel(
-                            f"Key path error: {e}",
-                            title="[b red]jq Error[/b red]",
-                            style="red",
-                        )
-                    )
-                    return 1
+        errors: list[str] = []
+        values = self._read_values(client, file_paths, errors)
+        if flags["s"]:
+            values = iter([list(values)])
+        outputs = self._filter(values, run, errors)
+
+        compact, raw = flags["c"], flags["r"]
+        if self.console.is_terminal and not (compact or raw):
+            self._print_highlighted(outputs, flags["S"])
+        else:
+            print_text_chunks(
+                self.console,
+                ((_format(value, compact, raw, flags["S"]) + "\n").encode() for value in outputs),
+            )
+
+        for error in errors:
+            self._error(error)
+        return 1 if errors else 0
+
+    def _is_file(self, client: ClientType, name: str) -> bool:
+        """Whether an argument names a file (or standard input) rather than a filter."""
+        if name == "-":
+            return True
+        return file_exists(
+            client, resolve_path(self.shell.current_directory, name, self.shell.home_dir)
+        )
+
+    def _read_values(
+        self, client: ClientType, file_paths: list[str], errors: list[str]
+    ) -> Iterator[Any]:
+        """Yield the JSON values in each file, stopping a file at its first error."""
+        for file_path in file_paths:
+            if file_path == "-":
+                chunks: Iterable[bytes] = [sys.stdin.read().encode()]
             else:
+                path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+                chunks = iter_remote_chunks(
+                    client, path, max_chunk_size=MAX_CHUNK_SIZE, decompress=True
+                )
+            try:
+                yield from iter_json_values(chunks)
+            except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                errors.append(f"Error reading file {file_path}: {e}")
+            except ValueError as e:
+                errors.append(f"Error parsing JSON in {file_path}: {e}")
+
+    @staticmethod
+    def _filter(
+        values: Iterable[Any], run: Callable[[Any], Iterable[Any]], errors: list[str]
+    ) -> Iterator[Any]:
+        """Run the filter over each value, reporting (rather than stopping at) errors."""
+        failed = 0
+        for value in values:
+            try:
+                yield from run(value)
+            except ValueError as e:
+                failed += 1
+                if failed == 1:
+                    errors.append(f"Key path error: {e}")
+        if failed > 1:
+            errors.append(f"Key path error in {failed - 1} more values")
+
+    def _print_highlighted(self, outputs: Iterable[Any], sort_keys: bool) -> None:
+        batch: list[str] = []
+
+        def flush() -> None:
+            if batch:
                 self.console.print(
-                    Panel(
-                        f"Invalid keypath: {keypath}. Must start with a dot (e.g., .foo.bar)",
-                        title="[b red]jq Error[/b red]",
-                        style="red",
+                    Syntax(
+                        "\n".join(batch),
+                        "json",
+                        theme="monokai",
+                        word_wrap=True,
+                        background_color="default",
                     )
                 )
-                return 1
-
-        # Pretty-print JSON with syntax highlighting
-        json_str = json.dumps(data, indent=2, ensure_ascii=False)
-        syntax = Syntax(
-            json_str,
-            "json",
-            theme="monokai",
-            word_wrap=True,
-            line_numbers=True,
-            background_color="default",
-        )
-        self.console.print(
-            Panel(
-                syntax,
-                title="[b]jq Output[/b]",
-                style="cyan",
-                border_style="bright_blue",
-            )
-        )
-        return 0
+                batch.clear()
+
+        for value in outputs:
+            batch.append(_format(value, False, False, sort_keys))
+            if len(batch) >= _HIGHLIGHT_BATCH:
+                flush()
+        flush()
+
+
+def _format(value: Any, compact: bool, raw: bool, sort_keys: bool) -> str:
+    if raw and isinstance(value, str):
+        return value
+    if compact:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys)
+    return json.dumps(value, indent=2, ensure_ascii=False, sort_keys=sort_keys)
@@ -10,6 +10,7 @@ from rich.panel import Panel
 from rich.table import Table
 
 from ...utils.command_helpers import handle_help_flag
+from ...utils.table_builder import TableBuilder, split_output_format
 from .._base import Command
 
 if TYPE_CHECKING:
@@ -30,8 +31,14 @@ class LsofCommand(Command):
         """Execute the lsof command to list open files."""
         if handle_help_flag(self, args):
             return 0
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
         console = self.console
-        table = Table(show_header=True, header_style="bold magenta", box=None, expand=False)
+        table = TableBuilder(
+            Table(show_header=True, header_style="bold magenta", box=None, expand=False)
+        ).output_to(console, output_format)
         table.add_column("PID", style="cyan", no_wrap=True)
         table.add_column("USER", style="white", no_wrap=True)
         table.add_column("FD", style="white", no_wrap=True)
@@ -79,9 +86,9 @@ class LsofCommand(Command):
                     for line in fdinfo_content.splitlines():
                         if line.startswith("pos:"):
                             size_off = line.split()[1]
-                table.add_row(pid, user, fd, ftype, device, size_off, node, name)
-        if table.row_count == 0:
+                table.add_row(int(pid), user, fd, ftype, device, size_off, node, name)
+        if table.row_count == 0 and not table.streaming:
             console.print(Panel("No open files found.", title="[b]lsof[/b]", style="cyan"))
             return 1
-        console.print(table)
-        return 0
+        table.print()
+        return 0 if table.row_count else 1
@@ -7,20 +7,26 @@ from typing import TYPE_CHECKING, Union
 import ops
 
 from ...utils import resolve_path
-from ...utils.command_helpers import (
-    handle_help_flag,
-    parse_flags,
-    safe_read_file,
-    validate_min_args,
-)
+from ...utils.external_sort import external_sort, parse_sort_args
+from ...utils.remote_offload import OffloadMode, offload, split_offload_mode
+from ...utils.streaming import iter_lines, iter_remote_chunks
+from ...utils.theme import get_theme
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     import shimmer
 
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+# Options that only tune the local sort, with the values they take.
+_LOCAL_ONLY_OPTIONS = ("-S", "-T", "--parallel")
+
+# Options whose value is passed through as it is, even if it looks like an option.
+_VALUE_OPTIONS = ("-k", "--key", "-t", "--field-separator")
+
 
 class SortCommand(Command):
     """Command for sorting lines in files."""
@@ -29,76 +35,108 @@ class SortCommand(Command):
     help = "Sort lines in files"
     category = "Filesystem Commands"
 
+    def show_help(self):
+        """Show command help."""
+        help_text = """Sort lines of text files.
+
+Usage: sort [OPTIONS] FILE...
+
+Description:
+    Write the sorted concatenation of all FILEs. Files are streamed; if
+    they do not fit in the memory buffer, sorted runs are written to local
+    temporary files and merged, so files larger than memory can be sorted.
+
+Options:
+    -k F[.C][OPTS][,F[.C][OPTS]]
+                    Sort on a key from field F (character C) to the end field;
+                    OPTS are any of b, f, h, n, r. May be repeated.
+    -t SEP          Use SEP as the field separator instead of blank to non-blank
+    -n              Compare by numeric value
+    -h              Compare human-readable sizes (2K, 1G)
+    -f              Fold lower case to upper case
+    -b              Ignore leading blanks
+    -r              Reverse the result of comparisons
+    -u              Output only the first of lines with equal keys
+    -s              Stable sort: don't compare whole lines when keys are equal
+    -S SIZE         Memory buffer size (b, K, M, G or T suffix; default 64M)
+    -T DIR          Local directory for temporary files
+    --parallel N    Sort up to N runs at once in separate processes
+    --remote        Sort in the container if it has sort
+    --local         Always sort locally (the default)
+    --help          Show this help message
+"""
+        self.console.print(help_text, markup=False)
+
     def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
         """Execute the sort command to sort lines in files."""
-        if handle_help_flag(self, args):
+        # -h is for human-readable numbers, so only --help shows the help.
+        if "--help" in args:
+            self.show_help()
             return 0
 
-        flags_result = parse_flags(args, {"r": bool, "n": bool, "k": int}, self.shell)
-        if flags_result is None:
+        mode, args = split_offload_mode(args)
+        try:
+            options, files = parse_sort_args(args)
+        except ValueError as e:
+            self.console.print(get_theme().error_text(f"sort: {e}"))
             return 1
-        flags, file_args = flags_result
-
-        if not validate_min_args(
-            self.shell, file_args, 1, "sort [-r] [-n] [-k field] <file> [file2...]"
-        ):
+        if not files:
+            self.console.print(get_theme().error_text("Usage: sort [OPTIONS] <file> [file2...]"))
             return 1
-
-        reverse = flags["r"]
-        numeric = flags["n"]
-        key_field = flags["k"]
-        if key_field is not None:
-            key_field -= 1  # Convert to 0-based indexing
-
-        files = file_args
-
-        all_lines: list[str] = []
-
+        paths = [
+            resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+            for file_path in files
+        ]
+        # A remote sort sends back as much as it reads, and its output would
+        # have to be held in memory, so it is only used when asked for.
+        if mode == OffloadMode.REMOTE:
+            remote_exit = offload(self, client, ["sort", *_remote_args(args)], paths, mode)
+            if remote_exit is not None:
+                return remote_exit
+
+        failed: list[str] = []
+        with self.output() as out:
+            out.write_lines(external_sort(self._read_lines(client, files, failed), options))
+        return 1 if failed else 0
+
+    def _read_lines(
+        self, client: ClientType, files: list[str], failed: list[str]
+    ) -> Iterator[str]:
+        """Stream the lines of every file; files that can't be read are added to ``failed``."""
         for file_path in files:
-            resolved_path = resolve_path(
-                self.shell.current_directory, file_path, self.shell.home_dir
-            )
-
-            content = safe_read_file(client, resolved_path, self.shell)
-            if content is None:
-                continue
-
-            lines = content.splitlines()
-            all_lines.extend(lines)
-
-        if not all_lines:
-            return 1
-
-        if key_field is not None:
-            # Sort by specific field
-            def sort_key(line: str):
-                fields = line.split()
-                assert key_field is not None  # Type narrowing
-                if key_field < len(fields):
-                    field_value = fields[key_field]
-                    if numeric:
-                        try:
-                            return float(field_value)
-                        except ValueError:
-                            return 0
-                    return field_value
-                return ""
-
-            all_lines.sort(key=sort_key, reverse=reverse)
-        elif numeric:
-            # Numeric sort
-            def numeric_key(line: str):
-                try:
-                    return float(line.split()[0] if line.split() else "0")
-                except (ValueError, IndexError):
-                    return 0
-
-            all_lines.sort(key=numeric_key, reverse=reverse)
+            path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+            try:
+                for line in iter_lines(iter_remote_chunks(client, path)):
+                    yield line.decode("utf-8", errors="replace")
+            except ops.pebble.PathError as e:
+                if e.kind == "not-found":
+                    message = f"sort: {file_path}: No such file or directory"
+                else:
+                    message = f"sort: {file_path}: {e.message}"
+                self.console.print(get_theme().error_text(message))
+                failed.append(file_path)
+            except ops.pebble.APIError as e:
+                self.console.print(get_theme().error_text(f"sort: {file_path}: {e}"))
+                failed.append(file_path)
+
+
+def _remote_args(args: list[str]) -> list[str]:
+    """Drop the options that only apply to the local sort (-S, -T, --parallel).
+
+    Their values may be separate (``-S 1G``) or attached (``-S1G``,
+    ``--parallel=2``).
+    """
+    remote: list[str] = []
+    arg_iter = iter(args)
+    for arg in arg_iter:
+        if arg in _LOCAL_ONLY_OPTIONS:
+            next(arg_iter, None)
+        elif arg.startswith(("-S", "-T", "--parallel=")):
+            continue
         else:
-            # Alphabetic sort
-            all_lines.sort(reverse=reverse)
-
-        # Output sorted lines
-        for line in all_lines:
-            self.console.print(line)
-        return 0
+            remote.append(arg)
+            if arg in _VALUE_OPTIONS:
+                value = next(arg_iter, None)
+                if value is not None:
+                    remote.append(value)
+    return remote
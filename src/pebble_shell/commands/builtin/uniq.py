@@ -57,7 +57,7 @@ class UniqCommand(Command):
 
         lines = []
         file_path = resolve_path(self.shell.current_directory, files[0], self.shell.home_dir)
-        content = safe_read_file(client, self.shell.error_console, file_path)
+        content = safe_read_file(client, file_path, self.shell)
         if content is None:
             return 1
         lines = content.splitlines()
@@ -10,9 +10,11 @@ from ...utils.command_helpers import (
     handle_help_flag,
     parse_flags,
     process_file_arguments,
-    safe_read_file,
     validate_min_args,
 )
+from ...utils.remote_offload import OffloadMode, offload, split_offload_mode
+from ...utils.streaming import has_compressed_suffix, iter_remote_chunks
+from ...utils.word_count import WC_FLAGS, count_chunks, format_counts, selected_columns
 from .._base import Command
 
 if TYPE_CHECKING:
@@ -23,34 +25,23 @@ ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
 
 class WcCommand(Command):
-    """Command for counting lines, words, and characters in files."""
+    """Command for counting lines, words, and bytes in files."""
 
     name = "wc"
-    help = "Count lines, words, and characters in files"
+    help = "Count lines, words, and characters in files (compressed files are decompressed)"
     category = "Filesystem Commands"
 
     def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
         """Execute the wc command to count text statistics in files."""
         if handle_help_flag(self, args):
             return 0
+        mode, args = split_offload_mode(args)
 
-        flags_result = parse_flags(args, {"l": bool, "w": bool, "c": bool}, self.shell)
+        flags_result = parse_flags(args, WC_FLAGS, self.shell)
         if flags_result is None:
             return 1
         flags, file_args = flags_result
-
-        # Determine what to show based on flags
-        any_flag_set = flags["l"] or flags["w"] or flags["c"]
-        if any_flag_set:
-            # If any flag is set, show only what's requested
-            show_lines = flags["l"]
-            show_words = flags["w"]
-            show_chars = flags["c"]
-        else:
-            # If no flags set, show all (default behavior)
-            show_lines = True
-            show_words = True
-            show_chars = True
+        columns = selected_columns(flags)
 
         # Validate file arguments
         if not validate_min_args(self.shell, file_args, 1, "wc [-l|-w|-c] <file> [file2...]"):
@@ -62,47 +53,27 @@ class WcCommand(Command):
         )
         if file_paths is None:
             return 1
-
-        total_lines = 0
-        total_words = 0
-        total_chars = 0
-        show_totals = len(file_paths) > 1
-
+        # The container's wc lays out its columns differently, so it is only
+        # used when asked for. It would count compressed files as they are
+        # stored.
+        if mode == OffloadMode.REMOTE and not any(map(has_compressed_suffix, file_paths)):
+            argv = ["wc", *(f"-{letter}" for letter in WC_FLAGS if flags[letter])]
+            remote_exit = offload(self, client, [*argv, "--", *file_paths], file_paths, mode)
+            if remote_exit is not None:
+                return remote_exit
+
+        totals = [0, 0, 0]
         for file_path in file_paths:
-            content = safe_read_file(client, file_path, self.shell)
-            if content is None:
+            try:
+                counts = count_chunks(iter_remote_chunks(client, file_path, decompress=True))
+            except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
+                self.console.print(f"Error reading file {file_path}: {e}")
                 continue
-
-            lines = len(content.splitlines())
-            words = len(content.split())
-            chars = len(content)
-
-            total_lines += lines
-            total_words += words
-            total_chars += chars
-
-            output_parts: list[str] = []
-            if show_lines:
-                output_parts.append(f"{lines:8}")
-            if show_words:
-                output_parts.append(f"{words:8}")
-            if show_chars:
-                output_parts.append(f"{chars:8}")
-
-            output = " ".join(output_parts)
-            self.console.print(f"{output} {file_path}")
+            totals = [total + count for total, count in zip(totals, counts, strict=True)]
+            self.console.print(format_counts(counts, columns, file_path))
 
         # Show totals if multiple files
-        if show_totals:
-            total_output_parts: list[str] = []
-            if show_lines:
-                total_output_parts.append(f"{total_lines:8}")
-            if show_words:
-                total_output_parts.append(f"{total_words:8}")
-            if show_chars:
-                total_output_parts.append(f"{total_chars:8}")
-
-            total_output = " ".join(total_output_parts)
-            self.console.print(f"{total_output} total")
+        if len(file_paths) > 1:
+            self.console.print(format_counts(totals, columns, "total"))
 
         return 0
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import json
 import sys
-from typing import TYPE_CHECKING, Any, Union, cast
+from typing import TYPE_CHECKING, Any, Union
 
 import ops
 import yaml
@@ -11,132 +12,240 @@ from rich.panel import Panel
 from rich.syntax import Syntax
 
 from ...utils import resolve_path
-from ...utils.command_helpers import handle_help_flag
+from ...utils.command_helpers import handle_help_flag, parse_flags, print_text_chunks
+from ...utils.file_ops import file_exists
+from ...utils.json_query import compile_filter, split_filter_args
+from ...utils.streaming import MAX_CHUNK_SIZE, ChunkReader, iter_remote_chunks
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
     import shimmer
 
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+# The libyaml bindings are much faster, but PyYAML may be built without them.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Outputs to highlight together on a terminal.
+_HIGHLIGHT_BATCH = 100
+
+
+def _iter_documents(stream: Any, index: int | None = None) -> Iterator[Any]:
+    """Load the documents of a YAML stream one at a time.
+
+    With ``index``, only that document is constructed: the ones before it
+    are parsed but never turned into Python objects, and the stream is not
+    read past it.
+    """
+    loader = _Loader(stream)
+    try:
+        current = 0
+        while loader.check_node():
+            if index is None or current == index:
+                yield loader.get_data()
+                if index is not None:
+                    return
+            else:
+                loader.get_node()
+            current += 1
+    finally:
+        loader.dispose()
+
+
+def _format_yaml(value: Any, raw: bool) -> str:
+    if isinstance(value, str) and raw:
+        return value
+    if isinstance(value, (dict, list)) and value:
+        return yaml.dump(
+            value,
+            Dumper=_Dumper,
+            default_flow_style=False,
+            indent=2,
+            sort_keys=False,
+            allow_unicode=True,
+        ).rstrip("\n")
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _format_json(value: Any, raw: bool) -> str:
+    if isinstance(value, str) and raw:
+        return value
+    return json.dumps(value, indent=2, ensure_ascii=False, default=str)
+
 
 class YqCommand(Command):
-    """Command for pretty-printing YAML files with optional keypath filtering."""
+    """Command for filtering and pretty-printing YAML files."""
 
     name = "yq"
-    help = "Pretty-print YAML files with optional jq-like keypath filtering. Usage: yq <file> [.foo.bar]"
+    help = "Filter and pretty-print YAML files, including multi-document ones. Usage: yq [FILTER] <file>..."
     category = "Built-in Commands"
 
-    def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
-        """Execute the yq command to format and filter YAML files."""
+    def show_help(self):
+        """Show command help."""
+        help_text = """Filter and pretty-print YAML.
+
+Usage: yq [OPTIONS] FILTER FILE...
+       yq [OPTIONS] FILE [FILTER]
+
+Description:
+    Run FILTER over each document in each FILE and print the results.
+    Documents are loaded one at a time, so large multi-document files
+    are not held in memory at once. FILTER uses the same language as jq.
+
+Options:
+    -o FORMAT       Output format: yaml (default) or json
+    -d INDEX        Only load the document at INDEX (counting from 0)
+    -r              Print strings without quotes (the default for yaml)
+    -h, --help      Show this help message
+
+Examples:
+    yq .services /etc/pebble/layers/001-app.yaml
+    yq -d 1 '.spec.template' manifests.yaml
+    yq -o json 'select(.kind == "Deployment") | .metadata.name' all.yaml
+        """
+        self.console.print(help_text)
+
+    def _error(self, message: str) -> None:
+        self.console.print(Panel(message, title="[b red]yq Error[/b red]", style="red"))
+
+    def execute(self, client: ClientType, args: list[str]) -> int:
+        """Execute the yq command to filter and format YAML files."""
         if handle_help_flag(self, args):
             return 0
 
-        if not args:
-            self.console.print(
-                Panel(
-                    "No file specified. Usage: yq <file> [.foo.bar]",
-                    title="[b red]yq Error[/b red]",
-                    style="red",
-                )
-            )
+        result = parse_flags(
+            args,
+            {
+                "o": str,  # output format
+                "d": str,  # document index
+                "r": bool,  # raw strings
+            },
+            self.shell,
+        )
+        if result is None:
             return 1
+        flags, positional_args = result
 
-        file_path = args[0]
-        keypath = args[1] if len(args) > 1 else None
-
-        # Resolve path
-        if file_path == "-":
-            # Read from stdin
-            content = sys.stdin.read()
-        else:
-            try:
-                resolved_path = resolve_path(
-                    self.shell.current_directory, file_path, self.shell.home_dir
-                )
-                with client.pull(resolved_path) as file:
-                    content = file.read()
-                    if isinstance(content, bytes):
-                        content = content.decode("utf-8")
-            except Exception as e:
-                self.console.print(
-                    Panel(
-                        f"Error reading file {file_path}: {e}",
-                        title="[b red]yq Error[/b red]",
-                        style="red",
-                    )
-                )
+        output_format = flags["o"] or "yaml"
+        if output_format not in ("yaml", "json"):
+            self._error(f"Unknown output format: {output_format}. Use yaml or json")
+            return 1
+        index = None
+        if flags["d"] is not None:
+            if not flags["d"].isdigit():
+                self._error(f"Invalid document index: {flags['d']}")
                 return 1
+            index = int(flags["d"])
+
+        expression, file_paths = split_filter_args(
+            positional_args, lambda name: self._is_file(client, name)
+        )
+        if not file_paths:
+            self._error("No file specified. Usage: yq <file> [.foo.bar]")
+            return 1
 
-        # Parse YAML
         try:
-            data = yaml.safe_load(content)
-        except Exception as e:
-            self.console.print(
-                Panel(
-                    f"Error parsing YAML: {e}",
-                    title="[b red]yq Error[/b red]",
-                    style="red",
-                )
-            )
+            run = compile_filter(expression)
+        except ValueError as e:
+            self._error(f"Invalid filter: {expression}: {e}")
             return 1
 
-        # Apply keypath filter if provided
-        if keypath:
-            if keypath.startswith("."):
-                keys = [k for k in keypath.lstrip(".").split(".") if k]
-                try:
-                    for k in keys:
-                        if isinstance(data, dict):
-                            data = cast("dict[Any, Any]", data)
-                            data = data[k]
-                        elif isinstance(data, list) and k.isdigit():
-                            data = cast("list[Any]", data)
-                            data = data[int(k)]
-                        else:
-                            raise KeyError(k)
-                except Exception as e:
-                    self.console.print(
-                        Panel(
-                            f"Key path error: {e}",
-                            title="[b red]yq Error[/b red]",
-                            style="red",
-                        )
-                    )
-                    return 1
+        errors: list[str] = []
+        outputs = self._filter(
+            self._read_documents(client, file_paths, index, errors), run, errors
+        )
+        raw = flags["r"] or output_format == "yaml"
+        if output_format == "json":
+            texts = (_format_json(value, raw) for value in outputs)
+        else:
+            texts = self._separate((_format_yaml(value, raw) for value in outputs), "---")
+
+        if self.console.is_terminal:
+            self._print_highlighted(texts, output_format)
+        else:
+            print_text_chunks(self.console, ((text + "\n").encode() for text in texts))
+
+        for error in errors:
+            self._error(error)
+        return 1 if errors else 0
+
+    def _is_file(self, client: ClientType, name: str) -> bool:
+        """Whether an argument names a file (or standard input) rather than a filter."""
+        if name == "-":
+            return True
+        return file_exists(
+            client, resolve_path(self.shell.current_directory, name, self.shell.home_dir)
+        )
+
+    def _read_documents(
+        self, client: ClientType, file_paths: list[str], index: int | None, errors: list[str]
+    ) -> Iterator[Any]:
+        """Yield the documents in each file, stopping a file at its first error."""
+        for file_path in file_paths:
+            if file_path == "-":
+                stream: Any = sys.stdin
             else:
+                path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+                stream = ChunkReader(
+                    iter_remote_chunks(
+                        client, path, max_chunk_size=MAX_CHUNK_SIZE, decompress=True
+                    )
+                )
+            try:
+                yield from _iter_documents(stream, index)
+            except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                errors.append(f"Error reading file {file_path}: {e}")
+            except (yaml.YAMLError, ValueError) as e:
+                errors.append(f"Error parsing YAML in {file_path}: {e}")
+            finally:
+                if isinstance(stream, ChunkReader):
+                    stream.close()
+
+    @staticmethod
+    def _filter(
+        documents: Iterable[Any], run: Callable[[Any], Iterable[Any]], errors: list[str]
+    ) -> Iterator[Any]:
+        """Run the filter over each document, reporting (rather than stopping at) errors."""
+        failed = 0
+        for document in documents:
+            try:
+                yield from run(document)
+            except ValueError as e:
+                failed += 1
+                if failed == 1:
+                    errors.append(f"Key path error: {e}")
+        if failed > 1:
+            errors.append(f"Key path error in {failed - 1} more documents")
+
+    @staticmethod
+    def _separate(texts: Iterable[str], separator: str) -> Iterator[str]:
+        for number, text in enumerate(texts):
+            if number:
+                yield separator
+            yield text
+
+    def _print_highlighted(self, texts: Iterable[str], lexer: str) -> None:
+        batch: list[str] = []
+
+        def flush() -> None:
+            if batch:
                 self.console.print(
-                    Panel(
-                        f"Invalid keypath: {keypath}. Must start with a dot (e.g., .foo.bar)",
-                        title="[b red]yq Error[/b red]",
-                        style="red",
+                    Syntax(
+                        "\n".join(batch),
+                        lexer,
+                        theme="monokai",
+                        word_wrap=True,
+                        background_color="default",
                     )
                 )
-                return 1
+                batch.clear()
 
-        # Pretty-print YAML with syntax highlighting
-        yaml_str = yaml.safe_dump(
-            data,
-            default_flow_style=False,
-            indent=2,
-            sort_keys=False,
-            allow_unicode=True,
-        )
-        syntax = Syntax(
-            yaml_str,
-            "yaml",
-            theme="monokai",
-            word_wrap=True,
-            line_numbers=True,
-            background_color="default",
-        )
-        self.console.print(
-            Panel(
-                syntax,
-                title="[b]yq Output[/b]",
-                style="cyan",
-                border_style="bright_blue",
-            )
-        )
-        return 0
+        for text in texts:
+            batch.append(text)
+            if len(batch) >= _HIGHLIGHT_BATCH:
+                flush()
+        flush()
@@ -0,0 +1,151 @@
+"""Base classes for compression commands."""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import sys
+from typing import TYPE_CHECKING, BinaryIO, ClassVar
+
+import ops
+
+from ...utils import resolve_path
+from ...utils.archive_stream import RemotePushStream
+from ...utils.block_compression import count_bytes, parallel_compress
+from ...utils.command_helpers import (
+    create_transfer_progress,
+    handle_help_flag,
+    print_text_chunks,
+    validate_min_args,
+)
+from ...utils.streaming import (
+    MAX_CHUNK_SIZE,
+    detect_compression,
+    iter_decompressed,
+    iter_remote_chunks,
+)
+from .._base import Command
+from .exceptions import CompressionError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import shimmer
+
+
+class _BlockCompressCommand(Command):
+    """A command that compresses files in parallel blocks (see utils.block_compression)."""
+
+    def _compress_blocks(
+        self,
+        client: ops.pebble.Client | shimmer.PebbleCliClient,
+        file_path: str,
+        output_path: str | None,
+        file_format: str,
+        level: int | None,
+        workers: int | None,
+        force: bool = False,
+    ) -> tuple[int, int]:
+        """Compress a remote file as a stream, showing the throughput as it goes.
+
+        Args:
+            client: Pebble client
+            file_path: File to compress
+            output_path: Remote file to write, or None to write to standard output
+            file_format: "gzip", "bzip2" or "xz"
+            level: Compression level, or None for the format's default
+            workers: Number of blocks to compress at once, or None for one per CPU
+            force: Write compressed data to standard output even if it is a terminal
+
+        Returns:
+            The number of bytes read and written
+
+        Raises:
+            CompressionError: If the file can't be read, or the output written
+        """
+        read = 0
+
+        with create_transfer_progress(self.console) as progress:
+            task = progress.add_task(f"{self.name}: {file_path}", total=None)
+
+            def on_read(size: int) -> None:
+                nonlocal read
+                read += size
+                progress.advance(task, size)
+
+            chunks = count_bytes(self._read_chunks(client, file_path), on_read)
+            compressed = parallel_compress(chunks, file_format, level, workers)
+            if output_path is None:
+                written = self._write_stdout(compressed, force)
+                return read, written
+            try:
+                with RemotePushStream(client, output_path) as sink:
+                    for block in compressed:
+                        sink.write(block)
+            except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                raise CompressionError(f"Cannot write file: {output_path}") from e
+        return read, sink.bytes_written
+
+    @staticmethod
+    def _read_chunks(
+        client: ops.pebble.Client | shimmer.PebbleCliClient, file_path: str
+    ) -> Iterator[bytes]:
+        try:
+            yield from iter_remote_chunks(client, file_path, max_chunk_size=MAX_CHUNK_SIZE)
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            raise CompressionError(f"Cannot read file: {file_path}") from e
+
+    def _write_stdout(self, compressed: Iterator[bytes], force: bool) -> int:
+        """Write compressed data to the shell's own standard output."""
+        stdout: BinaryIO | None = getattr(sys.stdout, "buffer", None)
+        if stdout is None:
+            raise CompressionError("standard output can't take binary data")
+        if stdout.isatty() and not force:
+            raise CompressionError(
+                "compressed data not written to a terminal. Use -f to force compression."
+            )
+        written = 0
+        for block in compressed:
+            stdout.write(block)
+            written += len(block)
+        stdout.flush()
+        return written
+
+
+class _DecompressCatCommand(Command):
+    """A command that prints compressed files, decompressing them as they are read.
+
+    Only files in one of the ``file_formats`` are accepted. The output is
+    written in batches as it is decompressed, so any size of file can be
+    shown without holding it in memory.
+    """
+
+    file_formats: ClassVar[tuple[str, ...]]
+
+    def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
+        """Execute the command."""
+        if handle_help_flag(self, args):
+            return 0
+        if not validate_min_args(self.shell, args, 1, f"{self.name} file [file2...]"):
+            return 1
+        for filename in args:
+            path = resolve_path(self.shell.current_directory, filename, self.shell.home_dir)
+            try:
+                self._print_file(client, path)
+            except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
+                self.console.print(f"{self.name}: {filename}: {e}", markup=False)
+                return 1
+        return 0
+
+    def _print_file(self, client: ops.pebble.Client | shimmer.PebbleCliClient, path: str) -> None:
+        with contextlib.closing(
+            iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE)
+        ) as chunks:
+            first = next(chunks, b"")
+            file_format = detect_compression(first)
+            if file_format not in self.file_formats:
+                raise ValueError(f"not in {self.file_formats[0]} format")
+            print_text_chunks(
+                self.console,
+                iter_decompressed(itertools.chain((first,), chunks), file_format),
+            )
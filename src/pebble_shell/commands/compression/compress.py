@@ -10,7 +10,7 @@ import ops
 
 from ...utils import resolve_path
 from ...utils.command_helpers import handle_help_flag, parse_flags, validate_min_args
-from .._base import Command
+from ._base import _BlockCompressCommand
 from .exceptions import CompressionError
 
 if TYPE_CHECKING:
@@ -20,7 +20,7 @@ if TYPE_CHECKING:
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
 
-class CompressCommand(Command):
+class CompressCommand(_BlockCompressCommand):
     """Implementation of compress command (LZW compression fallback to gzip)."""
 
     name = "compress"
@@ -48,6 +48,8 @@ class CompressCommand(Command):
                 "d": bool,  # decompress
                 "f": bool,  # force overwrite
                 "v": bool,  # verbose
+                "c": bool,  # write to standard output
+                "p": int,  # number of blocks to compress at once
             },
             self.shell,
         )
@@ -58,6 +60,11 @@ class CompressCommand(Command):
         decompress = flags.get("d", False)
         force = flags.get("f", False)
         verbose = flags.get("v", False)
+        to_stdout = flags.get("c", False)
+        workers = flags.get("p")
+        if decompress and to_stdout:
+            self.console.print("[red]compress: -c is only supported when compressing[/red]")
+            return 1
 
         if not validate_min_args(self.shell, positional_args, 1, "compress: missing file operand"):
             return 1
@@ -77,7 +84,9 @@ class CompressCommand(Command):
                 if decompress:
                     success = self._decompress_file(client, file_path, force, verbose)
                 else:
-                    success = self._compress_file(client, file_path, force, verbose)
+                    success = self._compress_file(
+                        client, file_path, force, verbose, workers, to_stdout
+                    )
 
                 if not success:
                     return 1
@@ -99,6 +108,8 @@ OPTIONS:
     -d          Decompress files
     -f          Force overwrite of output files
     -v          Verbose mode
+    -c          Write to standard output, keeping the input file
+    -p N        Compress N blocks at once (default: one per CPU)
     -h, --help  Show this help message
 
 NOTE:
@@ -117,8 +128,10 @@ EXAMPLES:
         file_path: str,
         force: bool,
         verbose: bool,
+        workers: int | None,
+        to_stdout: bool,
     ) -> bool:
-        """Compress a file using gzip (with .Z extension)."""
+        """Compress a file using gzip (with .Z extension), in parallel blocks."""
         try:
             # Check if the file is already compressed
             if file_path.endswith(".Z") and not force:
@@ -131,36 +144,28 @@ EXAMPLES:
 
             # Check if output file exists
             try:
-                client.list_files(output_path)[0]
-                if not force:
-                    raise CompressionError(
-                        f"Output file {output_path} already exists (use -f to force)"
-                    )
+                if not to_stdout:
+                    client.list_files(output_path)[0]
+                    if not force:
+                        raise CompressionError(
+                            f"Output file {output_path} already exists (use -f to force)"
+                        )
             except (ops.pebble.PathError, IndexError):
                 pass  # File doesn't exist, which is good
 
-            # Read the input file
-            try:
-                with client.pull(file_path, encoding=None) as f:
-                    file_content = f.read()
-            except ops.pebble.PathError as e:
-                raise CompressionError(f"Cannot read file: {file_path}") from e
-
-            compressed_content = gzip.compress(file_content)
-
-            # Write compressed content
-            client.push(output_path, io.BytesIO(compressed_content), make_dirs=True)
+            original_size, compressed_size = self._compress_blocks(
+                client, file_path, None if to_stdout else output_path, "gzip", None, workers, force
+            )
 
             if verbose:
-                original_size = len(file_content)
-                compressed_size = len(compressed_content)
                 ratio = (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
                 self.console.print(
                     f"[green]{file_path}: {original_size} -> {compressed_size} bytes ({ratio:.1f}% reduction)[/green]"
                 )
 
             # Remove original file (compress default behavior)
-            client.remove_path(file_path)
+            if not to_stdout:
+                client.remove_path(file_path)
 
             return True
 
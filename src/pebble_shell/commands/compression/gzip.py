@@ -9,8 +9,9 @@ from typing import TYPE_CHECKING, Union
 import ops
 
 from ...utils import resolve_path
+from ...utils.block_compression import DEFAULT_LEVELS, split_compression_level
 from ...utils.command_helpers import handle_help_flag, parse_flags, validate_min_args
-from .._base import Command
+from ._base import _BlockCompressCommand
 from .exceptions import CompressionError
 
 if TYPE_CHECKING:
@@ -20,7 +21,7 @@ if TYPE_CHECKING:
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
 
-class GzipCommand(Command):
+class GzipCommand(_BlockCompressCommand):
     """Implementation of gzip command."""
 
     name = "gzip"
@@ -36,6 +37,7 @@ class GzipCommand(Command):
         """Execute the gzip command."""
         if handle_help_flag(self, args):
             return 0
+        level, args = split_compression_level(args, DEFAULT_LEVELS["gzip"])
 
         # TODO: Can this use the common flag parsing code?
         parse_result = parse_flags(
@@ -45,6 +47,8 @@ class GzipCommand(Command):
                 "f": bool,  # force overwrite
                 "k": bool,  # keep original files
                 "v": bool,  # verbose
+                "c": bool,  # write to standard output
+                "p": int,  # number of blocks to compress at once
             },
             self.shell,
         )
@@ -59,6 +63,11 @@ class GzipCommand(Command):
         force = flags.get("f", False)
         keep_original = flags.get("k", False)
         verbose = flags.get("v", False)
+        to_stdout = flags.get("c", False)
+        workers = flags.get("p")
+        if decompress and to_stdout:
+            self.console.print("[red]gzip: -c is only supported when compressing[/red]")
+            return 1
 
         # Process each file
         for file_path in positional_args:
@@ -71,7 +80,9 @@ class GzipCommand(Command):
                         client, file_path, keep_original, force, verbose
                     )
                 else:
-                    success = self._compress_gzip(client, file_path, keep_original, force, verbose)
+                    success = self._compress_gzip(
+                        client, file_path, keep_original, force, verbose, level, workers, to_stdout
+                    )
 
                 if not success:
                     return 1
@@ -94,6 +105,9 @@ OPTIONS:
     -f          Force overwrite of output files
     -k          Keep (don't delete) input files
     -v          Verbose mode
+    -c          Write to standard output, keeping the input file
+    -1 .. -9    Compression level (--fast is -1, --best is -9)
+    -p N        Compress N blocks at once (default: one per CPU)
     -h, --help  Show this help message
 
 EXAMPLES:
@@ -110,8 +124,15 @@ EXAMPLES:
         keep_original: bool,
         force: bool,
         verbose: bool,
+        level: int,
+        workers: int | None,
+        to_stdout: bool,
     ) -> bool:
-        """Compress a file using gzip."""
+        """Compress a file using gzip, in parallel blocks, streaming the result.
+
+        The compressed file is written as it is produced, so neither the
+        input nor the output is ever held in memory in full.
+        """
         try:
             # Check if the file is already compressed
             if file_path.endswith(".gz") and not force:
@@ -124,36 +145,33 @@ EXAMPLES:
 
             # Check if output file exists
             try:
-                client.list_files(output_path)[0]
-                if not force:
-                    raise CompressionError(
-                        f"Output file {output_path} already exists (use -f to force)"
-                    )
+                if not to_stdout:
+                    client.list_files(output_path)[0]
+                    if not force:
+                        raise CompressionError(
+                            f"Output file {output_path} already exists (use -f to force)"
+                        )
             except (ops.pebble.PathError, IndexError):
                 pass  # File doesn't exist, which is good
 
-            # Read the input file
-            try:
-                with client.pull(file_path, encoding=None) as f:
-                    file_content = f.read()
-            except ops.pebble.PathError as e:
-                raise CompressionError(f"Cannot read file: {file_path}") from e
-
-            compressed_content = gzip.compress(file_content)
-
-            # Write compressed content
-            client.push(output_path, io.BytesIO(compressed_content), make_dirs=True)
+            original_size, compressed_size = self._compress_blocks(
+                client,
+                file_path,
+                None if to_stdout else output_path,
+                "gzip",
+                level,
+                workers,
+                force,
+            )
 
             if verbose:
-                original_size = len(file_content)
-                compressed_size = len(compressed_content)
                 ratio = (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
                 self.console.print(
                     f"[green]{file_path}: {original_size} -> {compressed_size} bytes ({ratio:.1f}% reduction)[/green]"
                 )
 
             # Remove original file if not keeping it
-            if not keep_original:
+            if not keep_original and not to_stdout:
                 client.remove_path(file_path)
 
             return True
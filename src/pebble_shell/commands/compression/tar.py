@@ -2,23 +2,37 @@
 
 from __future__ import annotations
 
-import io
+import os
 import tarfile
 from typing import TYPE_CHECKING, Union
 
 import ops
 
 from ...utils import resolve_path
-from ...utils.command_helpers import handle_help_flag, parse_flags
+from ...utils.archive_stream import (
+    MemberExtractor,
+    RemotePushStream,
+    TarWriter,
+    collect_members,
+    write_members,
+)
+from ...utils.command_helpers import create_transfer_progress, handle_help_flag, parse_flags
+from ...utils.remote_offload import offload, split_offload_mode
 from .._base import Command
 from .exceptions import CompressionError
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     import shimmer
 
+    from ...utils.archive_stream import ArchiveMember
+
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+_OUTPUT_BATCH_LINES = 1000
+
 
 class TarCommand(Command):
     """Implementation of tar command."""
@@ -36,15 +50,17 @@ class TarCommand(Command):
         """Execute the tar command."""
         if handle_help_flag(self, args):
             return 0
+        mode, args = split_offload_mode(args)
 
         # TODO: Can this use the common flag parsing code?
         parse_result = parse_flags(
-            args,
+            self._split_archive_flag(args),
             {
                 "c": bool,  # create archive
                 "x": bool,  # extract archive
                 "t": bool,  # list archive contents
                 "f": str,  # archive filename
+                "C": str,  # directory to extract into
                 "z": bool,  # gzip compression
                 "j": bool,  # bzip2 compression
                 "J": bool,  # xz compression
@@ -64,6 +80,9 @@ class TarCommand(Command):
         bzip2_compress = flags.get("j", False)
         xz_compress = flags.get("J", False)
         verbose = flags.get("v", False)
+        directory = resolve_path(
+            self.shell.current_directory, flags.get("C") or ".", self.shell.home_dir
+        )
 
         # Validate arguments
         mode_count = sum([create, extract, list_contents])
@@ -81,11 +100,19 @@ class TarCommand(Command):
         )
 
         # Convert file paths to absolute paths
+        member_names = list(positional_args)
         positional_args = [
             resolve_path(self.shell.current_directory, path, self.shell.home_dir)
             for path in positional_args
         ]
 
+        # Creating an archive reads the members; other modes read the archive.
+        remote_exit = offload(
+            self, client, ["tar", *args], positional_args if create else [archive_filename], mode
+        )
+        if remote_exit is not None:
+            return remote_exit
+
         try:
             if create:
                 if not positional_args:
@@ -105,7 +132,9 @@ class TarCommand(Command):
                 )
 
             elif extract:
-                return self._extract_tar(client, archive_filename, positional_args, verbose)
+                return self._extract_tar(
+                    client, archive_filename, member_names, directory, verbose
+                )
 
             elif list_contents:
                 return self._list_tar(client, archive_filename, verbose)
@@ -116,6 +145,17 @@ class TarCommand(Command):
 
         return 0
 
+    @staticmethod
+    def _split_archive_flag(args: list[str]) -> list[str]:
+        """Split a bundle like ``-czf`` into ``-cz -f`` so that -f can take its argument."""
+        split: list[str] = []
+        for arg in args:
+            if len(arg) > 2 and arg[0] == "-" and arg[1] != "-" and arg.endswith("f"):
+                split.extend([arg[:-1], "-f"])
+            else:
+                split.append(arg)
+        return split
+
     def _get_help_text(self) -> str:
         """Get help text for the tar command."""
         return """
@@ -129,10 +169,13 @@ OPTIONS:
     -x          Extract files from archive
     -t          List archive contents
     -f FILE     Use archive file FILE
+    -C DIR      Extract into DIR (a leading "/" is removed from member names)
     -z          Filter archive through gzip
     -j          Filter archive through bzip2
     -J          Filter archive through xz
     -v          Verbose mode
+    --remote    Run tar in the container if it has tar (default for large input)
+    --local     Always run tar locally
     -h, --help  Show this help message
 
 EXAMPLES:
@@ -150,135 +193,154 @@ EXAMPLES:
         compression: str | None,
         verbose: bool,
     ) -> int:
-        """Create a tar archive."""
-        try:
-            # Determine compression mode
-            mode = "w"
-            if compression == "gz":
-                mode = "w:gz"
-            elif compression == "bz2":
-                mode = "w:bz2"
-            elif compression == "xz":
-                mode = "w:xz"
-
-            # Create tar archive in memory
-            tar_buffer = io.BytesIO()
+        """Create a tar archive, pushing it to the container as it is written.
 
-            with tarfile.open(fileobj=tar_buffer, mode=mode) as tar:
-                for file_path in files:
-                    self._add_to_tar(client, tar, file_path, verbose)
+        Directories are archived recursively. Small files are read ahead
+        concurrently and large ones streamed, so memory use does not grow
+        with the size of the archive.
+        """
+        failed: list[str] = []
 
-            # Write archive to destination
-            tar_buffer.seek(0)
-            client.push(archive_path, tar_buffer, make_dirs=True)
+        def on_error(path: str, message: str) -> None:
+            failed.append(path)
+            self.console.print(f"tar: {path}: {message}", style="red", markup=False)
 
-            if verbose:
-                self.console.print(f"[green]Created archive: {archive_path}[/green]")
+        def report(members: Iterable[ArchiveMember]) -> Iterator[ArchiveMember]:
+            for member in members:
+                if verbose:
+                    self.console.print(member.path, markup=False)
+                yield member
 
-            return 0
-
-        except Exception as e:
-            raise CompressionError(f"Failed to create archive: {e}") from e
-
-    def _add_to_tar(
-        self,
-        client: ClientType,
-        tar: tarfile.TarFile,
-        file_path: str,
-        verbose: bool,
-    ) -> None:
-        """Add a file to the tar archive."""
         try:
-            # Try to read as file first
-            with client.pull(file_path, encoding=None) as f:
-                file_content = f.read()
-
-            # Add file to tar
-            tarinfo = tarfile.TarInfo(name=file_path)
-            tarinfo.size = len(file_content)
-            tar.addfile(tarinfo, io.BytesIO(file_content))
-
-            if verbose:
-                self.console.print(f"[green]Added: {file_path}[/green]")
+            with (
+                create_transfer_progress(self.console) as progress,
+                RemotePushStream(client, archive_path) as sink,
+            ):
+                task = progress.add_task(f"tar: {archive_path}", total=None)
+                writer = TarWriter(sink, compression)
+                members = report(collect_members(client, files, on_error))
+                write_members(
+                    writer, client, members, on_error, lambda n: progress.advance(task, n)
+                )
+                writer.close()
+        except (ops.pebble.Error, OSError, tarfile.TarError) as e:
+            raise CompressionError(f"Failed to create archive: {e}") from e
 
-        except ops.pebble.PathError:
-            # Try as directory - for simplicity, we'll just skip directories in this basic implementation
-            if verbose:
-                self.console.print(f"[yellow]Skipping directory: {file_path}[/yellow]")
+        if verbose:
+            self.console.print(f"[green]Created archive: {archive_path}[/green]")
+        return 1 if failed else 0
 
     def _extract_tar(
         self,
         client: ClientType,
         archive_path: str,
-        specific_files: list[str],
+        names: list[str],
+        directory: str,
         verbose: bool,
     ) -> int:
-        """Extract files from a tar archive."""
-        try:
-            # Read archive
-            with client.pull(archive_path, encoding=None) as f:
-                archive_content = f.read()
-
-            # Open tar archive
-            archive_buffer = io.BytesIO(archive_content)
-            with tarfile.open(fileobj=archive_buffer, mode="r:*") as tar:
-                members = tar.getmembers()
-
-                # Filter members if specific files requested
-                if specific_files:
-                    members = [m for m in members if m.name in specific_files]
-
-                extracted_count = 0
-                for member in members:
-                    if member.isfile():
-                        # Extract file
-                        file_content = tar.extractfile(member)
-                        if file_content:
-                            content = file_content.read()
-                            client.push(member.name, io.BytesIO(content), make_dirs=True)
-                            extracted_count += 1
-
-                            if verbose:
-                                self.console.print(f"[green]Extracted: {member.name}[/green]")
-
-                self.console.print(
-                    f"[green]Successfully extracted {extracted_count} files[/green]"
-                )
-                return 0
+        """Extract files from a tar archive, reading it as a stream.
+
+        Members are pushed by a pool of workers while the rest of the archive
+        is read, and each destination directory is created once.
+        """
+        failed: list[str] = []
 
-        except Exception as e:
+        def on_error(path: str, message: str) -> None:
+            failed.append(path)
+            self.console.print(f"tar: {path}: {message}", style="red", markup=False)
+
+        wanted = set(names)
+        stripped_leading_slash = False
+        try:
+            with (
+                client.pull(archive_path, encoding=None) as source,
+                tarfile.open(fileobj=source, mode="r|*") as tar,
+                MemberExtractor(client, on_error) as extractor,
+            ):
+                for member in tar:
+                    target = self._member_target(member.name, directory)
+                    if wanted and member.name.rstrip("/") not in wanted and target not in wanted:
+                        continue
+                    if target is None:
+                        on_error(member.name, "Member name contains '..', skipped")
+                        continue
+                    if member.name.startswith("/") and not stripped_leading_slash:
+                        stripped_leading_slash = True
+                        self.console.print("tar: Removing leading '/' from member names")
+                    if member.isdir():
+                        extractor.make_dir(target)
+                    elif member.isfile():
+                        data = tar.extractfile(member)
+                        if data is not None:
+                            extractor.write(target, data, member.size, member.mode & 0o777)
+                    else:
+                        # Pebble can only create regular files and directories.
+                        if verbose:
+                            self.console.print(
+                                f"[yellow]Skipping {member.name}: not a regular file[/yellow]"
+                            )
+                        continue
+                    if verbose:
+                        self.console.print(f"[green]Extracted: {member.name}[/green]")
+        except (ops.pebble.Error, OSError, tarfile.TarError) as e:
             raise CompressionError(f"Failed to extract archive: {e}") from e
 
+        self.console.print(f"[green]Successfully extracted {extractor.extracted} files[/green]")
+        return 1 if failed else 0
+
+    @staticmethod
+    def _member_target(name: str, directory: str) -> str | None:
+        """Where to extract a member: always under ``directory``, as GNU tar does.
+
+        A leading "/" is removed, so absolute names are extracted relative to
+        the directory too.
+
+        Returns:
+            The target path, or None if the name would escape the directory
+        """
+        if ".." in name.split("/"):
+            return None
+        directory = os.path.normpath(directory)
+        target = os.path.normpath(os.path.join(directory, name.lstrip("/")))
+        if os.path.commonpath([directory, target]) != directory:
+            return None
+        return target
+
     def _list_tar(
         self,
         client: ClientType,
         archive_path: str,
         verbose: bool,
     ) -> int:
-        """List contents of a tar archive."""
+        """List contents of a tar archive, reading it as a stream."""
+        lines: list[str] = []
         try:
-            # Read archive
-            with client.pull(archive_path, encoding=None) as f:
-                archive_content = f.read()
-
-            # Open tar archive
-            archive_buffer = io.BytesIO(archive_content)
-            with tarfile.open(fileobj=archive_buffer, mode="r:*") as tar:
-                members = tar.getmembers()
-
-                for member in members:
+            with (
+                client.pull(archive_path, encoding=None) as source,
+                tarfile.open(fileobj=source, mode="r|*") as tar,
+            ):
+                for member in tar:
                     if verbose:
                         # Show detailed info like ls -l
                         mode_str = self._get_file_mode_string(member)
                         size_str = str(member.size).rjust(8)
-                        self.console.print(f"{mode_str} {size_str} {member.name}")
+                        lines.append(f"{mode_str} {size_str} {member.name}")
                     else:
-                        self.console.print(member.name)
-
-                return 0
-
-        except Exception as e:
+                        lines.append(member.name)
+                    if len(lines) >= _OUTPUT_BATCH_LINES:
+                        self._flush(lines)
+        except (ops.pebble.Error, OSError, tarfile.TarError) as e:
             raise CompressionError(f"Failed to list archive: {e}") from e
+        finally:
+            self._flush(lines)
+        return 0
+
+    def _flush(self, lines: list[str]) -> None:
+        if lines:
+            self.console.print(
+                "\n".join(lines), markup=False, highlight=False, emoji=False, soft_wrap=True
+            )
+            lines.clear()
 
     def _get_file_mode_string(self, member: tarfile.TarInfo) -> str:
         """Convert file mode to string representation."""
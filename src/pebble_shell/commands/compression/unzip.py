@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
-import io
 import os
+import tempfile
 import zipfile
-from typing import TYPE_CHECKING, Union
+from typing import IO, TYPE_CHECKING, Union
 
 import ops
 
 from ...utils import resolve_path
+from ...utils.archive_stream import MemberExtractor
 from ...utils.command_helpers import handle_help_flag, parse_flags, validate_min_args
+from ...utils.streaming import MAX_CHUNK_SIZE, iter_remote_chunks
 from .._base import Command
 from .exceptions import CompressionError
 
@@ -20,6 +22,9 @@ if TYPE_CHECKING:
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+# ZIP files up to this size are spooled in memory rather than to a local file.
+_SPOOL_MEMORY_SIZE = 16 * 1024 * 1024
+
 
 class UnzipCommand(Command):
     """Implementation of unzip command."""
@@ -102,49 +107,59 @@ EXAMPLES:
     unzip -v archive.zip        # Extract verbosely
 """
 
+    def _spool_zip(self, client: ClientType, zip_file_path: str) -> IO[bytes]:
+        """Copy a ZIP file from the container into a local spool file.
+
+        The central directory is at the end of a ZIP file, so it can't be
+        read as a stream. Small archives stay in memory; larger ones are
+        written to a local temporary file rather than held in memory.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY_SIZE)  # noqa: SIM115
+        try:
+            for chunk in iter_remote_chunks(client, zip_file_path, max_chunk_size=MAX_CHUNK_SIZE):
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
     def _list_zip(
         self,
         client: ClientType,
         zip_file_path: str,
         verbose: bool,
     ) -> int:
-        """List contents of a ZIP file."""
+        """List contents of a ZIP file from its central directory."""
         try:
-            # Read ZIP file
-            with client.pull(zip_file_path, encoding=None) as f:
-                zip_content = f.read()
-
-            # Open ZIP file
-            zip_buffer = io.BytesIO(zip_content)
-            with zipfile.ZipFile(zip_buffer, "r") as zip_file:
-                if verbose:
-                    self.console.print("Archive:  " + zip_file_path)
-                    self.console.print("  Length      Date    Time    Name")
-                    self.console.print("---------  ---------- -----   ----")
-
-                    total_size = 0
-                    for info in zip_file.infolist():
-                        if not info.filename.endswith("/"):  # Skip directories
-                            date_time = f"{info.date_time[0]:04d}-{info.date_time[1]:02d}-{info.date_time[2]:02d} {info.date_time[3]:02d}:{info.date_time[4]:02d}"
-                            self.console.print(
-                                f"{info.file_size:9d}  {date_time}   {info.filename}"
-                            )
-                            total_size += info.file_size
-
-                    self.console.print("---------                     -------")
-                    self.console.print(
-                        f"{total_size:9d}                     {len([f for f in zip_file.namelist() if not f.endswith('/')])} files"
-                    )
-                else:
-                    for filename in zip_file.namelist():
-                        if not filename.endswith("/"):  # Skip directories
-                            self.console.print(filename)
-
-            return 0
-
-        except Exception as e:
+            with (
+                self._spool_zip(client, zip_file_path) as spool,
+                zipfile.ZipFile(spool, "r") as zip_file,
+            ):
+                files = [info for info in zip_file.infolist() if not info.is_dir()]
+        except (ops.pebble.Error, OSError, zipfile.BadZipFile) as e:
             raise CompressionError(f"Failed to list ZIP file: {e}") from e
 
+        lines: list[str] = []
+        if verbose:
+            lines.append("Archive:  " + zip_file_path)
+            lines.append("  Length      Date    Time    Name")
+            lines.append("---------  ---------- -----   ----")
+            for info in files:
+                date_time = (
+                    f"{info.date_time[0]:04d}-{info.date_time[1]:02d}-{info.date_time[2]:02d} "
+                    f"{info.date_time[3]:02d}:{info.date_time[4]:02d}"
+                )
+                lines.append(f"{info.file_size:9d}  {date_time}   {info.filename}")
+            lines.append("---------                     -------")
+            total_size = sum(info.file_size for info in files)
+            lines.append(f"{total_size:9d}                     {len(files)} files")
+        else:
+            lines.extend(info.filename for info in files)
+        if lines:
+            self.console.print("\n".join(lines), markup=False, highlight=False, soft_wrap=True)
+        return 0
+
     def _extract_zip(
         self,
         client: ClientType,
@@ -153,54 +168,50 @@ EXAMPLES:
         force: bool,
         verbose: bool,
     ) -> int:
-        """Extract files from a ZIP archive."""
+        """Extract files from a ZIP archive.
+
+        Members are pushed by a pool of workers. Each destination directory
+        is created once, and listed once to find existing files.
+        """
+        failed: list[str] = []
+
+        def on_error(path: str, message: str) -> None:
+            failed.append(path)
+            self.console.print(f"unzip: {path}: {message}", style="red", markup=False)
+
         try:
-            # Read ZIP file
-            with client.pull(zip_file_path, encoding=None) as f:
-                zip_content = f.read()
-
-            # Open ZIP file
-            zip_buffer = io.BytesIO(zip_content)
-            with zipfile.ZipFile(zip_buffer, "r") as zip_file:
-                files_to_extract = [
-                    info for info in zip_file.infolist() if not info.filename.endswith("/")
-                ]
-                total_files = len(files_to_extract)
-                extracted_count = 0
-
-                for info in files_to_extract:
-                    output_path = (
-                        os.path.join(extract_dir, info.filename)
-                        if extract_dir != "."
-                        else info.filename
-                    )
-
-                    # Check if file already exists
-                    try:
-                        client.list_files(output_path)[0]
-                        if not force:
+            with (
+                self._spool_zip(client, zip_file_path) as spool,
+                zipfile.ZipFile(spool, "r") as zip_file,
+                MemberExtractor(client, on_error, overwrite=force) as extractor,
+            ):
+                total_files = 0
+                for info in zip_file.infolist():
+                    name = info.filename.lstrip("/")
+                    if ".." in name.split("/"):
+                        on_error(info.filename, "Member name contains '..', skipped")
+                        continue
+                    output_path = os.path.normpath(os.path.join(extract_dir, name))
+                    if info.is_dir():
+                        extractor.make_dir(output_path)
+                        continue
+                    total_files += 1
+                    permissions = (info.external_attr >> 16) & 0o777 or None
+                    with zip_file.open(info) as member:
+                        if not extractor.write(output_path, member, info.file_size, permissions):
                             self.console.print(
-                                f"[yellow]Warning: File {info.filename} already exists, skipping (use -f to overwrite)[/yellow]"
+                                f"[yellow]Warning: File {info.filename} already exists, "
+                                "skipping (use -f to overwrite)[/yellow]"
                             )
                             continue
-                    except (ops.pebble.PathError, IndexError):
-                        pass  # File doesn't exist, which is good
-
-                    # Extract file
-                    file_content = zip_file.read(info)
-                    client.push(output_path, io.BytesIO(file_content), make_dirs=True)
-
                     if verbose:
                         self.console.print(
-                            f"[green]Extracted: {info.filename} ({len(file_content)} bytes)[/green]"
+                            f"[green]Extracted: {info.filename} ({info.file_size} bytes)[/green]"
                         )
-
-                    extracted_count += 1
-
-                self.console.print(
-                    f"[green]Successfully extracted {extracted_count}/{total_files} files[/green]"
-                )
-                return 0
-
-        except Exception as e:
+        except (ops.pebble.Error, OSError, zipfile.BadZipFile) as e:
             raise CompressionError(f"Failed to extract ZIP file: {e}") from e
+
+        self.console.print(
+            f"[green]Successfully extracted {extractor.extracted}/{total_files} files[/green]"
+        )
+        return 1 if failed else 0
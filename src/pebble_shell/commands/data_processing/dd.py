@@ -2,23 +2,111 @@
 
 from __future__ import annotations
 
-import math
-from io import BytesIO
-from typing import TYPE_CHECKING, Union
+import dataclasses
+import re
+import tempfile
+import time
+from typing import IO, TYPE_CHECKING, BinaryIO, Union
 
 import ops
 
-from ...utils.command_helpers import handle_help_flag, safe_read_file
+from ...utils import resolve_path
+from ...utils.archive_stream import RemotePushStream
+from ...utils.command_helpers import (
+    create_transfer_progress,
+    handle_help_flag,
+    print_text_chunks,
+)
+from ...utils.streaming import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, iter_remote_chunks
 from ...utils.theme import get_theme
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
     import shimmer
 
 
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+_DEFAULT_BLOCK_SIZE = 512
+
+# Size suffixes, as dd understands them: K, M and G are powers of 1024, kB,
+# MB and GB powers of 1000, and c, w and b are bytes, words and sectors.
+_SIZE_SUFFIXES = {
+    "": 1,
+    "c": 1,
+    "w": 2,
+    "b": 512,
+    "kB": 1000,
+    "K": 1024,
+    "k": 1024,
+    "KiB": 1024,
+    "MB": 1000**2,
+    "M": 1024**2,
+    "MiB": 1024**2,
+    "GB": 1000**3,
+    "G": 1024**3,
+    "GiB": 1024**3,
+    "TB": 1000**4,
+    "T": 1024**4,
+    "TiB": 1024**4,
+}
+_SIZE = re.compile(r"(\d+)([A-Za-z]*)")
+
+_UPPER = bytes(range(ord("A"), ord("Z") + 1))
+_LOWER = bytes(range(ord("a"), ord("z") + 1))
+_IDENTITY = bytes(range(256))
+
+# Translation tables for the conversions that map each byte to another byte.
+_TRANSLATIONS = {
+    "ascii": _IDENTITY.decode("cp037").encode("latin-1"),
+    "lcase": bytes.maketrans(_UPPER, _LOWER),
+    "ucase": bytes.maketrans(_LOWER, _UPPER),
+    "ebcdic": _IDENTITY.decode("latin-1").encode("cp037"),
+}
+
+# Conversions that are accepted but change nothing here: a failed pull can't
+# be resumed, and pushes are always complete before the command returns.
+_NO_OP_CONVERSIONS = {"noerror", "fsync", "fdatasync"}
+_CONVERSIONS = {*_TRANSLATIONS, *_NO_OP_CONVERSIONS, "sync", "swab", "notrunc", "nocreat", "excl"}
+_INPUT_FLAGS = {"fullblock", "skip_bytes", "count_bytes"}
+_OUTPUT_FLAGS = {"seek_bytes", "append"}
+
+# Up to this much of an existing output file that has to be kept (for seek=
+# or conv=notrunc) is held in memory; beyond it, a local temporary file is used.
+_SPOOL_MEMORY_SIZE = 16 * 1024 * 1024
+
+
+@dataclasses.dataclass
+class _Options:
+    """The parsed operands."""
+
+    input_file: str | None = None
+    output_file: str | None = None
+    input_block_size: int = _DEFAULT_BLOCK_SIZE
+    output_block_size: int = _DEFAULT_BLOCK_SIZE
+    same_block_size: bool = False
+    count: int | None = None
+    skip: int = 0
+    seek: int = 0
+    conversions: set[str] = dataclasses.field(default_factory=set)
+    input_flags: set[str] = dataclasses.field(default_factory=set)
+    output_flags: set[str] = dataclasses.field(default_factory=set)
+    status: str = "default"
+
+
+@dataclasses.dataclass
+class _Stats:
+    """Records and bytes copied, for the summary."""
+
+    full_in: int = 0
+    partial_in: int = 0
+    full_out: int = 0
+    partial_out: int = 0
+    bytes_out: int = 0
+
 
 class DdCommand(Command):
     """Implementation of dd command."""
@@ -35,9 +123,12 @@ Usage: dd [OPERAND]...
 
 Description:
     Copy a file, converting and formatting according to the operands.
+    Data is read and written in blocks as it streams, so any part of a
+    file of any size can be copied. The number of records and bytes
+    copied, and the transfer rate, are reported when it finishes.
 
 Operands:
-    if=FILE         Read from FILE instead of stdin
+    if=FILE         Read from FILE (required: there is no standard input)
     of=FILE         Write to FILE instead of stdout
     bs=BYTES        Read and write BYTES bytes at a time
     ibs=BYTES       Read BYTES bytes at a time (default: 512)
@@ -46,15 +137,33 @@ Operands:
     skip=N          Skip N ibs-sized blocks at start of input
     seek=N          Skip N obs-sized blocks at start of output
     conv=CONVS      Convert the file as per the comma separated symbol list
+    iflag=FLAGS     Read as per the comma separated symbol list
+    oflag=FLAGS     Write as per the comma separated symbol list
+    status=LEVEL    none (no summary), noxfer (no transfer rate) or
+                    progress (show the transfer as it happens)
+
+    BYTES and N may have a suffix: c (1), w (2), b (512), kB (1000),
+    K (1024), MB, M, GB, G, TB or T.
 
 Conversions:
     ascii           Convert EBCDIC to ASCII
     ebcdic          Convert ASCII to EBCDIC
     lcase           Change uppercase to lowercase
     ucase           Change lowercase to uppercase
+    swab            Swap every pair of input bytes
+    sync            Pad every input block with NULs to ibs-size
+    excl            Fail if the output file already exists
     nocreat         Do not create the output file
     notrunc         Do not truncate the output file
-    sync            Pad every input block with NULs to ibs-size
+
+Input flags:
+    fullblock       Accumulate full blocks of input
+    skip_bytes      Treat skip=N as a byte count
+    count_bytes     Treat count=N as a byte count
+
+Output flags:
+    seek_bytes      Treat seek=N as a byte count
+    append          Append to the output file (with conv=notrunc)
 
 Options:
     -h, --help      Show this help message
@@ -62,6 +171,7 @@ Options:
 Examples:
     dd if=/dev/zero of=output.txt bs=1024 count=10
     dd if=input.txt of=output.txt conv=ucase
+    dd if=/var/log/big.log bs=1M skip=100 count=1 of=/tmp/sample.log
         """
         self.console.print(help_text)
 
@@ -70,130 +180,348 @@ Examples:
         if handle_help_flag(self, args):
             return 0
 
-        # Parse dd operands (key=value format).
-        # TODO: Can this use common flag parsing code?
-        operands = {}
-        for arg in args:
-            if "=" in arg:
-                key, value = arg.split("=", 1)
-                operands[key] = value
-            else:
-                self.console.print(get_theme().error_text(f"dd: invalid operand '{arg}'"))
-                return 1
-
-        # Default values
-        input_file = operands.get("if")
-        output_file = operands.get("of")
-        block_size = self._parse_size(operands.get("bs"))
-        input_block_size = self._parse_size(operands.get("ibs", "512"))
-        output_block_size = self._parse_size(operands.get("obs", "512"))
-        count = int(operands.get("count", -1)) if operands.get("count") else -1
-        skip = int(operands.get("skip", 0)) if operands.get("skip") else 0
-        seek = int(operands.get("seek", 0)) if operands.get("seek") else 0
-        conversions = operands.get("conv", "").split(",") if operands.get("conv") else []
-
-        # Use block_size if specified, otherwise use separate ibs/obs
-        if block_size:
-            input_block_size = output_block_size = block_size
+        try:
+            options = self._parse_operands(args)
+        except ValueError as e:
+            self.console.print(get_theme().error_text(f"dd: {e}"))
+            return 1
 
+        if not options.input_file:
+            # TODO: Handle stdin
+            self.console.print(get_theme().warning_text("dd: reading from stdin not supported"))
+            return 1
+        input_path = self._resolve(options.input_file)
+
+        stats = _Stats()
+        start = time.monotonic()
         try:
-            # Read input data
-            if input_file:
-                input_data = safe_read_file(client, input_file, self.shell)
-                if input_data is None:
+            with (
+                create_transfer_progress(self.console) as progress,
+                client.pull(input_path, encoding=None) as source,
+            ):
+                task = progress.add_task(
+                    f"dd: {options.input_file}",
+                    total=None,
+                    visible=options.status == "progress",
+                )
+                if not self._skip_input(source, options):
                     self.console.print(
-                        get_theme().error_text(f"dd: {input_file}: No such file or directory")
+                        f"dd: '{options.input_file}': cannot skip to specified offset",
+                        markup=False,
                     )
-                    return 1
-            else:
-                # TODO: Handle stdin
-                self.console.print(
-                    get_theme().warning_text("dd: reading from stdin not supported")
+                blocks = self._copy_blocks(
+                    source, options, stats, lambda n: progress.advance(task, n)
                 )
-                return 1
-
-            # Apply skip
-            if skip > 0:
-                skip_bytes = skip * input_block_size
-                input_data = input_data[skip_bytes:]
-
-            # Apply count limit
-            if count > 0:
-                max_bytes = count * input_block_size
-                input_data = input_data[:max_bytes]
-
-            # Apply conversions
-            output_data = self._apply_conversions(input_data, conversions)
-
-            # Write output
-            if output_file:
-                # Apply seek for output
-                if seek > 0:
-                    # For simplicity, we'll just truncate or create new file
-                    # Real dd would seek into existing file
-                    pass
-
-                try:
-                    output_stream = BytesIO(output_data)
-                    client.push(output_file, output_stream)
-                except Exception as e:
-                    self.console.print(get_theme().error_text(f"dd: {output_file}: {e}"))
-                    return 1
+                if options.output_file:
+                    self._write_file(client, blocks, options)
+                else:
+                    print_text_chunks(self.console, blocks)
+        except ops.pebble.PathError as e:
+            if e.kind == "not-found":
+                message = f"dd: {options.input_file}: No such file or directory"
             else:
-                # Output to stdout (convert to text for display)
-                try:
-                    text_output = output_data.decode("utf-8", errors="replace")
-                    self.console.print(text_output, end="")
-                except Exception:
-                    # If can't decode, show hex representation
-                    hex_output = output_data.hex()
-                    self.console.print(f"[hex]{hex_output}[/hex]")
-
-            # Print statistics
-            blocks_read = math.ceil(len(input_data) / input_block_size) if input_data else 0
-            blocks_written = math.ceil(len(output_data) / output_block_size) if output_data else 0
-            self.console.print(f"{blocks_read} blocks read", file=self.shell.console.file)
-            self.console.print(f"{blocks_written} blocks written", file=self.shell.console.file)
-
-            return 0
-
-        except Exception as e:
+                message = f"dd: {e.message}"
+            self.console.print(get_theme().error_text(message))
+            return 1
+        except (ops.pebble.APIError, ValueError, OSError) as e:
             self.console.print(get_theme().error_text(f"dd: {e}"))
             return 1
 
-    def _parse_size(self, size_str: str | None) -> int:
-        """Parse size string (e.g., '1024', '1K', '1M')."""
-        if not size_str:
-            return 512
-
-        size_str = size_str.upper()
-        multipliers = {
-            "B": 1,
-            "K": 1024,
-            "M": 1024 * 1024,
-            "G": 1024 * 1024 * 1024,
-        }
-
-        if size_str[-1] in multipliers:
-            return int(size_str[:-1]) * multipliers[size_str[-1]]
-        else:
-            return int(size_str)
-
-    def _apply_conversions(self, data: bytes, conversions: list[str]) -> bytes:
-        """Apply conversion operations to data."""
-        result = bytearray(data)
-
-        for conv in conversions:
-            conv = conv.strip()
-            if conv == "lcase":
-                result = bytearray(b + 32 if 65 <= b <= 90 else b for b in result)
-            elif conv == "ucase":
-                result = bytearray(b - 32 if 97 <= b <= 122 else b for b in result)
-            elif conv == "ascii":
-                # Simple EBCDIC to ASCII (simplified)
-                pass  # Would need EBCDIC translation table
-            elif conv == "sync":
-                # Pad to block boundary with nulls
-                pass  # Would need block size context
-
-        return bytes(result)
+        self._report(options, stats, time.monotonic() - start)
+        return 0
+
+    def _resolve(self, path: str) -> str:
+        return resolve_path(self.shell.current_directory, path, self.shell.home_dir)
+
+    def _parse_operands(self, args: list[str]) -> _Options:
+        """Parse the KEY=VALUE operands.
+
+        Raises:
+            ValueError: If an operand is unknown or has an invalid value
+        """
+        # TODO: Can this use common flag parsing code?
+        options = _Options()
+        for arg in args:
+            key, sep, value = arg.partition("=")
+            if not sep:
+                raise ValueError(f"invalid operand '{arg}'")
+            if key == "if":
+                options.input_file = value
+            elif key == "of":
+                options.output_file = value
+            elif key == "bs":
+                options.input_block_size = options.output_block_size = self._parse_size(value)
+                options.same_block_size = True
+            elif key == "ibs" and not options.same_block_size:
+                options.input_block_size = self._parse_size(value)
+            elif key == "obs" and not options.same_block_size:
+                options.output_block_size = self._parse_size(value)
+            elif key in ("ibs", "obs"):
+                self._parse_size(value)  # bs= takes precedence, but check it anyway
+            elif key == "count":
+                options.count = self._parse_size(value, allow_zero=True)
+            elif key == "skip":
+                options.skip = self._parse_size(value, allow_zero=True)
+            elif key == "seek":
+                options.seek = self._parse_size(value, allow_zero=True)
+            elif key == "conv":
+                options.conversions |= self._parse_symbols(value, _CONVERSIONS, "conversion")
+            elif key == "iflag":
+                options.input_flags |= self._parse_symbols(value, _INPUT_FLAGS, "input flag")
+            elif key == "oflag":
+                options.output_flags |= self._parse_symbols(value, _OUTPUT_FLAGS, "output flag")
+            elif key == "status":
+                if value not in ("none", "noxfer", "progress"):
+                    raise ValueError(f"invalid status level '{value}'")
+                options.status = value
+            else:
+                raise ValueError(f"invalid operand '{arg}'")
+        if {"ascii", "ebcdic"} <= options.conversions:
+            raise ValueError("cannot combine ascii and ebcdic")
+        if {"lcase", "ucase"} <= options.conversions:
+            raise ValueError("cannot combine lcase and ucase")
+        if {"excl", "nocreat"} <= options.conversions:
+            raise ValueError("cannot combine excl and nocreat")
+        return options
+
+    @staticmethod
+    def _parse_size(size_str: str, allow_zero: bool = False) -> int:
+        """Parse a size such as ``512``, ``4K``, ``1MB`` or ``2x4K``.
+
+        Raises:
+            ValueError: If the size is invalid
+        """
+        value = 1
+        for factor in size_str.split("x"):
+            match = _SIZE.fullmatch(factor)
+            if not match or match.group(2) not in _SIZE_SUFFIXES:
+                raise ValueError(f"invalid number: '{size_str}'")
+            value *= int(match.group(1)) * _SIZE_SUFFIXES[match.group(2)]
+        if not value and not allow_zero:
+            raise ValueError(f"invalid number: '{size_str}'")
+        return value
+
+    @staticmethod
+    def _parse_symbols(value: str, known: set[str], kind: str) -> set[str]:
+        symbols = {symbol.strip() for symbol in value.split(",") if symbol.strip()}
+        for symbol in symbols - known:
+            raise ValueError(f"invalid {kind}: '{symbol}'")
+        return symbols
+
+    @staticmethod
+    def _read_block(source: BinaryIO, size: int, fullblock: bool) -> bytes:
+        """Read one input block: a single read, or with fullblock, as many as it takes."""
+        data = source.read(size)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not fullblock or len(data) in (0, size):
+            return data
+        parts = [data]
+        remaining = size - len(data)
+        while remaining:
+            more = source.read(remaining)
+            if not more:
+                break
+            if isinstance(more, str):
+                more = more.encode("utf-8")
+            parts.append(more)
+            remaining -= len(more)
+        return b"".join(parts)
+
+    def _skip_input(self, source: BinaryIO, options: _Options) -> bool:
+        """Read past the skipped part of the input (a pull can't seek).
+
+        Returns:
+            False if the input ended before the offset to skip to
+        """
+        remaining = options.skip
+        if "skip_bytes" not in options.input_flags:
+            remaining *= options.input_block_size
+        while remaining:
+            data = source.read(min(remaining, MAX_CHUNK_SIZE))
+            if not data:
+                return False
+            remaining -= len(data)
+        return True
+
+    def _copy_blocks(
+        self,
+        source: BinaryIO,
+        options: _Options,
+        stats: _Stats,
+        on_read: Callable[[int], None],
+    ) -> Iterator[bytes]:
+        """Read the input in blocks, yielding each one converted."""
+        input_block_size = options.input_block_size
+        fullblock = "fullblock" in options.input_flags
+        sync = "sync" in options.conversions
+        swab = "swab" in options.conversions
+        table = _IDENTITY
+        # GNU dd converts from EBCDIC first, and to EBCDIC last.
+        for conversion in ("ascii", "lcase", "ucase", "ebcdic"):
+            if conversion in options.conversions:
+                table = table.translate(_TRANSLATIONS[conversion])
+        translate = table != _IDENTITY
+        # Like GNU dd, swab regroups the output, so bs= no longer means one
+        # output record per input record.
+        same_block_size = options.same_block_size and not swab
+        odd_byte = b""
+
+        remaining = options.count
+        count_bytes = "count_bytes" in options.input_flags
+        while remaining is None or remaining > 0:
+            size = input_block_size
+            if count_bytes and remaining is not None:
+                size = min(size, remaining)
+            block = self._read_block(source, size, fullblock)
+            if not block:
+                break
+            on_read(len(block))
+            if len(block) == input_block_size:
+                stats.full_in += 1
+            else:
+                stats.partial_in += 1
+                if sync:
+                    block = block.ljust(input_block_size, b"\0")
+            if remaining is not None:
+                remaining -= len(block) if count_bytes else 1
+            if translate:
+                block = block.translate(table)
+            if swab:
+                # Pairs are swapped across block boundaries: an odd byte at
+                # the end of a block is carried over to the next one.
+                block, odd_byte = self._swap_pairs(odd_byte + block)
+                if not block:
+                    continue
+            if same_block_size:
+                # With bs=, each input block is written as one output block.
+                if len(block) == options.output_block_size:
+                    stats.full_out += 1
+                else:
+                    stats.partial_out += 1
+            stats.bytes_out += len(block)
+            yield block
+        if odd_byte:
+            # The last byte of an odd-sized input has nothing to swap with.
+            stats.bytes_out += 1
+            yield odd_byte
+        if not same_block_size:
+            stats.full_out, partial = divmod(stats.bytes_out, options.output_block_size)
+            stats.partial_out = 1 if partial else 0
+
+    @staticmethod
+    def _swap_pairs(data: bytes) -> tuple[bytes, bytes]:
+        """Swap every pair of bytes.
+
+        Returns:
+            The swapped pairs, and the last byte if there is an odd one out
+        """
+        end = len(data) - len(data) % 2
+        swapped = bytearray(data[:end])
+        swapped[0::2], swapped[1::2] = data[1:end:2], data[0:end:2]
+        return bytes(swapped), data[end:]
+
+    def _write_file(self, client: ClientType, blocks: Iterator[bytes], options: _Options) -> None:
+        """Stream the blocks to the output file.
+
+        A push always replaces a whole file, so the parts of an existing
+        output file that dd would leave alone (the part before seek=, and
+        with conv=notrunc the part after the copied data) are copied into
+        the new file around the data.
+        """
+        output_path = self._resolve(options.output_file or "")
+        conversions = options.conversions
+        offset = options.seek
+        if "seek_bytes" not in options.output_flags:
+            offset *= options.output_block_size
+        append = "append" in options.output_flags and "notrunc" in conversions
+        keep_old = bool(offset) or "notrunc" in conversions or append
+
+        exists = self._exists(client, output_path)
+        if exists and "excl" in conversions:
+            raise ValueError(f"failed to open '{options.output_file}': File exists")
+        if not exists and "nocreat" in conversions:
+            raise ValueError(f"failed to open '{options.output_file}': No such file or directory")
+
+        with self._spool_existing(client, output_path, exists and keep_old) as old:
+            old_size = old.seek(0, 2)
+            old.seek(0)
+            if append:
+                offset = old_size
+            with RemotePushStream(client, output_path) as sink:
+                self._copy_spool(old, min(offset, old_size), sink.write)
+                if offset > old_size:
+                    for start in range(old_size, offset, DEFAULT_CHUNK_SIZE):
+                        sink.write(b"\0" * min(DEFAULT_CHUNK_SIZE, offset - start))
+                written = 0
+                for block in blocks:
+                    sink.write(block)
+                    written += len(block)
+                if "notrunc" in conversions and offset + written < old_size:
+                    old.seek(offset + written)
+                    self._copy_spool(old, old_size - offset - written, sink.write)
+
+    @staticmethod
+    def _exists(client: ClientType, path: str) -> bool:
+        try:
+            client.list_files(path, itself=True)
+        except ops.pebble.PathError as e:
+            if e.kind == "not-found":
+                return False
+            raise
+        return True
+
+    @staticmethod
+    def _spool_existing(client: ClientType, path: str, needed: bool) -> IO[bytes]:
+        """Copy the existing output file into a local spool, if it has to be kept."""
+        spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY_SIZE)  # noqa: SIM115
+        if not needed:
+            return spool
+        try:
+            for chunk in iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE):
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+
+    @staticmethod
+    def _copy_spool(spool: IO[bytes], size: int, write: Callable[[bytes], object]) -> None:
+        while size > 0:
+            data = spool.read(min(size, MAX_CHUNK_SIZE))
+            if not data:
+                break
+            write(data)
+            size -= len(data)
+
+    def _report(self, options: _Options, stats: _Stats, elapsed: float) -> None:
+        """Print the records in and out, and the transfer summary, like GNU dd."""
+        if options.status == "none":
+            return
+        lines = [
+            f"{stats.full_in}+{stats.partial_in} records in",
+            f"{stats.full_out}+{stats.partial_out} records out",
+        ]
+        if options.status != "noxfer":
+            copied = stats.bytes_out
+            if copied >= 1000:
+                sizes = f" ({_human(copied, 1000, '')}B, {_human(copied, 1024, 'i')}B)"
+            else:
+                sizes = ""
+            rate = _human(copied / elapsed, 1000, "") + "B/s" if elapsed > 0 else "Infinity B/s"
+            byte_word = "byte" if copied == 1 else "bytes"
+            lines.append(f"{copied} {byte_word}{sizes} copied, {elapsed:.6g} s, {rate}")
+        self.shell.error_console.print("\n".join(lines), markup=False, highlight=False)
+
+
+def _human(value: float, base: int, infix: str) -> str:
+    """Format a size with two or three significant digits, as in ``1.5 MB`` or ``750 KiB``."""
+    units = ["", "k" if base == 1000 else "K", "M", "G", "T", "P"]
+    unit = 0
+    while value >= base and unit < len(units) - 1:
+        value /= base
+        unit += 1
+    if not unit:
+        return f"{value:.0f} "
+    number = f"{value:.1f}" if value < 10 else f"{value:.0f}"
+    return f"{number} {units[unit]}{infix}"
@@ -2,21 +2,191 @@
 
 from __future__ import annotations
 
+import dataclasses
+import re
+import struct
+from itertools import repeat
 from typing import TYPE_CHECKING, Union
 
 import ops
 
-from ...utils.command_helpers import handle_help_flag, parse_flags, safe_read_file
+from ...utils import resolve_path
+from ...utils.binary_dump import (
+    CHAR_TABLE,
+    NAMED_CHAR_TABLE,
+    dump_lines,
+    parse_byte_count,
+    printable,
+    table_bytes,
+    words,
+)
+from ...utils.command_helpers import handle_help_flag, parse_flags
+from ...utils.streaming import iter_byte_range, iter_remote_chunks
 from ...utils.theme import get_theme
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     import shimmer
 
 
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+# Number of output lines to collect before writing them to the console in one go.
+_OUTPUT_BATCH_LINES = 1000
+
+_TYPE_SPEC = re.compile(r"([acdfoux])(\d+|[CSILFD])?(z?)")
+_SIZE_LETTERS = {"C": 1, "S": 2, "I": 4, "L": 8, "F": 4, "D": 8}
+_DEFAULT_SIZES = {"d": 4, "o": 4, "u": 4, "x": 4, "f": 8}
+
+# Digits needed for the widest value of each integer type and size.
+_INT_DIGITS = {
+    ("d", 1): 4,
+    ("d", 2): 6,
+    ("d", 4): 11,
+    ("d", 8): 20,
+    ("u", 1): 3,
+    ("u", 2): 5,
+    ("u", 4): 10,
+    ("u", 8): 20,
+    ("o", 1): 3,
+    ("o", 2): 6,
+    ("o", 4): 11,
+    ("o", 8): 22,
+    ("x", 1): 2,
+    ("x", 2): 4,
+    ("x", 4): 8,
+    ("x", 8): 16,
+}
+_FLOAT_DIGITS = {4: 15, 8: 24}
+
+# Traditional single-letter formats and the -t types they stand for.
+_TRADITIONAL_FORMATS = {
+    "b": "o1",
+    "c": "c",
+    "d": "u2",
+    "o": "o2",
+    "s": "d2",
+    "x": "x2",
+    "i": "d4",
+    "l": "d8",
+    "f": "f4",
+}
+
+_ADDRESS_FORMATS = {"o": "{:07o}", "d": "{:07d}", "x": "{:06x}", "n": ""}
+
+# Options whose value may be attached (-An, -tx1) as well as separate.
+_VALUE_OPTIONS = ("-A", "-t", "-N", "-j", "-S")
+
+# Bytes per line for a -w without a value, as in GNU od.
+_DEFAULT_WIDE = "32"
+
+
+@dataclasses.dataclass
+class _OutputType:
+    """One output format selected with -t."""
+
+    kind: str
+    size: int
+    show_text: bool
+
+    @property
+    def digits(self) -> int:
+        """Width of one formatted value."""
+        if self.kind in ("a", "c"):
+            return 3
+        if self.kind == "f":
+            return _FLOAT_DIGITS[self.size]
+        return _INT_DIGITS[self.kind, self.size]
+
+    def renderer(self, pad: int) -> Callable[[bytes], str]:
+        """Build a function that formats a line, with ``pad`` extra spaces per value."""
+        field = " " * (pad + 1) + "%"
+        if self.kind in ("a", "c"):
+            table = NAMED_CHAR_TABLE if self.kind == "a" else CHAR_TABLE
+            template = f"{field}{self.digits}s"
+            return lambda line: table_bytes(line, table, template)
+        if self.kind == "f":
+            template = f"{field}{self.digits}s"
+            return lambda line: _float_words(line, self.size, template)
+        zero = "0" if self.kind in ("o", "x") else ""
+        template = f"{field}{zero}{self.digits}{self.kind.replace('u', 'd')}"
+        signed = self.kind == "d"
+        return lambda line: words(line, self.size, template, signed=signed)
+
+
+def _shortest_float(value: float, code: str) -> str:
+    """Format a float with the fewest digits that read back as the same value."""
+    for precision in range(1, 18):
+        text = f"{value:.{precision}g}"
+        if struct.unpack(code, struct.pack(code, float(text)))[0] == value:
+            return text
+    return repr(value)
+
+
+def _float_words(line: bytes, size: int, template: str) -> str:
+    """Render ``line`` as native floats of ``size`` bytes, padding a partial one."""
+    if len(line) % size:
+        line = line + bytes(size - len(line) % size)
+    code = "f" if size == 4 else "d"
+    values = memoryview(line).cast(code)
+    return (template * len(values)) % tuple(map(_shortest_float, values, repeat(code)))
+
+
+def _split_attached(args: list[str]) -> list[str]:
+    """Separate the values attached to options (``-tx1``, ``-w8``) for parse_flags.
+
+    A -w without a value is given the GNU default of 32 bytes per line.
+    """
+    split: list[str] = []
+    arg_iter = iter(args)
+    for arg in arg_iter:
+        if arg in _VALUE_OPTIONS:
+            split.append(arg)
+            value = next(arg_iter, None)
+            if value is not None:
+                split.append(value)
+        elif arg.startswith(_VALUE_OPTIONS):
+            split.extend((arg[:2], arg[2:]))
+        elif arg.startswith("-w"):
+            split.extend(("-w", arg[2:] or _DEFAULT_WIDE))
+        else:
+            split.append(arg)
+    return split
+
+
+def _parse_types(spec: str) -> list[_OutputType]:
+    """Parse a -t argument such as ``x1z`` or ``d2c``.
+
+    Raises:
+        ValueError: If the type specification is invalid
+    """
+    types: list[_OutputType] = []
+    position = 0
+    while position < len(spec):
+        match = _TYPE_SPEC.match(spec, position)
+        if not match:
+            raise ValueError(f"invalid type string '{spec}'")
+        kind, size_text, suffix = match.groups()
+        if kind in ("a", "c"):
+            if size_text:
+                raise ValueError(f"invalid type string '{spec}'")
+            size = 1
+        elif size_text is None:
+            size = _DEFAULT_SIZES[kind]
+        elif size_text.isdigit():
+            size = int(size_text)
+        else:
+            size = _SIZE_LETTERS[size_text]
+        valid_sizes = (4, 8) if kind == "f" else (1, 2, 4, 8)
+        if kind not in ("a", "c") and size not in valid_sizes:
+            raise ValueError(f"invalid type string '{spec}': no {size}-byte type")
+        types.append(_OutputType(kind, size, bool(suffix)))
+        position = match.end()
+    return types
+
 
 class OdCommand(Command):
     """Implementation of od command."""
@@ -33,15 +203,18 @@ Usage: od [OPTIONS] [FILE...]
 
 Description:
     Write an unambiguous representation, octal bytes by default,
-    of FILE to standard output.
+    of FILE to standard output. Files are streamed, and reading stops
+    once -N bytes have been dumped.
 
 Options:
     -A RADIX        Select address base: o(ctal), d(ecimal), x(hexadecimal), n(one)
     -t TYPE         Select output format(s)
     -N BYTES        Limit dump to BYTES input bytes
-    -S BYTES        Skip BYTES input bytes
-    -w[BYTES]       Output BYTES bytes per line (default 16)
+    -j, -S BYTES    Skip BYTES input bytes
+    -w[BYTES]       Output BYTES bytes per line (default 16, or 32 for -w alone)
     -v              Output all data (don't use * for repetition)
+    -b, -c, -d, -o, -s, -x, -i, -l, -f
+                    Same as -t o1, c, u2, o2, d2, x2, d4, d8, f4
     -h, --help      Show this help message
 
 Format types (for -t):
@@ -52,29 +225,34 @@ Format types (for -t):
     o[SIZE]         Octal, SIZE bytes per integer
     u[SIZE]         Unsigned decimal, SIZE bytes per integer
     x[SIZE]         Hexadecimal, SIZE bytes per integer
+    Add z to a type to show printable characters at the end of each line.
+
+BYTES may be given in hex (0x...), octal (0...) or with a b (512), k (1024),
+m or g suffix.
 
 Examples:
     od file.txt
     od -t x1 file.txt      # Hexadecimal bytes
     od -A x -t x1z file.txt # Hex addresses and bytes with ASCII
         """
-        self.console.print(help_text)
+        self.console.print(help_text, markup=False)
 
     def execute(self, client: ClientType, args: list[str]) -> int:
         """Execute the od command."""
         if handle_help_flag(self, args):
             return 0
 
-        # TODO: Can this use common flag parsing code?
         parse_result = parse_flags(
-            args,
+            _split_attached(args),
             {
                 "A": str,  # address radix
                 "t": str,  # output format
                 "N": str,  # limit bytes
+                "j": str,  # skip bytes
                 "S": str,  # skip bytes
                 "w": str,  # width
                 "v": bool,  # verbose (no *)
+                **dict.fromkeys(_TRADITIONAL_FORMATS, bool),
             },
             self.shell,
         )
@@ -82,140 +260,115 @@ Examples:
             return 1
         flags, positional_args = parse_result
 
-        address_radix = flags.get("A", "o")  # octal default
-        format_type = flags.get("t") or "o2"  # octal 2-byte default
-        limit_bytes = int(flags.get("N", 0)) if flags.get("N") else 0
-        skip_bytes = int(flags.get("S", 0)) if flags.get("S") else 0
-        width = int(flags.get("w", 16)) if flags.get("w") else 16
-        verbose = flags.get("v", False)
+        address_format = _ADDRESS_FORMATS.get(flags["A"] or "o")
+        if address_format is None:
+            self.console.print(
+                get_theme().error_text(f"od: invalid output address radix '{flags['A']}'")
+            )
+            return 1
+        try:
+            types = _parse_types(flags["t"] or "")
+            for letter, spec in _TRADITIONAL_FORMATS.items():
+                if flags[letter]:
+                    types.extend(_parse_types(spec))
+            types = types or _parse_types("o2")
+            skip_text = flags["j"] or flags["S"]
+            skip = parse_byte_count(skip_text) if skip_text else 0
+            limit = parse_byte_count(flags["N"]) if flags["N"] else None
+            width = parse_byte_count(flags["w"]) if flags["w"] else 16
+        except ValueError as e:
+            self.console.print(get_theme().error_text(f"od: {e}"))
+            return 1
+        if width <= 0 or any(width % output_type.size for output_type in types):
+            self.console.print(get_theme().error_text(f"od: invalid line width: {width}"))
+            return 1
+
+        renderers = self._renderers(types, width, address_format)
+        end_address = address_format.format if address_format else None
 
         files = positional_args if positional_args else ["-"]
         exit_code = 0
 
         for file_path in files:
-            try:
-                if file_path == "-":
-                    # TODO: Handle stdin
-                    self.console.print(
-                        get_theme().warning_text("od: reading from stdin not supported")
-                    )
-                    continue
+            if file_path == "-":
+                # TODO: Handle stdin
+                self.console.print(
+                    get_theme().warning_text("od: reading from stdin not supported")
+                )
+                continue
 
-                # Read file
-                data = safe_read_file(client, file_path, self.shell)
-                if data is None:
-                    self.console.print(
-                        get_theme().error_text(f"od: {file_path}: No such file or directory")
+            path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+            chunks = iter_byte_range(iter_remote_chunks(client, path), skip, limit)
+            try:
+                self._print_lines(
+                    dump_lines(
+                        chunks,
+                        width,
+                        renderers,
+                        offset=skip,
+                        squeeze=not flags["v"],
+                        end_address=end_address,
                     )
-                    continue
-
-                # Apply skip
-                if skip_bytes > 0:
-                    data = data[skip_bytes:]
-
-                # Apply limit
-                if limit_bytes > 0:
-                    data = data[:limit_bytes]
-
-                # Generate output
-                self._dump_data(data, address_radix, format_type, width, verbose, skip_bytes)
-
-            except ops.pebble.PathError:
-                self.console.print(
-                    get_theme().error_text(f"od: {file_path}: No such file or directory")
                 )
+            except ops.pebble.PathError as e:
+                if e.kind == "not-found":
+                    message = f"od: {file_path}: No such file or directory"
+                else:
+                    message = f"od: {file_path}: {e.message}"
+                self.console.print(get_theme().error_text(message))
                 exit_code = 1
-            except Exception as e:
+            except ops.pebble.APIError as e:
                 self.console.print(get_theme().error_text(f"od: {file_path}: {e}"))
                 exit_code = 1
 
         return exit_code
 
-    def _dump_data(
-        self,
-        data: bytes,
-        address_radix: str,
-        format_type: str,
-        width: int,
-        verbose: bool,
-        offset: int,
-    ):
-        """Dump binary data in specified format."""
-        for i in range(0, len(data), width):
-            chunk = data[i : i + width]
-            address = offset + i
-
-            # Format address
-            if address_radix == "o":
-                addr_str = f"{address:07o}"
-            elif address_radix == "d":
-                addr_str = f"{address:07d}"
-            elif address_radix == "x":
-                addr_str = f"{address:06x}"
-            elif address_radix == "n":
-                addr_str = ""
-            else:
-                addr_str = f"{address:07o}"
-
-            # Format data based on type
-            if format_type.startswith("x"):
-                # Hexadecimal
-                size = int(format_type[1:]) if len(format_type) > 1 else 1
-                hex_values = []
-                for j in range(0, len(chunk), size):
-                    value_bytes = chunk[j : j + size]
-                    if len(value_bytes) == size:
-                        if size == 1:
-                            hex_values.append(f"{value_bytes[0]:02x}")
-                        elif size == 2:
-                            value = int.from_bytes(value_bytes, byteorder="little")
-                            hex_values.append(f"{value:04x}")
-                        elif size == 4:
-                            value = int.from_bytes(value_bytes, byteorder="little")
-                            hex_values.append(f"{value:08x}")
-
-                data_str = " ".join(hex_values)
-
-            elif format_type.startswith("o"):
-                # Octal
-                size = int(format_type[1:]) if len(format_type) > 1 else 2
-                octal_values = []
-                for j in range(0, len(chunk), size):
-                    value_bytes = chunk[j : j + size]
-                    if len(value_bytes) == size:
-                        if size == 1:
-                            octal_values.append(f"{value_bytes[0]:03o}")
-                        elif size == 2:
-                            value = int.from_bytes(value_bytes, byteorder="little")
-                            octal_values.append(f"{value:06o}")
-
-                data_str = " ".join(octal_values)
-
-            elif format_type == "c":
-                # ASCII characters
-                char_values = []
-                for byte in chunk:
-                    if 32 <= byte <= 126:
-                        char_values.append(chr(byte))
-                    elif byte == 0:
-                        char_values.append("\\0")
-                    elif byte == 9:
-                        char_values.append("\\t")
-                    elif byte == 10:
-                        char_values.append("\\n")
-                    elif byte == 13:
-                        char_values.append("\\r")
-                    else:
-                        char_values.append(f"\\{byte:03o}")
-
-                data_str = " ".join(char_values)
-
-            else:
-                # Default to octal bytes
-                data_str = " ".join(f"{byte:03o}" for byte in chunk)
-
-            # Print line
-            if addr_str:
-                self.console.print(f"{addr_str} {data_str}")
-            else:
-                self.console.print(data_str)
+    @staticmethod
+    def _renderers(
+        types: list[_OutputType], width: int, address_format: str
+    ) -> list[Callable[[int, bytes], str]]:
+        """Build one line renderer per output type, with their columns aligned."""
+        # Like GNU od, every type's values are padded so that all of the
+        # lines for one block have the same total width.
+        line_widths = [(width // t.size) * (t.digits + 1) for t in types]
+        total_width = max(line_widths)
+        blank_address = " " * len(address_format.format(0)) if address_format else ""
+
+        renderers: list[Callable[[int, bytes], str]] = []
+        for index, (output_type, line_width) in enumerate(zip(types, line_widths, strict=True)):
+            render = output_type.renderer(
+                (total_width - line_width) // (width // output_type.size)
+            )
+
+            def render_line(
+                address: int,
+                line: bytes,
+                render: Callable[[bytes], str] = render,
+                first: bool = index == 0,
+                show_text: bool = output_type.show_text,
+            ) -> str:
+                prefix = address_format.format(address) if first else blank_address
+                text = render(line)
+                if show_text:
+                    text = f"{text:<{total_width}}  >{printable(line)}<"
+                return prefix + text
+
+            renderers.append(render_line)
+        return renderers
+
+    def _print_lines(self, lines: Iterable[str]) -> None:
+        batch: list[str] = []
+        try:
+            for line in lines:
+                batch.append(line)
+                if len(batch) >= _OUTPUT_BATCH_LINES:
+                    self._flush(batch)
+        finally:
+            self._flush(batch)
+
+    def _flush(self, batch: list[str]) -> None:
+        if batch:
+            self.console.print(
+                "\n".join(batch), markup=False, highlight=False, emoji=False, soft_wrap=True
+            )
+            batch.clear()
@@ -2,15 +2,22 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Union
+import io
+import os
+from typing import TYPE_CHECKING, BinaryIO, Union
 
 import ops
 
-from ...utils.command_helpers import handle_help_flag, parse_flags, safe_read_file
+from ...utils import resolve_path
+from ...utils.archive_stream import EXTRACT_BUFFER_SIZE, MemberExtractor, RemotePushStream
+from ...utils.command_helpers import create_transfer_progress, handle_help_flag, parse_flags
+from ...utils.streaming import MAX_CHUNK_SIZE, iter_remote_chunks
 from ...utils.theme import get_theme
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     import shimmer
 
 
@@ -35,12 +42,20 @@ Description:
     Output fixed-size pieces of INPUT to PREFIXaa, PREFIXab, ...
     Default PREFIX is 'x'.
 
+    The input is read as a stream, and pieces are pushed to the container
+    while the rest of the input is read, several at a time, so files of
+    any size can be split.
+
 Options:
-    -a SUFFIX_LENGTH Use SUFFIX_LENGTH characters for suffix (default: 2)
+    -a SUFFIX_LENGTH Use SUFFIX_LENGTH characters for suffix (default: 2,
+                    growing as needed: ..., yz, zaaa, ...)
     -b SIZE         Put SIZE bytes per output file
-    -C SIZE         Put at most SIZE bytes per line per output file
+    -C SIZE         Put at most SIZE bytes of lines per output file
     -l NUMBER       Put NUMBER lines per output file (default: 1000)
+    -n CHUNKS       Split into CHUNKS files of (nearly) equal size; with
+                    l/CHUNKS, without splitting lines
     -d              Use numeric suffixes instead of alphabetic
+    --local         Write the pieces to PREFIX on the local machine
     --verbose       Print a diagnostic just before each output file is opened
     -h, --help      Show this help message
 
@@ -54,6 +69,7 @@ Examples:
     split file.txt
     split -l 500 file.txt part_
     split -b 1024 file.txt chunk_
+    split -n 4 --local /var/backups/dump.sql /tmp/dump.
         """
         self.console.print(help_text)
 
@@ -70,7 +86,9 @@ Examples:
                 "b": str,  # bytes per file
                 "C": str,  # bytes per line per file
                 "l": str,  # lines per file
+                "n": str,  # number of files
                 "d": bool,  # numeric suffixes
+                "local": bool,  # write the pieces locally
                 "verbose": bool,  # verbose output
             },
             self.shell,
@@ -79,10 +97,20 @@ Examples:
             return 1
         flags, positional_args = parse_result
 
-        suffix_length = int(flags.get("a") or 2)
-        bytes_per_file = self._parse_size(flags.get("b"))
-        bytes_per_line = self._parse_size(flags.get("C"))
-        lines_per_file = int(flags.get("l") or 1000)
+        try:
+            suffix_length = int(flags.get("a") or 2)
+            bytes_per_file = self._parse_size(flags.get("b"))
+            bytes_per_line = self._parse_size(flags.get("C"))
+            lines_per_file = int(flags.get("l") or 1000)
+            chunks_spec = flags.get("n")
+            line_chunks = bool(chunks_spec and chunks_spec.startswith("l/"))
+            number_of_chunks = int(chunks_spec.removeprefix("l/")) if chunks_spec else None
+        except ValueError as e:
+            self.console.print(get_theme().error_text(f"split: invalid number: {e}"))
+            return 1
+        if min(suffix_length, lines_per_file, number_of_chunks or 1) < 1:
+            self.console.print(get_theme().error_text("split: invalid number: must be positive"))
+            return 1
         numeric_suffix = flags.get("d", False)
         verbose = flags.get("verbose", False)
 
@@ -90,73 +118,55 @@ Examples:
         input_file = positional_args[0] if positional_args else "-"
         prefix = positional_args[1] if len(positional_args) > 1 else "x"
 
-        # Determine split mode
-        if bytes_per_file:
-            split_mode = "bytes"
-            split_size = bytes_per_file
-        elif bytes_per_line:
-            split_mode = "line_bytes"
-            split_size = bytes_per_line
-        else:
-            split_mode = "lines"
-            split_size = lines_per_file
+        if input_file == "-":
+            # TODO: Handle stdin
+            self.console.print(get_theme().warning_text("split: reading from stdin not supported"))
+            return 1
+        input_path = resolve_path(self.shell.current_directory, input_file, self.shell.home_dir)
+        if not flags.get("local"):
+            prefix = resolve_path(self.shell.current_directory, prefix, self.shell.home_dir)
 
-        try:
-            # Read input
-            if input_file == "-":
-                # TODO: Handle stdin
-                self.console.print(
-                    get_theme().warning_text("split: reading from stdin not supported")
-                )
-                return 1
-            else:
-                content = safe_read_file(client, input_file, self.shell)
-                if content is None:
-                    return 1
-
-            # Split the content
-            if split_mode == "lines":
-                self._split_by_lines(
-                    client,
-                    content,
-                    prefix,
-                    split_size,
-                    suffix_length,
-                    numeric_suffix,
-                    verbose,
-                )
-            elif split_mode == "bytes":
-                self._split_by_bytes(
-                    client,
-                    content,
-                    prefix,
-                    split_size,
-                    suffix_length,
-                    numeric_suffix,
-                    verbose,
-                )
-            elif split_mode == "line_bytes":
-                self._split_by_line_bytes(
-                    client,
-                    content,
-                    prefix,
-                    split_size,
-                    suffix_length,
-                    numeric_suffix,
-                    verbose,
-                )
+        failed: list[str] = []
 
-            return 0
+        def on_error(path: str, message: str) -> None:
+            failed.append(path)
+            self.console.print(f"split: {path}: {message}", style="red", markup=False)
 
+        # Like GNU split, the suffixes grow as needed unless -a fixes their
+        # length (or -n says how many pieces there will be).
+        auto_widen = flags.get("a") is None and number_of_chunks is None
+        names = _piece_names(prefix, suffix_length, numeric_suffix, auto_widen)
+        try:
+            total = self._input_size(client, input_path)
+            if number_of_chunks is not None and total is None:
+                raise ops.pebble.PathError("not-found", f"{input_file}: cannot determine size")
+            with (
+                create_transfer_progress(self.console) as progress,
+                _PieceWriter(
+                    client, names, bool(flags.get("local")), on_error, verbose, self.console.print
+                ) as writer,
+            ):
+                task = progress.add_task(f"split: {input_file}", total=total)
+                chunks = self._read(client, input_path, lambda n: progress.advance(task, n))
+                if number_of_chunks is not None:
+                    _split_into_chunks(chunks, writer, total or 0, number_of_chunks, line_chunks)
+                elif bytes_per_file:
+                    _split_by_bytes(chunks, writer, bytes_per_file)
+                elif bytes_per_line:
+                    _split_by_line_bytes(chunks, writer, bytes_per_line)
+                else:
+                    _split_by_lines(chunks, writer, lines_per_file)
         except ops.pebble.PathError:
             self.console.print(
                 get_theme().error_text(f"split: {input_file}: No such file or directory")
             )
             return 1
-        except Exception as e:
+        except (ops.pebble.APIError, ValueError, OSError) as e:
             self.console.print(get_theme().error_text(f"split: {e}"))
             return 1
 
+        return 1 if failed else 0
+
     def _parse_size(self, size_str: str | None) -> int | None:
         """Parse size string (e.g., '1024', '1K', '1M')."""
         if not size_str:
@@ -170,130 +180,267 @@ Examples:
         }
 
         if size_str[-1] in multipliers:
-            return int(size_str[:-1]) * multipliers[size_str[-1]]
+            size = int(size_str[:-1]) * multipliers[size_str[-1]]
         else:
-            return int(size_str)
-
-    def _generate_suffix(self, index: int, length: int, numeric: bool) -> str:
-        """Generate suffix for split files."""
-        if numeric:
-            return f"{index:0{length}d}"
-        else:
-            # Alphabetic suffix (aa, ab, ac, ..., ba, bb, ...)
+            size = int(size_str)
+        if size < 1:
+            raise ValueError(size_str)
+        return size
+
+    @staticmethod
+    def _input_size(client: ClientType, path: str) -> int | None:
+        """The size of the input file, for progress (and -n), if it can be found."""
+        info = client.list_files(path, itself=True)
+        return info[0].size if info else None
+
+    @staticmethod
+    def _read(client: ClientType, path: str, on_read: Callable[[int], None]) -> Iterable[bytes]:
+        for chunk in iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE):
+            on_read(len(chunk))
+            yield chunk
+
+
+def _piece_names(
+    prefix: str, length: int, numeric: bool, auto_widen: bool = False
+) -> Iterable[str]:
+    """Generate the names of the pieces: PREFIXaa, PREFIXab, ... or PREFIX00, PREFIX01, ...
+
+    With ``auto_widen``, the suffixes grow the way GNU split's do: after
+    PREFIXyz come PREFIXzaaa, PREFIXzaab, ... (or PREFIX9000 after PREFIX89).
+
+    Raises:
+        ValueError: When the suffixes run out
+    """
+    base = 10 if numeric else 26
+    while True:
+        count = base**length
+        if auto_widen:
+            # Suffixes starting with the last letter or digit are kept for the wider ones.
+            count -= base ** (length - 1)
+        for index in range(count):
             suffix = ""
             remaining = index
             for _ in range(length):
-                suffix = chr(ord("a") + (remaining % 26)) + suffix
-                remaining //= 26
-            return suffix
-
-    def _split_by_lines(
+                digit = remaining % base
+                suffix = (str(digit) if numeric else chr(ord("a") + digit)) + suffix
+                remaining //= base
+            yield f"{prefix}{suffix}"
+        if not auto_widen:
+            raise ValueError("output file suffixes exhausted")
+        prefix += "9" if numeric else "z"
+        length += 1
+
+
+class _PieceWriter:
+    """Writes the pieces, one after another, as the input is cut up.
+
+    Remote pieces up to EXTRACT_BUFFER_SIZE are collected in memory and
+    pushed by a pool of workers while the next pieces are cut; larger ones
+    are streamed to the container as they are written. Local pieces are
+    written straight to disk.
+    """
+
+    def __init__(
         self,
         client: ClientType,
-        content: str,
-        prefix: str,
-        lines_per_file: int,
-        suffix_length: int,
-        numeric_suffix: bool,
+        names: Iterable[str],
+        local: bool,
+        on_error: Callable[[str, str], None],
         verbose: bool,
+        print_line: Callable[..., None],
     ):
-        """Split content by number of lines."""
-        lines = content.splitlines(keepends=True)
-
-        for file_index, i in enumerate(range(0, len(lines), lines_per_file)):
-            chunk_lines = lines[i : i + lines_per_file]
-            chunk_content = "".join(chunk_lines)
-
-            suffix = self._generate_suffix(file_index, suffix_length, numeric_suffix)
-            output_filename = f"{prefix}{suffix}"
-
-            if verbose:
-                self.console.print(f"creating file '{output_filename}'")
-
-            # Write to remote file
-            from io import StringIO
-
-            output_stream = StringIO(chunk_content)
-            client.push(output_filename, output_stream)
-
-    def _split_by_bytes(
-        self,
-        client: ClientType,
-        content: str,
-        prefix: str,
-        bytes_per_file: int,
-        suffix_length: int,
-        numeric_suffix: bool,
-        verbose: bool,
-    ):
-        """Split content by number of bytes."""
-        content_bytes = content.encode("utf-8")
-
-        for file_index, i in enumerate(range(0, len(content_bytes), bytes_per_file)):
-            chunk_bytes = content_bytes[i : i + bytes_per_file]
-
-            suffix = self._generate_suffix(file_index, suffix_length, numeric_suffix)
-            output_filename = f"{prefix}{suffix}"
-
-            if verbose:
-                self.console.print(f"creating file '{output_filename}'")
-
-            # Write to remote file
-            from io import BytesIO
-
-            output_stream = BytesIO(chunk_bytes)
-            client.push(output_filename, output_stream)
-
-    def _split_by_line_bytes(
-        self,
-        client: ClientType,
-        content: str,
-        prefix: str,
-        bytes_per_line: int,
-        suffix_length: int,
-        numeric_suffix: bool,
-        verbose: bool,
-    ):
-        """Split content by bytes per line."""
-        lines = content.splitlines(keepends=True)
-        file_index = 0
-        current_chunk = []
-        current_size = 0
-
-        for line in lines:
-            line_size = len(line.encode("utf-8"))
-
-            if current_size + line_size > bytes_per_line and current_chunk:
-                # Save current chunk
-                chunk_content = "".join(current_chunk)
-                suffix = self._generate_suffix(file_index, suffix_length, numeric_suffix)
-                output_filename = f"{prefix}{suffix}"
-
-                if verbose:
-                    self.console.print(f"creating file '{output_filename}'")
-
-                from io import StringIO
-
-                output_stream = StringIO(chunk_content)
-                client.push(output_filename, output_stream)
-
-                file_index += 1
-                current_chunk = [line]
-                current_size = line_size
+        self._client = client
+        self._names = iter(names)
+        self._local = local
+        self._verbose = verbose
+        self._print = print_line
+        self._extractor = MemberExtractor(client, on_error)
+        self._path: str | None = None
+        self._buffer = bytearray()
+        self._sink: RemotePushStream | BinaryIO | None = None
+        self.pieces = 0
+
+    def __enter__(self) -> _PieceWriter:
+        self._extractor.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.end_piece()
+            elif isinstance(self._sink, RemotePushStream):
+                self._sink.__exit__(exc_type, exc, tb)
+            elif self._sink is not None:
+                self._sink.close()
+        finally:
+            # Pieces already finished are still pushed after an error (such
+            # as running out of suffixes), as GNU split leaves them behind.
+            self._extractor.__exit__(None, None, None)
+
+    def write(self, data: bytes) -> None:
+        """Add data to the current piece, starting a new piece if there isn't one."""
+        if self._path is None:
+            self.start_piece()
+        if self._sink is not None:
+            self._sink.write(data)
+            return
+        self._buffer += data
+        if len(self._buffer) > EXTRACT_BUFFER_SIZE:
+            # Too big to hold while it waits for a worker: stream it instead.
+            assert self._path is not None
+            stream = RemotePushStream(self._client, self._path)
+            self._sink = stream.__enter__()
+            self._sink.write(bytes(self._buffer))
+            self._buffer.clear()
+
+    def start_piece(self) -> None:
+        """Start the next piece, even if no data is written to it."""
+        self.end_piece()
+        self._path = next(self._names)
+        self.pieces += 1
+        if self._verbose:
+            self._print(f"creating file '{self._path}'", markup=False)
+        if self._local:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._sink = open(self._path, "wb")  # noqa: SIM115
+
+    def end_piece(self) -> None:
+        """Finish the current piece, if there is one."""
+        if self._path is None:
+            return
+        path, self._path = self._path, None
+        sink, self._sink = self._sink, None
+        if isinstance(sink, RemotePushStream):
+            sink.__exit__(None, None, None)
+        elif sink is not None:
+            sink.close()
+        else:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            self._extractor.write(path, io.BytesIO(data), len(data))
+
+
+def _split_by_bytes(chunks: Iterable[bytes], writer: _PieceWriter, size: int) -> None:
+    """Cut the input into pieces of ``size`` bytes."""
+    room = size
+    for chunk in chunks:
+        while chunk:
+            writer.write(chunk[:room])
+            taken = min(room, len(chunk))
+            chunk = chunk[taken:]
+            room -= taken
+            if not room:
+                writer.end_piece()
+                room = size
+
+
+def _split_by_lines(chunks: Iterable[bytes], writer: _PieceWriter, lines: int) -> None:
+    """Cut the input into pieces of ``lines`` lines."""
+    needed = lines
+    for chunk in chunks:
+        while chunk:
+            if chunk.count(b"\n") < needed:
+                needed -= chunk.count(b"\n")
+                writer.write(chunk)
+                break
+            end = -1
+            for _ in range(needed):
+                end = chunk.index(b"\n", end + 1)
+            writer.write(chunk[: end + 1])
+            writer.end_piece()
+            chunk = chunk[end + 1 :]
+            needed = lines
+
+
+def _split_by_line_bytes(chunks: Iterable[bytes], writer: _PieceWriter, size: int) -> None:
+    """Cut the input into pieces of at most ``size`` bytes, keeping lines whole.
+
+    A line longer than ``size`` is split across pieces. Only the unfinished
+    line at the end of what has been read is held back.
+    """
+    pending = b""
+    used = 0
+    for chunk in chunks:
+        pending += chunk
+        while pending:
+            room = size - used
+            if len(pending) <= room:
+                # Everything fits; write the complete lines and wait for the rest.
+                cut = pending.rfind(b"\n") + 1
+                if cut:
+                    writer.write(pending[:cut])
+                    used += cut
+                    pending = pending[cut:]
+                break
+            cut = pending.rfind(b"\n", 0, room) + 1
+            if cut:
+                writer.write(pending[:cut])
+                pending = pending[cut:]
+            elif not used:
+                writer.write(pending[:room])
+                pending = pending[room:]
+            writer.end_piece()
+            used = 0
+    if pending:
+        writer.write(pending)
+
+
+def _split_into_chunks(
+    chunks: Iterable[bytes], writer: _PieceWriter, total: int, count: int, whole_lines: bool
+) -> None:
+    """Cut the input into ``count`` pieces of equal size, as GNU split does.
+
+    Each piece but the last is ``total // count`` bytes long, and the last
+    takes the rest, including anything beyond the listed size. With
+    ``whole_lines``, a piece instead runs on to the end of the line holding
+    its last byte; pieces whose bytes all went to an earlier line are left
+    empty. With fewer bytes than pieces, each byte gets a piece and the
+    pieces after them are empty. Every piece is created, even if it is empty.
+    """
+    filled = min(count, max(total, 1))
+    size = total // filled
+    position = 0
+    piece = 0
+    seeking_newline = False
+    # Whether the bytes written so far end with a complete line.
+    line_ended = True
+    writer.start_piece()
+    for chunk in chunks:
+        while chunk:
+            if piece == filled - 1:
+                writer.write(chunk)
+                position += len(chunk)
+                break
+            if seeking_newline:
+                end = chunk.find(b"\n") + 1
+                if not end:
+                    writer.write(chunk)
+                    position += len(chunk)
+                    break
+                seeking_newline = False
             else:
-                current_chunk.append(line)
-                current_size += line_size
-
-        # Save final chunk if any
-        if current_chunk:
-            chunk_content = "".join(current_chunk)
-            suffix = self._generate_suffix(file_index, suffix_length, numeric_suffix)
-            output_filename = f"{prefix}{suffix}"
-
-            if verbose:
-                self.console.print(f"creating file '{output_filename}'")
-
-            from io import StringIO
-
-            output_stream = StringIO(chunk_content)
-            client.push(output_filename, output_stream)
+                end = max((piece + 1) * size - position, 0)
+                if end >= len(chunk):
+                    writer.write(chunk)
+                    position += len(chunk)
+                    line_ended = chunk.endswith(b"\n")
+                    break
+                if whole_lines and not (chunk.endswith(b"\n", 0, end) if end else line_ended):
+                    newline = chunk.find(b"\n", end) + 1
+                    if not newline:
+                        writer.write(chunk)
+                        position += len(chunk)
+                        seeking_newline = True
+                        break
+                    end = newline
+            writer.write(chunk[:end])
+            position += end
+            chunk = chunk[end:]
+            line_ended = True
+            piece += 1
+            writer.start_piece()
+    while piece < count - 1:
+        piece += 1
+        writer.start_piece()
@@ -6,6 +6,8 @@ from .cmp import CmpCommand
 from .comm import CommCommand
 from .dirname import DirnameCommand
 from .findfs import FindfsCommand
+from .index import IndexCommand
+from .isearch import IsearchCommand
 from .lsattr import LsattrCommand
 from .mktemp import MktempCommand
 from .mountpoint import MountpointCommand
@@ -21,6 +23,8 @@ __all__ = [
     "CommCommand",
     "DirnameCommand",
     "FindfsCommand",
+    "IndexCommand",
+    "IsearchCommand",
     "LsattrCommand",
     "MktempCommand",
     "MountpointCommand",
@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-import binascii
 from typing import TYPE_CHECKING, Union
 
 import ops
 
-from ...utils.command_helpers import handle_help_flag, safe_read_file
-from .._base import Command
+from ...utils.checksums import FileChecksum, is_supported, tag_name
+from ...utils.command_helpers import handle_help_flag, parse_flags, validate_min_args
+from ...utils.theme import get_theme
+from ..builtin._base import _CHECKSUM_FLAGS, _HashCommand
 
 if TYPE_CHECKING:
     import shimmer
@@ -17,29 +18,40 @@ if TYPE_CHECKING:
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
 
-class CksumCommand(Command):
+class CksumCommand(_HashCommand):
     """Implementation of cksum command."""
 
     name = "cksum"
-    help = "Calculate CRC checksum and byte count"
+    help = "Calculate CRC checksum and byte count, or other checksums with -a"
     category = "File Utilities"
 
     def show_help(self):
         """Show command help."""
         help_text = """Calculate CRC checksum and byte count for files.
 
-Usage: cksum [FILE...]
+Usage: cksum [OPTIONS] FILE...
 
 Description:
     Calculate and display the CRC checksum and byte count for each file.
-    If no files are specified, read from standard input.
+    With -a, compute other checksums instead; several algorithms can be
+    given, and each file is only read once however many are requested.
+    Files are read several at a time.
 
 Options:
+    -a ALG[,ALG...] Use the given algorithms (crc, bsd, sysv, md5, sha1,
+                    sha256, sha512, blake2b, ...)
+    -c, --check     Verify checksums listed in FILEs (as printed with -a)
+    --quiet         With -c, don't print OK for each verified file
+    --status        With -c, print nothing; the exit code shows the result
+    -R              Checksum the files in directories, recursively
+    -j N            Number of files to read concurrently (default: 8)
     -h, --help      Show this help message
 
 Examples:
     cksum file.txt
-    cksum file1.txt file2.txt
+    cksum -a md5,sha256 file1.txt file2.txt
+    cksum -a sha256 -R /etc > sums.txt
+    cksum -c sums.txt
         """
         self.console.print(help_text)
 
@@ -48,35 +60,35 @@ Examples:
         if handle_help_flag(self, args):
             return 0
 
-        files = args if args else ["-"]  # stdin if no files
-        exit_code = 0
+        parse_result = parse_flags(args, {**_CHECKSUM_FLAGS, "a": str}, self.shell)
+        if parse_result is None:
+            return 1
+        flags, positional_args = parse_result
 
-        for file_path in files:
-            if file_path == "-":
-                # TODO: Handle stdin input
-                self.console.print(
-                    "[yellow]" + "cksum: reading from stdin not supported" + "[/yellow]"
-                )
-                continue
+        if not validate_min_args(self.shell, positional_args, 1, "cksum [-a ALG] <file>..."):
+            return 1
 
-            # Read file from remote system
-            data = safe_read_file(client, file_path, self.shell)
-            if data is None:
+        algorithms = [alg.strip().lower() for alg in (flags["a"] or "crc").split(",")]
+        for algorithm in algorithms:
+            if not is_supported(algorithm):
                 self.console.print(
-                    "[red]" + f"cksum: {file_path}: No such file or directory" + "[/red]"
+                    get_theme().error_text(f"cksum: unknown algorithm: {algorithm}")
                 )
-                exit_code = 1
-                continue
-
-            try:
-                # Calculate CRC32 checksum
-                crc = binascii.crc32(data) & 0xFFFFFFFF
-                size = len(data)
-
-                self.console.print(f"{crc} {size} {file_path}")
-
-            except Exception as e:
-                self.console.print("[red]" + f"cksum: {file_path}: {e}" + "[/red]")
-                exit_code = 1
-
-        return exit_code
+                return 1
+
+        if flags["c"] or flags["check"]:
+            return self._check(client, positional_args, algorithms[0], flags)
+
+        def format_line(display: str, result: FileChecksum) -> str:
+            lines = []
+            for algorithm in algorithms:
+                checksum = result.checksums[algorithm]
+                if algorithm in ("crc", "bsd", "sysv"):
+                    lines.append(f"{checksum.summary()} {display}")
+                else:
+                    lines.append(f"{tag_name(algorithm)} ({display}) = {checksum.hexdigest()}")
+            return "\n".join(lines)
+
+        return self._print_checksums(
+            client, positional_args, algorithms, flags["R"], flags, format_line
+        )
@@ -0,0 +1,159 @@
+"""Implementation of IndexCommand."""
+
+from __future__ import annotations
+
+import datetime
+import os
+import time
+from typing import TYPE_CHECKING, Union
+
+import ops
+
+from ...utils.command_helpers import handle_help_flag, parse_flags
+from ...utils.pathutils import resolve_path
+from ...utils.search_index import (
+    SearchIndexError,
+    TrigramIndex,
+    client_origin,
+    find_indexes,
+    index_file,
+)
+from ...utils.streaming import DEFAULT_WORKERS
+from ...utils.theme import get_theme
+from .._base import Command
+
+if TYPE_CHECKING:
+    import shimmer
+
+# TODO: Use the prototype from Shimmer.
+ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
+
+
+class IndexCommand(Command):
+    """Implementation of index command."""
+
+    name = "index"
+    help = "Build and maintain local search indexes of remote trees (see isearch)"
+    category = "File Utilities"
+
+    def show_help(self):
+        """Show command help."""
+        help_text = """Build and maintain local trigram search indexes of remote directory trees.
+
+Usage: index build [-j N] PATH
+       index update [-j N] [PATH]
+       index list
+       index drop PATH
+
+Description:
+    'build' pulls every file under PATH once (several at a time) and stores
+    a trigram index of their contents on this machine, so that 'isearch'
+    only needs to pull the files that could match. 'update' re-lists the
+    tree and only re-pulls files whose size or modification time changed;
+    with no PATH, every index for this container is updated.
+
+Options:
+    -j N            Number of files to pull concurrently (default: 8)
+    -h, --help      Show this help message
+
+Examples:
+    index build /var/log
+    index update
+    isearch 'Traceback' /var/log
+        """
+        self.console.print(help_text)
+
+    def execute(self, client: ClientType, args: list[str]) -> int:
+        """Execute the index command."""
+        if handle_help_flag(self, args):
+            return 0
+
+        parse_result = parse_flags(args, {"j": int}, self.shell)
+        if parse_result is None:
+            return 1
+        flags, positional_args = parse_result
+        workers = flags.get("j") or DEFAULT_WORKERS
+
+        if not positional_args:
+            self.show_help()
+            return 1
+        action, paths = positional_args[0], positional_args[1:]
+        roots = [
+            os.path.normpath(resolve_path(self.shell.current_directory, path, self.shell.home_dir))
+            for path in paths
+        ]
+        origin = client_origin(client)
+
+        if action == "build" and len(roots) == 1:
+            return self._build(client, roots[0], workers)
+        if action == "update" and len(roots) <= 1:
+            if not roots:
+                roots = [index.root for index in find_indexes(origin)]
+            exit_code = 0
+            for root in roots:
+                exit_code = max(exit_code, self._update(client, root, workers))
+            return exit_code
+        if action == "list" and not roots:
+            for index in find_indexes(origin):
+                updated = datetime.datetime.fromtimestamp(index.updated)
+                self.console.print(
+                    f"{index.root}\t{len(index.files)} files\tupdated {updated:%Y-%m-%d %H:%M}",
+                    markup=False,
+                    highlight=False,
+                )
+            return 0
+        if action == "drop" and len(roots) == 1:
+            path = index_file(roots[0], origin)
+            if not path.exists():
+                self.console.print(get_theme().error_text(f"index: {roots[0]}: not indexed"))
+                return 1
+            path.unlink()
+            return 0
+
+        self.console.print(get_theme().error_text(f"index: invalid usage: {' '.join(args)}"))
+        self.console.print("Usage: index build|update|list|drop [PATH]")
+        return 1
+
+    def _report_error(self, path: str, error: Exception) -> None:
+        self.console.print(f"index: {path}: {error}", markup=False, highlight=False)
+
+    def _build(self, client: ClientType, root: str, workers: int) -> int:
+        start = time.monotonic()
+        index = TrigramIndex.build(client, root, workers, self._report_error)
+        if not index.files:
+            self.console.print(get_theme().error_text(f"index: {root}: no files to index"))
+            return 1
+        try:
+            index.save(index_file(root, index.origin))
+        except OSError as e:
+            self.console.print(get_theme().error_text(f"index: cannot save index: {e}"))
+            return 1
+        self.console.print(
+            f"Indexed {len(index.files)} files ({index.trigram_count} trigrams) under {root} "
+            f"in {time.monotonic() - start:.1f}s",
+            markup=False,
+            highlight=False,
+        )
+        return 0
+
+    def _update(self, client: ClientType, root: str, workers: int) -> int:
+        path = index_file(root, client_origin(client))
+        if not path.exists():
+            self.console.print(
+                get_theme().error_text(f"index: {root}: not indexed (use 'index build {root}')")
+            )
+            return 1
+        try:
+            index = TrigramIndex.load(path)
+            stats = index.update(client, workers, self._report_error)
+            index.save(path)
+        except (SearchIndexError, OSError) as e:
+            self.console.print(get_theme().error_text(f"index: {e}"))
+            return 1
+        self.console.print(
+            f"{root}: {stats.added} added, {stats.changed} changed, {stats.removed} removed, "
+            f"{stats.unchanged} unchanged",
+            markup=False,
+            highlight=False,
+        )
+        return 0
@@ -0,0 +1,159 @@
+"""Implementation of IsearchCommand."""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import TYPE_CHECKING, Union
+
+import ops
+
+from pebble_shell.commands.builtin import GrepCommand
+
+from ...utils.command_helpers import handle_help_flag, parse_flags
+from ...utils.pathutils import resolve_path
+from ...utils.pattern_matching import required_literal, strip_regex_delimiters
+from ...utils.search_index import (
+    SearchIndexError,
+    TrigramIndex,
+    client_origin,
+    covering_root,
+    find_indexes,
+    index_file,
+)
+from ...utils.theme import get_theme
+from .._base import Command
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import shimmer
+
+# TODO: Use the prototype from Shimmer.
+ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
+
+# grep options that isearch passes straight through.
+_GREP_FLAGS = ("i", "F", "w", "x", "l", "c", "q", "s")
+
+# Bytes of file names given to each grep run. Linux allows at least 128 KiB
+# of arguments and environment for the container's grep; stay well under.
+_ARGS_LIMIT = 64 * 1024
+
+
+def _batches(paths: list[str], limit: int = _ARGS_LIMIT) -> Iterator[list[str]]:
+    """Split ``paths`` into runs whose names take at most ``limit`` bytes in total."""
+    batch: list[str] = []
+    size = 0
+    for path in paths:
+        length = len(path.encode("utf-8")) + 1
+        if batch and size + length > limit:
+            yield batch
+            batch, size = [], 0
+        batch.append(path)
+        size += length
+    if batch:
+        yield batch
+
+
+class IsearchCommand(Command):
+    """Implementation of isearch command."""
+
+    name = "isearch"
+    help = "Search indexed trees for a pattern, pulling only candidate files"
+    category = "File Utilities"
+
+    def show_help(self):
+        """Show command help."""
+        help_text = """Search an indexed remote tree for a regular expression.
+
+Usage: isearch [-iFwxlcqs] PATTERN [PATH]
+
+Description:
+    Use the local trigram index built by 'index build' to find the files
+    under PATH (default: the current directory) that could contain a match,
+    then pull and search only those files, as grep does. Files changed
+    since the index was last built or updated may be missed; run
+    'index update' first if the tree may have changed. Binary files are
+    not indexed and are never searched; compressed files are indexed and
+    searched by their decompressed text.
+
+Options:
+    -i              Ignore case
+    -F              Treat PATTERN as a fixed string
+    -w, -x          Match whole words / whole lines only
+    -l, -c          List matching files / count matching lines per file
+    -q, -s          Quiet / suppress file errors
+    -h, --help      Show this help message
+
+Examples:
+    index build /usr/lib/python3/dist-packages
+    isearch -l 'def get_logger' /usr/lib/python3/dist-packages
+        """
+        self.console.print(help_text)
+
+    def execute(self, client: ClientType, args: list[str]) -> int:
+        """Execute the isearch command."""
+        if handle_help_flag(self, args):
+            return 0
+
+        parse_result = parse_flags(args, dict.fromkeys(_GREP_FLAGS, bool), self.shell)
+        if parse_result is None:
+            return 1
+        flags, positional_args = parse_result
+        if not 1 <= len(positional_args) <= 2:
+            self.console.print(get_theme().error_text("Usage: isearch [-iFwxlcqs] PATTERN [PATH]"))
+            return 2
+
+        pattern = positional_args[0]
+        path = os.path.normpath(
+            resolve_path(
+                self.shell.current_directory,
+                positional_args[1] if len(positional_args) > 1 else ".",
+                self.shell.home_dir,
+            )
+        )
+        origin = client_origin(client)
+        root = covering_root(path, [index.root for index in find_indexes(origin)])
+        if root is None:
+            self.console.print(
+                get_theme().error_text(
+                    f"isearch: no index covers {path} (use 'index build {path}')"
+                )
+            )
+            return 2
+        try:
+            index = TrigramIndex.load(index_file(root, origin))
+        except SearchIndexError as e:
+            self.console.print(get_theme().error_text(f"isearch: {e}"))
+            return 2
+
+        if flags.get("F"):
+            literal: str | None = pattern
+        else:
+            # As with grep, a regex may be written /.../.
+            expression = strip_regex_delimiters(pattern)
+            try:
+                re.compile(expression)
+            except re.error as e:
+                self.console.print(get_theme().error_text(f"isearch: invalid pattern: {e}"))
+                return 2
+            literal = required_literal(expression)
+        candidates = index.candidates(
+            literal.encode("utf-8") if literal is not None else None, under=path
+        )
+        if not candidates:
+            return 1
+
+        # Verify the candidates exactly as grep would, a batch at a time so
+        # that an offloaded grep's command line stays within the system limit.
+        grep = GrepCommand(self.shell)
+        grep_args = ["-H"] + [f"-{flag}" for flag in _GREP_FLAGS if flags.get(flag)]
+        exit_codes = set()
+        for batch in _batches(candidates):
+            exit_code = grep.execute(client, [*grep_args, "-e", pattern, *batch])
+            exit_codes.add(exit_code)
+            if exit_code == 0 and flags.get("q"):
+                break
+        if 0 in exit_codes:
+            return 0
+        return max(exit_codes)
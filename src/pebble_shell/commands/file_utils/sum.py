@@ -6,18 +6,20 @@ from typing import TYPE_CHECKING, Union
 
 import ops
 
-from ...utils.command_helpers import handle_help_flag, parse_flags, safe_read_file
+from ...utils.command_helpers import handle_help_flag, parse_flags
 from ...utils.theme import get_theme
-from .._base import Command
+from ..builtin._base import _CHECKSUM_FLAGS, _HashCommand
 
 if TYPE_CHECKING:
     import shimmer
 
+    from ...utils.checksums import FileChecksum
+
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
 
-class SumCommand(Command):
+class SumCommand(_HashCommand):
     """Implementation of sum command."""
 
     name = "sum"
@@ -37,6 +39,8 @@ Description:
 Options:
     -r              Use BSD sum algorithm (default)
     -s, --sysv      Use System V sum algorithm
+    -R              Checksum the files in directories, recursively
+    -j N            Number of files to read concurrently (default: 8)
     -h, --help      Show this help message
 
 Examples:
@@ -56,6 +60,8 @@ Examples:
                 "r": bool,  # BSD algorithm (default)
                 "s": bool,  # System V algorithm
                 "sysv": bool,  # System V algorithm
+                "R": _CHECKSUM_FLAGS["R"],
+                "j": _CHECKSUM_FLAGS["j"],
             },
             self.shell,
         )
@@ -63,48 +69,16 @@ Examples:
             return 1
         flags, positional_args = parse_result
 
-        use_sysv = flags.get("s", False) or flags.get("sysv", False)
-        files = positional_args if positional_args else ["-"]
-        exit_code = 0
-
-        for file_path in files:
-            try:
-                if file_path == "-":
-                    # TODO: Handle stdin input
-                    self.console.print(
-                        get_theme().warning_text("sum: reading from stdin not supported")
-                    )
-                    continue
-
-                # Read file from remote system
-                data = safe_read_file(client, file_path, self.shell)
-                if data is None:
-                    self.console.print(
-                        get_theme().error_text(f"sum: {file_path}: No such file or directory")
-                    )
-                    exit_code = 1
-                    continue
-
-                # Convert string to bytes for checksum calculation
-                data_bytes = data.encode("utf-8")
-
-                if use_sysv:
-                    # System V algorithm: sum of all bytes
-                    checksum = sum(data_bytes) & 0xFFFF
-                    blocks = (len(data_bytes) + 511) // 512  # 512-byte blocks
-                    self.console.print(f"{checksum} {blocks} {file_path}")
-                else:
-                    # BSD algorithm: rotating checksum
-                    checksum = 0
-                    for byte in data_bytes:
-                        checksum = ((checksum >> 1) | ((checksum & 1) << 15)) + byte
-                        checksum &= 0xFFFF
-
-                    blocks = (len(data_bytes) + 1023) // 1024  # 1024-byte blocks
-                    self.console.print(f"{checksum:05d} {blocks:5d} {file_path}")
-
-            except Exception as e:
-                self.console.print(get_theme().error_text(f"sum: {file_path}: {e}"))
-                exit_code = 1
-
-        return exit_code
+        if not positional_args:
+            # TODO: Handle stdin input
+            self.console.print(get_theme().warning_text("sum: reading from stdin not supported"))
+            return 0
+
+        algorithm = "sysv" if flags["s"] or flags["sysv"] else "bsd"
+
+        def format_line(display: str, result: FileChecksum) -> str:
+            return f"{result.checksums[algorithm].summary()} {display}"
+
+        return self._print_checksums(
+            client, positional_args, [algorithm], flags["R"], flags, format_line
+        )
@@ -2,22 +2,26 @@
 
 from __future__ import annotations
 
+import itertools
 from typing import TYPE_CHECKING
 
+import ops
+
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Iterator
 
-    import ops
     import shimmer
 
+    from ...utils.output_writer import OutputWriter
+
 from ...utils.command_helpers import (
     format_file_header,
     handle_help_flag,
     parse_lines_argument,
     process_file_arguments,
-    safe_read_file_lines,
     validate_min_args,
 )
+from ...utils.streaming import iter_decoded_lines, iter_remote_chunks
 from .._base import Command
 
 
@@ -43,20 +47,47 @@ class _LinesCommand(Command):
             return 1
 
         # Process each file
-        for file_path in file_paths:
-            file_lines = safe_read_file_lines(client, file_path, self.shell)
-            if file_lines is None:
-                return 1
+        with self.output() as writer:
+            for file_path in file_paths:
+                file_lines = self.read_lines(client, file_path)
+                if file_lines is None:
+                    return 1
 
-            # Print filename header if multiple files
-            header = format_file_header(file_path, len(file_paths))
-            if header:
-                self.shell.console.print(header)
+                # Print filename header if multiple files
+                header = format_file_header(file_path, len(file_paths))
+                if header:
+                    writer.flush()
+                    self.shell.console.print(header)
 
-            self.process_lines(file_lines, lines)
+                self.process_lines(file_lines, lines, writer)
 
         return 0
 
-    def process_lines(self, file_lines: Sequence[str], lines: int) -> None:
-        """Process lines read from the file."""
+    def read_lines(
+        self, client: ops.pebble.Client | shimmer.PebbleCliClient, file_path: str
+    ) -> Iterable[str] | None:
+        """Stream the lines of a file, or return None if it can't be opened.
+
+        Compressed files are decompressed as they are read.
+        """
+        chunks = iter_remote_chunks(client, file_path, decompress=True)
+        try:
+            first = next(chunks, b"")
+        except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
+            self.shell.console.print(f"Error reading file {file_path}: {e}")
+            return None
+        return self._decode(file_path, first, chunks)
+
+    def _decode(self, file_path: str, first: bytes, chunks: Iterator[bytes]) -> Iterator[str]:
+        try:
+            yield from iter_decoded_lines(itertools.chain((first,), chunks))
+        except (ops.pebble.APIError, ValueError) as e:
+            self.shell.console.print(f"Error reading file {file_path}: {e}")
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    def process_lines(self, file_lines: Iterable[str], lines: int, writer: OutputWriter) -> None:
+        """Process lines read from the file, writing the selected ones to ``writer``."""
         raise NotImplementedError("Subclasses must implement process_lines method")
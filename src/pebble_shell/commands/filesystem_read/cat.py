@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import contextlib
+import itertools
 from typing import TYPE_CHECKING, ClassVar
 
+import ops
+
 if TYPE_CHECKING:
-    import ops
     import shimmer
 
+    from ...utils.output_writer import OutputWriter
+
 from rich.markdown import Markdown
 from rich.syntax import Syntax
 
@@ -16,10 +21,17 @@ from ...utils.command_helpers import (
     format_file_header,
     handle_help_flag,
     parse_flags,
+    print_text_chunks,
     process_file_arguments,
     safe_read_file,
     validate_min_args,
 )
+from ...utils.streaming import (
+    MAX_CHUNK_SIZE,
+    detect_compression,
+    iter_decompressed,
+    iter_remote_chunks,
+)
 from .._base import Command
 
 
@@ -79,13 +91,25 @@ class CatCommand(Command):
         if file_paths is None:
             return 1
 
+        # Output that isn't shown on a terminal is copied without rendering.
+        writer = self.output(flags["plain"])
+        if writer.raw or flags["plain"]:
+            return self._stream_files(client, file_paths, writer)
+
         # Process files with progress tracking
         with create_file_progress() as progress:
             task = progress.add_task("Reading files...", total=len(file_paths))
 
             for file_path in file_paths:
                 # Read file content safely
-                content = safe_read_file(client, file_path, self.shell)
+                try:
+                    content = safe_read_file(client, file_path, self.shell)
+                except UnicodeDecodeError:
+                    # Not text, but it may be a compressed text file.
+                    if not self._print_compressed(client, file_path):
+                        return 1
+                    progress.advance(task)
+                    continue
                 if content is None:
                     return 1
 
@@ -95,17 +119,58 @@ class CatCommand(Command):
                     self.shell.console.print(header)
 
                 # Display content based on file type and flags
-                self._display_content(content, file_path, flags["plain"])
+                self._display_content(content, file_path)
                 progress.advance(task)
 
         return 0
 
-    def _display_content(self, content: str, file_path: str, plain: bool) -> None:
-        """Display file content with appropriate formatting."""
-        if plain:
-            self.shell.console.print(content, end="")
-            return
+    def _stream_files(
+        self,
+        client: ops.pebble.Client | shimmer.PebbleCliClient,
+        file_paths: list[str],
+        writer: OutputWriter,
+    ) -> int:
+        """Copy files to the output as they are read, decompressing them if needed."""
+        with writer:
+            for file_path in file_paths:
+                header = format_file_header(file_path, len(file_paths))
+                if header:
+                    writer.flush()
+                    self.shell.console.print(header)
+                chunks = iter_remote_chunks(
+                    client, file_path, max_chunk_size=MAX_CHUNK_SIZE, decompress=True
+                )
+                try:
+                    with contextlib.closing(chunks):
+                        writer.write_chunks(chunks)
+                except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
+                    writer.flush()
+                    self.shell.console.print(f"Error reading file {file_path}: {e}", markup=False)
+                    return 1
+        return 0
 
+    def _print_compressed(
+        self, client: ops.pebble.Client | shimmer.PebbleCliClient, file_path: str
+    ) -> bool:
+        """Print a gzip, bzip2, xz or lzma file, decompressing it as it is read."""
+        try:
+            with contextlib.closing(iter_remote_chunks(client, file_path)) as chunks:
+                first = next(chunks, b"")
+                file_format = detect_compression(first)
+                if file_format is None:
+                    self.shell.console.print(f"cat: {file_path}: binary file not shown")
+                    return False
+                print_text_chunks(
+                    self.shell.console,
+                    iter_decompressed(itertools.chain((first,), chunks), file_format),
+                )
+        except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
+            self.shell.console.print(f"Error reading file {file_path}: {e}")
+            return False
+        return True
+
+    def _display_content(self, content: str, file_path: str) -> None:
+        """Display file content with appropriate formatting."""
         # Determine file extension for syntax highlighting
         ext: str | None = None
         for known_ext in self.CODE_EXTENSIONS:
@@ -133,5 +198,5 @@ class CatCommand(Command):
             self.shell.console.print(content, end="")
 
         # Add newline between files if content doesn't end with one
-        if content and not content.endswith("\n") and (plain or not ext):
+        if content and not content.endswith("\n") and not ext:
             self.shell.console.print()
@@ -2,31 +2,88 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import collections
+import concurrent.futures
+import fnmatch
+import hashlib
+import os
+import posixpath
+from typing import TYPE_CHECKING, Any, Union
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     import shimmer
 
 import ops
 
 from ...utils import resolve_path
 from ...utils.command_helpers import handle_help_flag, parse_flags, validate_min_args
+from ...utils.line_diff import diff_opcodes, format_normal, format_unified
+from ...utils.streaming import bounded_map, is_binary, iter_remote_chunks, walk_remote_files
 from .._base import Command
 
+# TODO: Use the prototype from Shimmer.
+ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
+
+# Number of output lines to collect before writing them to the console in one go.
+_OUTPUT_BATCH_LINES = 1000
+
+# Lines of context in a unified diff when -u is given without -U NUM.
+_DEFAULT_CONTEXT = 3
+
+
+def _read_lines(client: ClientType, path: str) -> list[bytes] | None:
+    """Read a file as lines that keep their newline; None if it is binary."""
+    lines: list[bytes] = []
+    pending = b""
+    first = True
+    for chunk in iter_remote_chunks(client, path):
+        if first and is_binary(chunk):
+            return None
+        first = False
+        parts = (pending + chunk).split(b"\n")
+        pending = parts.pop()
+        lines.extend(part + b"\n" for part in parts)
+    if pending:
+        lines.append(pending)
+    return lines
+
+
+def _digest(client: ClientType, path: str) -> bytes:
+    """Hash a file's contents as it streams in."""
+    digest = hashlib.blake2b()
+    for chunk in iter_remote_chunks(client, path):
+        digest.update(chunk)
+    return digest.digest()
+
 
 class DiffCommand(Command):
     """Compare files line by line."""
 
     name = "diff"
-    help = "Compare files line by line. Use -r for recursive directory comparison"
+    help = (
+        "Compare files line by line. Use -r for recursive directory comparison. "
+        "Usage: diff [-qr] [-u | -U NUM] [--exclude PATTERN] file1 file2"
+    )
     category = "Filesystem Commands"
 
-    def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
+    def execute(self, client: ClientType, args: list[str]):
         """Execute diff command."""
         if handle_help_flag(self, args):
             return 0
 
-        flags_result = parse_flags(args, {"r": bool}, self.shell)
+        flags_result = parse_flags(
+            args,
+            {
+                "r": bool,  # recursive
+                "q": bool,  # only report whether files differ
+                "u": bool,  # unified output with 3 lines of context
+                "U": int,  # unified output with NUM lines of context
+                "exclude": str,
+            },
+            self.shell,
+        )
         if flags_result is None:
             return 1
         flags, remaining_args = flags_result
@@ -38,178 +95,211 @@ class DiffCommand(Command):
             self.shell.console.print("Error: Too many arguments")
             return 1
 
-        file1, file2 = remaining_args[0], remaining_args[1]
-        recursive = flags["r"]
-
         # Resolve paths
-        file1 = resolve_path(self.shell.current_directory, file1, self.shell.home_dir)
-        file2 = resolve_path(self.shell.current_directory, file2, self.shell.home_dir)
+        file1, file2 = (
+            os.path.normpath(resolve_path(self.shell.current_directory, f, self.shell.home_dir))
+            for f in remaining_args
+        )
 
-        # Check if files exist
+        # Check the files exist, and whether they are files or directories.
         try:
-            stat1 = client.list_files(file1)
-            stat2 = client.list_files(file2)
-        except Exception as e:
+            info1 = self._file_info(client, file1)
+            info2 = self._file_info(client, file2)
+            if info1 is None and info2 is not None:
+                file1 = posixpath.join(file1, posixpath.basename(file2))
+                info1 = self._file_info(client, file1)
+            elif info2 is None and info1 is not None:
+                file2 = posixpath.join(file2, posixpath.basename(file1))
+                info2 = self._file_info(client, file2)
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
             self.shell.console.print(f"Error accessing files: {e}")
             return 1
 
-        # If both are directories and recursive is enabled
-        if recursive and len(stat1) > 0 and len(stat2) > 0:
-            return self._compare_directories(client, file1, file2)
-        return self._compare_files(client, file1, file2)
+        if info1 is None or info2 is None:
+            if not flags["r"]:
+                self.shell.console.print(
+                    f"Error: {file1} and {file2} are directories (use -r to compare them)"
+                )
+                return 1
+            return self._compare_directories(client, file1, file2, flags)
+        return self._compare_files(client, file1, file2, info1, info2, flags)
+
+    @staticmethod
+    def _file_info(client: ClientType, path: str) -> ops.pebble.FileInfo | None:
+        """Return the FileInfo for a regular file, or None for a directory."""
+        info = client.list_files(path, itself=True)[0]
+        return info if info.type == ops.pebble.FileType.FILE else None
+
+    def _print_lines(self, lines: Iterable[str]) -> None:
+        batch: list[str] = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= _OUTPUT_BATCH_LINES:
+                self._flush(batch)
+        self._flush(batch)
+
+    def _flush(self, batch: list[str]) -> None:
+        if batch:
+            self.shell.console.print(
+                "\n".join(batch), markup=False, highlight=False, emoji=False, soft_wrap=True
+            )
+            batch.clear()
+
+    @staticmethod
+    def _identical(
+        client: ClientType, pair: tuple[str, str, int | None, int | None]
+    ) -> bool | Exception:
+        """Compare two files by size and then by a streamed hash of each."""
+        path1, path2, size1, size2 = pair
+        if size1 is not None and size2 is not None and size1 != size2:
+            return False
+        try:
+            return _digest(client, path1) == _digest(client, path2)
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            return e
+
+    def _diff_lines(
+        self, client: ClientType, file1: str, file2: str, flags: dict[str, Any]
+    ) -> list[str]:
+        """Produce the diff output for two files that are known to differ."""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            lines1, lines2 = pool.map(lambda path: _read_lines(client, path), (file1, file2))
+        if lines1 is None or lines2 is None:
+            return [f"Binary files {file1} and {file2} differ"]
+        opcodes = diff_opcodes(lines1, lines2)
+        context = flags["U"]
+        if context is None and flags["u"]:
+            context = _DEFAULT_CONTEXT
+        if context is not None:
+            return list(format_unified(lines1, lines2, opcodes, file1, file2, max(context, 0)))
+        return list(format_normal(lines1, lines2, opcodes))
 
     def _compare_files(
         self,
-        client: ops.pebble.Client | shimmer.PebbleCliClient,
+        client: ClientType,
         file1: str,
         file2: str,
+        info1: ops.pebble.FileInfo,
+        info2: ops.pebble.FileInfo,
+        flags: dict[str, Any],
     ) -> int:
         """Compare two files line by line."""
         try:
-            # Read both files
-            with client.pull(file1) as f1:
-                content1 = f1.read()
-                assert isinstance(content1, str)
-                lines1 = content1.splitlines()
-
-            with client.pull(file2) as f2:
-                content2 = f2.read()
-                assert isinstance(content2, str)
-                lines2 = content2.splitlines()
-
-            # Simple diff algorithm
-            differences: list[tuple[int, str | None, str | None]] = []
-            max_len = max(len(lines1), len(lines2))
-
-            for i in range(max_len):
-                line1 = lines1[i] if i < len(lines1) else None
-                line2 = lines2[i] if i < len(lines2) else None
-
-                if line1 != line2:
-                    differences.append((i + 1, line1, line2))
-
-            # Display results
-            if not differences:
-                self.shell.console.print("Files are identical")
+            identical = False
+            if info1.size is None or info2.size is None or info1.size == info2.size:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+                    digest1, digest2 = pool.map(lambda path: _digest(client, path), (file1, file2))
+                identical = digest1 == digest2
+            if identical:
+                if not flags["q"]:
+                    self.shell.console.print("Files are identical")
                 return 0
-
-            self.shell.console.print(f"--- {file1}")
-            self.shell.console.print(f"+++ {file2}")
-            self.shell.console.print()
-
-            for line_num, line1, line2 in differences:
-                if line1 is None:
-                    # Line only in file2
-                    self.shell.console.print(f"@@ Line {line_num} @@")
-                    self.shell.console.print(f"+{line2}")
-                elif line2 is None:
-                    # Line only in file1
-                    self.shell.console.print(f"@@ Line {line_num} @@")
-                    self.shell.console.print(f"-{line1}")
-                else:
-                    # Different lines
-                    self.shell.console.print(f"@@ Line {line_num} @@")
-                    self.shell.console.print(f"-{line1}")
-                    self.shell.console.print(f"+{line2}")
-                self.shell.console.print()
-
+            if flags["q"]:
+                self.shell.console.print(f"Files {file1} and {file2} differ", markup=False)
+                return 1
+            self._print_lines(self._diff_lines(client, file1, file2, flags))
             return 1
 
-        except Exception as e:
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
             self.shell.console.print(f"Error comparing files: {e}")
             return 1
 
+    def _manifest(
+        self, client: ClientType, root: str, exclude: str | None
+    ) -> dict[str, ops.pebble.FileInfo]:
+        """List every file under a directory, keyed by its path relative to it."""
+
+        def report(path: str, error: Exception) -> None:
+            self.shell.console.print(f"Error listing files in {path}: {error}", markup=False)
+
+        files: dict[str, ops.pebble.FileInfo] = {}
+        for path, info in walk_remote_files(client, root, on_error=report):
+            rel_path = posixpath.relpath(path, root)
+            if exclude and any(fnmatch.fnmatch(part, exclude) for part in rel_path.split("/")):
+                continue
+            files[rel_path] = info
+        return files
+
+    @staticmethod
+    def _only_in(root: str, only: Iterable[str], other: Iterable[str]) -> dict[str, str]:
+        """Report files missing from the other side, collapsed to the topmost missing directory."""
+        # Every ancestor directory of a file on the other side exists there.
+        other_dirs: set[str] = set()
+        for rel_path in other:
+            while rel_path:
+                rel_path = posixpath.dirname(rel_path)
+                other_dirs.add(rel_path)
+        reports: dict[str, str] = {}
+        for rel_path in only:
+            parts = rel_path.split("/")
+            # The first missing ancestor (or the file itself) is what gets reported.
+            for depth in range(1, len(parts) + 1):
+                candidate = "/".join(parts[:depth])
+                if depth == len(parts) or candidate not in other_dirs:
+                    parent = posixpath.join(root, *parts[: depth - 1])
+                    reports[candidate] = f"Only in {parent}: {parts[depth - 1]}"
+                    break
+        return reports
+
     def _compare_directories(
-        self, client: ops.pebble.Client | shimmer.PebbleCliClient, dir1: str, dir2: str
+        self, client: ClientType, dir1: str, dir2: str, flags: dict[str, Any]
     ) -> int:
-        """Compare two directories recursively."""
-        try:
-            # Get all files in both directories
-            files1 = self._get_all_files(client, dir1)
-            files2 = self._get_all_files(client, dir2)
-
-            # Find common files
-            common_files = set(files1.keys()) & set(files2.keys())
-            only_in_1 = set(files1.keys()) - set(files2.keys())
-            only_in_2 = set(files2.keys()) - set(files1.keys())
-
-            differences_found = False
-
-            # Show files only in dir1
-            if only_in_1:
-                self.shell.console.print(f"Files only in {dir1}:")
-                for file in sorted(only_in_1):
-                    self.shell.console.print(f"  {file}")
-                self.shell.console.print()
-                differences_found = True
-
-            # Show files only in dir2
-            if only_in_2:
-                self.shell.console.print(f"Files only in {dir2}:")
-                for file in sorted(only_in_2):
-                    self.shell.console.print(f"  {file}")
-                self.shell.console.print()
-                differences_found = True
-
-            # Compare common files
-            for file in sorted(common_files):
-                file1_path = f"{dir1}/{file}"
-                file2_path = f"{dir2}/{file}"
-
-                try:
-                    # Quick size check
-                    stat1 = client.list_files(file1_path)
-                    stat2 = client.list_files(file2_path)
-
-                    if len(stat1) != len(stat2):
-                        self.shell.console.print(f"Files differ: {file}")
-                        differences_found = True
-                        continue
-
-                    # Compare content
-                    with client.pull(file1_path) as f1:
-                        content1 = f1.read()
-
-                    with client.pull(file2_path) as f2:
-                        content2 = f2.read()
-
-                    if content1 != content2:
-                        self.shell.console.print(f"Files differ: {file}")
-                        differences_found = True
-
-                except Exception:
-                    self.shell.console.print(f"Error comparing {file}")
-                    differences_found = True
-
-            if not differences_found:
+        """Compare two directory trees recursively.
+
+        Both trees are listed concurrently and joined on their relative paths,
+        so files are only pulled when their sizes match and their contents need
+        hashing, or when a differing pair needs a line diff.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            files1, files2 = pool.map(
+                lambda root: self._manifest(client, root, flags["exclude"]), (dir1, dir2)
+            )
+
+        reports = self._only_in(dir1, files1.keys() - files2.keys(), files2.keys())
+        reports.update(self._only_in(dir2, files2.keys() - files1.keys(), files1.keys()))
+        common = sorted(files1.keys() & files2.keys())
+        pairs = [
+            (f"{dir1}/{rel}", f"{dir2}/{rel}", files1[rel].size, files2[rel].size)
+            for rel in common
+        ]
+        differing: list[str] = []
+        for (path1, *_), identical in bounded_map(
+            lambda pair: self._identical(client, pair), pairs
+        ):
+            if isinstance(identical, Exception):
+                reports[posixpath.relpath(path1, dir1)] = f"Error comparing {path1}: {identical}"
+            elif not identical:
+                differing.append(posixpath.relpath(path1, dir1))
+
+        if not reports and not differing:
+            if not flags["q"]:
                 self.shell.console.print("Directories are identical")
-                return 0
-
-            return 1
+            return 0
 
-        except Exception as e:
-            self.shell.console.print(f"Error comparing directories: {e}")
+        if flags["q"]:
+            for rel in differing:
+                reports[rel] = f"Files {dir1}/{rel} and {dir2}/{rel} differ"
+            self._print_lines(reports[rel] for rel in sorted(reports))
             return 1
 
-    def _get_all_files(
-        self, client: ops.pebble.Client | shimmer.PebbleCliClient, directory: str
-    ) -> dict[str, str]:
-        """Get all files in a directory recursively."""
-        try:
-            entries = client.list_files(directory)
-        except ops.pebble.PathError as e:
-            self.shell.console.print(f"Error listing files in {directory}: {e}")
-            return {}
-
-        files: dict[str, str] = {}
-        for entry in entries:
-            if entry.type == ops.pebble.FileType.FILE:
-                # Remove directory prefix for relative path:
-                rel_path = entry.path[len(directory) :].lstrip("/")
-                files[rel_path] = entry.path
-            elif entry.type == ops.pebble.FileType.DIRECTORY:
-                # Recursively get files in subdirectory:
-                subdir_files = self._get_all_files(client, entry.path)
-                for rel_path, full_path in subdir_files.items():
-                    files[rel_path] = full_path
-        return files
+        def file_diff(rel: str) -> list[str]:
+            path1, path2 = f"{dir1}/{rel}", f"{dir2}/{rel}"
+            try:
+                return [f"diff -r {path1} {path2}", *self._diff_lines(client, path1, path2, flags)]
+            except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                return [f"Error comparing {path1}: {e}"]
+
+        # Line diffs of the differing files are computed concurrently but
+        # printed in order, interleaved with the "Only in" reports.
+        diffs = bounded_map(file_diff, differing)
+        pending_reports = collections.deque(sorted(reports))
+        output: list[str] = []
+        for rel, lines in diffs:
+            while pending_reports and pending_reports[0] < rel:
+                output.append(reports[pending_reports.popleft()])
+            output.extend(lines)
+            if len(output) >= _OUTPUT_BATCH_LINES:
+                self._flush(output)
+        output.extend(reports[rel] for rel in pending_reports)
+        self._flush(output)
+        return 1
@@ -9,11 +9,14 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     import shimmer
 
+    from ...utils.output_writer import OutputWriter
+
 import ops
 from rich.progress import Progress, SpinnerColumn, TaskID, TextColumn
 
 from ...utils import resolve_path
 from ...utils.command_helpers import handle_help_flag, validate_min_args
+from ...utils.remote_offload import OffloadMode, offload, split_offload_mode
 from .._base import Command
 
 
@@ -28,6 +31,7 @@ class FindCommand(Command):
         """Execute find command."""
         if handle_help_flag(self, args):
             return 0
+        mode, args = split_offload_mode(args)
 
         if not validate_min_args(self.shell, args, 1, "find <search_path> [pattern]"):
             return 1
@@ -35,14 +39,25 @@ class FindCommand(Command):
         # Process search path
         search_path = resolve_path(self.shell.current_directory, args[0], self.shell.home_dir)
         pattern = args[1] if len(args) > 1 else "*"
+        # The container's find prints its own way, so it is only used when
+        # asked for.
+        if mode == OffloadMode.REMOTE:
+            remote_exit = offload(
+                self, client, ["find", search_path, "-name", pattern], [search_path], mode
+            )
+            if remote_exit is not None:
+                return remote_exit
 
         # Use progress tracking
         exit_code = 0
-        with Progress(
-            SpinnerColumn(), TextColumn("{task.description}"), transient=True
-        ) as progress:
+        with (
+            Progress(
+                SpinnerColumn(), TextColumn("{task.description}"), transient=True
+            ) as progress,
+            self.output() as writer,
+        ):
             task = progress.add_task(f"Searching {search_path}...", total=None)
-            code = self._find_files(client, search_path, pattern, progress, task)
+            code = self._find_files(client, search_path, pattern, progress, task, writer)
             if code != 0:
                 exit_code = code
         return exit_code
@@ -54,21 +69,23 @@ class FindCommand(Command):
         pattern: str,
         progress: Progress,
         task: TaskID,
+        writer: OutputWriter,
     ) -> int:
         """Recursively find files matching pattern."""
         try:
             files = client.list_files(path)
         except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            writer.flush()
             self.shell.console.print(f"Error listing files in {path}: {e}")
             return 0
         exit_code = 0
         for file_info in files:
             full_path = os.path.join(path, file_info.name)
             if fnmatch.fnmatch(file_info.name, pattern):
-                self.shell.console.print(full_path)
+                writer.write_line(full_path)
             if file_info.type == ops.pebble.FileType.DIRECTORY:
                 progress.update(task, description=f"Searching {full_path}...")
-                code = self._find_files(client, full_path, pattern, progress, task)
+                code = self._find_files(client, full_path, pattern, progress, task, writer)
                 if code != 0:
                     exit_code = code
         return exit_code
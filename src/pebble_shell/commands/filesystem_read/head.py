@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import itertools
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable
 
+    from ...utils.output_writer import OutputWriter
 
 from ._base import _LinesCommand
 
@@ -17,7 +19,9 @@ class HeadCommand(_LinesCommand):
     name = "head"
     help = "Display first lines of file"
 
-    def process_lines(self, file_lines: Sequence[str], lines: int):
+    def process_lines(self, file_lines: Iterable[str], lines: int, writer: OutputWriter):
         """Display first lines of a file."""
-        for line in file_lines[:lines]:
-            self.shell.console.print(line)
+        writer.write_lines(itertools.islice(file_lines, lines))
+        close = getattr(file_lines, "close", None)
+        if close is not None:
+            close()
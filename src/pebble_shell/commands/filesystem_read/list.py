@@ -15,7 +15,7 @@ from ...utils import (
     resolve_path,
 )
 from ...utils.command_helpers import parse_flags
-from ...utils.table_builder import add_file_columns, create_standard_table
+from ...utils.table_builder import add_file_columns, create_standard_table, split_output_format
 from .._base import Command
 
 
@@ -34,6 +34,10 @@ class ListCommand(Command):
             return 0
 
         # Handle special flags first
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
         show_plain = "--plain-timestamp" in args
         if show_plain:
             args = [arg for arg in args if arg != "--plain-timestamp"]
@@ -75,29 +79,33 @@ class ListCommand(Command):
         if not show_all:
             files = [f for f in files if not f.name.startswith(".")]
 
-        table_builder = create_standard_table()
+        table = create_standard_table().output_to(self.shell.console, output_format)
         if long_listing:
-            table = add_file_columns(table_builder, long_format=True).build()
+            add_file_columns(table, long_format=True)
+        elif human_readable:
+            table.numeric_column("Size").data_column("Name", no_wrap=False)
         else:
-            if human_readable:
-                table = (
-                    table_builder.numeric_column("Size").data_column("Name", no_wrap=False).build()
-                )
-            else:
-                table = table_builder.data_column("Name", no_wrap=False).build()
+            table.data_column("Name", no_wrap=False)
 
         for file_info in files:
             permissions = format_file_info(file_info)[0:10]
-            owner = str(file_info.user_id) if file_info.user_id is not None else "0"
-            group = str(file_info.group_id) if file_info.group_id is not None else "0"
+            owner = file_info.user_id if file_info.user_id is not None else 0
+            group = file_info.group_id if file_info.group_id is not None else 0
 
+            # Machine-readable formats always get the size in bytes, so the
+            # column's type doesn't depend on -h.
             if file_info.size is not None:
-                size_str = format_bytes(file_info.size) if human_readable else str(file_info.size)
+                if human_readable and not table.streaming:
+                    size_str = format_bytes(file_info.size)
+                else:
+                    size_str = file_info.size
             else:
-                size_str = "0"
+                size_str = 0
 
             if file_info.last_modified:
-                if show_plain:
+                if table.streaming:
+                    time_str = file_info.last_modified.isoformat()
+                elif show_plain:
                     time_str = file_info.last_modified.strftime("%Y-%m-%d %H:%M:%S")
                 else:
                     time_str = format_relative_time(file_info.last_modified)
@@ -119,5 +127,5 @@ class ListCommand(Command):
                 else:
                     table.add_row(file_info.name)
 
-        self.shell.console.print(table)
+        table.print()
         return 0
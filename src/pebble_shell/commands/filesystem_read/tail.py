@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import collections
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable
+
+    from ...utils.output_writer import OutputWriter
 
 
 from ._base import _LinesCommand
@@ -17,7 +20,6 @@ class TailCommand(_LinesCommand):
     name = "tail"
     help = "Display last lines of file. Use -f to follow (like tail -f)"
 
-    def process_lines(self, file_lines: Sequence[str], lines: int):
-        """Process and display the last lines of a file."""
-        for line in file_lines[-lines:]:
-            self.shell.console.print(line)
+    def process_lines(self, file_lines: Iterable[str], lines: int, writer: OutputWriter):
+        """Process and display the last lines of a file, keeping only those in memory."""
+        writer.write_lines(collections.deque(file_lines, maxlen=lines))
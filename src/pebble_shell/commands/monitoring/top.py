@@ -19,7 +19,7 @@ if TYPE_CHECKING:
 from ...utils.command_helpers import handle_help_flag
 from ...utils.formatting import format_bytes, format_time
 from ...utils.proc_reader import parse_proc_meminfo, parse_proc_stat, read_proc_file
-from ...utils.table_builder import add_process_columns, create_enhanced_table
+from ...utils.table_builder import create_enhanced_table, split_output_format
 from .._base import Command
 
 
@@ -256,9 +256,24 @@ class TopCommand(Command):
 
         if "--once" in args or batch_mode:
             # One-shot rich table output
+            format_result = split_output_format(args, self.shell)
+            if format_result is None:
+                return 1
+            output_format, args = format_result
             proc_reader = ProcReader(client)
             processes = proc_reader.get_all_processes()
-            table = add_process_columns(create_enhanced_table()).build()
+            table = (
+                create_enhanced_table()
+                .output_to(self.console, output_format)
+                .numeric_column("PID")
+                .secondary_column("User")
+                .numeric_column("%CPU")
+                .numeric_column("%MEM")
+                .numeric_column("Memory")
+                .status_column("State")
+                .numeric_column("Threads")
+                .data_column("Command")
+            )
             # Sort by CPU descending by default
             processes.sort(key=lambda p: p.cpu_percent, reverse=True)
             for proc in processes:
@@ -273,7 +288,7 @@ class TopCommand(Command):
                     else ("blue" if proc.memory_percent > 5 else "")
                 )
                 table.add_row(
-                    str(proc.pid),
+                    proc.pid,
                     proc.user,
                     f"[{cpu_style}]{proc.cpu_percent:>6.1f}[/{cpu_style}]"
                     if cpu_style
@@ -283,10 +298,10 @@ class TopCommand(Command):
                     else f"{proc.memory_percent:>6.1f}",
                     format_bytes(proc.memory_kb),
                     proc.state,
-                    str(proc.threads),
-                    proc.cmdline[:30],
+                    proc.threads,
+                    proc.cmdline if table.streaming else proc.cmdline[:30],
                 )
-            self.console.print(table)
+            table.print()
             return 0
         try:
             app = PebbleTopViewer(client)
@@ -8,7 +8,7 @@ from rich.panel import Panel
 
 from ...utils.command_helpers import parse_flags
 from ...utils.proc_reader import ProcReadError, parse_proc_net_connections
-from ...utils.table_builder import create_standard_table
+from ...utils.table_builder import create_standard_table, split_output_format
 from ...utils.theme import get_theme
 from .._base import Command
 
@@ -65,6 +65,11 @@ Note: This command shows information from the remote container environment.
 
     def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
         """Execute netstat command."""
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
+
         # Parse arguments using common parsing code
         parse_result = parse_flags(
             args,
@@ -178,7 +183,7 @@ Note: This command shows information from the remote container environment.
                 # If -a/--all is specified, show all connections (no filtering)
 
                 if connections:
-                    self._display_connections(connections, protocol, flags)
+                    self._display_connections(connections, protocol, flags, output_format)
                 elif flags["v"] or flags["verbose"]:
                     self.shell.console.print(f"No {protocol} connections found")
 
@@ -188,18 +193,28 @@ Note: This command shows information from the remote container environment.
 
         return 0
 
-    def _display_connections(self, connections: list[dict[str, str]], protocol: str, flags: dict):
+    def _display_connections(
+        self,
+        connections: list[dict[str, str]],
+        protocol: str,
+        flags: dict,
+        output_format: str,
+    ):
         """Display network connections in a formatted table."""
         if protocol == "unix":
-            self._display_unix_connections(connections, flags)
+            self._display_unix_connections(connections, flags, output_format)
         else:
-            self._display_inet_connections(connections, protocol, flags)
+            self._display_inet_connections(connections, protocol, flags, output_format)
 
     def _display_inet_connections(
-        self, connections: list[dict[str, str]], protocol: str, flags: dict
+        self,
+        connections: list[dict[str, str]],
+        protocol: str,
+        flags: dict,
+        output_format: str,
     ):
         """Display TCP/UDP connections."""
-        table = create_standard_table()
+        table = create_standard_table().output_to(self.shell.console, output_format)
 
         # Add columns based on protocol and flags
         table.add_column("Proto", style="cyan", no_wrap=True)
@@ -236,17 +251,19 @@ Note: This command shows information from the remote container environment.
         elif not (flags["a"] or flags["all"]):
             header += " (w/o servers)"
 
-        self.shell.console.print(
-            Panel(
-                table.build(),
+        table.print(
+            lambda rendered: Panel(
+                rendered,
                 title=get_theme().highlight_text(header),
                 style=get_theme().info,
             )
         )
 
-    def _display_unix_connections(self, connections: list[dict[str, str]], flags: dict):
+    def _display_unix_connections(
+        self, connections: list[dict[str, str]], flags: dict, output_format: str
+    ):
         """Display UNIX domain sockets."""
-        table = create_standard_table()
+        table = create_standard_table().output_to(self.shell.console, output_format)
         table.add_column("Proto", style="cyan", no_wrap=True)
         table.add_column("RefCnt", style="yellow", no_wrap=True, justify="right")
         table.add_column("Flags", style="magenta", no_wrap=True)
@@ -281,9 +298,9 @@ Note: This command shows information from the remote container environment.
         elif not (flags["a"] or flags["all"]):
             header += " (w/o servers)"
 
-        self.shell.console.print(
-            Panel(
-                table.build(),
+        table.print(
+            lambda rendered: Panel(
+                rendered,
                 title=get_theme().highlight_text(header),
                 style=get_theme().info,
             )
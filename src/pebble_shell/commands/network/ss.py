@@ -8,6 +8,7 @@ from rich.table import Table
 
 from ...utils.command_helpers import parse_flags
 from ...utils.proc_reader import ProcReadError, parse_proc_net_connections
+from ...utils.table_builder import TableBuilder, split_output_format
 from .._base import Command
 
 if TYPE_CHECKING:
@@ -78,6 +79,11 @@ Note: This command shows information from the remote container environment.
 
     def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
         """Execute ss command."""
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
+
         # Parse arguments using common parsing code
         parse_result = parse_flags(
             args,
@@ -196,7 +202,7 @@ Note: This command shows information from the remote container environment.
         protocols = self._get_protocols(flags)
 
         # Show socket information
-        return self._show_sockets(client, protocols, flags)
+        return self._show_sockets(client, protocols, flags, output_format)
 
     def _get_protocols(self, flags: dict) -> list[str]:
         """Determine which protocols to display based on flags."""
@@ -252,7 +258,7 @@ Note: This command shows information from the remote container environment.
 
         return 0
 
-    def _show_sockets(self, client, protocols: list[str], flags: dict) -> int:
+    def _show_sockets(self, client, protocols: list[str], flags: dict, output_format: str) -> int:
         """Show detailed socket information."""
         show_all = flags["a"] or flags["all"]
         show_listening = flags["l"] or flags["listening"]
@@ -291,13 +297,15 @@ Note: This command shows information from the remote container environment.
         if oneline:
             self._display_oneline(all_sockets, flags)
         else:
-            self._display_table(all_sockets, flags)
+            self._display_table(all_sockets, flags, output_format)
 
         return 0
 
-    def _display_table(self, sockets: list[dict], flags: dict):
+    def _display_table(self, sockets: list[dict], flags: dict, output_format: str):
         """Display sockets in table format."""
-        table = Table(show_header=not (flags["H"] or flags["no-header"]), header_style="bold blue")
+        table = TableBuilder(
+            Table(show_header=not (flags["H"] or flags["no-header"]), header_style="bold blue")
+        ).output_to(self.shell.console, output_format)
 
         table.add_column("Netid", style="cyan", no_wrap=True)
         table.add_column("State", style="yellow", no_wrap=True)
@@ -325,7 +333,7 @@ Note: This command shows information from the remote container environment.
             table.add_row(*row)
 
         if sockets:
-            self.shell.console.print(table)
+            table.print()
 
     def _display_oneline(self, sockets: list[dict], flags: dict):
         """Display sockets in one-line format."""
@@ -15,12 +15,14 @@ from .ipcs import IpcsCommand
 from .lzmacat import LzmacatCommand
 from .nmeter import NmeterCommand
 from .pipeprogress import PipeProgressCommand
+from .pv import PvCommand
 from .reformine import ReformineCommand
 from .reset import ResetCommand
 from .sed import SedCommand
 from .strings import StringsCommand
 from .sysctl import SysctlCommand
 from .unlzop import UnlzopCommand
+from .zgrep import ZgrepCommand
 
 __all__ = [
     "ArCommand",
@@ -36,10 +38,12 @@ __all__ = [
     "LzmacatCommand",
     "NmeterCommand",
     "PipeProgressCommand",
+    "PvCommand",
     "ReformineCommand",
     "ResetCommand",
     "SedCommand",
     "StringsCommand",
     "SysctlCommand",
     "UnlzopCommand",
+    "ZgrepCommand",
 ]
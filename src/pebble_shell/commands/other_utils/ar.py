@@ -2,10 +2,22 @@
 
 from __future__ import annotations
 
+import datetime
+import stat
 from typing import TYPE_CHECKING, Union
 
 import ops
 
+from ...utils import resolve_path
+from ...utils.archive_stream import (
+    ArWriter,
+    RemotePushStream,
+    collect_members,
+    iter_ar_headers,
+    write_members,
+)
+from ...utils.command_helpers import create_transfer_progress, handle_help_flag
+from ...utils.file_ops import file_exists
 from .._base import Command
 
 if TYPE_CHECKING:
@@ -17,21 +29,130 @@ ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
 # TODO: This should go to the compression category.
 class ArCommand(Command):
-    """Create, modify, and extract from archives."""
+    """Create and list ar archives."""
 
     name = "ar"
-    help = "Create, modify, and extract from archives"
+    help = "Create and list ar archives. Usage: ar {r|q|t}[cv] ARCHIVE [FILE...]"
     category = "Archive"
 
+    def show_help(self):
+        """Show command help."""
+        help_text = """Archive utility for static libraries and other ar archives.
+
+Usage: ar OPERATION[MODIFIERS] ARCHIVE [FILE...]
+
+Operations:
+    r               Create ARCHIVE containing FILEs
+    q               Same as r (quick append to a new archive)
+    t               List the members of ARCHIVE
+
+Modifiers:
+    c               Don't warn when the archive is created
+    v               Verbose: list members as they are added, or in long format
+    s               Accepted for compatibility (no symbol index is written)
+
+Description:
+    The archive is written as a stream: small members are read ahead
+    concurrently and the archive is pushed to the container as it is
+    produced. Existing archives can be listed but not updated.
+
+Examples:
+    ar rc libfoo.a foo.o bar.o
+    ar tv libfoo.a
+"""
+        self.console.print(help_text, markup=False)
+
     def execute(self, client: ClientType, args: list[str]) -> int:
         """Execute the ar command."""
+        if handle_help_flag(self, args):
+            return 0
         return self._execute_ar(client, args)
 
     def _execute_ar(self, client: ClientType, args: list[str]) -> int:
-        if not args:
-            self.console.print("Usage: ar [options] archive [files...]")
+        if len(args) < 2:
+            self.console.print("Usage: ar {r|q|t}[cv] archive [files...]")
+            return 1
+
+        letters = args[0].lstrip("-")
+        operations = [letter for letter in letters if letter in "dmpqrstx"]
+        unknown = [letter for letter in letters if letter not in "dmpqrstxcvuS"]
+        if len(operations) != 1 or unknown:
+            self.console.print(f"ar: invalid operation '{args[0]}'", markup=False)
+            return 1
+        operation = operations[0]
+        verbose = "v" in letters
+        archive = resolve_path(self.shell.current_directory, args[1], self.shell.home_dir)
+
+        if operation == "t":
+            return self._list(client, archive, args[1], verbose)
+        if operation in "rq":
+            return self._create(client, archive, args[2:], verbose, quiet="c" in letters)
+        self.console.print(f"ar: operation '{operation}' is not supported", markup=False)
+        return 1
+
+    def _create(
+        self, client: ClientType, archive: str, files: list[str], verbose: bool, quiet: bool
+    ) -> int:
+        """Write a new archive containing ``files``."""
+        if file_exists(client, archive):
+            self.console.print(
+                f"ar: {archive}: updating an existing archive is not supported", markup=False
+            )
             return 1
 
-        # TODO: Implement this!
-        self.console.print(f"ar command with args: {' '.join(args)}")
+        failed: list[str] = []
+
+        def on_error(path: str, message: str) -> None:
+            failed.append(path)
+            self.console.print(f"ar: {path}: {message}", style="red", markup=False)
+
+        paths = [
+            resolve_path(self.shell.current_directory, path, self.shell.home_dir) for path in files
+        ]
+        # The long name table comes first, so list the members before writing.
+        members = []
+        for member in collect_members(client, paths, on_error):
+            if member.is_dir:
+                on_error(member.path, "Is a directory")
+                break
+            members.append(member)
+        if failed:
+            return 1
+
+        if not quiet:
+            self.console.print(f"ar: creating {archive}", markup=False)
+        with (
+            create_transfer_progress(self.console) as progress,
+            RemotePushStream(client, archive) as sink,
+        ):
+            task = progress.add_task(f"ar: {archive}", total=None)
+            writer = ArWriter(sink, [member.path for member in members])
+            for member in members:
+                if verbose:
+                    self.console.print(f"a - {member.path}", markup=False)
+            write_members(writer, client, members, on_error, lambda n: progress.advance(task, n))
+        return 1 if failed else 0
+
+    def _list(self, client: ClientType, archive: str, name: str, verbose: bool) -> int:
+        """List the members of an archive."""
+        try:
+            with client.pull(archive, encoding=None) as source:
+                lines = []
+                for header in iter_ar_headers(source):
+                    if verbose:
+                        mtime = datetime.datetime.fromtimestamp(header.mtime)
+                        lines.append(
+                            f"{stat.filemode(header.mode)[1:]} {header.uid}/{header.gid} "
+                            f"{header.size:6} {mtime:%b %e %H:%M %Y} {header.name}"
+                        )
+                    else:
+                        lines.append(header.name)
+        except ops.pebble.PathError:
+            self.console.print(f"ar: {name}: No such file or directory", markup=False)
+            return 1
+        except ValueError as e:
+            self.console.print(f"ar: {name}: {e}", markup=False)
+            return 1
+        if lines:
+            self.console.print("\n".join(lines), markup=False, highlight=False)
         return 0
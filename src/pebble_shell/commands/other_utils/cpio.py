@@ -2,18 +2,39 @@
 
 from __future__ import annotations
 
+import fnmatch
 import io
+import stat
 import tarfile
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, BinaryIO, Union
 
 import ops
 
-from ...utils.command_helpers import handle_help_flag, parse_flags, safe_read_file
+from ...utils import resolve_path
+from ...utils.archive_stream import (
+    CpioHeader,
+    CpioWriter,
+    MemberExtractor,
+    RemotePushStream,
+    TarWriter,
+    collect_members,
+    iter_cpio_members,
+    write_members,
+)
+from ...utils.command_helpers import (
+    create_transfer_progress,
+    handle_help_flag,
+    parse_flags,
+)
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     import shimmer
 
+    from ...utils.archive_stream import ArchiveMember
+
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
@@ -44,22 +65,27 @@ class CpioCommand(Command):
                 "verbose": bool,
                 "d": bool,  # make directories
                 "make-directories": bool,
+                "u": bool,  # replace existing files
+                "unconditional": bool,
                 "F": str,  # archive file
+                "I": str,  # archive file to read
+                "O": str,  # archive file to create
                 "H": str,  # format
             },
             self.shell,
         )
         if result is None:
             return 1
-        flags, _positional_args = result
+        flags, positional_args = result
 
         extract = flags.get("i", False) or flags.get("extract", False)
         create = flags.get("o", False) or flags.get("create", False)
         list_contents = flags.get("t", False) or flags.get("list", False)
         verbose = flags.get("v", False) or flags.get("verbose", False)
         make_dirs = flags.get("d", False) or flags.get("make-directories", False)
-        archive_file = flags.get("F")
-        format_type = flags.get("H", "newc")
+        unconditional = flags.get("u", False) or flags.get("unconditional", False)
+        archive_file = flags.get("F") or flags.get("I") or flags.get("O")
+        format_type = flags.get("H") or "newc"
 
         # Exactly one mode must be specified
         mode_count = sum([extract, create, list_contents])
@@ -69,11 +95,15 @@ class CpioCommand(Command):
 
         try:
             if list_contents:
-                return self._list_archive(client, archive_file, verbose)
+                return self._list_archive(client, archive_file, positional_args, verbose)
             elif extract:
-                return self._extract_archive(client, archive_file, verbose, make_dirs)
+                return self._extract_archive(
+                    client, archive_file, positional_args, verbose, make_dirs, unconditional
+                )
             elif create:
-                return self._create_archive(client, archive_file, verbose, format_type)
+                return self._create_archive(
+                    client, archive_file, positional_args, verbose, format_type
+                )
             else:
                 return 1
 
@@ -81,99 +111,187 @@ class CpioCommand(Command):
             self.console.print(f"[red]cpio: {e}[/red]")
             return 1
 
-    def _list_archive(self, client: ClientType, archive_file: str, verbose: bool) -> int:
-        """List contents of an archive."""
+    def _list_archive(
+        self, client: ClientType, archive_file: str, patterns: list[str], verbose: bool
+    ) -> int:
+        """List the contents of an archive, reading it as a stream."""
         if not archive_file:
             self.console.print("[red]cpio: archive file required for listing[/red]")
             return 1
 
+        lines: list[str] = []
         try:
-            # Read archive file
-            archive_content = safe_read_file(client, archive_file, self.shell)
-            if archive_content is None:
-                self.console.print(f"[red]cpio: cannot read archive '{archive_file}'[/red]")
-                return 1
-
-            # Try to read as tar format (most common)
-            try:
-                with tarfile.open(fileobj=io.BytesIO(archive_content.encode()), mode="r") as tar:
-                    for member in tar.getmembers():
-                        if verbose:
-                            self.console.print(
-                                f"{member.mode:o} {member.uid}/{member.gid} {member.size:8d} {member.name}"
-                            )
-                        else:
-                            self.console.print(member.name)
-                return 0
-            except tarfile.TarError:
-                self.console.print(
-                    "[yellow]cpio: archive format not supported for listing[/yellow]"
-                )
-                return 1
-
-        except Exception as e:
-            self.console.print(f"[red]cpio: error listing archive: {e}[/red]")
+            with client.pull(self._resolve(archive_file), encoding=None) as source:
+                for header, _ in self._iter_members(source):
+                    if not self._matches(header.name, patterns):
+                        continue
+                    if verbose:
+                        lines.append(
+                            f"{stat.filemode(header.mode)} {header.uid}/{header.gid} "
+                            f"{header.size:8d} {header.name}"
+                        )
+                    else:
+                        lines.append(header.name)
+        except ops.pebble.PathError:
+            self.console.print(f"[red]cpio: cannot read archive '{archive_file}'[/red]")
+            return 1
+        except (ValueError, tarfile.TarError) as e:
+            self.console.print(f"[red]cpio: {archive_file}: {e}[/red]")
             return 1
+        if lines:
+            self.console.print("\n".join(lines), markup=False, highlight=False, soft_wrap=True)
+        return 0
 
     def _extract_archive(
-        self, client: ClientType, archive_file: str, verbose: bool, make_dirs: bool
+        self,
+        client: ClientType,
+        archive_file: str,
+        patterns: list[str],
+        verbose: bool,
+        make_dirs: bool,
+        unconditional: bool,
     ) -> int:
-        """Extract files from an archive."""
+        """Extract files from an archive, reading it as a stream.
+
+        Files are pushed by a pool of workers while the rest of the archive
+        is read. Unless -u is given, existing files are left alone; each
+        destination directory is listed once to find them.
+        """
         if not archive_file:
             self.console.print("[red]cpio: archive file required for extraction[/red]")
             return 1
 
+        failed: list[str] = []
+
+        def on_error(path: str, message: str) -> None:
+            failed.append(path)
+            self.console.print(f"cpio: {path}: {message}", style="red", markup=False)
+
         try:
-            # Read archive file
-            archive_content = safe_read_file(client, archive_file, self.shell)
-            if archive_content is None:
-                self.console.print(f"[red]cpio: cannot read archive '{archive_file}'[/red]")
-                return 1
+            with (
+                client.pull(self._resolve(archive_file), encoding=None) as source,
+                MemberExtractor(
+                    client, on_error, overwrite=unconditional, make_dirs=make_dirs
+                ) as extractor,
+            ):
+                for header, data in self._iter_members(source):
+                    if not self._matches(header.name, patterns):
+                        continue
+                    if ".." in header.name.split("/"):
+                        on_error(header.name, "Member name contains '..', skipped")
+                        continue
+                    target = self._resolve(header.name)
+                    if header.is_dir:
+                        extractor.make_dir(target)
+                    elif not header.is_file:
+                        on_error(header.name, "not a regular file, skipped")
+                        continue
+                    elif not extractor.write(target, data, header.size, header.mode & 0o777):
+                        self.console.print(
+                            f"cpio: {header.name} not created: file exists (use -u to replace)",
+                            markup=False,
+                        )
+                        continue
+                    if verbose:
+                        self.console.print(header.name, markup=False)
+        except ops.pebble.PathError:
+            self.console.print(f"[red]cpio: cannot read archive '{archive_file}'[/red]")
+            return 1
+        except (ValueError, tarfile.TarError) as e:
+            self.console.print(f"[red]cpio: {archive_file}: {e}[/red]")
+            return 1
+
+        self.console.print(f"[green]Extracted {extractor.extracted} files[/green]")
+        return 1 if failed else 0
 
-            # Try to extract as tar format
-            try:
-                with tarfile.open(fileobj=io.BytesIO(archive_content.encode()), mode="r") as tar:
-                    extracted_count = 0
-                    for member in tar.getmembers():
-                        if member.isfile():
-                            file_content = tar.extractfile(member)
-                            if file_content:
-                                # Create directories if needed
-                                if make_dirs and "/" in member.name:
-                                    dir_path = "/".join(member.name.split("/")[:-1])
-                                    # Note: In a real implementation, we'd need to create directories
-                                    # For this demo, we'll just note it
-                                    if verbose:
-                                        self.console.print(
-                                            f"[dim]Would create directory: {dir_path}[/dim]"
-                                        )
-
-                                # Write file (simulate)
-                                if verbose:
-                                    self.console.print(f"Extracting: {member.name}")
-
-                                # In a real implementation, we'd write to the remote filesystem
-                                # For this demo, we'll just count the files
-                                extracted_count += 1
-
-                    self.console.print(f"[green]Extracted {extracted_count} files[/green]")
-                    return 0
-            except tarfile.TarError:
-                self.console.print(
-                    "[yellow]cpio: archive format not supported for extraction[/yellow]"
+    @staticmethod
+    def _iter_members(source: BinaryIO) -> Iterator[tuple[CpioHeader, BinaryIO]]:
+        """Read a newc cpio archive, or a tar archive, as a stream."""
+        magic = source.read(6)
+        stream = _Prepended(magic, source)
+        if magic in (b"070701", b"070702"):
+            yield from iter_cpio_members(stream)
+            return
+        with tarfile.open(fileobj=stream, mode="r|*") as tar:
+            for member in tar:
+                kind = stat.S_IFDIR if member.isdir() else stat.S_IFREG if member.isfile() else 0
+                header = CpioHeader(
+                    name=member.name,
+                    mode=kind | member.mode,
+                    uid=member.uid,
+                    gid=member.gid,
+                    mtime=int(member.mtime),
+                    size=member.size,
                 )
-                return 1
+                yield header, tar.extractfile(member) or io.BytesIO()
 
-        except Exception as e:
-            self.console.print(f"[red]cpio: error extracting archive: {e}[/red]")
-            return 1
+    @staticmethod
+    def _matches(name: str, patterns: list[str]) -> bool:
+        return not patterns or any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+    def _resolve(self, path: str) -> str:
+        return resolve_path(self.shell.current_directory, path, self.shell.home_dir)
 
     def _create_archive(
-        self, client: ClientType, archive_file: str, verbose: bool, format_type: str
+        self,
+        client: ClientType,
+        archive_file: str,
+        files: list[str],
+        verbose: bool,
+        format_type: str,
     ) -> int:
-        """Create an archive from file list."""
-        self.console.print(
-            "[yellow]cpio: creating archives not implemented in read-only mode[/yellow]"
-        )
-        self.console.print("[dim]Would read file list from stdin and create archive[/dim]")
-        return 0
+        """Create an archive from the files (and directory trees) given as arguments.
+
+        There is no standard input to read the file list from, so the files
+        are taken from the command line instead. The archive is streamed to
+        the container as it is written.
+        """
+        if not archive_file:
+            self.console.print("[red]cpio: archive file required for creation (-O FILE)[/red]")
+            return 1
+        if not files:
+            self.console.print("[red]cpio: no files specified for archive creation[/red]")
+            return 1
+        if format_type not in ("newc", "ustar", "tar"):
+            self.console.print(f"[red]cpio: unsupported archive format '{format_type}'[/red]")
+            return 1
+
+        failed: list[str] = []
+
+        def on_error(path: str, message: str) -> None:
+            failed.append(path)
+            self.console.print(f"cpio: {path}: {message}", style="red", markup=False)
+
+        def report(members: Iterable[ArchiveMember]) -> Iterator[ArchiveMember]:
+            for member in members:
+                if verbose:
+                    self.console.print(member.path, markup=False)
+                yield member
+
+        with (
+            create_transfer_progress(self.console) as progress,
+            RemotePushStream(client, self._resolve(archive_file)) as sink,
+        ):
+            task = progress.add_task(f"cpio: {archive_file}", total=None)
+            writer = CpioWriter(sink) if format_type == "newc" else TarWriter(sink)
+            members = report(collect_members(client, [self._resolve(f) for f in files], on_error))
+            write_members(writer, client, members, on_error, lambda n: progress.advance(task, n))
+            writer.close()
+        return 1 if failed else 0
+
+
+class _Prepended:
+    """A stream that returns some bytes already read from it before the rest."""
+
+    def __init__(self, head: bytes, source: BinaryIO):
+        self._head = head
+        self._source = source
+
+    def read(self, size: int = -1) -> bytes:
+        if self._head:
+            if size < 0:
+                data, self._head = self._head + self._source.read(), b""
+                return data
+            data, self._head = self._head[:size], self._head[size:]
+            return data
+        return self._source.read(size)
@@ -30,3 +30,8 @@ class EgrepCommand(Command):
         # egrep is equivalent to grep -E
         grep_cmd = GrepCommand(self.shell)
         return grep_cmd.execute(client, ["-E", *args])
+
+    def execute_piped(self, client: ClientType, args: list[str], data: str) -> int:
+        """Search text piped in from another command, as grep -E does."""
+        grep_cmd = GrepCommand(self.shell)
+        return grep_cmd.execute_piped(client, ["-E", *args], data)
@@ -30,3 +30,8 @@ class FgrepCommand(Command):
         # fgrep is equivalent to grep -F
         grep_cmd = GrepCommand(self.shell)
         return grep_cmd.execute(client, ["-F", *args])
+
+    def execute_piped(self, client: ClientType, args: list[str], data: str) -> int:
+        """Search text piped in from another command, as grep -F does."""
+        grep_cmd = GrepCommand(self.shell)
+        return grep_cmd.execute_piped(client, ["-F", *args], data)
@@ -2,21 +2,44 @@
 
 from __future__ import annotations
 
-import time
+import dataclasses
 from typing import TYPE_CHECKING, Union
 
 import ops
 
-from ...utils.command_helpers import handle_help_flag, parse_flags
+from ...utils import resolve_path
+from ...utils.command_helpers import handle_help_flag, parse_flags, print_text_chunks
+from ...utils.streaming import DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, iter_remote_chunks
+from ...utils.theme import get_theme
+from ...utils.throughput import (
+    MeterDisplay,
+    RateLimiter,
+    ThroughputMeter,
+    meter_chunks,
+    parse_size,
+)
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     import shimmer
 
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
 
+@dataclasses.dataclass
+class _Options:
+    """The parsed pipe_progress options."""
+
+    size: int | None
+    limiter: RateLimiter | None
+    name: str
+    interval: float
+    quiet: bool
+
+
 # TODO: Put this in the builtin category?
 class PipeProgressCommand(Command):
     """Implementation of pipe_progress command."""
@@ -25,55 +48,164 @@ class PipeProgressCommand(Command):
     help = "Show progress for data through a pipe"
     category = "Utilities"
 
+    def show_help(self):
+        """Show command help."""
+        help_text = """Monitor the progress of data through a pipe.
+
+Usage: pipe_progress [OPTIONS] FILE...
+
+Description:
+    Copy each FILE to standard output, showing on standard error how much
+    data has passed, how long it has taken, the current and average rate,
+    and, when the total size is known, the percentage done and the time
+    left. The size of the files is found automatically.
+
+    As a later stage of a pipeline (for example
+    'cat big.log | pv -L 1M | grep ERROR'), the data passing through the
+    pipeline is measured instead, and passed on unchanged.
+
+Options:
+    -s SIZE         Assume the total amount of data is SIZE
+    -L RATE         Limit the transfer to at most RATE bytes per second
+    -N NAME         Prefix the progress information with NAME
+    -i SECONDS      Update the progress every SECONDS seconds (default: 1)
+    -q              Don't show any progress information
+    -h, --help      Show this help message
+
+SIZE and RATE may have a K, M, G or T suffix (powers of 1024).
+
+Examples:
+    pv /var/log/big.log > /tmp/copy.log
+    pv -L 10M -N backup /srv/dump.sql > /backup/dump.sql
+        """
+        self.console.print(help_text)
+
     def execute(self, client: ClientType, args: list[str]) -> int:
         """Execute the pipe_progress command."""
         if handle_help_flag(self, args):
             return 0
+        parsed = self._parse(args)
+        if parsed is None:
+            return 1
+        options, positional_args = parsed
+        if not positional_args:
+            self.console.print(get_theme().error_text(f"Usage: {self.name} [OPTIONS] FILE..."))
+            return 1
+        return self._copy_files(client, options, positional_args)
+
+    def execute_piped(self, client: ClientType, args: list[str], data: str) -> int:
+        """Pass text piped in from another command through unchanged, measuring it.
 
-        # Parse flags
+        Files named on the command line are copied instead, as pv does.
+        """
+        if handle_help_flag(self, args):
+            return 0
+        parsed = self._parse(args)
+        if parsed is None:
+            return 1
+        options, positional_args = parsed
+        if positional_args:
+            return self._copy_files(client, options, positional_args)
+
+        encoded = data.encode("utf-8")
+        chunks = (
+            encoded[start : start + DEFAULT_CHUNK_SIZE]
+            for start in range(0, len(encoded), DEFAULT_CHUNK_SIZE)
+        )
+        meter = ThroughputMeter(options.size if options.size is not None else len(encoded))
+        with self._display(meter, options) as display:
+            print_text_chunks(
+                self.console, meter_chunks(chunks, meter, options.limiter, display.refresh)
+            )
+        return 0
+
+    def _parse(self, args: list[str]) -> tuple[_Options, list[str]] | None:
+        """Parse the options, reporting any that are invalid."""
         result = parse_flags(
             args,
             {
                 "s": str,  # size
-                "t": str,  # title
+                "L": str,  # rate limit
+                "N": str,  # name
+                "i": str,  # update interval
+                "q": bool,  # quiet
             },
             self.shell,
         )
         if result is None:
-            return 1
-        flags, _positional_args = result
-
-        expected_size = flags.get("s")
-        title = flags.get("t") or "Progress"
+            return None
+        flags, positional_args = result
 
         try:
-            # TODO: Implement real pipe progress
-
-            self.console.print(f"[bold]{title}[/bold]")
+            size = parse_size(flags["s"]) if flags.get("s") else None
+        except ValueError:
+            self.console.print(get_theme().error_text(f"{self.name}: invalid size: {flags['s']}"))
+            return None
+        try:
+            limiter = RateLimiter(parse_size(flags["L"])) if flags.get("L") else None
+        except ValueError:
+            self.console.print(get_theme().error_text(f"{self.name}: invalid rate: {flags['L']}"))
+            return None
+        try:
+            interval = float(flags.get("i") or 1)
+            if interval <= 0:
+                raise ValueError(interval)
+        except ValueError:
+            self.console.print(
+                get_theme().error_text(f"{self.name}: invalid interval: {flags['i']}")
+            )
+            return None
+        options = _Options(size, limiter, flags.get("N") or "", interval, flags.get("q", False))
+        return options, positional_args
+
+    def _display(self, meter: ThroughputMeter, options: _Options) -> MeterDisplay:
+        return MeterDisplay(
+            self.shell.error_console, meter, options.name, options.interval, options.quiet
+        )
 
-            if expected_size:
+    def _copy_files(self, client: ClientType, options: _Options, files: list[str]) -> int:
+        """Copy the files to standard output, measuring them."""
+        exit_code = 0
+        paths: list[tuple[str, str]] = []
+        total = 0
+        for file_path in files:
+            path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+            try:
+                info = client.list_files(path, itself=True)
+            except ops.pebble.PathError:
+                self.console.print(
+                    get_theme().error_text(f"{self.name}: {file_path}: No such file or directory")
+                )
+                exit_code = 1
+                continue
+            except ops.pebble.APIError as e:
+                self.console.print(get_theme().error_text(f"{self.name}: {file_path}: {e}"))
+                exit_code = 1
+                continue
+            paths.append((file_path, path))
+            if info:
+                total += info[0].size or 0
+
+        meter = ThroughputMeter(options.size if options.size is not None else total or None)
+        with self._display(meter, options) as display:
+            for file_path, path in paths:
+                chunks = meter_chunks(
+                    self._read(client, path, options.limiter),
+                    meter,
+                    options.limiter,
+                    display.refresh,
+                )
                 try:
-                    size_bytes = int(expected_size)
-                    size_mb = size_bytes / (1024 * 1024)
-                    self.console.print(f"Expected size: {size_mb:.1f}MB")
-                except ValueError:
-                    self.console.print(f"Expected size: {expected_size}")
-
-            # Simulate progress (in a real implementation, this would read/write data)
-            progress_chars = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧"]
-
-            for i in range(10):
-                char = progress_chars[i % len(progress_chars)]
-                percent = (i + 1) * 10
-                self.console.print(f"\r{char} {percent}% complete", end="")
-                time.sleep(0.1)
-
-            self.console.print("\n[green]✓ Complete[/green]")
-            return 0
-
-        except KeyboardInterrupt:
-            self.console.print("\n[yellow]Progress interrupted[/yellow]")
-            return 1
-        except Exception as e:
-            self.console.print(f"[red]pipe_progress: {e}[/red]")
-            return 1
+                    print_text_chunks(self.console, chunks)
+                except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                    self.console.print(get_theme().error_text(f"{self.name}: {file_path}: {e}"))
+                    exit_code = 1
+        return exit_code
+
+    @staticmethod
+    def _read(client: ClientType, path: str, limiter: RateLimiter | None) -> Iterator[bytes]:
+        # Large reads would make a rate limit bursty, so keep them small then.
+        if limiter is not None:
+            chunk_size = limiter.chunk_size(DEFAULT_CHUNK_SIZE)
+            return iter_remote_chunks(client, path, chunk_size)
+        return iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE)
@@ -0,0 +1,35 @@
+"""Implementation of PvCommand."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Union
+
+import ops
+
+from .._base import Command
+from .pipeprogress import PipeProgressCommand
+
+if TYPE_CHECKING:
+    import shimmer
+
+# TODO: Use the prototype from Shimmer.
+ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
+
+
+class PvCommand(Command):
+    """Monitor the progress of data through a pipe."""
+
+    name = "pv"
+    help = "Monitor the progress of data through a pipe"
+    category = "Utilities"
+
+    def execute(self, client: ClientType, args: list[str]) -> int:
+        """Execute the pv command."""
+        # pv is the usual name for pipe_progress.
+        progress_cmd = PipeProgressCommand(self.shell)
+        return progress_cmd.execute(client, args)
+
+    def execute_piped(self, client: ClientType, args: list[str], data: str) -> int:
+        """Pass text piped in from another command through, measuring it."""
+        progress_cmd = PipeProgressCommand(self.shell)
+        return progress_cmd.execute_piped(client, args, data)
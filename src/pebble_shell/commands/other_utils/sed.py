@@ -2,20 +2,97 @@
 
 from __future__ import annotations
 
+import hashlib
+import os
+import tempfile
 from typing import TYPE_CHECKING, Union
 
 import ops
 
+from ...utils import resolve_path
+from ...utils.command_helpers import handle_help_flag, print_text_chunks
+from ...utils.sed_script import SedScript, parse_sed_args
+from ...utils.streaming import (
+    DEFAULT_WORKERS,
+    MAX_CHUNK_SIZE,
+    bounded_map,
+    iter_lines,
+    iter_remote_chunks,
+)
+from ...utils.theme import get_theme
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
     import shimmer
 
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+# Edited files up to this size are kept in memory rather than in a local file.
+_SPOOL_MEMORY_SIZE = 16 * 1024 * 1024
+
+# Characters of output to collect before printing them in one go.
+_OUTPUT_BATCH_SIZE = 64 * 1024
+
+
+class _LineReader:
+    """The lines of a stream of chunks as text, noting whether the last one ended in a newline.
+
+    Bytes that aren't valid UTF-8 are kept (as surrogates), so that writing
+    the lines back gives the same bytes.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = chunks
+        self.empty = True
+        self.missing_newline = False
+
+    def __iter__(self) -> Iterator[str]:
+        for line in iter_lines(self._track()):
+            yield line.decode("utf-8", errors="surrogateescape")
+
+    def _track(self) -> Iterator[bytes]:
+        last = b""
+        for chunk in self._chunks:
+            if chunk:
+                last = chunk
+            yield chunk
+        self.empty = not last
+        self.missing_newline = bool(last) and not last.endswith(b"\n")
+
+
+def _missing_newline(readers: list[_LineReader]) -> bool:
+    """Whether the last line read, from the last file that had any, had no newline."""
+    for reader in reversed(readers):
+        if not reader.empty:
+            return reader.missing_newline
+    return False
+
+
+def _encode_batches(pieces: Iterable[str]) -> Iterator[bytes]:
+    batch: list[str] = []
+    size = 0
+    for piece in pieces:
+        batch.append(piece)
+        size += len(piece)
+        if size >= _OUTPUT_BATCH_SIZE:
+            yield "".join(batch).encode("utf-8", errors="surrogateescape")
+            batch.clear()
+            size = 0
+    if batch:
+        yield "".join(batch).encode("utf-8", errors="surrogateescape")
+
+
+def _backup_path(path: str, suffix: str) -> str:
+    """Where -i keeps the original of ``path``: a ``*`` in the suffix is the file's name."""
+    if "*" not in suffix:
+        return path + suffix
+    name = suffix.replace("*", os.path.basename(path))
+    return name if name.startswith("/") else os.path.join(os.path.dirname(path), name)
+
 
-# TODO: Put this in the text category.
 class SedCommand(Command):
     """Stream editor for filtering and transforming text."""
 
@@ -23,14 +100,205 @@ class SedCommand(Command):
     help = "Stream editor for filtering and transforming text"
     category = "Text"
 
+    def show_help(self):
+        """Show command help."""
+        help_text = """Stream editor for filtering and transforming text.
+
+Usage: sed [OPTIONS] SCRIPT FILE...
+       sed [OPTIONS] -e SCRIPT [-e SCRIPT]... FILE...
+
+Description:
+    Run SCRIPT over each line of the FILEs and print the result. The
+    script is compiled once and the input is streamed, so large files are
+    never held in memory, and a q command stops reading straight away.
+
+    With -i, each FILE is edited in place instead. Files are edited
+    concurrently, and only files whose content changes are written back.
+
+Options:
+    -n, --quiet         Only print what the script prints
+    -e SCRIPT           Add SCRIPT to the commands to run
+    -f FILE             Add the contents of FILE to the commands to run
+    -E, -r              Use extended regular expressions
+    -i[SUFFIX]          Edit files in place (keeping a backup if SUFFIX given)
+    -s, --separate      Treat files as separate rather than as one stream
+    -h, --help          Show this help message
+
+Commands:
+    s/RE/REPL/FLAGS     substitute (flags: g, p, N, i, m)
+    y/SRC/DST/          transliterate characters
+    d D p P n N         delete, print, read next line
+    a i c TEXT          append, insert, change lines
+    = q Q               print line number, quit
+    h H g G x z         hold space
+    { } ! b t T :       blocks, negation and branches
+
+Addresses: N, $, /RE/, FIRST~STEP, ADDR1,ADDR2, ADDR1,+N and 0,/RE/.
+
+Examples:
+    sed 's/root/admin/' /etc/passwd
+    sed -n '/ERROR/,/^$/p' /var/log/app.log
+    sed -i.bak 's/^port=.*/port=8080/' /etc/app/*.conf
+        """
+        self.console.print(help_text)
+
     def execute(self, client: ClientType, args: list[str]) -> int:
         """Execute the sed command."""
-        return self._execute_sed(client, args)
-
-    def _execute_sed(self, client: ClientType, args: list[str]) -> int:
+        if handle_help_flag(self, args):
+            return 0
         if not args:
             self.console.print("Usage: sed [options] script [file...]")
             return 1
 
-        # TODO: Implement this!
-        return 1
+        try:
+            options, files = parse_sed_args(args)
+        except ValueError as e:
+            self.console.print(get_theme().error_text(f"sed: {e}"))
+            self.console.print("Usage: sed [options] script [file...]")
+            return 1
+
+        texts: list[str] = []
+        for kind, value in options.scripts:
+            if kind == "e":
+                texts.append(value)
+                continue
+            path = resolve_path(self.shell.current_directory, value, self.shell.home_dir)
+            try:
+                data = b"".join(iter_remote_chunks(client, path))
+            except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                self.console.print(get_theme().error_text(f"sed: couldn't open file {value}: {e}"))
+                return 1
+            texts.append(data.decode("utf-8", errors="replace").removesuffix("\n"))
+        try:
+            script = SedScript("\n".join(texts), options.extended)
+        except ValueError as e:
+            self.console.print(get_theme().error_text(f"sed: {e}"))
+            return 1
+
+        if not files:
+            # TODO: Handle stdin
+            self.console.print(
+                get_theme().warning_text(f"{self.name}: reading from stdin not supported")
+            )
+            return 1
+
+        if options.in_place is not None:
+            return self._edit_in_place(client, script, options.quiet, options.in_place, files)
+        return self._print(client, script, options.quiet, options.separate, files)
+
+    def _print(
+        self, client: ClientType, script: SedScript, quiet: bool, separate: bool, files: list[str]
+    ) -> int:
+        """Run the script over the files and print the result."""
+        failed: list[str] = []
+        readers: list[_LineReader] = []
+
+        def lines(file_paths: list[str]) -> Iterator[str]:
+            for file_path in file_paths:
+                path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+                reader = _LineReader(
+                    iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE)
+                )
+                readers.append(reader)
+                try:
+                    yield from reader
+                except ops.pebble.PathError as e:
+                    failed.append(f"sed: can't read {file_path}: {e.message}")
+                except ops.pebble.APIError as e:
+                    failed.append(f"sed: can't read {file_path}: {e}")
+
+        exit_code = 0
+        for group in [[file_path] for file_path in files] if separate else [files]:
+            execution = script.run(lines(group), quiet, lambda: _missing_newline(readers))
+            print_text_chunks(self.console, _encode_batches(execution))
+            exit_code = execution.exit_code
+            if execution.quit:
+                break
+
+        for message in failed:
+            self.console.print(get_theme().error_text(message))
+        return exit_code or (1 if failed else 0)
+
+    def _edit_in_place(
+        self, client: ClientType, script: SedScript, quiet: bool, suffix: str, files: list[str]
+    ) -> int:
+        """Edit each file concurrently, writing back only the ones that change."""
+
+        def edit(file_path: str) -> tuple[int, str | None]:
+            path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+            try:
+                return self._edit_file(client, script, quiet, suffix, path)
+            except ops.pebble.PathError as e:
+                if e.kind == "not-found":
+                    return 1, f"sed: can't read {file_path}: No such file or directory"
+                return 1, f"sed: couldn't edit {file_path}: {e.message}"
+            except ops.pebble.APIError as e:
+                return 1, f"sed: couldn't edit {file_path}: {e}"
+
+        exit_code = 0
+        for _, (status, error) in bounded_map(edit, files, max_workers=DEFAULT_WORKERS):
+            if error is not None:
+                self.console.print(get_theme().error_text(error))
+            exit_code = exit_code or status
+        return exit_code
+
+    @staticmethod
+    def _edit_file(
+        client: ClientType, script: SedScript, quiet: bool, suffix: str, path: str
+    ) -> tuple[int, str | None]:
+        """Edit one file, returning its exit status and any error message.
+
+        The original and the edited content are hashed as they stream, and
+        the file is only pushed if the hashes differ. With ``q``, the rest
+        of the original is still read, to hash it (and back it up), but is
+        not copied to the edited file.
+        """
+        info = client.list_files(path, itself=True)[0]
+        if info.type != ops.pebble.FileType.FILE:
+            return 1, f"sed: couldn't edit {path}: not a regular file"
+
+        original = hashlib.blake2b()
+        edited = hashlib.blake2b()
+        backup = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY_SIZE) if suffix else None  # noqa: SIM115
+        output = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY_SIZE)  # noqa: SIM115
+
+        def read() -> Iterator[bytes]:
+            for chunk in iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE):
+                original.update(chunk)
+                if backup is not None:
+                    backup.write(chunk)
+                yield chunk
+
+        try:
+            chunks = read()
+            reader = _LineReader(chunks)
+            execution = script.run(reader, quiet, lambda: reader.missing_newline)
+            for data in _encode_batches(execution):
+                edited.update(data)
+                output.write(data)
+            for _ in chunks:
+                pass
+            if original.digest() == edited.digest():
+                return execution.exit_code, None
+            if backup is not None:
+                backup.seek(0)
+                client.push(
+                    _backup_path(path, suffix),
+                    backup,
+                    permissions=info.permissions,
+                    user_id=info.user_id,
+                    group_id=info.group_id,
+                )
+            output.seek(0)
+            client.push(
+                path,
+                output,
+                permissions=info.permissions,
+                user_id=info.user_id,
+                group_id=info.group_id,
+            )
+            return execution.exit_code, None
+        finally:
+            output.close()
+            if backup is not None:
+                backup.close()
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
-import re
 from typing import TYPE_CHECKING, Union
 
 import ops
 
-from pebble_shell.utils.command_helpers import safe_read_file
+from pebble_shell.utils import resolve_path
+from pebble_shell.utils.binary_dump import find_strings
+from pebble_shell.utils.command_helpers import handle_help_flag, parse_flags
+from pebble_shell.utils.streaming import iter_remote_chunks
 
 from .._base import Command
 
@@ -17,6 +19,8 @@ if TYPE_CHECKING:
 # TODO: Use the prototype from Shimmer.
 ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
 
+_OFFSET_FORMATS = {"d": "{:7d} ", "o": "{:7o} ", "x": "{:7x} "}
+
 
 # TODO: Put this in the text category.
 class StringsCommand(Command):
@@ -26,25 +30,68 @@ class StringsCommand(Command):
     help = "Print printable strings from files"
     category = "File"
 
+    def show_help(self):
+        """Show command help."""
+        help_text = """Print the sequences of printable characters in files.
+
+Usage: strings [-af] [-n MIN] [-t RADIX] [-o] FILE...
+
+Description:
+    Print every run of at least MIN printable characters (default 4) in
+    each file. Files are streamed rather than loaded into memory.
+
+Options:
+    -a              Scan the whole file (always the case)
+    -f              Print the name of the file before each string
+    -n MIN          Minimum string length (default 4)
+    -t RADIX        Print the offset of each string in o(ctal), d(ecimal) or x(hex)
+    -o              Same as -t o
+    -h, --help      Show this help message
+"""
+        self.console.print(help_text, markup=False)
+
     def execute(self, client: ClientType, args: list[str]) -> int:
         """Execute the strings command."""
+        if handle_help_flag(self, args):
+            return 0
         return self._execute_strings(client, args)
 
     def _execute_strings(self, client: ClientType, args: list[str]) -> int:
-        if not args:
+        parse_result = parse_flags(
+            args, {"a": bool, "f": bool, "n": int, "t": str, "o": bool}, self.shell
+        )
+        if parse_result is None:
+            return 1
+        flags, files = parse_result
+        if not files:
             self.console.print("Usage: strings [files...]")
             return 1
+        min_length = flags["n"] if flags["n"] is not None else 4
+        if min_length < 1:
+            self.console.print(f"strings: invalid minimum string length {min_length}")
+            return 1
+        radix = flags["t"] or ("o" if flags["o"] else None)
+        if radix is not None and radix not in _OFFSET_FORMATS:
+            self.console.print(f"strings: invalid radix: {radix}")
+            return 1
+        offset_format = _OFFSET_FORMATS[radix].format if radix else None
+
+        exit_code = 0
+        with self.output() as out:
+            for file_path in files:
+                path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+                prefix = f"{file_path}: " if flags["f"] else ""
+                try:
+                    for offset, string in find_strings(
+                        iter_remote_chunks(client, path), min_length
+                    ):
+                        text = string.decode("ascii")
+                        if offset_format is not None:
+                            text = offset_format(offset) + text
+                        out.write_line(prefix + text)
+                except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                    out.flush()
+                    self.console.print(f"strings: {file_path}: {e}", markup=False)
+                    exit_code = 1
 
-        for file_path in args:
-            try:
-                content = safe_read_file(client, file_path, self.shell)
-                if content is not None:
-                    # Find printable strings (4+ consecutive printable chars)
-                    strings = re.findall(r"[!-~]{4,}", content)
-                    for string in strings:
-                        self.console.print(string)
-            except Exception as e:  # needed for robust file processing
-                self.console.print(f"strings: {file_path}: {e}")
-                return 1
-
-        return 0
+        return exit_code
@@ -28,5 +28,7 @@ class UnlzopCommand(Command):
         return self._execute_unlzop(client, args)
 
     def _execute_unlzop(self, client: ClientType, args: list[str]) -> int:
-        # TODO: Implement this!
+        # TODO: Implement this! lzop (LZO) isn't supported by the standard library,
+        # unlike the formats that other commands decompress (see iter_decompressed).
+        self.console.print("unlzop: lzop files are not supported")
         return 1
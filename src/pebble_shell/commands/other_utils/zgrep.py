@@ -0,0 +1,31 @@
+"""Implementation of ZgrepCommand."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Union
+
+import ops
+
+from pebble_shell.commands.builtin import GrepCommand
+
+from .._base import Command
+
+if TYPE_CHECKING:
+    import shimmer
+
+# TODO: Use the prototype from Shimmer.
+ClientType = Union[ops.pebble.Client, "shimmer.PebbleCliClient"]
+
+
+class ZgrepCommand(Command):
+    """Search possibly compressed files."""
+
+    name = "zgrep"
+    help = "Search possibly compressed files for a pattern"
+    category = "Text"
+
+    def execute(self, client: ClientType, args: list[str]) -> int:
+        """Execute the zgrep command."""
+        # grep decompresses files itself; the container's grep would not.
+        grep_cmd = GrepCommand(self.shell)
+        return grep_cmd.execute(client, ["--local", *args])
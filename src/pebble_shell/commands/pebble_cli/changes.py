@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 from rich.panel import Panel
 
 from ...utils.command_helpers import handle_help_flag
-from ...utils.table_builder import create_standard_table
+from ...utils.table_builder import create_standard_table, split_output_format
 from ...utils.theme import get_theme
 from .._base import Command
 
@@ -27,19 +27,23 @@ class ChangesCommand(Command):
         """Execute the changes command."""
         if handle_help_flag(self, args):
             return 0
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
 
         changes = client.get_changes()
 
-        if not changes:
+        if not changes and output_format == "table":
             self.console.print("No changes found")
             return 0
 
-        self._show_changes_table(changes)
+        self._show_changes_table(changes, output_format)
         return 0
 
-    def _show_changes_table(self, changes: list[ops.pebble.Change]):
+    def _show_changes_table(self, changes: list[ops.pebble.Change], output_format: str):
         """Display changes in a Rich table."""
-        table = create_standard_table()
+        table = create_standard_table().output_to(self.console, output_format)
         table.primary_id_column("ID")
         table.status_column("Kind")
         table.status_column("Status")
@@ -51,13 +55,13 @@ class ChangesCommand(Command):
             kind = str(change.kind) if change.kind else "unknown"
             status = str(change.status) if change.status else "unknown"
             summary = str(change.summary) if change.summary else ""
-            tasks = str(len(change.tasks)) if change.tasks else "0"
+            tasks = len(change.tasks) if change.tasks else 0
 
             table.add_row(change_id, kind, status, summary, tasks)
 
-        self.console.print(
-            Panel(
-                table,
+        table.print(
+            lambda rendered: Panel(
+                rendered,
                 title=get_theme().highlight_text("Changes"),
                 style=get_theme().info,
             )
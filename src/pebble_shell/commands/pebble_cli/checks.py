@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 from rich.panel import Panel
 
 from ...utils.command_helpers import handle_help_flag
-from ...utils.table_builder import create_standard_table
+from ...utils.table_builder import create_standard_table, split_output_format
 from ...utils.theme import get_theme
 from .._base import Command
 
@@ -27,25 +27,30 @@ class ChecksCommand(Command):
         """Execute the checks command."""
         if handle_help_flag(self, args):
             return 0
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
 
         check_infos = client.get_checks()
         plan = client.get_plan()
         checks = plan.checks
 
-        if not checks:
+        if not checks and output_format == "table":
             self.console.print("No health checks configured")
             return 0
 
-        self._show_checks_table(check_infos, checks)
+        self._show_checks_table(check_infos, checks, output_format)
         return 0
 
     def _show_checks_table(
         self,
         check_infos: list[ops.pebble.CheckInfo],
         checks: dict[str, ops.pebble.Check],
+        output_format: str,
     ):
         """Display checks in a Rich table."""
-        table = create_standard_table()
+        table = create_standard_table().output_to(self.console, output_format)
         table.primary_id_column("Name")
         table.status_column("Level")
         table.status_column("Status")
@@ -58,7 +63,7 @@ class ChecksCommand(Command):
             name = str(check.name)
             level = str(check_info.level) if check_info.level else "unknown"
             status = str(check_info.status) if check_info.status else "unknown"
-            failures = str(check_info.failures) if check_info.failures else "0"
+            failures = check_info.failures or 0
 
             check_type = ""
             target = ""
@@ -81,9 +86,9 @@ class ChecksCommand(Command):
 
             table.add_row(name, level, status, failures, check_type, target)
 
-        self.console.print(
-            Panel(
-                table,
+        table.print(
+            lambda rendered: Panel(
+                rendered,
                 title=get_theme().highlight_text("Health Checks"),
                 style=get_theme().info,
             )
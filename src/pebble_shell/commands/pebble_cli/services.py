@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 from rich.panel import Panel
 
 from ...utils.command_helpers import handle_help_flag
-from ...utils.table_builder import create_standard_table
+from ...utils.table_builder import create_standard_table, split_output_format
 from ...utils.theme import get_theme
 from .._base import Command
 
@@ -27,19 +27,23 @@ class ServicesCommand(Command):
         """Execute the services command."""
         if handle_help_flag(self, args):
             return 0
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
 
         services = client.get_services()
 
-        if not services:
+        if not services and output_format == "table":
             self.console.print("No services configured")
             return 0
 
-        self._show_services_table(services)
+        self._show_services_table(services, output_format)
         return 0
 
-    def _show_services_table(self, services: list[ops.pebble.ServiceInfo]):
+    def _show_services_table(self, services: list[ops.pebble.ServiceInfo], output_format: str):
         """Display services in a Rich table."""
-        table = create_standard_table()
+        table = create_standard_table().output_to(self.console, output_format)
         table.primary_id_column("Service")
         table.status_column("Startup")
         table.status_column("Current")
@@ -54,9 +58,9 @@ class ServicesCommand(Command):
 
             table.add_row(service_name, startup, current, status)
 
-        self.console.print(
-            Panel(
-                table,
+        table.print(
+            lambda rendered: Panel(
+                rendered,
                 title=get_theme().highlight_text("Services"),
                 style=get_theme().info,
             )
@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 
 from ...utils.command_helpers import handle_help_flag
 from ...utils.proc_reader import ProcReadError, read_proc_file
-from ...utils.table_builder import create_enhanced_table
+from ...utils.table_builder import create_enhanced_table, split_output_format
 from .._base import Command
 
 if TYPE_CHECKING:
@@ -25,13 +25,17 @@ class DiskUsageCommand(Command):
         """Execute df command with rich table output."""
         if handle_help_flag(self, args):
             return 0
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
         try:
             content = read_proc_file(client, "/proc/mounts")
         except ProcReadError as e:
             self.console.print(f"df: failed to read /proc/mounts: {e}")
             return 1
 
-        table = create_enhanced_table()
+        table = create_enhanced_table().output_to(self.console, output_format)
         table.add_column("Device", style="cyan", no_wrap=True)
         table.add_column("Mount Point", style="green", no_wrap=True)
         table.add_column("Type", style="yellow", no_wrap=True)
@@ -50,5 +54,5 @@ class DiskUsageCommand(Command):
                 f"[green]{mount_point}[/green]",
                 f"[yellow]{fs_type}[/yellow]",
             )
-        self.console.print(table.build())
+        table.print()
         return 0
@@ -9,7 +9,8 @@ import ops
 
 from ...utils import format_bytes, resolve_path
 from ...utils.command_helpers import handle_help_flag
-from ...utils.table_builder import create_enhanced_table
+from ...utils.remote_offload import OffloadMode, offload, split_offload_mode
+from ...utils.table_builder import create_enhanced_table, split_output_format
 from .._base import Command
 
 if TYPE_CHECKING:
@@ -27,6 +28,11 @@ class DuCommand(Command):
         """Execute du command with rich table output."""
         if handle_help_flag(self, args):
             return 0
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
+        mode, args = split_offload_mode(args)
         human_readable = False
         summary_only = False
         paths: list[str] = []
@@ -42,16 +48,30 @@ class DuCommand(Command):
         if not paths:
             paths = ["."]
 
-        table = create_enhanced_table()
+        resolved_paths = [
+            resolve_path(self.shell.current_directory, path, home_dir=self.shell.home_dir)
+            for path in paths
+        ]
+        # The container's du counts disk blocks and writes plain text, so it
+        # is only used when asked for, and only in place of a table.
+        if mode == OffloadMode.REMOTE and output_format == "table":
+            remote_exit = offload(self, client, ["du", *args], resolved_paths, mode)
+            if remote_exit is not None:
+                return remote_exit
+        elif mode == OffloadMode.REMOTE:
+            self.console.print(
+                f"du: the container's du can't write {output_format}, running locally",
+                markup=False,
+                highlight=False,
+            )
+
+        table = create_enhanced_table().output_to(self.console, output_format)
         table.add_column("Size", style="yellow", justify="right")
         table.add_column("Path", style="green")
 
         total_size = 0
 
-        for path in paths:
-            resolved_path = resolve_path(
-                self.shell.current_directory, path, home_dir=self.shell.home_dir
-            )
+        for resolved_path in resolved_paths:
             size = self._calculate_size(client, resolved_path, summary_only)
             total_size += size
 
@@ -62,9 +82,9 @@ class DuCommand(Command):
                 f"[green]{resolved_path}[/green]",
             )
 
-        self.console.print(table.build())
+        table.print()
 
-        if len(paths) > 1:
+        if len(paths) > 1 and not table.streaming:
             total_str = format_bytes(total_size) if human_readable else str(total_size)
             self.console.print(f"[bold]Total: {total_str}[/bold]")
         return 0
@@ -8,7 +8,7 @@ import ops
 from rich.panel import Panel
 
 from ...utils.command_helpers import handle_help_flag
-from ...utils.table_builder import create_enhanced_table
+from ...utils.table_builder import create_enhanced_table, split_output_format
 from .._base import Command
 
 if TYPE_CHECKING:
@@ -26,6 +26,10 @@ class FdinfoCommand(Command):
         """Execute fdinfo command."""
         if handle_help_flag(self, args):
             return 0
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
         target_pid = None
         all_processes = False
         fd_type = None
@@ -39,17 +43,19 @@ class FdinfoCommand(Command):
                 target_pid = arg
 
         if all_processes:
-            self._display_all_processes_fdinfo(client)
+            self._display_all_processes_fdinfo(client, output_format)
         elif target_pid:
-            self._display_process_fdinfo(client, target_pid, fd_type)
+            self._display_process_fdinfo(client, target_pid, fd_type, output_format)
         else:
-            self._display_process_fdinfo(client, "self", fd_type)
+            self._display_process_fdinfo(client, "self", fd_type, output_format)
 
         return 0
 
-    def _display_all_processes_fdinfo(self, client: ops.pebble.Client | shimmer.PebbleCliClient):
+    def _display_all_processes_fdinfo(
+        self, client: ops.pebble.Client | shimmer.PebbleCliClient, output_format: str
+    ):
         """Display file descriptor information for all processes."""
-        table = create_enhanced_table()
+        table = create_enhanced_table().output_to(self.console, output_format)
         table.add_column("PID", style="cyan", no_wrap=True)
         table.add_column("Process", style="green", no_wrap=False)
         table.add_column("FD Count", style="yellow", justify="right")
@@ -62,18 +68,19 @@ class FdinfoCommand(Command):
             fd_count, fd_types = self._get_process_fd_summary(client, pid)
             if fd_count > 0:
                 process_name = self._get_process_name(client, pid)
-                table.add_row(pid, process_name, str(fd_count), ", ".join(fd_types))
+                table.add_row(int(pid), process_name, fd_count, ", ".join(fd_types))
 
-        self.console.print(table.build())
+        table.print()
 
     def _display_process_fdinfo(
         self,
         client: ops.pebble.Client | shimmer.PebbleCliClient,
         pid: str,
         fd_type: str | None,
+        output_format: str,
     ):
         """Display file descriptor information for a specific process."""
-        table = create_enhanced_table()
+        table = create_enhanced_table().output_to(self.console, output_format)
         table.add_column("FD", style="cyan", no_wrap=True)
         table.add_column("Type", style="green", no_wrap=True)
         table.add_column("Flags", style="yellow", no_wrap=True)
@@ -95,17 +102,20 @@ class FdinfoCommand(Command):
             if fd_type and fd_type_info.get("type") != fd_type:
                 continue
             table.add_row(
-                fd,
+                int(fd),
                 fd_type_info.get("type", "unknown"),
                 fd_type_info.get("flags", ""),
             )
+        if table.streaming:
+            table.print()
+            return
         if table.row_count == 0:
             self.console.print("No file descriptors found.")
             return
         process_name = self._get_process_name(client, pid)
-        self.console.print(
-            Panel(
-                table,
+        table.print(
+            lambda rendered: Panel(
+                rendered,
                 title=f"File Descriptors - PID {pid} ({process_name})",
                 border_style="bright_blue",
             )
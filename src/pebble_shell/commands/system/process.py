@@ -19,12 +19,17 @@ from ...utils.proc_reader import (
     read_proc_file,
     read_proc_status_fields,
 )
-from ...utils.table_builder import create_enhanced_table
+from ...utils.table_builder import create_enhanced_table, split_output_format
 from .._base import Command
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     import shimmer
 
+    from ...utils.output_writer import OutputWriter
+    from ...utils.table_builder import TableBuilder
+
 
 class ProcessCommand(Command):
     """Show process information."""
@@ -35,8 +40,28 @@ class ProcessCommand(Command):
 
     def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]):
         """Execute ps command with rich table output."""
+        return self.execute_filtered(client, args)
+
+    def execute_filtered(
+        self,
+        client: ops.pebble.Client | shimmer.PebbleCliClient,
+        args: list[str],
+        match: Callable[[str], bool] | None = None,
+    ) -> int:
+        """Execute ps, listing only the rows whose text satisfies ``match``.
+
+        This is how ``ps aux | grep PATTERN`` runs when the pipeline is fused.
+        Each row's cells are joined with spaces and passed to ``match`` (so a
+        pattern can match the user or PID as well as the command, as it would
+        in ps output), and the matching rows are printed as plain text lines,
+        without the table's header or borders, as they are found.
+        """
         if handle_help_flag(self, args):
             return 0
+        format_result = split_output_format(args, self.shell)
+        if format_result is None:
+            return 1
+        output_format, args = format_result
         # Parse flags
         show_all = False
         user_format = False
@@ -92,8 +117,8 @@ class ProcessCommand(Command):
             return 1
 
         # Create table based on flags
+        table = create_enhanced_table().output_to(self.console, output_format)
         if user_format:
-            table = create_enhanced_table()
             table.add_column("USER", style="cyan", no_wrap=True)
             table.add_column("PID", style="cyan", no_wrap=True)
             table.add_column("%CPU", style="yellow", justify="right")
@@ -108,12 +133,15 @@ class ProcessCommand(Command):
             if show_env:
                 table.add_column("ENV", style="yellow")
         else:
-            table = create_enhanced_table()
             table.add_column("PID", style="cyan", no_wrap=True)
             table.add_column("CMD", style="green")
             if show_env:
                 table.add_column("ENV", style="yellow")
 
+        # Filtered rows are printed whole, so long values are not shortened.
+        truncate = match is None and not table.streaming
+        writer = self.output() if match is not None else None
+        matched = 0
         for pid in sorted(proc_dirs, key=int):
             cmdline = read_proc_cmdline(client, pid)
             if cmdline == "unknown":
@@ -140,12 +168,12 @@ class ProcessCommand(Command):
                 if show_no_tty and not show_all and status_info["tty"] != "?":
                     continue
 
-                # Truncate command if too long
-                if len(cmdline) > 30:
+                # Truncate command if too long to display
+                if len(cmdline) > 30 and truncate:
                     cmdline = cmdline[:27] + "..."
 
                 # Truncate environment if needed
-                if show_env and not show_full_env and len(env_str) > 100:
+                if show_env and not show_full_env and len(env_str) > 100 and truncate:
                     env_str = env_str[:97] + "..."
 
                 # Use Text objects to avoid Rich markup interpretation issues
@@ -153,7 +181,7 @@ class ProcessCommand(Command):
 
                 row_data = [
                     Text(status_info["user"], style="cyan"),
-                    Text(pid, style="cyan"),
+                    int(pid),
                     Text(f"{status_info['cpu_percent']:.1f}", style="yellow"),
                     Text(f"{status_info['mem_percent']:.1f}", style="yellow"),
                     Text(str(status_info.get("vsz", "?")), style="white"),
@@ -166,29 +194,50 @@ class ProcessCommand(Command):
                 ]
                 if show_env:
                     row_data.append(Text(env_str, style="yellow"))
-                table.add_row(*row_data)
+                matched += self._add_row(table, writer, row_data, match)
             else:
                 # Simple format
-                if len(cmdline) > 50:
+                if len(cmdline) > 50 and truncate:
                     cmdline = cmdline[:47] + "..."
 
                 # Truncate environment if needed
-                if show_env and not show_full_env and len(env_str) > 150:
+                if show_env and not show_full_env and len(env_str) > 150 and truncate:
                     env_str = env_str[:147] + "..."
 
                 # Use Text objects to avoid Rich markup interpretation
                 from rich.text import Text
 
                 row_data = [
-                    Text(pid, style="cyan"),
+                    int(pid),
                     Text(cmdline, style="green"),
                 ]
                 if show_env:
                     row_data.append(Text(env_str, style="yellow"))
-                table.add_row(*row_data)
+                matched += self._add_row(table, writer, row_data, match)
 
-        self.console.print(table.build())
-        return 0
+        if writer is None:
+            table.print()
+            return 0
+        writer.close()
+        # Like grep (and pgrep), a filter that matched nothing is a failure.
+        return 0 if matched else 1
+
+    @staticmethod
+    def _add_row(
+        table: TableBuilder,
+        writer: OutputWriter | None,
+        row_data: list[Any],
+        match: Callable[[str], bool] | None,
+    ) -> bool:
+        """Add a row to the table, or write it as plain text if it satisfies ``match``."""
+        if writer is None or match is None:
+            table.add_row(*row_data)
+            return True
+        line = " ".join(str(cell) for cell in row_data)
+        if not match(line):
+            return False
+        writer.write_line(line)
+        return True
 
     def _get_process_status(
         self, client: ops.pebble.Client | shimmer.PebbleCliClient, pid: str
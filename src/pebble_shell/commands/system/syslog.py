@@ -93,9 +93,15 @@ class SyslogCommand(Command):
         return 0
 
     def _print_syslog_lines(self, lines: list[str]):
+        with self.output() as writer:
+            if writer.raw:
+                # Not shown on a terminal, so there's no point styling the lines.
+                writer.write_lines(lines)
+                return
+        text = Text()
         for line in lines:
-            style = self._get_line_style(line)
-            self.console.print(Text(line, style=style))
+            text.append(line + "\n", style=self._get_line_style(line))
+        self.console.print(text, end="")
 
     def _get_line_style(self, line: str) -> str:
         if any(word in line.lower() for word in ["error", "fail", "critical"]):
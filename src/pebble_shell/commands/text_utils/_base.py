@@ -0,0 +1,95 @@
+"""Base classes for text processing commands."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, ClassVar
+
+import ops
+
+from ...utils import resolve_path
+from ...utils.archive_stream import RemotePushStream
+from ...utils.command_helpers import handle_help_flag, print_text_chunks, validate_min_args
+from ...utils.streaming import MAX_CHUNK_SIZE, iter_remote_chunks
+from ...utils.text_transform import build_transformer
+from ...utils.theme import get_theme
+from .._base import Command
+
+if TYPE_CHECKING:
+    import shimmer
+
+    from ...utils.text_transform import ChunkTransformer
+
+
+class _TransformCommand(Command):
+    """A command that transforms files as byte streams (see utils.text_transform).
+
+    Each file is read in chunks and its transformed bytes are printed as
+    they are produced, or, for ``in_place`` commands, pushed back to the
+    file as they are produced. Pebble replaces a pushed file only once the
+    push completes, so the original can be read while it is replaced.
+    """
+
+    category = "Text"
+
+    # Whether the command rewrites its files, rather than printing them.
+    in_place: ClassVar[bool] = False
+
+    def execute(self, client: ops.pebble.Client | shimmer.PebbleCliClient, args: list[str]) -> int:
+        """Execute the command."""
+        if handle_help_flag(self, args):
+            return 0
+
+        try:
+            built = build_transformer(self.name, args, self.shell)
+        except ValueError as e:
+            self.console.print(get_theme().error_text(f"{self.name}: {e}"))
+            return 1
+        if built is None:
+            return 1
+        make_transformer, file_args = built
+
+        if not file_args:
+            if self.in_place:
+                validate_min_args(self.shell, file_args, 1, f"{self.name}: missing file operand")
+            else:
+                # TODO: Handle stdin
+                self.console.print(
+                    get_theme().warning_text(f"{self.name}: reading from stdin not supported")
+                )
+            return 1
+
+        for file_path in file_args:
+            path = resolve_path(self.shell.current_directory, file_path, self.shell.home_dir)
+            try:
+                if self.in_place:
+                    self._rewrite(client, path, make_transformer())
+                    self.console.print(
+                        get_theme().success_text(f"{self.name}: converted {file_path}")
+                    )
+                else:
+                    chunks = iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE)
+                    print_text_chunks(self.console, make_transformer().run(chunks))
+            except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                self.console.print(get_theme().error_text(f"{self.name}: {file_path}: {e}"))
+                return 1
+
+        return 0
+
+    @staticmethod
+    def _rewrite(
+        client: ops.pebble.Client | shimmer.PebbleCliClient,
+        path: str,
+        transformer: ChunkTransformer,
+    ) -> None:
+        """Transform a file in place, keeping its permissions and ownership."""
+        info = client.list_files(path, itself=True)[0]
+        chunks = iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE)
+        with RemotePushStream(
+            client,
+            path,
+            permissions=info.permissions,
+            user_id=info.user_id,
+            group_id=info.group_id,
+        ) as sink:
+            for data in transformer.run(chunks):
+                sink.write(data)
@@ -37,6 +37,8 @@ from .utils import (
     init_shell_parser,
     setup_readline_support,
 )
+from .utils.glob_utils import GlobError, RemoteGlobExpander
+from .utils.table_builder import OUTPUT_FORMATS, set_output_format
 
 
 class PebbleShell:
@@ -68,6 +70,14 @@ class PebbleShell:
         parser.set_variable("HOME", self.home_dir)
         parser.set_variable("PWD", self.home_dir)
         parser.set_variable("USER", user or "root")
+        parser.glob_expander = self._expand_globs
+
+    def _expand_globs(self, patterns: list[str]) -> list[list[str]]:
+        """Expand the glob patterns on a command line against the container's filesystem."""
+        expander = RemoteGlobExpander(self.client)
+        return [
+            expander.expand(pattern, self.current_directory, self.home_dir) for pattern in patterns
+        ]
 
     def _get_remote_user(self) -> str:
         try:
@@ -224,6 +234,16 @@ class PebbleShell:
                 self.console.print(f"[dim]Command executed in {elapsed:.3f} seconds[/dim]")
             return result
 
+        except GlobError as e:
+            self.console.print(
+                Panel(
+                    Text(format_error(f"Glob expansion error: {e}"), style="bold red"),
+                    title="[b red]Glob Error[/b red]",
+                    style="red",
+                )
+            )
+            return True
+
         except Exception as e:
             self.console.print(
                 Panel(
@@ -702,8 +722,17 @@ def main(
         "--command-file",
         help="Path to a file containing Cascade commands to execute non-interactively",
     ),
+    output_format: str = typer.Option(
+        "table",
+        "--format",
+        help=f"Format for tables ({', '.join(OUTPUT_FORMATS)}); commands also take --format",
+    ),
 ):
     """Cascade - commands flowing over bare rocks."""
+    try:
+        set_output_format(output_format)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--format") from e
     socket_path = socket
 
     # If default socket pattern and no user-specified socket, try socket discovery.
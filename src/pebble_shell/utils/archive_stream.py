@@ -0,0 +1,780 @@
+"""Streaming creation and extraction of tar, cpio and ar archives in the container.
+
+Archives are written as a stream: the members are listed lazily, small
+files are read ahead concurrently (a bounded number at a time) while the
+writer is busy with earlier ones, large files are copied straight from
+their pull into the archive, and the archive itself is pushed back to the
+container as it is produced. Memory use is therefore bounded by the
+read-ahead window rather than by the size of the archive.
+
+Extraction is the mirror image: the archive is read as a stream where the
+format allows it, and the members are pushed by a pool of workers, with
+each destination directory created (and, when existing files must not be
+overwritten, listed) once rather than once per member.
+"""
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import dataclasses
+import io
+import os
+import queue
+import stat
+import struct
+import tarfile
+import threading
+from typing import TYPE_CHECKING, BinaryIO
+
+import ops
+
+from .streaming import DEFAULT_WORKERS, bounded_map, iter_remote_chunks, walk_remote_files
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    import shimmer
+
+    PebbleClient = ops.pebble.Client | shimmer.PebbleCliClient
+
+# Files up to this size are read ahead concurrently; larger ones are streamed.
+PREFETCH_FILE_SIZE = 1024 * 1024
+
+# Number of members read ahead of the writer.
+PREFETCH_WINDOW = 16
+
+# Size of each chunk handed to the push, and how many may be queued.
+PUSH_CHUNK_SIZE = 1024 * 1024
+PUSH_QUEUE_DEPTH = 8
+
+# Extracted members up to this size are pushed by the worker pool; larger
+# ones are pushed straight from the archive stream.
+EXTRACT_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Maximum bytes of extracted members waiting to be pushed.
+EXTRACT_WINDOW_BYTES = 64 * 1024 * 1024
+
+# Seconds between checks for a failed push while the queue is full.
+_PUT_INTERVAL = 0.1
+
+_COPY_CHUNK_SIZE = 64 * 1024
+
+
+@dataclasses.dataclass
+class ArchiveMember:
+    """A remote file or directory to add to an archive."""
+
+    path: str
+    info: ops.pebble.FileInfo
+
+    @property
+    def is_dir(self) -> bool:
+        """Whether the member is a directory."""
+        return self.info.type == ops.pebble.FileType.DIRECTORY
+
+    @property
+    def size(self) -> int:
+        """Size of the member's data (0 for directories)."""
+        return 0 if self.is_dir else int(self.info.size or 0)
+
+    @property
+    def mode(self) -> int:
+        """Full mode of the member, including the file type bits."""
+        kind = stat.S_IFDIR if self.is_dir else stat.S_IFREG
+        permissions = self.info.permissions
+        if not isinstance(permissions, int):
+            permissions = 0o755 if self.is_dir else 0o644
+        return kind | permissions
+
+    @property
+    def mtime(self) -> int:
+        """Modification time as a Unix timestamp."""
+        try:
+            return int(self.info.last_modified.timestamp())
+        except (AttributeError, TypeError, ValueError, OverflowError):
+            return 0
+
+    @property
+    def uid(self) -> int:
+        """Owner's user ID (0 if unknown)."""
+        return self.info.user_id if isinstance(self.info.user_id, int) else 0
+
+    @property
+    def gid(self) -> int:
+        """Owner's group ID (0 if unknown)."""
+        return self.info.group_id if isinstance(self.info.group_id, int) else 0
+
+
+def collect_members(
+    client: PebbleClient,
+    paths: Iterable[str],
+    on_error: Callable[[str, str], None],
+) -> Iterator[ArchiveMember]:
+    """List the members for ``paths``, descending into directories lazily.
+
+    Each directory is followed by the directories and regular files beneath
+    it, so empty directories are archived too. Other kinds
+    of file (symbolic links, devices) can't be read through Pebble and are
+    reported through ``on_error``.
+    """
+
+    def listing_failed(path: str, error: Exception) -> None:
+        on_error(path, _describe(error))
+
+    for path in paths:
+        try:
+            info = client.list_files(path, itself=True)[0]
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            listing_failed(path, e)
+            continue
+        if info.type == ops.pebble.FileType.DIRECTORY:
+            yield ArchiveMember(path, info)
+            for member_path, member_info in walk_remote_files(
+                client, path, on_error=listing_failed, include_dirs=True
+            ):
+                yield ArchiveMember(member_path, member_info)
+        elif info.type == ops.pebble.FileType.FILE:
+            yield ArchiveMember(path, info)
+        else:
+            on_error(path, "not a regular file, skipped")
+
+
+def read_members(
+    client: PebbleClient,
+    members: Iterable[ArchiveMember],
+    on_error: Callable[[str, str], None],
+    window: int = PREFETCH_WINDOW,
+) -> Iterator[tuple[ArchiveMember, BinaryIO | None]]:
+    """Pair each member with a readable source for its data.
+
+    Files of up to ``PREFETCH_FILE_SIZE`` bytes are read ahead on a thread
+    pool, at most ``window`` at a time; larger files are pulled when the
+    consumer reaches them and stream through. Directories are paired with
+    None. A file that can't be read is reported and skipped. Each source is
+    only valid until the next member is requested.
+    """
+
+    def prefetch(member: ArchiveMember) -> bytes | Exception | None:
+        if member.is_dir or member.size > PREFETCH_FILE_SIZE:
+            return None
+        try:
+            return b"".join(iter_remote_chunks(client, member.path))
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            return e
+
+    for member, data in bounded_map(prefetch, members, window=window):
+        if isinstance(data, Exception):
+            on_error(member.path, _describe(data))
+        elif data is not None:
+            yield member, io.BytesIO(data)
+        elif member.is_dir:
+            yield member, None
+        else:
+            try:
+                source = client.pull(member.path, encoding=None)
+            except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                on_error(member.path, _describe(e))
+                continue
+            with source:
+                yield member, source
+
+
+class SizedReader:
+    """Read exactly ``size`` bytes from a source that may have changed since it was listed.
+
+    Archive headers record a member's size before its data, so a file that
+    shrinks while it is read is padded with NUL bytes and one that grows is
+    cut off; ``changed`` records that either happened.
+    """
+
+    def __init__(self, source: BinaryIO, size: int, on_read: Callable[[int], None] | None = None):
+        self._source = source
+        self._remaining = size
+        self._on_read = on_read
+        self._exhausted = False
+        self.changed = False
+
+    def read(self, size: int = -1) -> bytes:
+        """Read ``size`` bytes, or all remaining bytes if fewer remain or ``size`` is negative."""
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        if not size:
+            self._check_growth()
+            return b""
+        data = b""
+        while len(data) < size and not self._exhausted:
+            chunk = self._source.read(size - len(data))
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if not chunk:
+                self._exhausted = True
+                self.changed = True
+            data += chunk
+        if len(data) < size:
+            data += b"\0" * (size - len(data))
+        self._remaining -= len(data)
+        if self._on_read is not None:
+            self._on_read(len(data))
+        if not self._remaining:
+            self._check_growth()
+        return data
+
+    def _check_growth(self) -> None:
+        if not self._exhausted:
+            self._exhausted = True
+            if self._source.read(1):
+                self.changed = True
+
+
+def _copy(source: SizedReader, sink: BinaryIO, size: int) -> None:
+    while size:
+        data = source.read(min(size, _COPY_CHUNK_SIZE))
+        sink.write(data)
+        size -= len(data)
+
+
+def write_members(
+    writer: TarWriter | CpioWriter | ArWriter,
+    client: PebbleClient,
+    members: Iterable[ArchiveMember],
+    on_error: Callable[[str, str], None],
+    on_read: Callable[[int], None] | None = None,
+) -> None:
+    """Read ``members`` (see ``read_members``) and add them to ``writer``.
+
+    ``on_read`` is called with the number of bytes of member data as they
+    are copied, for progress reporting.
+    """
+    for member, source in read_members(client, members, on_error):
+        if source is None:
+            writer.add(member, None)
+            continue
+        reader = SizedReader(source, member.size, on_read)
+        writer.add(member, reader)
+        if reader.changed:
+            on_error(member.path, "file changed as we read it")
+
+
+class TarWriter:
+    """Write a tar archive as a stream, optionally compressed."""
+
+    def __init__(self, sink: BinaryIO, compression: str | None = None):
+        # Stream mode ("w|gz") never seeks, so the sink can be a push.
+        self._tar = tarfile.open(fileobj=sink, mode=f"w|{compression or ''}")  # noqa: SIM115
+
+    def add(self, member: ArchiveMember, source: SizedReader | None) -> None:
+        """Add a member; ``source`` is None for directories."""
+        tarinfo = tarfile.TarInfo(name=member.path)
+        tarinfo.type = tarfile.DIRTYPE if member.is_dir else tarfile.REGTYPE
+        tarinfo.mode = stat.S_IMODE(member.mode)
+        tarinfo.mtime = member.mtime
+        tarinfo.uid = member.uid
+        tarinfo.gid = member.gid
+        tarinfo.uname = member.info.user or ""
+        tarinfo.gname = member.info.group or ""
+        tarinfo.size = member.size
+        self._tar.addfile(tarinfo, source)
+
+    def close(self) -> None:
+        """Write the end-of-archive marker and flush the compressor."""
+        self._tar.close()
+
+
+class CpioWriter:
+    """Write a cpio archive in the portable "newc" (SVR4) format."""
+
+    _MAGIC = b"070701"
+
+    def __init__(self, sink: BinaryIO):
+        self._sink = sink
+        self._inode = 0
+
+    def add(self, member: ArchiveMember, source: SizedReader | None) -> None:
+        """Add a member; ``source`` is None for directories."""
+        self._inode += 1
+        nlink = 2 if member.is_dir else 1
+        self._write_header(
+            member.path.lstrip("/") or ".",
+            [self._inode, member.mode, member.uid, member.gid, nlink, member.mtime, member.size],
+        )
+        if source is not None:
+            _copy(source, self._sink, member.size)
+            self._pad(member.size)
+
+    def close(self) -> None:
+        """Write the trailer that ends the archive."""
+        self._write_header("TRAILER!!!", [0, 0, 0, 0, 1, 0, 0])
+
+    def _write_header(self, name: str, fields: list[int]) -> None:
+        encoded = name.encode("utf-8") + b"\0"
+        # ino, mode, uid, gid, nlink, mtime, filesize, then the device
+        # numbers, the name size and the (unused) checksum.
+        values = [*fields, 0, 0, 0, 0, len(encoded), 0]
+        header = self._MAGIC + b"".join(b"%08X" % (value & 0xFFFFFFFF) for value in values)
+        self._sink.write(header + encoded)
+        self._pad(len(header) + len(encoded))
+
+    def _pad(self, length: int) -> None:
+        if length % 4:
+            self._sink.write(b"\0" * (4 - length % 4))
+
+
+class ArWriter:
+    """Write a Unix ar archive, with a GNU name table for long member names.
+
+    Members are stored under their base names. The name table has to come
+    first, so the member names are needed up front.
+    """
+
+    _MAGIC = b"!<arch>\n"
+
+    def __init__(self, sink: BinaryIO, names: Iterable[str]):
+        self._sink = sink
+        self._offsets: dict[str, int] = {}
+        sink.write(self._MAGIC)
+        table = bytearray()
+        for name in names:
+            name = os.path.basename(name)
+            if len(name) > 15 and name not in self._offsets:
+                self._offsets[name] = len(table)
+                table += name.encode("utf-8") + b"/\n"
+        if table:
+            self._write_header(b"//", 0, 0, 0, 0, len(table))
+            sink.write(bytes(table))
+            self._pad(len(table))
+
+    def add(self, member: ArchiveMember, source: SizedReader | None) -> None:
+        """Add a file; ar archives can't hold directories."""
+        if source is None:
+            raise ValueError(f"{member.path}: is a directory")
+        name = os.path.basename(member.path)
+        encoded = (
+            f"/{self._offsets[name]}".encode() if name in self._offsets else name.encode() + b"/"
+        )
+        self._write_header(encoded, member.mtime, member.uid, member.gid, member.mode, member.size)
+        _copy(source, self._sink, member.size)
+        self._pad(member.size)
+
+    def close(self) -> None:
+        """Nothing follows the last member of an ar archive."""
+
+    def _write_header(
+        self, name: bytes, mtime: int, uid: int, gid: int, mode: int, size: int
+    ) -> None:
+        header = struct.pack(
+            "16s12s6s6s8s10s2s",
+            name.ljust(16),
+            str(mtime).encode().ljust(12),
+            str(uid).encode().ljust(6),
+            str(gid).encode().ljust(6),
+            b"%o" % mode,
+            str(size).encode().ljust(10),
+            b"`\n",
+        )
+        self._sink.write(header.replace(b"\0", b" "))
+
+    def _pad(self, length: int) -> None:
+        if length % 2:
+            self._sink.write(b"\n")
+
+
+@dataclasses.dataclass
+class ArHeader:
+    """A member header read from an ar archive."""
+
+    name: str
+    mtime: int
+    uid: int
+    gid: int
+    mode: int
+    size: int
+
+
+def iter_ar_headers(source: BinaryIO) -> Iterator[ArHeader]:
+    """Read the member headers of an ar archive, skipping over the member data.
+
+    GNU long names (``/OFFSET`` into the ``//`` table) and BSD long names
+    (``#1/LENGTH``, stored before the data) are resolved; the symbol table
+    is not listed.
+
+    Raises:
+        ValueError: If the data is not an ar archive
+    """
+    if source.read(len(ArWriter._MAGIC)) != ArWriter._MAGIC:
+        raise ValueError("file format not recognized")
+    names = b""
+    while True:
+        header = source.read(60)
+        if len(header) < 60:
+            return
+        if header[58:60] != b"`\n":
+            raise ValueError("malformed archive")
+        raw_name = header[:16].rstrip(b" ")
+        size = int(header[48:58].strip() or 0)
+        consumed = 0
+        if raw_name == b"//":
+            names = source.read(size)
+            consumed = size
+        if raw_name.startswith(b"#1/"):
+            length = int(raw_name[3:])
+            raw_name = source.read(length).rstrip(b"\0")
+            consumed = length
+        elif raw_name.startswith(b"/") and raw_name[1:].isdigit():
+            offset = int(raw_name[1:])
+            raw_name = names[offset : names.index(b"\n", offset)].rstrip(b"/")
+        elif raw_name not in (b"/", b"//", b"/SYM64/"):
+            raw_name = raw_name.rstrip(b"/")
+        skip = size - consumed + size % 2
+        while skip:
+            skipped = len(source.read(min(skip, _COPY_CHUNK_SIZE)))
+            if not skipped:
+                return
+            skip -= skipped
+        if raw_name in (b"/", b"//", b"/SYM64/", b"__.SYMDEF", b"__.SYMDEF SORTED"):
+            continue
+        yield ArHeader(
+            name=raw_name.decode("utf-8", errors="replace"),
+            mtime=int(header[16:28].strip() or 0),
+            uid=int(header[28:34].strip() or 0),
+            gid=int(header[34:40].strip() or 0),
+            mode=int(header[40:48].strip() or 0, 8),
+            size=size - consumed,
+        )
+
+
+class RemotePushStream:
+    """A writable stream whose bytes are pushed to a remote file as they are written.
+
+    The push runs on a background thread and reads from a bounded queue of
+    chunks, so the writer blocks rather than buffering the whole file if the
+    push falls behind. Use as a context manager: on a clean exit the push is
+    completed, and if the block raises the push is abandoned, so Pebble does
+    not write a truncated file.
+    """
+
+    _ABORT = object()
+
+    def __init__(
+        self,
+        client: PebbleClient,
+        path: str,
+        chunk_size: int = PUSH_CHUNK_SIZE,
+        depth: int = PUSH_QUEUE_DEPTH,
+        permissions: int | None = None,
+        user_id: int | None = None,
+        group_id: int | None = None,
+    ):
+        self._client = client
+        self._path = path
+        # Ownership and permissions for the pushed file, if they are to be set.
+        self._push_options = {
+            name: value
+            for name, value in (
+                ("permissions", permissions),
+                ("user_id", user_id),
+                ("group_id", group_id),
+            )
+            if value is not None
+        }
+        self._chunk_size = chunk_size
+        self._queue: queue.Queue[bytes | object | None] = queue.Queue(maxsize=depth)
+        self._buffer = bytearray()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._push, daemon=True)
+        self.bytes_written = 0
+
+    def __enter__(self) -> RemotePushStream:
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+            self._put(None)
+            self._thread.join()
+            if self._error is not None:
+                raise self._error
+        else:
+            self._abort()
+
+    def write(self, data: bytes) -> int:
+        """Queue ``data`` for the push."""
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self._chunk_size:
+            self._put(bytes(self._buffer[: self._chunk_size]))
+            del self._buffer[: self._chunk_size]
+        return len(data)
+
+    def flush(self) -> None:
+        """Nothing to do; data is pushed in chunks as it arrives."""
+
+    def _put(self, item: bytes | None) -> None:
+        if item == b"":
+            return
+        while True:
+            if self._error is not None:
+                raise self._error
+            try:
+                self._queue.put(item, timeout=_PUT_INTERVAL)
+            except queue.Full:
+                continue
+            return
+
+    def _abort(self) -> None:
+        # Empty the queue so that the abort marker can't block.
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._queue.put(self._ABORT)
+        self._thread.join()
+
+    def _push(self) -> None:
+        try:
+            self._client.push(self._path, _QueueReader(self), make_dirs=True, **self._push_options)
+        except BaseException as e:
+            self._error = e
+
+    def _next_chunk(self) -> bytes:
+        item = self._queue.get()
+        if item is self._ABORT:
+            raise OSError("archive creation was abandoned")
+        return item or b""  # type: ignore[return-value]
+
+
+class _QueueReader:
+    """The readable end of a RemotePushStream, handed to ``client.push``."""
+
+    def __init__(self, stream: RemotePushStream):
+        self._stream = stream
+        self._pending = b""
+        self._done = False
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            return b"".join(iter(lambda: self.read(PUSH_CHUNK_SIZE), b""))
+        while not self._pending and not self._done:
+            self._pending = self._stream._next_chunk()
+            self._done = not self._pending
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+class MemberExtractor:
+    """Write extracted archive members to the container.
+
+    Small members are pushed concurrently by a pool of workers, with at
+    most ``EXTRACT_WINDOW_BYTES`` waiting; large ones are pushed straight
+    from their source. Each destination directory is created once, with
+    its parents, before the first member inside it is pushed. When
+    ``overwrite`` is false, each destination directory is listed once to
+    find the files that are already there. With ``make_dirs`` false,
+    missing parent directories are not created and the push fails instead.
+
+    Use as a context manager; leaving the block waits for the pushes still
+    in flight. Failures are reported through ``on_error``.
+    """
+
+    def __init__(
+        self,
+        client: PebbleClient,
+        on_error: Callable[[str, str], None],
+        overwrite: bool = True,
+        make_dirs: bool = True,
+        max_workers: int = DEFAULT_WORKERS,
+    ):
+        self._client = client
+        self._on_error = on_error
+        self._overwrite = overwrite
+        self._make_dirs = make_dirs
+        self._created: set[str] = set()
+        self._listings: dict[str, set[str]] = {}
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._window = max_workers * 2
+        self._pending: collections.deque[tuple[str, int, concurrent.futures.Future[bool]]] = (
+            collections.deque()
+        )
+        self._pending_bytes = 0
+        self.extracted = 0
+
+    def __enter__(self) -> MemberExtractor:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            for _, _, future in self._pending:
+                future.cancel()
+        self._drain(0)
+        self._pool.shutdown()
+
+    def exists(self, path: str) -> bool:
+        """Whether ``path`` existed in the container before extraction started."""
+        directory, name = os.path.split(path)
+        if directory not in self._listings:
+            try:
+                listing = self._client.list_files(directory)
+            except (ops.pebble.PathError, ops.pebble.APIError):
+                listing = []
+            self._listings[directory] = {info.name for info in listing}
+        return name in self._listings[directory]
+
+    def make_dir(self, path: str) -> None:
+        """Create ``path`` and its parents, once."""
+        path = os.path.normpath(path)
+        if path in self._created:
+            return
+        try:
+            self._client.make_dir(path, make_parents=True)
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            self._on_error(path, _describe(e))
+            return
+        while path not in self._created and path != os.path.dirname(path):
+            self._created.add(path)
+            path = os.path.dirname(path)
+
+    def write(
+        self, path: str, source: BinaryIO, size: int, permissions: int | None = None
+    ) -> bool:
+        """Push ``size`` bytes from ``source`` to ``path``.
+
+        Returns:
+            False if the file was skipped because it already exists
+        """
+        if not self._overwrite and self.exists(path):
+            return False
+        if self._make_dirs:
+            self.make_dir(os.path.dirname(path))
+        if size > EXTRACT_BUFFER_SIZE:
+            self._drain(0)
+            if self._push(path, source, permissions):
+                self.extracted += 1
+            return True
+        data = source.read(size)
+        self._drain(self._window - 1, EXTRACT_WINDOW_BYTES - len(data))
+        future = self._pool.submit(self._push, path, data, permissions)
+        self._pending.append((path, len(data), future))
+        self._pending_bytes += len(data)
+        return True
+
+    def _push(self, path: str, data: bytes | BinaryIO, permissions: int | None) -> bool:
+        try:
+            self._client.push(path, data, permissions=permissions)
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            self._on_error(path, _describe(e))
+            return False
+        return True
+
+    def _drain(self, max_pending: int, max_bytes: int | None = None) -> None:
+        """Wait for the oldest pushes until within the given limits."""
+        while self._pending and (
+            len(self._pending) > max_pending
+            or (max_bytes is not None and self._pending_bytes > max_bytes)
+        ):
+            _, size, future = self._pending.popleft()
+            self._pending_bytes -= size
+            if not future.cancelled() and future.result():
+                self.extracted += 1
+
+
+@dataclasses.dataclass
+class CpioHeader:
+    """A member header read from a cpio archive."""
+
+    name: str
+    mode: int
+    uid: int
+    gid: int
+    mtime: int
+    size: int
+
+    @property
+    def is_dir(self) -> bool:
+        """Whether the member is a directory."""
+        return stat.S_ISDIR(self.mode)
+
+    @property
+    def is_file(self) -> bool:
+        """Whether the member is a regular file."""
+        return stat.S_ISREG(self.mode)
+
+
+def iter_cpio_members(source: BinaryIO) -> Iterator[tuple[CpioHeader, BinaryIO]]:
+    """Read a "newc" cpio archive as a stream.
+
+    Each member is yielded with a reader for its data, which is only valid
+    until the next member is requested; data the consumer doesn't read is
+    skipped.
+
+    Raises:
+        ValueError: If the data is not a newc cpio archive
+    """
+    first = True
+    while True:
+        header = _read_exact(source, 110)
+        if first and header[:6] not in (b"070701", b"070702"):
+            raise ValueError("unsupported archive format")
+        first = False
+        if len(header) < 110 or header[:6] not in (b"070701", b"070702"):
+            raise ValueError("truncated archive")
+        fields = [int(header[6 + 8 * i : 14 + 8 * i], 16) for i in range(13)]
+        namesize = fields[11]
+        name = _read_exact(source, namesize)[:-1].decode("utf-8", errors="replace")
+        _read_exact(source, -(110 + namesize) % 4)
+        if name == "TRAILER!!!":
+            return
+        size = fields[6]
+        member = CpioHeader(
+            name=name,
+            mode=fields[1],
+            uid=fields[2],
+            gid=fields[3],
+            mtime=fields[5],
+            size=size,
+        )
+        reader = _MemberReader(source, size)
+        yield member, reader
+        reader.skip()
+        _read_exact(source, -size % 4)
+
+
+class _MemberReader:
+    """Read one member's data from an archive stream, and no further."""
+
+    def __init__(self, source: BinaryIO, size: int):
+        self._source = source
+        self._remaining = size
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = _read_exact(self._source, size)
+        if len(data) < size:
+            raise ValueError("truncated archive")
+        self._remaining -= size
+        return data
+
+    def skip(self) -> None:
+        while self._remaining:
+            self.read(_COPY_CHUNK_SIZE)
+
+
+def _read_exact(source: BinaryIO, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = source.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ops.pebble.PathError) and error.kind == "not-found":
+        return "No such file or directory"
+    if isinstance(error, ops.pebble.PathError) and error.kind == "permission-denied":
+        return "Permission denied"
+    return str(getattr(error, "message", error))
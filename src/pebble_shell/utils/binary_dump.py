@@ -0,0 +1,220 @@
+"""Streaming, bulk formatting of binary data for hexdump, od and strings.
+
+Dumping a large binary one byte at a time through Python generator
+expressions is very slow. The helpers here format a whole output line with
+a handful of C-level calls instead: ``bytes.hex`` with a separator for hex
+bytes, ``memoryview.cast`` to read 2, 4 and 8 byte words and a single
+``%``-format for all of them, lookup tables for per-byte formats, and
+``bytes.translate`` for the printable-character column. Data arrives as a
+stream of chunks (see ``streaming.iter_remote_chunks``), so memory use does
+not depend on the size of the file, and repeated lines can be collapsed into
+a single ``*`` without being formatted at all.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
+# Printable ASCII stays as it is; everything else becomes ".".
+PRINTABLE_TABLE = bytes(b if 32 <= b < 127 else ord(".") for b in range(256))
+
+# memoryview.cast codes by (size, signed).
+_INT_CODES = {
+    (1, False): "B",
+    (2, False): "H",
+    (4, False): "I",
+    (8, False): "Q",
+    (1, True): "b",
+    (2, True): "h",
+    (4, True): "i",
+    (8, True): "q",
+}
+
+_C_ESCAPES = {0: "\\0", 7: "\\a", 8: "\\b", 9: "\\t", 10: "\\n", 11: "\\v", 12: "\\f", 13: "\\r"}
+
+# Character representations used by ``od -c`` (and ``hexdump -c``).
+CHAR_TABLE = [_C_ESCAPES.get(b, chr(b) if 32 <= b < 127 else f"{b:03o}") for b in range(256)]
+
+# Names of the control characters 0-31 and space, as printed by ``od -t a``.
+_CONTROL_NAMES = (
+    "nul soh stx etx eot enq ack bel bs ht nl vt ff cr so si "
+    "dle dc1 dc2 dc3 dc4 nak syn etb can em sub esc fs gs rs us sp"
+)
+_ASCII_NAMES = _CONTROL_NAMES.split()
+
+# Named characters used by ``od -t a`` (the high bit is ignored).
+NAMED_CHAR_TABLE = [
+    _ASCII_NAMES[b & 0x7F] if b & 0x7F <= 32 else ("del" if b & 0x7F == 127 else chr(b & 0x7F))
+    for b in range(256)
+]
+
+# The bytes ``strings`` considers part of a string: printable ASCII and tab.
+_STRING_BYTES = bytes([9, *range(32, 127)])
+
+_SIZE_SUFFIXES = {
+    "b": 512,
+    "k": 1024,
+    "kb": 1000,
+    "kib": 1024,
+    "m": 1024**2,
+    "mb": 1000**2,
+    "mib": 1024**2,
+    "g": 1024**3,
+    "gb": 1000**3,
+    "gib": 1024**3,
+}
+
+_NUMBER = re.compile(r"^(0[xX][0-9a-fA-F]+|0[0-7]*|[1-9][0-9]*)([A-Za-z]*)$")
+
+
+def parse_byte_count(text: str) -> int:
+    """Parse a byte count such as ``100``, ``0x400``, ``010``, ``4k`` or ``2MiB``.
+
+    Like ``od`` and ``hexdump``, a leading ``0x`` means hexadecimal and a
+    leading ``0`` means octal.
+
+    Raises:
+        ValueError: If ``text`` is not a valid byte count
+    """
+    match = _NUMBER.match(text.strip())
+    if not match:
+        raise ValueError(f"invalid byte count: {text!r}")
+    number, suffix = match.groups()
+    if number.lower().startswith("0x"):
+        value = int(number, 16)
+    elif number.startswith("0"):
+        value = int(number, 8)
+    else:
+        value = int(number)
+    if suffix:
+        multiplier = _SIZE_SUFFIXES.get(suffix.lower())
+        if multiplier is None:
+            raise ValueError(f"invalid byte count: {text!r}")
+        value *= multiplier
+    return value
+
+
+def printable(line: bytes) -> str:
+    """Render bytes as printable ASCII, with "." for anything else."""
+    return line.translate(PRINTABLE_TABLE).decode("ascii")
+
+
+def hex_bytes(line: bytes, group: int = 0) -> str:
+    """Render bytes as space-separated hex pairs.
+
+    Args:
+        line: The bytes to render
+        group: If non-zero, add an extra space after every ``group`` bytes
+    """
+    if not group or len(line) <= group:
+        return line.hex(" ")
+    return "  ".join(line[i : i + group].hex(" ") for i in range(0, len(line), group))
+
+
+def table_bytes(line: bytes, table: Sequence[str], template: str) -> str:
+    """Render each byte through a lookup table, each formatted with ``template``."""
+    return (template * len(line)) % tuple(map(table.__getitem__, line))
+
+
+def words(line: bytes, size: int, template: str, signed: bool = False) -> str:
+    """Render ``line`` as native-endian words of ``size`` bytes.
+
+    A final partial word is padded with zero bytes, as ``od`` does.
+
+    Args:
+        line: The bytes to render
+        size: Word size in bytes (1, 2, 4 or 8)
+        template: ``%``-format for one word, including its separator
+        signed: Whether the words are signed
+    """
+    if len(line) % size:
+        line = line + bytes(size - len(line) % size)
+    values = memoryview(line).cast(_INT_CODES[size, signed])
+    return (template * len(values)) % tuple(values)
+
+
+def dump_lines(
+    chunks: Iterable[bytes],
+    width: int,
+    renderers: Sequence[Callable[[int, bytes], str]],
+    offset: int = 0,
+    squeeze: bool = True,
+    end_address: Callable[[int], str] | None = None,
+) -> Iterator[str]:
+    """Split a stream into lines of ``width`` bytes and render each one.
+
+    Args:
+        chunks: The data, as a stream of chunks of any size
+        width: Number of input bytes per output line
+        renderers: Each is called with the address and bytes of a line and
+            returns one output line; several renderers give several output
+            lines per input line (as with multiple ``od -t`` types)
+        offset: Address of the first byte
+        squeeze: Replace runs of identical lines with a single ``*``
+        end_address: If given, called with the address just past the data
+            to produce a final line
+
+    Yields:
+        Output lines
+    """
+    pending = b""
+    previous: bytes | None = None
+    squeezing = False
+    address = offset
+    for chunk in chunks:
+        data = pending + chunk if pending else chunk
+        end = len(data) - len(data) % width
+        for start in range(0, end, width):
+            line = data[start : start + width]
+            if squeeze and line == previous:
+                if not squeezing:
+                    squeezing = True
+                    yield "*"
+            else:
+                squeezing = False
+                previous = line
+                for render in renderers:
+                    yield render(address, line)
+            address += width
+        pending = data[end:]
+    if pending:
+        for render in renderers:
+            yield render(address, pending)
+        address += len(pending)
+    if end_address is not None:
+        yield end_address(address)
+
+
+def find_strings(
+    chunks: Iterable[bytes], min_length: int = 4, offset: int = 0
+) -> Iterator[tuple[int, bytes]]:
+    """Find runs of printable characters (and tabs) in a stream, as ``strings`` does.
+
+    A run that continues into the next chunk is carried over rather than
+    split, so results do not depend on the chunk boundaries.
+
+    Yields:
+        (offset, string) pairs
+    """
+    pattern = re.compile(rb"[%s]{%d,}" % (re.escape(_STRING_BYTES), max(min_length, 1)))
+    pending: list[bytes] = []
+    base = offset  # File offset of the start of the pending data.
+    for chunk in chunks:
+        # A printable run at the very end of the chunk may not be finished yet.
+        trailing = len(chunk) - len(chunk.rstrip(_STRING_BYTES))
+        if trailing == len(chunk):
+            pending.append(chunk)
+            continue
+        data = b"".join([*pending, chunk]) if pending else chunk
+        cut = len(data) - trailing
+        for match in pattern.finditer(data, 0, cut):
+            yield base + match.start(), match.group()
+        pending = [data[cut:]] if trailing else []
+        base += cut
+    tail = b"".join(pending)
+    if len(tail) >= min_length:
+        yield base, tail
@@ -0,0 +1,162 @@
+"""Parallel block compression of remote files, in the style of pigz.
+
+The input is read as a stream and cut into fixed-size blocks. Each block
+is compressed independently on a pool of worker threads (zlib, bz2 and
+lzma release the GIL while they work, so the blocks really are compressed
+in parallel), and the results are written out in order as they complete.
+
+Each block becomes a complete gzip member, bzip2 stream or xz stream.
+Concatenations of these are valid files for the standard tools: gzip,
+bzip2 and xz all decompress every member or stream in a file, as do
+Python's own modules. An input that fits in a single block is compressed
+as one ordinary stream.
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import os
+from typing import TYPE_CHECKING
+
+from .streaming import bounded_map
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+# The file formats, with the block size used for each. bzip2 compresses in
+# blocks of at most 900 kB anyway; xz gets larger blocks so that its
+# dictionary has more to work with.
+BLOCK_SIZES = {
+    "gzip": 1024 * 1024,
+    "bzip2": 900 * 1000,
+    "xz": 4 * 1024 * 1024,
+}
+
+# Compression level used by each format's standard tool when none is given.
+DEFAULT_LEVELS = {"gzip": 6, "bzip2": 9, "xz": 6}
+
+
+def default_workers() -> int:
+    """Number of blocks to compress at once: one per available CPU."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def split_compression_level(
+    args: list[str], default: int, value_flags: str = "p"
+) -> tuple[int, list[str]]:
+    """Remove the compression level options (``-1`` to ``-9``, ``--fast``, ``--best``).
+
+    Digits may be bundled with other short options, as in ``-9k``; the
+    other options are kept. Digits after an option that takes a value
+    (one of ``value_flags``, as in ``-p4``) are that option's value, not a
+    level; the option and its value are passed on as separate arguments.
+
+    Returns:
+        The level (the last one given wins) and the other arguments
+    """
+    level = default
+    remaining: list[str] = []
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg == "--fast":
+            level = 1
+        elif arg == "--best":
+            level = 9
+        elif len(arg) > 1 and arg[0] == "-" and arg[1] != "-":
+            letters = ""
+            for i, char in enumerate(arg[1:], start=2):
+                if char.isdigit():
+                    level = int(char) or 1
+                elif char in value_flags:
+                    if letters:
+                        remaining.append("-" + letters)
+                    letters = ""
+                    remaining.append("-" + char)
+                    value = arg[i:] or next(args_iter, None)
+                    if value is not None:
+                        remaining.append(value)
+                    break
+                else:
+                    letters += char
+            if letters:
+                remaining.append("-" + letters)
+        else:
+            remaining.append(arg)
+    return level, remaining
+
+
+def compress_block(data: bytes, file_format: str, level: int) -> bytes:
+    """Compress ``data`` as one complete gzip member, bzip2 stream or xz stream."""
+    if file_format == "gzip":
+        return gzip.compress(data, compresslevel=level)
+    if file_format == "bzip2":
+        return bz2.compress(data, compresslevel=level)
+    if file_format == "xz":
+        return lzma.compress(data, format=lzma.FORMAT_XZ, preset=level)
+    raise ValueError(f"unknown compression format: {file_format}")
+
+
+def iter_blocks(chunks: Iterable[bytes], block_size: int) -> Iterator[bytes]:
+    """Regroup a stream of chunks into blocks of ``block_size`` bytes (the last may be short)."""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= block_size:
+            yield bytes(buffer[:block_size])
+            del buffer[:block_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def parallel_compress(
+    chunks: Iterable[bytes],
+    file_format: str,
+    level: int | None = None,
+    workers: int | None = None,
+) -> Iterator[bytes]:
+    """Compress a stream of chunks, yielding the compressed output in order.
+
+    At most twice ``workers`` blocks are held in memory at once.
+
+    Args:
+        chunks: The data to compress
+        file_format: "gzip", "bzip2" or "xz"
+        level: Compression level from 1 to 9 (default: the format's usual level)
+        workers: Number of blocks to compress at once (default: one per CPU)
+
+    Yields:
+        Compressed data
+    """
+    if level is None:
+        level = DEFAULT_LEVELS[file_format]
+    workers = workers or default_workers()
+    blocks = iter_blocks(chunks, BLOCK_SIZES[file_format])
+    first = next(blocks, b"")
+    second = next(blocks, None)
+    if second is None:
+        # Small input: one ordinary stream, with no pool to start.
+        yield compress_block(first, file_format, level)
+        return
+
+    def compress(block: bytes) -> bytes:
+        return compress_block(block, file_format, level)
+
+    def all_blocks() -> Iterator[bytes]:
+        yield first
+        yield second
+        yield from blocks
+
+    for _, compressed in bounded_map(compress, all_blocks(), max_workers=workers):
+        yield compressed
+
+
+def count_bytes(chunks: Iterable[bytes], on_read: Callable[[int], None]) -> Iterator[bytes]:
+    """Pass chunks through, reporting the size of each to ``on_read``."""
+    for chunk in chunks:
+        on_read(len(chunk))
+        yield chunk
@@ -0,0 +1,292 @@
+"""Checksum engine shared by md5sum, the sha*sum commands, cksum and sum.
+
+Files are read with adaptive chunk sizes (small reads for small files,
+growing to a few MiB for large ones) and many files are checksummed
+concurrently. Every requested algorithm is fed from the same read, so
+asking for several digests of a file only pulls it once. ``hashlib``
+releases the GIL while hashing large buffers, so the thread pool overlaps
+hashing as well as the network reads.
+
+The legacy BSD and System V ``sum`` algorithms and the CRC used by
+``cksum`` are provided with the same ``update`` interface as ``hashlib``.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import re
+import zlib
+from typing import TYPE_CHECKING, Any
+
+import ops
+
+from .streaming import DEFAULT_WORKERS, MAX_CHUNK_SIZE, bounded_map, iter_remote_chunks
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    import shimmer
+
+    PebbleClient = ops.pebble.Client | shimmer.PebbleCliClient
+
+
+class BsdSum:
+    """The BSD ``sum`` checksum: a 16-bit rotate-right-and-add, in 1 KiB blocks."""
+
+    def __init__(self):
+        self.checksum = 0
+        self.size = 0
+
+    def update(self, data: bytes) -> None:
+        """Add ``data`` to the checksum."""
+        # Each step depends on the rotation of the previous result, so this
+        # cannot be done with block arithmetic; keep the loop as tight as possible.
+        checksum = self.checksum
+        for byte in data:
+            checksum = ((checksum >> 1) + ((checksum & 1) << 15) + byte) & 0xFFFF
+        self.checksum = checksum
+        self.size += len(data)
+
+    def hexdigest(self) -> str:
+        """Return the checksum as hex digits."""
+        return f"{self.checksum:04x}"
+
+    def summary(self) -> str:
+        """Return the checksum and size in 1 KiB blocks, as printed by ``sum -r``."""
+        return f"{self.checksum:05d} {(self.size + 1023) // 1024:5d}"
+
+
+class SysvSum:
+    """The System V ``sum`` checksum: the byte total folded to 16 bits, in 512 byte blocks."""
+
+    def __init__(self):
+        self.total = 0
+        self.size = 0
+
+    def update(self, data: bytes) -> None:
+        """Add ``data`` to the checksum."""
+        # Summing a whole block at once runs in C rather than per byte.
+        self.total += sum(data)
+        self.size += len(data)
+
+    @property
+    def checksum(self) -> int:
+        """The 16-bit checksum."""
+        folded = (self.total & 0xFFFF) + ((self.total & 0xFFFFFFFF) >> 16)
+        return (folded & 0xFFFF) + (folded >> 16)
+
+    def hexdigest(self) -> str:
+        """Return the checksum as hex digits."""
+        return f"{self.checksum:04x}"
+
+    def summary(self) -> str:
+        """Return the checksum and size in 512 byte blocks, as printed by ``sum -s``."""
+        return f"{self.checksum} {(self.size + 511) // 512}"
+
+
+# Each byte with its bits in reverse order, for computing the POSIX CRC with zlib.
+_REVERSED_BITS = bytes(int(f"{byte:08b}"[::-1], 2) for byte in range(256))
+
+
+class Crc32:
+    """The POSIX ``cksum`` CRC and byte count.
+
+    The CRC uses the polynomial 0x04C11DB7 most significant bit first, over
+    the data followed by its length. That is the bit-reversed form of the
+    CRC-32 computed by ``zlib``, so the data is fed to ``zlib.crc32`` with
+    the bits of each byte reversed, keeping the work per byte in C.
+    """
+
+    def __init__(self):
+        # The CRC register, bit-reversed; zlib.crc32 inverts it on the way
+        # in and out.
+        self.register = 0
+        self.size = 0
+
+    def update(self, data: bytes) -> None:
+        """Add ``data`` to the checksum."""
+        self.register = self._feed(self.register, data)
+        self.size += len(data)
+
+    @staticmethod
+    def _feed(register: int, data: bytes) -> int:
+        return ~zlib.crc32(data.translate(_REVERSED_BITS), ~register & 0xFFFFFFFF) & 0xFFFFFFFF
+
+    @property
+    def checksum(self) -> int:
+        """The CRC, once the length has been appended (least significant byte first)."""
+        length = self.size.to_bytes((self.size.bit_length() + 7) // 8, "little")
+        register = self._feed(self.register, length)
+        return ~int(f"{register:032b}"[::-1], 2) & 0xFFFFFFFF
+
+    def hexdigest(self) -> str:
+        """Return the checksum as hex digits."""
+        return f"{self.checksum:08x}"
+
+    def summary(self) -> str:
+        """Return the checksum and size in bytes, as printed by ``cksum``."""
+        return f"{self.checksum} {self.size}"
+
+
+SUM_ALGORITHMS = {"bsd": BsdSum, "sysv": SysvSum, "crc": Crc32}
+
+# Names used in BSD-style ("tagged") checksum lines, where they differ from
+# upper case with "-" for "_" (as in SHA3-256 for sha3_256).
+_TAG_NAMES = {"blake2b": "BLAKE2b", "blake2s": "BLAKE2s"}
+
+_TAGGED_LINE = re.compile(
+    r"^(?P<algorithm>[A-Za-z0-9-]+) \((?P<path>.*)\) = (?P<digest>[0-9a-fA-F]+)$"
+)
+_PLAIN_LINE = re.compile(r"^(?P<digest>[0-9a-fA-F]+) [ *](?P<path>.+)$")
+
+
+def is_supported(algorithm: str) -> bool:
+    """Return whether ``algorithm`` can be computed."""
+    # The SHAKE algorithms need a digest length, which checksum lines cannot give.
+    return algorithm in SUM_ALGORITHMS or (
+        algorithm in hashlib.algorithms_available and not algorithm.startswith("shake")
+    )
+
+
+def new_checksum(algorithm: str) -> Any:
+    """Create a checksum object (with ``update``) for ``algorithm``.
+
+    Raises:
+        ValueError: If the algorithm is not supported
+    """
+    factory = SUM_ALGORITHMS.get(algorithm)
+    return factory() if factory is not None else hashlib.new(algorithm)
+
+
+def tag_name(algorithm: str) -> str:
+    """Return the name of ``algorithm`` as used in tagged checksum lines."""
+    return _TAG_NAMES.get(algorithm, algorithm.upper().replace("_", "-"))
+
+
+def algorithm_from_tag(tag: str) -> str | None:
+    """Return the algorithm named ``tag`` in a tagged checksum line, or None if unsupported."""
+    algorithm = tag.lower().replace("-", "_")
+    return algorithm if is_supported(algorithm) and algorithm not in SUM_ALGORITHMS else None
+
+
+@dataclasses.dataclass
+class FileChecksum:
+    """The checksums of one file."""
+
+    path: str
+    size: int
+    checksums: dict[str, Any]
+
+    def hexdigest(self, algorithm: str) -> str:
+        """Return the hex digest computed for ``algorithm``."""
+        return self.checksums[algorithm].hexdigest()
+
+
+def checksum_file(client: PebbleClient, path: str, algorithms: Iterable[str]) -> FileChecksum:
+    """Compute every algorithm in ``algorithms`` over ``path`` in a single read."""
+    checksums = {algorithm: new_checksum(algorithm) for algorithm in algorithms}
+    updates = [checksum.update for checksum in checksums.values()]
+    size = 0
+    for chunk in iter_remote_chunks(client, path, max_chunk_size=MAX_CHUNK_SIZE):
+        size += len(chunk)
+        for update in updates:
+            update(chunk)
+    return FileChecksum(path, size, checksums)
+
+
+def checksum_files(
+    client: PebbleClient,
+    paths: Iterable[str],
+    algorithms: Iterable[str],
+    max_workers: int = DEFAULT_WORKERS,
+) -> Iterator[tuple[str, FileChecksum | Exception]]:
+    """Checksum many files concurrently, yielding results in input order.
+
+    Files that cannot be read are yielded with the exception instead.
+    """
+    algorithms = list(algorithms)
+
+    def checksum_one(path: str) -> FileChecksum | Exception:
+        try:
+            return checksum_file(client, path, algorithms)
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            return e
+
+    yield from bounded_map(checksum_one, paths, max_workers)
+
+
+@dataclasses.dataclass
+class ChecksumEntry:
+    """One line of a checksum manifest."""
+
+    digest: str
+    path: str
+    algorithm: str | None = None  # Only known for tagged lines.
+
+
+def parse_checksum_line(line: str) -> ChecksumEntry | None:
+    """Parse a ``md5sum``-style or tagged (``--tag``) checksum line.
+
+    Returns None if the line is not in either format, or names an algorithm
+    that is not supported.
+    """
+    escaped = line.startswith("\\")
+    if escaped:
+        line = line[1:]
+    match = _TAGGED_LINE.match(line)
+    if match:
+        algorithm = algorithm_from_tag(match["algorithm"])
+        if algorithm is None:
+            return None
+        entry = ChecksumEntry(match["digest"].lower(), match["path"], algorithm)
+    else:
+        match = _PLAIN_LINE.match(line)
+        if not match:
+            return None
+        entry = ChecksumEntry(match["digest"].lower(), match["path"])
+    if escaped:
+        entry.path = entry.path.replace("\\n", "\n").replace("\\\\", "\\")
+    return entry
+
+
+def verify_checksums(
+    client: PebbleClient,
+    entries: Iterable[tuple[ChecksumEntry, str]],
+    default_algorithm: str,
+    max_workers: int = DEFAULT_WORKERS,
+) -> Iterator[tuple[ChecksumEntry, bool | Exception]]:
+    """Check manifest entries against the files they name.
+
+    Entries are (entry, resolved path) pairs. Files are checked concurrently,
+    and a file listed several times (for example, with different algorithms)
+    is only read once.
+
+    Yields:
+        Each entry, in the order given, with True if it matches, False if
+        not, or the exception raised while reading the file
+    """
+    entries = list(entries)
+    algorithms: dict[str, set[str]] = {}
+    for entry, path in entries:
+        algorithms.setdefault(path, set()).add(entry.algorithm or default_algorithm)
+
+    def check(path: str) -> FileChecksum | Exception:
+        try:
+            return checksum_file(client, path, algorithms[path])
+        except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
+            return e
+
+    # Files are checked in the order they are first listed, so the result
+    # for each entry is either already in or the next to come.
+    checked = bounded_map(check, algorithms, max_workers)
+    results: dict[str, FileChecksum | Exception] = {}
+    for entry, path in entries:
+        while path not in results:
+            checked_path, result = next(checked)
+            results[checked_path] = result
+        result = results[path]
+        if isinstance(result, Exception):
+            yield entry, result
+        else:
+            yield entry, result.hexdigest(entry.algorithm or default_algorithm) == entry.digest
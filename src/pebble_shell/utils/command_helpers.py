@@ -2,22 +2,35 @@
 
 from __future__ import annotations
 
+import codecs
 import os
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any
 
 import ops
 from rich import box
-from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    Progress,
+    SpinnerColumn,
+    TextColumn,
+    TransferSpeedColumn,
+)
 from rich.table import Table
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     import shimmer
+    from rich.console import Console
 
     from .. import PebbleShell
 
     PebbleClient = ops.pebble.Client | shimmer.PebbleCliClient
 
 from . import expand_globs_in_tokens, resolve_path
+from .output_writer import OutputWriter
+from .streaming import MAX_CHUNK_SIZE, iter_decoded_lines, iter_remote_chunks
 
 
 def handle_help_flag(command_instance, args: list[str]) -> bool:
@@ -291,6 +304,41 @@ def safe_read_file(
         return None
 
 
+def safe_read_decompressed_file(
+    client: PebbleClient,
+    file_path: str,
+    shell: PebbleShell | None = None,
+) -> str | None:
+    """Safely read a text file, decompressing it if it is compressed.
+
+    gzip, bzip2, xz and lzma files are recognised from their magic bytes
+    and decompressed as they are read; other files are read as they are.
+    Invalid UTF-8 is replaced rather than raising an error.
+
+    Args:
+        client: Pebble client
+        file_path: Path to file to read
+        shell: Shell instance for error reporting
+
+    Returns:
+        File content as string or None if reading failed
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        pieces = [
+            decoder.decode(chunk)
+            for chunk in iter_remote_chunks(
+                client, file_path, max_chunk_size=MAX_CHUNK_SIZE, decompress=True
+            )
+        ]
+    except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
+        if shell:
+            shell.console.print(f"Error reading file {file_path}: {e}")
+        return None
+    pieces.append(decoder.decode(b"", final=True))
+    return "".join(pieces)
+
+
 def safe_read_file_lines(
     client: PebbleClient,
     file_path: str,
@@ -298,6 +346,9 @@ def safe_read_file_lines(
 ) -> list[str] | None:
     """Safely read a file and return its lines.
 
+    Compressed files are decompressed (see ``safe_read_decompressed_file``).
+    The file is split into lines as it is read, so only the lines are kept.
+
     Args:
         client: Pebble client
         file_path: Path to file to read
@@ -307,21 +358,24 @@ def safe_read_file_lines(
         List of file lines or None if reading failed
     """
     try:
-        with client.pull(file_path) as file:
-            content = file.read()
-            if isinstance(content, bytes):
-                try:
-                    content = content.decode("utf-8")
-                except UnicodeDecodeError:
-                    content = cast("bytes", content).decode("utf-8", errors="replace")
-            # content is now str
-            return content.splitlines()
-    except ops.pebble.PathError as e:
+        return list(iter_decoded_lines(iter_remote_chunks(client, file_path, decompress=True)))
+    except (ops.pebble.PathError, ops.pebble.APIError, ValueError) as e:
         if shell:
             shell.console.print(f"Error reading file {file_path}: {e}")
         return None
 
 
+def print_text_chunks(console: Console, chunks: Iterable[bytes]) -> None:
+    """Print a stream of UTF-8 text to the console in batches, as it is read.
+
+    Characters split across chunks are put back together; invalid UTF-8 is
+    replaced rather than raising an error. When the console is not a
+    terminal, the bytes are written to it unchanged (see OutputWriter).
+    """
+    with OutputWriter(console) as writer:
+        writer.write_chunks(chunks)
+
+
 def create_standard_table() -> Table:
     """Create a standard Rich table with common styling."""
     return Table(
@@ -353,6 +407,19 @@ def create_file_progress() -> Progress:
     )
 
 
+def create_transfer_progress(console: Console) -> Progress:
+    """Create a progress display showing bytes transferred and throughput."""
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("{task.description}"),
+        DownloadColumn(binary_units=True),
+        TransferSpeedColumn(),
+        console=console,
+        transient=True,
+        disable=not console.is_terminal,
+    )
+
+
 # Standard column configurations for common table types
 COLUMN_CONFIGS = {
     "name": ("Name", "bold", False, "left"),
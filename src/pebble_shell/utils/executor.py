@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import contextlib
 import io
-import re
 import sys
 from typing import TYPE_CHECKING
 
@@ -20,6 +19,7 @@ from .pathutils import resolve_path
 if TYPE_CHECKING:
     from ..commands import AliasCommand, Command
     from ..shell import PebbleShell
+    from .pipeline_fusion import FusedPipeline
 
 
 class CommandOutput:
@@ -114,11 +114,12 @@ class PipelineExecutor:
         Returns:
             Exit code of the last command
         """
-        # Collect all commands in the pipe sequence.
+        # Collect all commands in the pipe sequence, expanding their globs
+        # now, against the directory and files left by the commands before.
         pipe_commands: list[ParsedCommand] = []
         current = start_cmd
         while current:
-            pipe_commands.append(current)
+            pipe_commands.append(self.parser.expand_globs(current))
             if current.type == CommandType.PIPE:
                 current = current.next_command
             else:
@@ -171,6 +172,12 @@ class PipelineExecutor:
         Returns:
             Exit code of the last command
         """
+        from .pipeline_fusion import plan_pipeline
+
+        plan = plan_pipeline(pipe_commands, self.commands)
+        if plan is not None:
+            return self._run_fused_pipeline(plan)
+
         # Start with no input
         pipe_input = None
         exit_code = 0
@@ -202,6 +209,45 @@ class PipelineExecutor:
 
         return exit_code
 
+    def _run_fused_pipeline(self, plan: FusedPipeline) -> int:
+        """Execute a pipeline that has been rewritten into fused operators.
+
+        Args:
+            plan: The fused plan for the pipeline
+
+        Returns:
+            Exit code of the last command
+        """
+        from .pipeline_fusion import FusionContext
+
+        output = CommandOutput()
+        context = FusionContext(
+            client=self.client,
+            shell=self._shell,
+            commands=self.commands,
+            output=output,
+            run_command=self._run_command,
+        )
+        try:
+            exit_code = plan.run(context)
+        except Exception as e:
+            output.write_stderr(f"Execution error: {e}\n")
+            exit_code = 1
+
+        last = plan.stages[-1]
+        if last.type == CommandType.REDIRECT_OUT and last.target:
+            self._write_to_file(last.target, output.get_stdout(), append=False)
+        elif last.type == CommandType.REDIRECT_APPEND and last.target:
+            self._write_to_file(last.target, output.get_stdout(), append=True)
+        else:
+            stdout_content = output.get_stdout()
+            if stdout_content:
+                print(stdout_content, end="")
+        stderr_content = output.get_stderr()
+        if stderr_content:
+            print(stderr_content, end="", file=sys.stderr)
+        return exit_code
+
     def _run_command(
         self, cmd: ParsedCommand, pipe_input: str | None, output: CommandOutput
     ) -> int:
@@ -246,10 +292,26 @@ class PipelineExecutor:
                 try:
                     # If command supports piped input, modify args
                     args = cmd.args.copy()
-                    if pipe_input and cmd.command in ["grep", "wc", "sort", "cut"]:
+                    # pv passes its input on even when there is none.
+                    piped = bool(pipe_input) or (
+                        pipe_input is not None and cmd.command in ("pv", "pipe_progress")
+                    )
+                    if piped and cmd.command in [
+                        "grep",
+                        "egrep",
+                        "fgrep",
+                        "wc",
+                        "sort",
+                        "cut",
+                        "tr",
+                        "expand",
+                        "unexpand",
+                        "fold",
+                        "pv",
+                        "pipe_progress",
+                    ]:
                         # Special handling for text processing commands
-                        self._handle_piped_text_command(cmd, pipe_input, output)
-                        return 0
+                        return self._handle_piped_text_command(cmd, pipe_input, output)
                     else:
                         # Regular command execution
                         return command_instance.execute(self.client, args)
@@ -273,63 +335,42 @@ class PipelineExecutor:
 
     def _handle_piped_text_command(
         self, cmd: ParsedCommand, pipe_input: str, output: CommandOutput
-    ) -> None:
-        """Handle text processing commands with piped input."""
+    ) -> int:
+        """Handle text processing commands with piped input.
+
+        Returns:
+            Exit code
+        """
         lines = pipe_input.splitlines()
 
-        if cmd.command == "grep":
-            if not cmd.args:
-                output.write_stderr("grep: missing pattern\n")
-                return
+        if cmd.command in ("grep", "egrep", "fgrep"):
+            # grep searches piped input with the same engine (and flags) as files.
+            return self.commands[cmd.command].execute_piped(self.client, cmd.args, pipe_input)
 
-            pattern = cmd.args[0]
+        if cmd.command in ("pv", "pipe_progress"):
+            # pv passes the input on unchanged, measuring it.
+            return self.commands[cmd.command].execute_piped(self.client, cmd.args, pipe_input)
 
-            try:
-                if pattern.startswith("/") and pattern.endswith("/"):
-                    regex = re.compile(pattern[1:-1])
-                else:
-                    regex = re.compile(re.escape(pattern))
-
-                for line in lines:
-                    if regex.search(line):
-                        output.write_stdout(f"{line}\n")
-            except re.error:
-                output.write_stderr(f"grep: invalid pattern: {pattern}\n")
-
-        elif cmd.command == "wc":
-            show_lines = True
-            show_words = True
-            show_chars = True
-
-            if "-l" in cmd.args:
-                show_lines, show_words, show_chars = True, False, False
-            elif "-w" in cmd.args:
-                show_lines, show_words, show_chars = False, True, False
-            elif "-c" in cmd.args:
-                show_lines, show_words, show_chars = False, False, True
-
-            line_count = len(lines)
-            word_count = sum(len(line.split()) for line in lines)
-            char_count = len(pipe_input)
-
-            result: list[str] = []
-            if show_lines:
-                result.append(f"{line_count:8}")
-            if show_words:
-                result.append(f"{word_count:8}")
-            if show_chars:
-                result.append(f"{char_count:8}")
-
-            output.write_stdout(" ".join(result) + "\n")
+        if cmd.command == "wc":
+            from .command_helpers import parse_flags
+            from .word_count import WC_FLAGS, count_chunks, format_counts, selected_columns
+
+            parsed = parse_flags(cmd.args, WC_FLAGS)
+            if parsed is None:
+                output.write_stderr("wc: invalid option\n")
+                return 1
+            counts = count_chunks([pipe_input.encode("utf-8")])
+            output.write_stdout(format_counts(counts, selected_columns(parsed[0])) + "\n")
 
         elif cmd.command == "sort":
-            reverse = "-r" in cmd.args
+            from .external_sort import external_sort, parse_sort_args
+
             try:
-                sorted_lines = sorted(lines, reverse=reverse)
-                for line in sorted_lines:
-                    output.write_stdout(f"{line}\n")
-            except Exception as e:
+                options, _ = parse_sort_args(cmd.args)
+                output.write_stdout("".join(f"{line}\n" for line in external_sort(lines, options)))
+            except ValueError as e:
                 output.write_stderr(f"sort: {e}\n")
+                return 1
 
         elif cmd.command == "cut":
             # Simple cut implementation for piped input
@@ -356,6 +397,22 @@ class PipelineExecutor:
             else:
                 output.write_stderr("cut: field specification required for piped input\n")
 
+        elif cmd.command in ("tr", "expand", "unexpand", "fold"):
+            from .text_transform import build_transformer
+
+            try:
+                built = build_transformer(cmd.command, cmd.args)
+            except ValueError as e:
+                output.write_stderr(f"{cmd.command}: {e}\n")
+                return 1
+            if built is None:
+                output.write_stderr(f"{cmd.command}: invalid option\n")
+                return 1
+            make_transformer, _ = built
+            data = make_transformer().run([pipe_input.encode("utf-8", errors="replace")])
+            output.write_stdout(b"".join(data).decode("utf-8", errors="replace"))
+        return 0
+
     def _write_to_file(self, filename: str, content: str, append: bool = False) -> None:
         """Write content to a file using Pebble.
 
@@ -0,0 +1,409 @@
+"""External merge sort of text lines, with ``sort``-style keys.
+
+Sorting a multi-gigabyte log in memory is not an option, so lines are
+collected until a memory budget is reached, sorted, and written ("spilled")
+to a temporary file as a sorted run. The runs are then combined with a
+k-way ``heapq.merge``, which only holds one line per run in memory. Sort
+keys are computed once per line, before sorting, from the ``-k``/``-t``
+field specifications and the ``-n``, ``-h``, ``-f`` and ``-b`` modifiers.
+Runs can optionally be sorted in a process pool, so several CPU cores sort
+at once while the main process keeps reading input.
+
+As with ``LC_ALL=C sort``, strings are compared by code point.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import dataclasses
+import functools
+import heapq
+import itertools
+import os
+import re
+import shutil
+import tempfile
+from typing import TYPE_CHECKING, Any
+
+from .command_helpers import parse_flags
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# Default memory budget for lines held before a run is spilled to disk.
+DEFAULT_BUFFER_SIZE = 64 * 1024 * 1024
+
+# Approximate per-line overhead of a str in a list, on top of its characters.
+_LINE_OVERHEAD = 64
+
+_NUMBER = re.compile(r"\s*(-?)(\d*)(?:\.(\d*))?")
+_HUMAN = re.compile(r"\s*(-?)(\d*(?:\.\d*)?)([KMGTPEZY]?)", re.IGNORECASE)
+_HUMAN_SUFFIXES = " KMGTPEZY"
+_KEY_SPEC = re.compile(r"^(\d+)(?:\.(\d+))?([bdfhnr]*)(?:,(\d+)(?:\.(\d+))?([bdfhnr]*))?$")
+_SIZE = re.compile(r"^(\d+)([bKMGT%]?)$", re.IGNORECASE)
+_SIZE_MULTIPLIERS = {"": 1024, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+
+@dataclasses.dataclass(frozen=True)
+class KeySpec:
+    """A ``-k`` key: fields (and characters) to compare, and how to compare them.
+
+    Field and character numbers are 1-based, as on the command line. An
+    ``end_field`` of None means the end of the line; an ``end_char`` of 0
+    means the end of the end field.
+    """
+
+    start_field: int
+    start_char: int = 1
+    end_field: int | None = None
+    end_char: int = 0
+    numeric: bool = False
+    human: bool = False
+    fold_case: bool = False
+    ignore_blanks: bool = False
+    reverse: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class SortOptions:
+    """Options controlling how lines are compared and output."""
+
+    keys: tuple[KeySpec, ...] = ()
+    separator: str | None = None
+    reverse: bool = False
+    unique: bool = False
+    stable: bool = False
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+    temp_dir: str | None = None
+    parallel: int = 1
+
+
+def _parse_key(text: str, defaults: dict[str, bool]) -> KeySpec:
+    match = _KEY_SPEC.match(text)
+    if not match:
+        raise ValueError(f"invalid key specification: {text!r}")
+    start_field, start_char, start_opts, end_field, end_char, end_opts = match.groups()
+    if int(start_field) == 0 or (start_char is not None and int(start_char) == 0):
+        raise ValueError(f"invalid key specification: {text!r}: fields start at 1")
+    modifiers = (start_opts or "") + (end_opts or "")
+    # Global options apply to keys that have no modifiers of their own.
+    options = (
+        {
+            "numeric": "n" in modifiers,
+            "human": "h" in modifiers,
+            "fold_case": "f" in modifiers,
+            "ignore_blanks": "b" in modifiers,
+            "reverse": "r" in modifiers,
+        }
+        if modifiers
+        else defaults
+    )
+    return KeySpec(
+        start_field=int(start_field),
+        start_char=int(start_char or 1),
+        end_field=int(end_field) if end_field is not None else None,
+        end_char=int(end_char or 0),
+        **options,
+    )
+
+
+def parse_buffer_size(text: str) -> int:
+    """Parse a ``-S`` buffer size: bytes with a b, K, M, G or T suffix (K by default).
+
+    Raises:
+        ValueError: If ``text`` is not a valid size
+    """
+    match = _SIZE.match(text)
+    if not match or match.group(2) == "%":
+        raise ValueError(f"invalid buffer size: {text!r}")
+    return int(match.group(1)) * _SIZE_MULTIPLIERS[match.group(2).lower()]
+
+
+def parse_sort_args(args: list[str]) -> tuple[SortOptions, list[str]]:
+    """Parse ``sort`` command line arguments.
+
+    Returns:
+        The sort options and the remaining (file) arguments
+
+    Raises:
+        ValueError: If an option is invalid
+    """
+    # parse_flags keeps only the last value of a flag, but -k may be repeated;
+    # -t is taken here too, as its value is often attached (-t:), and attached
+    # -S/-T values (-S1G) are split off for parse_flags.
+    key_texts: list[str] = []
+    separator: str | None = None
+    rest: list[str] = []
+    arg_iter = iter(args)
+    for arg in arg_iter:
+        if arg in ("-k", "--key", "-t", "--field-separator"):
+            value = next(arg_iter, None)
+            if value is None:
+                raise ValueError(f"option requires an argument: {arg}")
+            if arg in ("-k", "--key"):
+                key_texts.append(value)
+            else:
+                separator = value
+        elif arg.startswith("--key="):
+            key_texts.append(arg[len("--key=") :])
+        elif arg.startswith("--field-separator="):
+            separator = arg[len("--field-separator=") :]
+        elif arg.startswith("-k") and len(arg) > 2:
+            key_texts.append(arg[2:])
+        elif arg.startswith("-t") and len(arg) > 2:
+            separator = arg[2:]
+        elif arg.startswith(("-S", "-T")) and len(arg) > 2:
+            rest.extend((arg[:2], arg[2:]))
+        else:
+            rest.append(arg)
+
+    parsed = parse_flags(
+        rest,
+        {
+            "r": bool,  # reverse
+            "n": bool,  # numeric
+            "h": bool,  # human-readable sizes (2K, 1G)
+            "f": bool,  # fold lower case to upper case
+            "b": bool,  # ignore leading blanks
+            "u": bool,  # output only the first of equal lines
+            "s": bool,  # stable: no last-resort comparison
+            "S": str,  # memory budget
+            "T": str,  # directory for temporary files
+            "parallel": int,  # processes to sort runs with
+        },
+    )
+    if parsed is None:
+        raise ValueError("invalid option")
+    flags, files = parsed
+    if separator is not None and len(separator) != 1:
+        if separator != "\\0":
+            raise ValueError(f"multi-character tab {separator!r}")
+        separator = "\0"
+    defaults = {
+        "numeric": flags["n"],
+        "human": flags["h"],
+        "fold_case": flags["f"],
+        "ignore_blanks": flags["b"],
+        "reverse": flags["r"],
+    }
+    keys = tuple(_parse_key(text, defaults) for text in key_texts)
+    if not keys and (flags["n"] or flags["h"] or flags["f"] or flags["b"]):
+        # Global modifiers without -k apply to the whole line.
+        keys = (KeySpec(1, **defaults),)
+    return (
+        SortOptions(
+            keys=keys,
+            separator=separator,
+            reverse=flags["r"],
+            unique=flags["u"],
+            stable=flags["s"],
+            buffer_size=parse_buffer_size(flags["S"]) if flags["S"] else DEFAULT_BUFFER_SIZE,
+            temp_dir=flags["T"],
+            parallel=max(flags["parallel"] or 1, 1),
+        ),
+        files,
+    )
+
+
+def _numeric_value(text: str) -> float:
+    match = _NUMBER.match(text)
+    sign, whole, fraction = match.groups()  # type: ignore[union-attr]
+    if not whole and not fraction:
+        return 0.0
+    value = float(f"{whole or 0}.{fraction or 0}")
+    return -value if sign else value
+
+
+def _human_value(text: str) -> tuple[int, float]:
+    match = _HUMAN.match(text)
+    sign, number, suffix = match.groups()  # type: ignore[union-attr]
+    try:
+        value = float(number) if number and number != "." else 0.0
+    except ValueError:
+        value = 0.0
+    # Like GNU sort -h, the suffix decides first (1G > 900M), then the number.
+    rank = _HUMAN_SUFFIXES.index(suffix.upper()) if suffix else 0
+    if not value:
+        return (0, 0.0)
+    return (-rank, -value) if sign else (rank, value)
+
+
+@functools.total_ordering
+class _Reversed:
+    """Wraps a key so that it sorts in the opposite order."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Reversed) and self.value == other.value
+
+    def __lt__(self, other: _Reversed) -> bool:
+        return other.value < self.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+
+class LineKey:
+    """Computes the sort key of a line. Instances can be sent to worker processes."""
+
+    def __init__(self, options: SortOptions, last_resort: bool = True):
+        self.options = options
+        self.keys = options.keys
+        # GNU sort compares whole lines when all keys are equal, unless -s or -u.
+        self.last_resort = last_resort and not options.stable and not options.unique
+        # Keys without modifiers of their own inherit -r, which reverses the
+        # whole sort; only keys whose direction differs need to be wrapped.
+        self.flip = [key.reverse != options.reverse for key in self.keys]
+        self.whole_line = [
+            key.start_field == 1 and key.start_char == 1 and key.end_field is None
+            for key in self.keys
+        ]
+        self.needs_fields = not all(self.whole_line)
+
+    def _split(self, line: str) -> list[str]:
+        separator = self.options.separator
+        if separator is not None:
+            return line.split(separator)
+        # Without -t, each field includes the blanks that precede it.
+        return re.findall(r"\s*\S+", line) or [line]
+
+    def _field_text(self, fields: list[str], key: KeySpec) -> str:
+        start = key.start_field - 1
+        if start >= len(fields):
+            return ""
+        first = fields[start]
+        if key.ignore_blanks:
+            first = first.lstrip()
+        if key.end_field is None:
+            rest = fields[start + 1 :]
+            text = first[key.start_char - 1 :]
+            if rest:
+                joiner = self.options.separator or ""
+                text = joiner.join([text, *rest])
+            return text
+        end = min(key.end_field, len(fields)) - 1
+        if end < start:
+            return ""
+        if end == start:
+            stop = key.end_char if key.end_char else None
+            return first[key.start_char - 1 : stop]
+        last = fields[end]
+        if key.ignore_blanks:
+            last = last.lstrip()
+        if key.end_char:
+            last = last[: key.end_char]
+        joiner = self.options.separator or ""
+        return joiner.join([first[key.start_char - 1 :], *fields[start + 1 : end], last])
+
+    def _key_value(self, text: str, key: KeySpec) -> Any:
+        if key.numeric:
+            return _numeric_value(text)
+        if key.human:
+            return _human_value(text)
+        if key.ignore_blanks:
+            text = text.lstrip()
+        return text.upper() if key.fold_case else text
+
+    def __call__(self, line: str) -> Any:
+        """Return the sort key of ``line``."""
+        if not self.keys:
+            return line
+        fields = self._split(line) if self.needs_fields else []
+        values: list[Any] = []
+        for key, flip, whole_line in zip(self.keys, self.flip, self.whole_line, strict=True):
+            text = line if whole_line else self._field_text(fields, key)
+            value = self._key_value(text, key)
+            values.append(_Reversed(value) if flip else value)
+        if self.last_resort:
+            values.append(line)
+        return tuple(values)
+
+
+def _line_size(line: str) -> int:
+    return len(line) + _LINE_OVERHEAD
+
+
+def _write_run(lines: list[str], key: LineKey, reverse: bool, temp_dir: str) -> str:
+    """Sort ``lines`` and write them to a new temporary file; return its path."""
+    lines.sort(key=key, reverse=reverse)
+    fd, path = tempfile.mkstemp(prefix="sort-run-", suffix=".txt", dir=temp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8", errors="surrogateescape", newline="\n") as f:
+        f.writelines(line + "\n" for line in lines)
+    return path
+
+
+def _read_run(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8", errors="surrogateescape", newline="\n") as f:
+        for line in f:
+            yield line[:-1]
+
+
+def _unique(lines: Iterable[str], key: LineKey) -> Iterator[str]:
+    """Keep the first of each run of lines with equal keys."""
+    for _, group in itertools.groupby(lines, key=key):
+        yield next(group)
+
+
+def external_sort(lines: Iterable[str], options: SortOptions) -> Iterator[str]:
+    """Sort lines, spilling sorted runs to temporary files if they do not fit in memory.
+
+    Args:
+        lines: Lines without their trailing newline (the input can be lazy)
+        options: How to compare and output the lines
+
+    Yields:
+        The sorted lines
+    """
+    key = LineKey(options)
+    reverse = options.reverse
+    buffer: list[str] = []
+    buffered = 0
+    runs: list[str] = []
+    pending: list[concurrent.futures.Future[str]] = []
+    pool: concurrent.futures.ProcessPoolExecutor | None = None
+    # Only touch the disk if the input does not fit in the buffer.
+    temp_dir = ""
+
+    try:
+        try:
+            for line in lines:
+                buffer.append(line)
+                buffered += _line_size(line)
+                if buffered < options.buffer_size:
+                    continue
+                if not temp_dir:
+                    temp_dir = tempfile.mkdtemp(prefix="cascade-sort-", dir=options.temp_dir)
+                if options.parallel > 1:
+                    if pool is None:
+                        pool = concurrent.futures.ProcessPoolExecutor(options.parallel)
+                    # Don't queue more runs than there are workers, or memory
+                    # use would grow past the budget while they wait.
+                    if len(pending) >= options.parallel:
+                        runs.append(pending.pop(0).result())
+                    pending.append(pool.submit(_write_run, buffer, key, reverse, temp_dir))
+                else:
+                    runs.append(_write_run(buffer, key, reverse, temp_dir))
+                buffer = []
+                buffered = 0
+            runs.extend(future.result() for future in pending)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        buffer.sort(key=key, reverse=reverse)
+        if runs:
+            # Runs come before the in-memory tail in input order, so merging
+            # (which prefers earlier inputs on ties) keeps the sort stable.
+            merged = heapq.merge(*map(_read_run, runs), buffer, key=key, reverse=reverse)
+        else:
+            merged = iter(buffer)
+        if options.unique:
+            merged = _unique(merged, LineKey(options, last_resort=False))
+        yield from merged
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
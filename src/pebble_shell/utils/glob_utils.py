@@ -1,16 +1,313 @@
-"""Remote glob expansion utilities for Pebble filesystem."""
+"""Remote glob expansion utilities for Pebble filesystem.
+
+Patterns are matched a path segment at a time, so wildcards can appear in
+any segment (``/var/log/*/app-*.log``), ``**`` matches any number of
+directories (and can be used more than once), and ``{a,b}`` alternatives are
+expanded first, as in bash. Each directory is listed at most once per
+expansion, and the directories at one level are listed concurrently.
+Names starting with a dot are only matched by a pattern that starts with one.
+"""
 
 from __future__ import annotations
 
+import concurrent.futures
 import fnmatch
 import os
+import posixpath
+import re
 from typing import TYPE_CHECKING
 
 import ops
 
+from .pathutils import resolve_path
+from .streaming import DEFAULT_WORKERS
+
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     import shimmer
 
+# Most paths a single pattern may expand to.
+MAX_GLOB_MATCHES = 10000
+
+_MAGIC = re.compile(r"[*?]|\[[^\]]+\]")
+
+
+class GlobError(ValueError):
+    """Raised when a glob pattern matches more than the allowed number of paths."""
+
+
+def has_magic(pattern: str) -> bool:
+    """Whether a pattern contains wildcards (``*``, ``?`` or a ``[...]`` set)."""
+    return _MAGIC.search(pattern) is not None
+
+
+def expand_braces(pattern: str) -> list[str]:
+    """Expand ``{a,b}`` alternatives in a pattern, including nested ones.
+
+    Braces without a comma between them are left as they are, as in bash.
+
+    Args:
+        pattern: Pattern to expand (e.g., "/var/log/{syslog,auth.log}*")
+
+    Returns:
+        The patterns, in the order bash would give them
+    """
+    depth = 0
+    start = 0
+    for i, char in enumerate(pattern):
+        if char == "{":
+            if not depth:
+                start = i
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth:
+                continue
+            alternatives = _split_alternatives(pattern[start + 1 : i])
+            rest = expand_braces(pattern[i + 1 :])
+            if len(alternatives) == 1:
+                return [pattern[: i + 1] + suffix for suffix in rest]
+            return [
+                pattern[:start] + expanded + suffix
+                for alternative in alternatives
+                for expanded in expand_braces(alternative)
+                for suffix in rest
+            ]
+    return [pattern]
+
+
+def _split_alternatives(text: str) -> list[str]:
+    """Split the inside of a brace group on the commas that are not nested."""
+    alternatives: list[str] = []
+    depth = 0
+    current = ""
+    for char in text:
+        if char == "," and not depth:
+            alternatives.append(current)
+            current = ""
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+        current += char
+    alternatives.append(current)
+    return alternatives
+
+
+def _join(parent: str, name: str) -> str:
+    if not parent:
+        return name
+    return parent + name if parent.endswith("/") else f"{parent}/{name}"
+
+
+def _as_dir(path: str) -> str:
+    return path if path.endswith("/") else path + "/"
+
+
+class RemoteGlobExpander:
+    """Expand glob patterns against the remote filesystem.
+
+    Directory listings are kept for the lifetime of the expander, so patterns
+    expanded together (the words of one command line, say) never list the
+    same directory twice.
+
+    Args:
+        client: Pebble client for remote filesystem access
+        max_matches: Most paths a pattern may expand to
+        max_workers: Maximum number of concurrent listings
+        on_error: Called with the path and exception when a listing fails
+    """
+
+    def __init__(
+        self,
+        client: ops.pebble.Client | shimmer.PebbleCliClient,
+        max_matches: int = MAX_GLOB_MATCHES,
+        max_workers: int = DEFAULT_WORKERS,
+        on_error: Callable[[str, Exception], None] | None = None,
+    ):
+        self.client = client
+        self.max_matches = max_matches
+        self.max_workers = max_workers
+        self.on_error = on_error
+        self._listings: dict[str, list[ops.pebble.FileInfo] | None] = {}
+
+    def expand(self, pattern: str, base_path: str = "/", home_dir: str | None = None) -> list[str]:
+        """Expand a shell word the way bash does.
+
+        Brace alternatives are expanded first. Alternatives without wildcards
+        are kept as they are, and so are ones that match nothing.
+
+        Args:
+            pattern: Word to expand
+            base_path: Directory that relative patterns are matched in
+            home_dir: Home directory that ``~`` stands for
+
+        Returns:
+            The words the pattern expands to; relative patterns give relative paths
+
+        Raises:
+            GlobError: If the pattern matches too many paths
+        """
+        words: list[str] = []
+        for alternative in expand_braces(pattern):
+            matches = self.glob(alternative, base_path, home_dir) if has_magic(alternative) else []
+            words.extend(matches or [alternative])
+        if len(words) > self.max_matches:
+            raise GlobError(f"{pattern}: more than {self.max_matches} matches")
+        return words
+
+    def glob(self, pattern: str, base_path: str = "/", home_dir: str | None = None) -> list[str]:
+        """Find the paths matching a pattern (without brace alternatives).
+
+        Args:
+            pattern: Glob pattern (e.g., "*.txt", "/var/log/*/app-*.log", "**/*.py")
+            base_path: Directory that relative patterns are matched in
+            home_dir: Home directory that ``~`` stands for
+
+        Returns:
+            Sorted list of matching paths, which are relative if the pattern is
+
+        Raises:
+            GlobError: If the pattern matches too many paths
+        """
+        # A trailing slash only matches directories, and is kept on the matches.
+        dirs_only = pattern.endswith("/")
+        segments = [segment for segment in pattern.split("/") if segment]
+        if not segments:
+            return []
+        # Without wildcards, the last segment is still looked up, to check the path exists.
+        first_magic = next(
+            (i for i, segment in enumerate(segments) if segment == "**" or has_magic(segment)),
+            len(segments) - 1,
+        )
+        shown = "/".join(segments[:first_magic])
+        if pattern.startswith("/"):
+            shown = "/" + shown
+        if home_dir is not None:
+            remote = resolve_path(base_path, shown or ".", home_dir)
+        else:
+            remote = posixpath.join(base_path, shown)
+        # Each partial match, as (path to list, path as it is shown).
+        level = [(posixpath.normpath(remote), shown)]
+        # Directories shown with a trailing slash, as bash shows them.
+        start_dirs: set[str] = set()
+
+        try:
+            for i in range(first_magic, len(segments)):
+                segment = segments[i]
+                last = i == len(segments) - 1
+                if segment == "**":
+                    # On its own, "**" stands for the directory and everything
+                    # below it. Like bash with globstar, a final "**" after a
+                    # directory name (/dir/**) matches that directory as "dir/".
+                    if last and i == first_magic:
+                        start_dirs = {shown for _, shown in level}
+                    level = self._descend(level, include_files=last and not dirs_only)
+                elif has_magic(segment) or last:
+                    level = self._match(level, segment, dirs_only=dirs_only or not last)
+                else:
+                    # Directories that don't exist fail to list at the next level.
+                    level = [
+                        (posixpath.normpath(posixpath.join(path, segment)), _join(name, segment))
+                        for path, name in level
+                    ]
+                if len(level) > self.max_matches:
+                    raise GlobError(f"more than {self.max_matches} matches")
+        except GlobError as e:
+            raise GlobError(f"{pattern}: {e}") from None
+
+        # The current directory, matched by a bare "**", has no name to show.
+        matches = sorted({shown for _, shown in level if shown})
+        return [_as_dir(match) if dirs_only or match in start_dirs else match for match in matches]
+
+    def _match(
+        self, level: list[tuple[str, str]], segment: str, dirs_only: bool
+    ) -> list[tuple[str, str]]:
+        """Match one path segment against the entries of each directory in ``level``."""
+        regex = re.compile(fnmatch.translate(segment))
+        listings = self._list_all(remote for remote, _ in level)
+        matched: list[tuple[str, str]] = []
+        for remote, shown in level:
+            for info in listings[remote] or ():
+                name = info.name
+                if name in (".", "..") or (name.startswith(".") and not segment.startswith(".")):
+                    continue
+                if not regex.match(name):
+                    continue
+                if dirs_only and info.type not in (
+                    ops.pebble.FileType.DIRECTORY,
+                    ops.pebble.FileType.SYMLINK,
+                ):
+                    continue
+                matched.append((posixpath.join(remote, name), _join(shown, name)))
+        return matched
+
+    def _descend(self, level: list[tuple[str, str]], include_files: bool) -> list[tuple[str, str]]:
+        """Find the directories in ``level`` and every directory (and optionally file) below them.
+
+        Directories in ``level`` that don't exist are left out. Hidden
+        directories are not descended into, and symbolic links are not followed.
+        """
+        listings = self._list_all(remote for remote, _ in level)
+        found = [entry for entry in level if listings[entry[0]] is not None]
+        seen = {remote for remote, _ in level}
+        while level:
+            listings = self._list_all(remote for remote, _ in level)
+            next_level: list[tuple[str, str]] = []
+            for remote, shown in level:
+                for info in listings[remote] or ():
+                    if info.name.startswith("."):
+                        continue
+                    child = (posixpath.join(remote, info.name), _join(shown, info.name))
+                    if info.type == ops.pebble.FileType.DIRECTORY:
+                        if child[0] in seen:
+                            continue
+                        seen.add(child[0])
+                        next_level.append(child)
+                        found.append(child)
+                    elif include_files:
+                        found.append(child)
+                if len(found) > self.max_matches:
+                    raise GlobError(f"more than {self.max_matches} matches")
+            level = next_level
+        return found
+
+    def _list_all(self, paths: Iterable[str]) -> dict[str, list[ops.pebble.FileInfo] | None]:
+        """List the directories that haven't been listed yet, concurrently."""
+        missing = [path for path in dict.fromkeys(paths) if path not in self._listings]
+        if len(missing) == 1:
+            self._store(missing[0], self._list(missing[0]))
+        elif missing:
+            workers = min(self.max_workers, len(missing))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                for path, listing in zip(missing, pool.map(self._list, missing), strict=True):
+                    self._store(path, listing)
+        return self._listings
+
+    def _list(self, path: str) -> list[ops.pebble.FileInfo] | Exception:
+        try:
+            return self.client.list_files(path)
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            return e
+
+    def _store(self, path: str, listing: list[ops.pebble.FileInfo] | Exception) -> None:
+        if isinstance(listing, Exception):
+            if self.on_error is not None:
+                self.on_error(path, listing)
+            self._listings[path] = None
+            return
+        if (
+            len(listing) == 1
+            and getattr(listing[0], "type", None) == ops.pebble.FileType.FILE
+            and os.path.normpath(getattr(listing[0], "path", "") or "") == os.path.normpath(path)
+        ):
+            # Pebble lists a file path as the file itself: it isn't a directory.
+            self._listings[path] = None
+            return
+        self._listings[path] = listing
+
 
 def expand_remote_globs(
     client: ops.pebble.Client | shimmer.PebbleCliClient,
@@ -21,54 +318,25 @@ def expand_remote_globs(
 
     Args:
         client: Pebble client for remote filesystem access
-        pattern: Glob pattern to expand (e.g., "*.txt", "file*", "dir/*")
+        pattern: Glob pattern to expand (e.g., "*.txt", "file*", "dir/*", "/var/log/*/*.log")
         base_path: Base directory to search from (default: "/")
 
     Returns:
-        List of matching file paths
+        List of matching absolute paths, or the pattern itself if nothing
+        matched because a directory could not be listed
+
+    Raises:
+        GlobError: If the pattern matches too many paths
     """
     if not pattern or pattern == "." or pattern == "..":
         return [pattern]
 
-    # Handle absolute paths:
-    if pattern.startswith("/"):
-        base_path = "/"
-        pattern = pattern[1:]
-
-    # Split pattern into directory and filename parts:
-    dir_parts = pattern.split("/")
-    filename_pattern = dir_parts[-1]
-    dir_path = "/".join(dir_parts[:-1]) if len(dir_parts) > 1 else ""
-
-    # Resolve the directory path:
-    search_dir = os.path.join(base_path, dir_path).replace("//", "/")
-    if search_dir.endswith("/") and len(search_dir) > 1:
-        search_dir = search_dir[:-1]
-
-    try:
-        files = client.list_files(search_dir)
-    except ops.pebble.PathError:
+    failed: list[str] = []
+    expander = RemoteGlobExpander(client, on_error=lambda path, _: failed.append(path))
+    matches = expander.glob(posixpath.join(base_path, pattern))
+    if not matches and failed:
         return [pattern]
-
-    matches: list[str] = []
-    for file_info in files:
-        filename = file_info.name
-
-        if filename in (".", ".."):
-            continue
-
-        # Check if filename matches the pattern:
-        if fnmatch.fnmatch(filename, filename_pattern):
-            full_path = f"{dir_path}/{filename}" if dir_path else filename
-
-            # Handle absolute paths:
-            if pattern.startswith("/"):
-                full_path = f"/{full_path}"
-            elif not full_path.startswith("/"):
-                full_path = os.path.join(base_path, full_path).replace("//", "/")
-
-            matches.append(full_path)
-    return sorted(matches)
+    return matches
 
 
 def expand_remote_globs_recursive(
@@ -78,7 +346,8 @@ def expand_remote_globs_recursive(
 ) -> list[str]:
     """Expand glob patterns recursively against the remote filesystem.
 
-    This function handles patterns like "**/*.txt" for recursive matching.
+    This function handles patterns like "**/*.txt" for recursive matching;
+    ``**`` can appear any number of times.
 
     Args:
         client: Pebble client for remote filesystem access
@@ -87,49 +356,13 @@ def expand_remote_globs_recursive(
 
     Returns:
         List of matching file paths
+
+    Raises:
+        GlobError: If the pattern matches too many paths
     """
     if "**" not in pattern:
         return expand_remote_globs(client, pattern, base_path)
-
-    # Split pattern by **:
-    parts = pattern.split("**")
-    if len(parts) != 2:
-        return [pattern]
-
-    suffix = parts[1].lstrip("/")
-
-    matches: list[str] = []
-
-    def search_recursive(current_dir: str, remaining_pattern: str):
-        """Recursively search directories for matches."""
-        try:
-            files = client.list_files(current_dir)
-        except ops.pebble.PathError:
-            return
-
-        for file_info in files:
-            if file_info.name in (".", ".."):
-                continue
-
-            current_path = f"{current_dir}/{file_info.name}".replace("//", "/")
-
-            if file_info.type == ops.pebble.FileType.DIRECTORY:
-                # If we have a remaining pattern, continue searching:
-                if remaining_pattern:
-                    search_recursive(current_path, remaining_pattern)
-                else:
-                    # No remaining pattern, this directory matches:
-                    matches.append(current_path)
-                    # Continue searching recursively for nested directories:
-                    search_recursive(current_path, remaining_pattern)
-            # It's a file, check if it matches the remaining pattern:
-            elif not remaining_pattern or fnmatch.fnmatch(file_info.name, remaining_pattern):
-                matches.append(current_path)
-
-    # Start recursive search:
-    search_recursive(base_path, suffix)
-
-    return sorted(matches)
+    return RemoteGlobExpander(client).glob(posixpath.join(base_path, pattern))
 
 
 def expand_globs_in_tokens(
@@ -0,0 +1,890 @@
+"""Read streams of JSON values and run jq-style filters over them.
+
+``iter_json_values`` parses a stream of chunks as a sequence of JSON
+values, one at a time, so NDJSON (or any concatenation of JSON texts) is
+processed in memory proportional to the largest record rather than the
+whole file. ``compile_filter`` turns a filter expression in a subset of the
+jq language into a function from one input value to its outputs.
+
+The supported language:
+
+* Paths: ``.``, ``.foo``, ``."a key"``, ``.[0]``, ``.[1:3]``, ``.[]``,
+  ``.foo[]?`` and ``.items.0`` (a digit after a dot indexes an array).
+* Pipes and commas: ``.a | .b``, ``.a, .b``.
+* Operators: ``== != < <= > >=``, ``and``, ``or``, ``//`` and
+  ``+ - * / %``.
+* Literals, ``( )``, array construction ``[...]`` and object construction
+  ``{a: .x, b, "c": 1, (.k): .v}``.
+* Conditionals: ``if .a then .b elif .c then .d else .e end`` (the
+  ``else`` branch may be left out, keeping the input).
+* Functions: ``select(f)``, ``map(f)``, ``has(f)``, ``test(f)``,
+  ``startswith(f)``, ``endswith(f)``, ``contains(f)``, ``join(f)``,
+  ``not``, ``length``, ``keys``, ``values``, ``type``, ``add``, ``first``,
+  ``last``, ``tostring``, ``tonumber``, ``ascii_downcase``,
+  ``ascii_upcase`` and ``empty``.
+
+Filters that always produce exactly one output, such as paths and
+comparisons between them, are compiled to plain functions rather than
+generators, so that ``select(.level == "error")`` costs a few dictionary
+lookups per record.
+"""
+
+from __future__ import annotations
+
+import codecs
+import itertools
+import json
+import math
+import re
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# What may follow a number that could still be part of it.
+_NUMBER_TAIL = re.compile(r"[0-9eE+\-.]*\Z")
+
+# Literals that a chunk may end in the middle of.
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+
+# Longest piece of a number or \uXXXX escape that the decoder may stop
+# short of when a chunk ends in the middle of it (as in "[1." or "\u00").
+_PARTIAL_TOKEN_SIZE = 8
+
+
+def _incomplete(error: json.JSONDecodeError, buffer: str) -> bool:
+    """Whether a decoding error could be fixed by reading more of the stream.
+
+    An error close to the end of the buffer may just be a token cut off by
+    the end of a chunk; if it is a real error, it is raised once more of
+    the stream has been read.
+    """
+    if len(buffer) - error.pos <= _PARTIAL_TOKEN_SIZE:
+        return True
+    if error.msg.startswith("Unterminated string"):
+        return True
+    rest = buffer[error.pos :]
+    return any(literal.startswith(rest) for literal in _LITERALS)
+
+
+def iter_json_values(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Parse a stream of UTF-8 chunks as a sequence of JSON values.
+
+    Values may be separated by any whitespace (or nothing, between objects
+    and arrays), so this reads NDJSON, concatenated JSON and single
+    documents alike.
+
+    Raises:
+        ValueError: If the stream is not a sequence of JSON values
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    at_end = False
+    # Characters that must be buffered before trying again to decode a
+    # value that was incomplete; doubling it keeps a huge value linear.
+    retry_at = 0
+    count = 0
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()  # type: ignore[union-attr]
+        remaining = len(buffer) - pos
+        if remaining and (at_end or remaining >= retry_at):
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if at_end or not _incomplete(e, buffer):
+                    raise ValueError(f"{e.msg} (in value {count + 1})") from None
+                retry_at = 2 * remaining
+            else:
+                if at_end or not (
+                    isinstance(value, (int, float))
+                    and not isinstance(value, bool)
+                    and _NUMBER_TAIL.match(buffer, end)
+                ):
+                    count += 1
+                    retry_at = 0
+                    pos = end
+                    yield value
+                    continue
+        if at_end:
+            return
+        chunk = next(chunks, None)
+        if chunk is None:
+            at_end = True
+            text = text_decoder.decode(b"", final=True)
+        else:
+            text = text_decoder.decode(chunk)
+        buffer = buffer[pos:] + text
+        pos = 0
+
+
+class _Filter:
+    """A compiled filter.
+
+    ``run`` maps an input to an iterable of outputs; ``single``, when set,
+    maps an input to its one and only output.
+    """
+
+    __slots__ = ("run", "single")
+
+    def __init__(
+        self,
+        run: Callable[[Any], Iterable[Any]] | None = None,
+        single: Callable[[Any], Any] | None = None,
+    ):
+        if run is None:
+            assert single is not None
+            run = _run_single(single)
+        self.run = run
+        self.single = single
+
+
+def _run_single(single: Callable[[Any], Any]) -> Callable[[Any], Iterable[Any]]:
+    return lambda value: (single(value),)
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _truthy(value: Any) -> bool:
+    return value is not None and value is not False
+
+
+# jq orders values of different types: null < false < true < numbers < strings < arrays < objects.
+def _sort_key(value: Any) -> tuple:
+    if value is None:
+        return (0,)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    if isinstance(value, list):
+        return (4, [_sort_key(item) for item in value])
+    return (5, sorted((k, _sort_key(v)) for k, v in value.items()))
+
+
+def _equal(left: Any, right: Any) -> bool:
+    # Unlike Python, jq never treats booleans as numbers.
+    if isinstance(left, bool) or isinstance(right, bool):
+        return left is right
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return left == right
+    if type(left) is not type(right):
+        return False
+    if isinstance(left, list):
+        return len(left) == len(right) and all(map(_equal, left, right))
+    if isinstance(left, dict):
+        return left.keys() == right.keys() and all(_equal(v, right[k]) for k, v in left.items())
+    return left == right
+
+
+_COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": _equal,
+    "!=": lambda a, b: not _equal(a, b),
+    "<": lambda a, b: _sort_key(a) < _sort_key(b),
+    "<=": lambda a, b: _sort_key(a) <= _sort_key(b),
+    ">": lambda a, b: _sort_key(a) > _sort_key(b),
+    ">=": lambda a, b: _sort_key(a) >= _sort_key(b),
+}
+
+
+def _cannot(operation: str, left: Any, right: Any) -> ValueError:
+    return ValueError(f"{_type_name(left)} and {_type_name(right)} cannot be {operation}")
+
+
+def _number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _add(left: Any, right: Any) -> Any:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if _number(left) and _number(right):
+        return left + right
+    if type(left) is type(right) and isinstance(left, (str, list)):
+        return left + right
+    if isinstance(left, dict) and isinstance(right, dict):
+        return {**left, **right}
+    raise _cannot("added", left, right)
+
+
+def _subtract(left: Any, right: Any) -> Any:
+    if _number(left) and _number(right):
+        return left - right
+    if isinstance(left, list) and isinstance(right, list):
+        return [item for item in left if not any(_equal(item, other) for other in right)]
+    raise _cannot("subtracted", left, right)
+
+
+def _multiply(left: Any, right: Any) -> Any:
+    if _number(left) and _number(right):
+        return left * right
+    raise _cannot("multiplied", left, right)
+
+
+def _divide(left: Any, right: Any) -> Any:
+    if _number(left) and _number(right):
+        if right == 0:
+            raise ValueError(f"{left} and {right} cannot be divided because the divisor is zero")
+        result = left / right
+        return int(result) if result.is_integer() and math.isfinite(result) else result
+    if isinstance(left, str) and isinstance(right, str):
+        return left.split(right)
+    raise _cannot("divided", left, right)
+
+
+def _modulo(left: Any, right: Any) -> Any:
+    if _number(left) and _number(right):
+        if int(right) == 0:
+            raise ValueError(f"{left} and {right} cannot be divided because the divisor is zero")
+        return int(math.fmod(int(left), int(right)))
+    raise _cannot("divided", left, right)
+
+
+_ARITHMETIC: dict[str, Callable[[Any, Any], Any]] = {
+    "+": _add,
+    "-": _subtract,
+    "*": _multiply,
+    "/": _divide,
+    "%": _modulo,
+}
+
+
+def _field(value: Any, name: str) -> Any:
+    if isinstance(value, dict):
+        return value.get(name)
+    if value is None:
+        return None
+    if isinstance(value, list) and name.isdigit():
+        return _index(value, int(name))
+    raise ValueError(f'Cannot index {_type_name(value)} with "{name}"')
+
+
+def _index(value: Any, index: Any) -> Any:
+    if isinstance(index, str):
+        return _field(value, index)
+    if value is None:
+        return None
+    if isinstance(value, list) and _number(index):
+        position = math.floor(index)
+        if position < 0:
+            position += len(value)
+        return value[position] if 0 <= position < len(value) else None
+    raise ValueError(f"Cannot index {_type_name(value)} with {_type_name(index)}")
+
+
+def _slice(value: Any, start: Any, stop: Any) -> Any:
+    if value is None:
+        return None
+    if not isinstance(value, (list, str)):
+        raise ValueError(f"Cannot index {_type_name(value)} with object")
+    for bound in (start, stop):
+        if bound is not None and not _number(bound):
+            raise ValueError("Start and end indices of an array slice must be numbers")
+    return value[
+        None if start is None else math.floor(start) : None if stop is None else math.ceil(stop)
+    ]
+
+
+def _iterate(value: Any) -> Iterable[Any]:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        return value.values()
+    raise ValueError(f"Cannot iterate over {_type_name(value)}")
+
+
+def _length(value: Any) -> Any:
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        raise ValueError("boolean has no length")
+    if _number(value):
+        return abs(value)
+    return len(value)
+
+
+def _keys(value: Any) -> list[Any]:
+    if isinstance(value, dict):
+        return sorted(value)
+    if isinstance(value, list):
+        return list(range(len(value)))
+    raise ValueError(f"{_type_name(value)} has no keys")
+
+
+def _tostring(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _tonumber(value: Any) -> Any:
+    if _number(value):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    raise ValueError(f"Cannot parse {_tostring(value)!r} as a number")
+
+
+def _add_all(value: Any) -> Any:
+    result = None
+    for item in _iterate(value):
+        result = _add(result, item)
+    return result
+
+
+def _contains(value: Any, other: Any) -> bool:
+    if isinstance(value, dict) and isinstance(other, dict):
+        return all(k in value and _contains(value[k], v) for k, v in other.items())
+    if isinstance(value, list) and isinstance(other, list):
+        return all(any(_contains(item, wanted) for item in value) for wanted in other)
+    if isinstance(value, str) and isinstance(other, str):
+        return other in value
+    if _type_name(value) == _type_name(other):
+        return _equal(value, other)
+    raise ValueError(
+        f"{_type_name(value)} and {_type_name(other)} cannot have their containment checked"
+    )
+
+
+def _string_function(name: str, function: Callable[[str], Any]) -> Callable[[Any], Any]:
+    def apply(value: Any) -> Any:
+        if not isinstance(value, str):
+            raise ValueError(f"{name} input must be a string")
+        return function(value)
+
+    return apply
+
+
+def _has(value: Any, key: Any) -> bool:
+    if isinstance(value, dict) and isinstance(key, str):
+        return key in value
+    if isinstance(value, list) and _number(key):
+        return 0 <= key < len(value)
+    raise ValueError(f"Cannot check whether {_type_name(value)} has a {_type_name(key)} key")
+
+
+def _test(value: Any, pattern: Any) -> bool:
+    if not isinstance(value, str) or not isinstance(pattern, str):
+        raise ValueError(f"{_type_name(value)} cannot be matched, as it is not a string")
+    return re.search(pattern, value) is not None
+
+
+def _join(value: Any, separator: Any) -> str:
+    parts = []
+    for item in _iterate(value):
+        if item is None:
+            parts.append("")
+        elif isinstance(item, (dict, list)):
+            raise ValueError(f"Cannot join with {_type_name(item)}")
+        else:
+            parts.append(_tostring(item))
+    return separator.join(parts)
+
+
+def _starts_or_ends(value: Any, affix: Any, name: str) -> bool:
+    if not isinstance(value, str) or not isinstance(affix, str):
+        raise ValueError(f"{name}() requires string inputs")
+    return getattr(value, name)(affix)
+
+
+# Functions of no arguments: name -> function of the input.
+_FUNCTIONS: dict[str, Callable[[Any], Any]] = {
+    "not": lambda value: not _truthy(value),
+    "length": _length,
+    "keys": _keys,
+    "type": _type_name,
+    "add": _add_all,
+    "first": lambda value: _index(value, 0),
+    "last": lambda value: _index(value, -1),
+    "tostring": _tostring,
+    "tonumber": _tonumber,
+    "ascii_downcase": _string_function("ascii_downcase", str.lower),
+    "ascii_upcase": _string_function("ascii_upcase", str.upper),
+}
+
+# Functions of one argument: name -> function of the input and the argument.
+_BINARY_FUNCTIONS: dict[str, Callable[[Any, Any], Any]] = {
+    "has": _has,
+    "test": _test,
+    "contains": _contains,
+    "join": _join,
+    "startswith": lambda value, prefix: _starts_or_ends(value, prefix, "startswith"),
+    "endswith": lambda value, suffix: _starts_or_ends(value, suffix, "endswith"),
+}
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<field>\.(?:[A-Za-z_][A-Za-z0-9_]*|\d+)?)
+      | (?P<op>==|!=|<=|>=|//|[|,<>()\[\]{}:;?+\-*/%])
+      | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+    )""",
+    re.VERBOSE,
+)
+
+
+def _tokenize(text: str) -> list[tuple[str, str]]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None or match.lastgroup is None:
+            raise ValueError(f"unexpected character {text[pos:].lstrip()[:1]!r}")
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        pos = match.end()
+    return tokens
+
+
+def _const(value: Any) -> _Filter:
+    return _Filter(single=lambda _: value)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _pipe(left: _Filter, right: _Filter) -> _Filter:
+    first, second = left.single, right.single
+    if first is not None and second is not None:
+        return _Filter(single=lambda value: second(first(value)))
+    left_run, right_run = left.run, right.run
+    return _Filter(lambda value: (out for item in left_run(value) for out in right_run(item)))
+
+
+def _comma(parts: list[_Filter]) -> _Filter:
+    runs = [part.run for part in parts]
+    return _Filter(lambda value: (out for run in runs for out in run(value)))
+
+
+def _binary(left: _Filter, right: _Filter, operation: Callable[[Any, Any], Any]) -> _Filter:
+    first, second = left.single, right.single
+    if first is not None and second is not None:
+        return _Filter(single=lambda value: operation(first(value), second(value)))
+    left_run, right_run = left.run, right.run
+    # Like jq, the right-hand outputs vary slowest.
+    return _Filter(
+        lambda value: (operation(a, b) for b in right_run(value) for a in left_run(value))
+    )
+
+
+def _map_outputs(inner: _Filter, function: Callable[[Any], Any]) -> _Filter:
+    """Apply ``function`` to each output of ``inner``."""
+    single = inner.single
+    if single is not None:
+        return _Filter(single=lambda value: function(single(value)))
+    run = inner.run
+    return _Filter(lambda value: (function(item) for item in run(value)))
+
+
+def _and(left: _Filter, right: _Filter) -> _Filter:
+    left_run, right_run = left.run, right.run
+
+    def run(value: Any) -> Iterator[bool]:
+        for a in left_run(value):
+            if not _truthy(a):
+                yield False
+            else:
+                for b in right_run(value):
+                    yield _truthy(b)
+
+    first, second = left.single, right.single
+    if first is not None and second is not None:
+        return _Filter(single=lambda value: _truthy(first(value)) and _truthy(second(value)))
+    return _Filter(run)
+
+
+def _or(left: _Filter, right: _Filter) -> _Filter:
+    left_run, right_run = left.run, right.run
+
+    def run(value: Any) -> Iterator[bool]:
+        for a in left_run(value):
+            if _truthy(a):
+                yield True
+            else:
+                for b in right_run(value):
+                    yield _truthy(b)
+
+    first, second = left.single, right.single
+    if first is not None and second is not None:
+        return _Filter(single=lambda value: _truthy(first(value)) or _truthy(second(value)))
+    return _Filter(run)
+
+
+def _alternative(left: _Filter, right: _Filter) -> _Filter:
+    left_run, right_run = left.run, right.run
+
+    def run(value: Any) -> Iterator[Any]:
+        found = False
+        try:
+            for item in left_run(value):
+                if _truthy(item):
+                    found = True
+                    yield item
+        except ValueError:
+            pass
+        if not found:
+            yield from right_run(value)
+
+    return _Filter(run)
+
+
+def _optional(inner: _Filter) -> _Filter:
+    run = inner.run
+
+    def optional(value: Any) -> Iterator[Any]:
+        try:
+            yield from run(value)
+        except ValueError:
+            return
+
+    return _Filter(optional)
+
+
+def _select(condition: _Filter) -> _Filter:
+    single = condition.single
+    if single is not None:
+        return _Filter(lambda value: (value,) if _truthy(single(value)) else ())
+    run = condition.run
+    return _Filter(lambda value: (value for result in run(value) if _truthy(result)))
+
+
+def _if(condition: _Filter, then: _Filter, otherwise: _Filter) -> _Filter:
+    test, yes, no = condition.single, then.single, otherwise.single
+    if test is not None and yes is not None and no is not None:
+        return _Filter(single=lambda value: yes(value) if _truthy(test(value)) else no(value))
+    run, then_run, else_run = condition.run, then.run, otherwise.run
+    return _Filter(
+        lambda value: (
+            out
+            for result in run(value)
+            for out in (then_run if _truthy(result) else else_run)(value)
+        )
+    )
+
+
+def _collect(inner: _Filter) -> _Filter:
+    run = inner.run
+    return _Filter(single=lambda value: list(run(value)))
+
+
+def _object(entries: list[tuple[_Filter, _Filter]]) -> _Filter:
+    def run(value: Any) -> Iterator[dict[str, Any]]:
+        choices = []
+        for key_filter, value_filter in entries:
+            pairs = []
+            for key in key_filter.run(value):
+                if not isinstance(key, str):
+                    raise ValueError(f"Object keys must be strings, not {_type_name(key)}")
+                pairs.extend((key, item) for item in value_filter.run(value))
+            choices.append(pairs)
+        for combination in itertools.product(*choices):
+            yield dict(combination)
+
+    return _Filter(run)
+
+
+class _Parser:
+    """A recursive descent parser compiling a filter as it goes.
+
+    From the loosest binding: ``|``, ``,``, ``//``, ``or``, ``and``,
+    comparisons, ``+ -``, ``* / %``, then postfix paths on a term.
+    """
+
+    def __init__(self, text: str):
+        self._tokens = _tokenize(text)
+        self._pos = 0
+
+    def _peek(self, offset: int = 0) -> tuple[str, str] | None:
+        pos = self._pos + offset
+        return self._tokens[pos] if pos < len(self._tokens) else None
+
+    def _next(self) -> tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise ValueError("unexpected end of filter")
+        self._pos += 1
+        return token
+
+    def _accept(self, value: str) -> bool:
+        token = self._peek()
+        if token is not None and token[1] == value and token[0] in ("op", "ident"):
+            self._pos += 1
+            return True
+        return False
+
+    def _expect(self, value: str) -> None:
+        if not self._accept(value):
+            token = self._peek()
+            found = token[1] if token else "end of filter"
+            raise ValueError(f"expected {value!r} but found {found!r}")
+
+    def parse(self) -> _Filter:
+        if not self._tokens:
+            return _Filter(single=_identity)
+        result = self._pipe()
+        token = self._peek()
+        if token is not None:
+            raise ValueError(f"unexpected {token[1]!r}")
+        return result
+
+    def _pipe(self) -> _Filter:
+        left = self._comma()
+        if self._accept("|"):
+            return _pipe(left, self._pipe())
+        return left
+
+    def _comma(self) -> _Filter:
+        parts = [self._alternative()]
+        while self._accept(","):
+            parts.append(self._alternative())
+        return parts[0] if len(parts) == 1 else _comma(parts)
+
+    def _alternative(self) -> _Filter:
+        left = self._or()
+        if self._accept("//"):
+            return _alternative(left, self._alternative())
+        return left
+
+    def _or(self) -> _Filter:
+        left = self._and()
+        while self._accept("or"):
+            left = _or(left, self._and())
+        return left
+
+    def _and(self) -> _Filter:
+        left = self._comparison()
+        while self._accept("and"):
+            left = _and(left, self._comparison())
+        return left
+
+    def _comparison(self) -> _Filter:
+        left = self._additive()
+        token = self._peek()
+        if token is not None and token[0] == "op" and token[1] in _COMPARISONS:
+            self._pos += 1
+            return _binary(left, self._additive(), _COMPARISONS[token[1]])
+        return left
+
+    def _additive(self) -> _Filter:
+        left = self._multiplicative()
+        while (token := self._peek()) is not None and token[1] in ("+", "-"):
+            self._pos += 1
+            left = _binary(left, self._multiplicative(), _ARITHMETIC[token[1]])
+        return left
+
+    def _multiplicative(self) -> _Filter:
+        left = self._postfix()
+        while (token := self._peek()) is not None and token[0] == "op" and token[1] in "*/%":
+            self._pos += 1
+            left = _binary(left, self._postfix(), _ARITHMETIC[token[1]])
+        return left
+
+    def _postfix(self) -> _Filter:
+        result = self._term()
+        while (token := self._peek()) is not None:
+            kind, value = token
+            if kind == "field":
+                self._pos += 1
+                if value != ".":
+                    result = _pipe(result, self._field(value[1:]))
+                elif (following := self._peek()) is not None and following[0] == "string":
+                    self._pos += 1
+                    result = _pipe(result, self._field(json.loads(following[1])))
+                elif following is None or following[1] != "[":
+                    raise ValueError("unexpected '.'")
+            elif value == "[" and kind == "op":
+                self._pos += 1
+                result = self._subscript(result)
+            elif value == "?" and kind == "op":
+                self._pos += 1
+                result = _optional(result)
+            else:
+                break
+        return result
+
+    @staticmethod
+    def _field(name: str) -> _Filter:
+        return _Filter(single=lambda value: _field(value, name))
+
+    def _subscript(self, base: _Filter) -> _Filter:
+        """Compile ``base[]``, ``base[index]`` or ``base[start:stop]``, after the ``[``."""
+        if self._accept("]"):
+            run = base.run
+            return _Filter(lambda value: (item for out in run(value) for item in _iterate(out)))
+        start = None if self._peek() and self._peek()[1] == ":" else self._pipe()
+        if self._accept(":"):
+            stop = None if self._peek() and self._peek()[1] == "]" else self._pipe()
+            self._expect("]")
+            bounds = [part or _const(None) for part in (start, stop)]
+            return _binary(
+                base,
+                _binary(bounds[0], bounds[1], lambda a, b: (a, b)),
+                lambda value, bound: _slice(value, *bound),
+            )
+        self._expect("]")
+        assert start is not None
+        return _binary(base, start, _index)
+
+    def _term(self) -> _Filter:
+        kind, value = self._next()
+        if kind == "field":
+            if value != ".":
+                return self._field(value[1:])
+            following = self._peek()
+            if following is not None and following[0] == "string":
+                self._pos += 1
+                return self._field(json.loads(following[1]))
+            return _Filter(single=_identity)
+        if kind == "number":
+            number = float(value)
+            return _const(
+                int(number) if number.is_integer() and "e" not in value.lower() else number
+            )
+        if kind == "string":
+            return _const(json.loads(value))
+        if kind == "ident":
+            return self._function(value)
+        if value == "(":
+            inner = self._pipe()
+            self._expect(")")
+            return inner
+        if value == "[":
+            if self._accept("]"):
+                return _Filter(single=lambda _: [])
+            inner = self._pipe()
+            self._expect("]")
+            return _collect(inner)
+        if value == "{":
+            return self._object()
+        if value == "-":
+            return _map_outputs(self._postfix(), lambda number: _subtract(0, number))
+        raise ValueError(f"unexpected {value!r}")
+
+    def _object(self) -> _Filter:
+        """Compile an object construction, after the ``{``."""
+        entries: list[tuple[_Filter, _Filter]] = []
+        while not self._accept("}"):
+            if entries:
+                self._expect(",")
+            kind, value = self._next()
+            if kind in ("ident", "string"):
+                key = value if kind == "ident" else json.loads(value)
+                key_filter = _const(key)
+                value_filter = self._field(key)
+            elif value == "(":
+                key_filter = self._pipe()
+                self._expect(")")
+                value_filter = None
+            else:
+                raise ValueError(f"unexpected {value!r} in object")
+            if self._accept(":"):
+                value_filter = self._alternative()
+            elif value_filter is None:
+                raise ValueError("expected ':' after a computed key")
+            entries.append((key_filter, value_filter))
+        return _object(entries)
+
+    def _if(self) -> _Filter:
+        """Compile a conditional, after the ``if`` (or ``elif``)."""
+        condition = self._pipe()
+        self._expect("then")
+        then = self._pipe()
+        if self._accept("elif"):
+            return _if(condition, then, self._if())
+        otherwise = self._pipe() if self._accept("else") else _Filter(single=_identity)
+        self._expect("end")
+        return _if(condition, then, otherwise)
+
+    def _function(self, name: str) -> _Filter:
+        if name == "if":
+            return self._if()
+        if name in ("true", "false", "null"):
+            return _const({"true": True, "false": False, "null": None}[name])
+        if name == "empty":
+            return _Filter(lambda _: ())
+        if name == "values":
+            return _select(
+                _map_outputs(_Filter(single=_identity), lambda value: value is not None)
+            )
+        if name in _FUNCTIONS:
+            return _Filter(single=_FUNCTIONS[name])
+        if not self._accept("("):
+            raise ValueError(f"{name}/0 is not defined")
+        argument = self._pipe()
+        self._expect(")")
+        if name == "select":
+            return _select(argument)
+        if name == "map":
+            run = argument.run
+            return _Filter(
+                single=lambda value: [out for item in _iterate(value) for out in run(item)]
+            )
+        if name in _BINARY_FUNCTIONS:
+            return _binary(_Filter(single=_identity), argument, _BINARY_FUNCTIONS[name])
+        raise ValueError(f"{name}/1 is not defined")
+
+
+def compile_filter(text: str) -> Callable[[Any], Iterable[Any]]:
+    """Compile a jq-style filter into a function from an input to its outputs.
+
+    The returned function raises ValueError for errors such as indexing a
+    number; they only affect the input being processed.
+
+    Raises:
+        ValueError: If the filter is not valid
+    """
+    return _Parser(text).parse().run
+
+
+def split_filter_args(args: list[str], is_file: Callable[[str], bool]) -> tuple[str, list[str]]:
+    """Separate the filter from the files in ``jq`` or ``yq`` arguments.
+
+    The usual form is ``jq FILTER FILE...``: the first argument is the
+    filter if it compiles and either more arguments follow or it doesn't
+    name a file (checked with ``is_file``). Otherwise the older
+    ``jq FILE [FILTER]`` form is assumed.
+
+    Returns:
+        The filter (``.`` if none was given) and the files
+    """
+    if not args:
+        return ".", []
+    first = args[0]
+    try:
+        compile_filter(first)
+    except ValueError:
+        # Report the filter's error rather than a missing file, unless it is a file.
+        filter_first = len(args) > 1 and not is_file(first)
+    else:
+        filter_first = len(args) > 1 or not is_file(first)
+    if filter_first:
+        return first, args[1:]
+    return (args[1] if len(args) > 1 else "."), args[:1]
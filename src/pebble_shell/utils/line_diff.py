@@ -0,0 +1,320 @@
+"""Line-based diff algorithms and output formats for large inputs.
+
+``difflib.SequenceMatcher`` can take quadratic time on large inputs and its
+"junk" heuristics make it unsuitable for long files with many repeated
+lines. This module computes diffs in linear space:
+
+* lines are interned to integers, so comparisons are cheap;
+* the common prefix and suffix are stripped before any real work;
+* patience diff anchors the problem on lines that occur exactly once on each
+  side, splitting it into small, independent regions;
+* regions without such anchors are solved with Myers' O((N+M)D) algorithm,
+  using the bidirectional "middle snake" search so that memory stays linear.
+
+The result is a list of opcodes in the same shape as
+``difflib.SequenceMatcher.get_opcodes``, which the ``format_*`` functions
+render in the normal and unified output formats of ``diff``.
+"""
+
+from __future__ import annotations
+
+import bisect
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterator, Sequence
+
+# (tag, i1, i2, j1, j2), as in difflib: tag is "equal", "replace", "delete" or "insert".
+Opcode = tuple[str, int, int, int, int]
+
+NO_NEWLINE_MARKER = "\\ No newline at end of file"
+
+# How far (in edits) a single Myers search may go before giving up on a
+# minimal diff of that region and reporting it as one replaced block. Like
+# GNU diff's "too expensive" heuristic, this bounds the time spent on inputs
+# that are almost entirely different.
+MAX_EDIT_COST = 1024
+
+
+def diff_opcodes(a: Sequence[Hashable], b: Sequence[Hashable]) -> list[Opcode]:
+    """Compute the opcodes that turn ``a`` into ``b``.
+
+    Args:
+        a: The old sequence (usually lines)
+        b: The new sequence
+
+    Returns:
+        Opcodes covering both sequences completely, in order
+    """
+    ids: dict[Hashable, int] = {}
+    a_ids = [ids.setdefault(item, len(ids)) for item in a]
+    b_ids = [ids.setdefault(item, len(ids)) for item in b]
+    return _opcodes_from_matches(_matches(a_ids, b_ids), len(a_ids), len(b_ids))
+
+
+def _matches(a: list[int], b: list[int]) -> list[tuple[int, int]]:
+    """Return the sorted (i, j) index pairs of a common subsequence of a and b."""
+    matches: list[tuple[int, int]] = []
+    # An explicit stack rather than recursion: patience regions can nest deeply.
+    stack = [(0, len(a), 0, len(b), True)]
+    while stack:
+        alo, ahi, blo, bhi, patience = stack.pop()
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matches.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+        if patience:
+            anchors = _unique_common_subsequence(a, alo, ahi, b, blo, bhi)
+            if anchors:
+                prev_i, prev_j = alo, blo
+                for i, j in anchors:
+                    stack.append((prev_i, i, prev_j, j, True))
+                    matches.append((i, j))
+                    prev_i, prev_j = i + 1, j + 1
+                stack.append((prev_i, ahi, prev_j, bhi, True))
+                continue
+        split = _bisect(a, alo, ahi, b, blo, bhi)
+        if split is not None:
+            x, y = split
+            stack.append((alo, x, blo, y, False))
+            stack.append((x, ahi, y, bhi, False))
+    matches.sort()
+    return matches
+
+
+def _unique_common_subsequence(
+    a: list[int], alo: int, ahi: int, b: list[int], blo: int, bhi: int
+) -> list[tuple[int, int]]:
+    """Longest increasing run of lines that occur exactly once on each side."""
+    counts: dict[int, int] = {}
+    for line in b[blo:bhi]:
+        counts[line] = counts.get(line, 0) + 1
+    b_position = {b[j]: j for j in range(blo, bhi) if counts[b[j]] == 1}
+    a_counts: dict[int, int] = {}
+    for line in a[alo:ahi]:
+        a_counts[line] = a_counts.get(line, 0) + 1
+    pairs = [
+        (i, b_position[a[i]])
+        for i in range(alo, ahi)
+        if a_counts[a[i]] == 1 and a[i] in b_position
+    ]
+    if not pairs:
+        return []
+
+    # Patience sorting: longest increasing subsequence of the b positions.
+    tails: list[int] = []
+    tail_index: list[int] = []
+    back: list[int] = []
+    for index, (_, j) in enumerate(pairs):
+        pile = bisect.bisect_left(tails, j)
+        if pile == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pile] = j
+            tail_index[pile] = index
+        back.append(tail_index[pile - 1] if pile else -1)
+    result = []
+    index = tail_index[-1]
+    while index >= 0:
+        result.append(pairs[index])
+        index = back[index]
+    result.reverse()
+    return result
+
+
+def _bisect(
+    a: list[int], alo: int, ahi: int, b: list[int], blo: int, bhi: int
+) -> tuple[int, int] | None:
+    """Find where the forward and reverse Myers searches meet.
+
+    Returns the absolute (i, j) split point, or None if the two ranges have
+    nothing in common (or are too different to be worth searching further).
+    """
+    n = ahi - alo
+    m = bhi - blo
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    length = 2 * max_d + 2
+    forward = [-1] * length
+    reverse = [-1] * length
+    forward[offset + 1] = 0
+    reverse[offset + 1] = 0
+    delta = n - m
+    # If the total length is odd, the forward search detects the overlap.
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+    for d in range(min(max_d, MAX_EDIT_COST)):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                x1 = forward[k1_offset + 1]
+            else:
+                x1 = forward[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[alo + x1] == b[blo + y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_offset] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif front:
+                k2_offset = offset + delta - k1
+                if (
+                    0 <= k2_offset < length
+                    and reverse[k2_offset] != -1
+                    and x1 >= n - reverse[k2_offset]
+                ):
+                    return alo + x1, blo + y1
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and reverse[k2_offset - 1] < reverse[k2_offset + 1]):
+                x2 = reverse[k2_offset + 1]
+            else:
+                x2 = reverse[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[ahi - x2 - 1] == b[bhi - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            reverse[k2_offset] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not front:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < length and forward[k1_offset] != -1:
+                    x1 = forward[k1_offset]
+                    y1 = offset + x1 - k1_offset
+                    if x1 >= n - x2:
+                        return alo + x1, blo + y1
+    return None
+
+
+def _opcodes_from_matches(matches: list[tuple[int, int]], n: int, m: int) -> list[Opcode]:
+    opcodes: list[Opcode] = []
+    i = j = 0
+    for mi, mj in [*matches, (n, m)]:
+        if i < mi and j < mj:
+            opcodes.append(("replace", i, mi, j, mj))
+        elif i < mi:
+            opcodes.append(("delete", i, mi, j, j))
+        elif j < mj:
+            opcodes.append(("insert", i, i, j, mj))
+        if mi == n and mj == m:
+            break
+        if opcodes and opcodes[-1][0] == "equal" and opcodes[-1][2] == mi:
+            tag, i1, _, j1, _ = opcodes[-1]
+            opcodes[-1] = (tag, i1, mi + 1, j1, mj + 1)
+        else:
+            opcodes.append(("equal", mi, mi + 1, mj, mj + 1))
+        i, j = mi + 1, mj + 1
+    return opcodes
+
+
+def group_opcodes(opcodes: list[Opcode], context: int = 3) -> Iterator[list[Opcode]]:
+    """Group changes into hunks with up to ``context`` lines of context.
+
+    This mirrors ``difflib.SequenceMatcher.get_grouped_opcodes``.
+    """
+    if not opcodes or (len(opcodes) == 1 and opcodes[0][0] == "equal"):
+        return
+    codes = list(opcodes)
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = (tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2)
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = (tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context))
+    group: list[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _line_text(line: bytes) -> tuple[str, bool]:
+    """Decode a line that may carry its newline; report whether it had one."""
+    has_newline = line.endswith(b"\n")
+    return line[: -1 if has_newline else None].decode("utf-8", errors="replace"), has_newline
+
+
+def _emit(prefix: str, lines: Sequence[bytes]) -> Iterator[str]:
+    for line in lines:
+        text, has_newline = _line_text(line)
+        yield prefix + text
+        if not has_newline:
+            yield NO_NEWLINE_MARKER
+
+
+def _normal_range(start: int, stop: int) -> str:
+    return f"{start + 1},{stop}" if stop - start > 1 else str(stop)
+
+
+def format_normal(a: Sequence[bytes], b: Sequence[bytes], opcodes: list[Opcode]) -> Iterator[str]:
+    """Render opcodes in diff's default ("normal") output format.
+
+    ``a`` and ``b`` are lines that keep their trailing newline (the last line
+    of a file may not have one).
+    """
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            continue
+        if tag == "delete":
+            yield f"{_normal_range(i1, i2)}d{j1}"
+            yield from _emit("< ", a[i1:i2])
+        elif tag == "insert":
+            yield f"{i1}a{_normal_range(j1, j2)}"
+            yield from _emit("> ", b[j1:j2])
+        else:
+            yield f"{_normal_range(i1, i2)}c{_normal_range(j1, j2)}"
+            yield from _emit("< ", a[i1:i2])
+            yield "---"
+            yield from _emit("> ", b[j1:j2])
+
+
+def _unified_range(start: int, stop: int) -> str:
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    return f"{start + 1 if length else start},{length}"
+
+
+def format_unified(
+    a: Sequence[bytes],
+    b: Sequence[bytes],
+    opcodes: list[Opcode],
+    from_name: str,
+    to_name: str,
+    context: int = 3,
+) -> Iterator[str]:
+    """Render opcodes in unified format with ``context`` lines of context."""
+    started = False
+    for group in group_opcodes(opcodes, context):
+        if not started:
+            yield f"--- {from_name}"
+            yield f"+++ {to_name}"
+            started = True
+        first, last = group[0], group[-1]
+        yield (f"@@ -{_unified_range(first[1], last[2])} +{_unified_range(first[3], last[4])} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                yield from _emit(" ", a[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                yield from _emit("-", a[i1:i2])
+            if tag in ("replace", "insert"):
+                yield from _emit("+", b[j1:j2])
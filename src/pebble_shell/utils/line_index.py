@@ -0,0 +1,313 @@
+"""Random access to the lines of a remote file without reading all of it.
+
+Pulls can only be read from the start, so a pager over a multi-gigabyte
+log cannot simply seek. ``LineIndex`` instead reads the file as a stream,
+only as far as it is asked to, and builds a sparse index as it goes: the
+byte offset of every ``checkpoint_lines``-th line. Lines are handed out in
+pages of that many lines, and only a bounded number of decoded pages are
+kept, least recently used first out.
+
+* Moving forward continues the open stream; lines that are skipped over
+  are counted, not split or decoded.
+* Going back to a page that is no longer cached reopens the stream and
+  skips the bytes up to the page's checkpoint, which is much cheaper than
+  finding all the lines before it again.
+* Going to the end counts the remaining lines, and keeps the raw bytes of
+  the last two pages on the way so that they don't have to be read again.
+* Searching walks the pages in order, so it holds no more of the file in
+  memory than the page cache.
+"""
+
+from __future__ import annotations
+
+import collections
+from typing import TYPE_CHECKING
+
+from .streaming import MAX_CHUNK_SIZE, iter_byte_range, iter_remote_chunks
+
+if TYPE_CHECKING:
+    import re
+    from collections.abc import Iterator
+
+    import ops
+    import shimmer
+
+    PebbleClient = ops.pebble.Client | shimmer.PebbleCliClient
+
+# Lines between checkpoints in the index, which is also the size of a page.
+CHECKPOINT_LINES = 1024
+
+# Number of decoded pages to keep.
+CACHED_PAGES = 16
+
+
+class _Cursor:
+    """A position in a stream of a file's bytes, which only moves forward.
+
+    As the cursor passes every ``checkpoint_lines``-th line it records the
+    byte offset in ``index`` (if it is not there yet), and it keeps the raw
+    bytes of the current block of lines and the two before it.
+    """
+
+    def __init__(
+        self, chunks: Iterator[bytes], line: int, offset: int, index: list[int], every: int
+    ):
+        self._chunks = chunks
+        self._buffer = b""
+        self._pos = 0
+        # Bytes of the buffer after _pos known to have no newline.
+        self._searched = 0
+        self._index = index
+        self._every = every
+        self.line = line
+        self.offset = offset
+        self.at_end = False
+        self.block = bytearray()
+        # The two blocks before the current one; None until checkpoints have been passed.
+        self.previous_block: bytes | None = None
+        self.older_block: bytes | None = None
+
+    def close(self) -> None:
+        """Stop reading the stream."""
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def _fill(self) -> bool:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.at_end = True
+            return False
+        self._searched = len(self._buffer) - self._pos
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _consume(self, end: int, lines: int) -> None:
+        """Move past the bytes up to ``end``, which hold ``lines`` line endings."""
+        self.block += self._buffer[self._pos : end]
+        self.offset += end - self._pos
+        self._pos = end
+        self._searched = 0
+        self.line += lines
+        if lines and self.line % self._every == 0:
+            if self.line == len(self._index) * self._every:
+                self._index.append(self.offset)
+            self.older_block = self.previous_block
+            self.previous_block = bytes(self.block)
+            self.block.clear()
+
+    def read_line(self) -> bytes | None:
+        """Read the next line, without its newline, or None at the end of the file."""
+        while True:
+            end = self._buffer.find(b"\n", self._pos + self._searched)
+            if end >= 0:
+                line = self._buffer[self._pos : end]
+                self._consume(end + 1, 1)
+                return line
+            self._searched = len(self._buffer) - self._pos
+            if not self._fill():
+                if self._pos < len(self._buffer):
+                    # A last line without a newline.
+                    line = self._buffer[self._pos :]
+                    self._consume(len(self._buffer), 1)
+                    return line
+                return None
+
+    def skip_to(self, target: int) -> None:
+        """Move to the start of line ``target``, or to the end of the file if it is shorter."""
+        while self.line < target:
+            # Stop at each checkpoint, to record it.
+            limit = min(target, (self.line // self._every + 1) * self._every)
+            wanted = limit - self.line
+            found = self._buffer.count(b"\n", self._pos)
+            if found < wanted:
+                if found:
+                    self._consume(self._buffer.rindex(b"\n") + 1, found)
+                if not self._fill():
+                    if self._pos < len(self._buffer):
+                        self._consume(len(self._buffer), 1)
+                    return
+                continue
+            end = self._pos - 1
+            for _ in range(wanted):
+                end = self._buffer.index(b"\n", end + 1)
+            self._consume(end + 1, wanted)
+
+
+class LineIndex:
+    """Lines of a remote file, read lazily and indexed as they are found.
+
+    Args:
+        client: Pebble client
+        path: Path of the file; compressed files are decompressed
+        checkpoint_lines: Lines between checkpoints, and in each page
+        cached_pages: Number of decoded pages to keep
+    """
+
+    def __init__(
+        self,
+        client: PebbleClient,
+        path: str,
+        checkpoint_lines: int = CHECKPOINT_LINES,
+        cached_pages: int = CACHED_PAGES,
+    ):
+        self._client = client
+        self._path = path
+        self._every = checkpoint_lines
+        self._cached_pages = cached_pages
+        self._index = [0]
+        self._pages: collections.OrderedDict[int, list[str]] = collections.OrderedDict()
+        self._cursor: _Cursor | None = None
+        self.total_lines: int | None = None
+        self.reopened = 0
+
+    def close(self) -> None:
+        """Stop reading the file."""
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+
+    @property
+    def known_lines(self) -> int:
+        """The number of lines found so far (all of them, once the end has been reached)."""
+        if self.total_lines is not None:
+            return self.total_lines
+        cursor_line = self._cursor.line if self._cursor is not None else 0
+        return max(cursor_line, (len(self._index) - 1) * self._every)
+
+    def _open(self, page: int) -> _Cursor:
+        """Start reading at the checkpoint of ``page``, which must be in the index."""
+        self.close()
+        offset = self._index[page]
+        chunks = iter_byte_range(
+            iter_remote_chunks(
+                self._client, self._path, max_chunk_size=MAX_CHUNK_SIZE, decompress=True
+            ),
+            skip=offset,
+        )
+        if offset:
+            self.reopened += 1
+        self._cursor = _Cursor(chunks, page * self._every, offset, self._index, self._every)
+        return self._cursor
+
+    def _cursor_for(self, line: int) -> _Cursor:
+        """A cursor at or before ``line``, reusing the open one if it hasn't passed it."""
+        cursor = self._cursor
+        if cursor is not None and cursor.line <= line:
+            return cursor
+        page = min(line // self._every, len(self._index) - 1)
+        return self._open(page)
+
+    def _note_end(self, cursor: _Cursor) -> None:
+        if cursor.at_end and self.total_lines is None:
+            self.total_lines = cursor.line
+
+    def _decode(self, raw: bytes) -> list[str]:
+        text = raw.decode("utf-8", errors="replace")
+        lines = text.split("\n")
+        if lines and lines[-1] == "":
+            lines.pop()
+        return lines
+
+    def _store(self, page: int, lines: list[str]) -> list[str]:
+        self._pages[page] = lines
+        self._pages.move_to_end(page)
+        while len(self._pages) > self._cached_pages:
+            self._pages.popitem(last=False)
+        return lines
+
+    def page(self, number: int) -> list[str]:
+        """The lines of page ``number`` (an empty list past the end of the file)."""
+        if number in self._pages:
+            self._pages.move_to_end(number)
+            return self._pages[number]
+        if self.total_lines is not None and number * self._every >= self.total_lines:
+            return []
+        start = number * self._every
+        cursor = self._cursor_for(start)
+        cursor.skip_to(start)
+        if cursor.line < start:
+            self._note_end(cursor)
+            return []
+        raw_lines: list[bytes] = []
+        while len(raw_lines) < self._every:
+            line = cursor.read_line()
+            if line is None:
+                break
+            raw_lines.append(line)
+        self._note_end(cursor)
+        return self._store(number, [line.decode("utf-8", errors="replace") for line in raw_lines])
+
+    def lines(self, start: int, count: int) -> list[str]:
+        """Up to ``count`` lines from line ``start`` (counting from 0)."""
+        result: list[str] = []
+        line = max(start, 0)
+        while len(result) < count:
+            page_number, skip = divmod(line, self._every)
+            page = self.page(page_number)
+            taken = page[skip : skip + count - len(result)]
+            if not taken:
+                break
+            result.extend(taken)
+            line += len(taken)
+        return result
+
+    def count_lines(self) -> int:
+        """Read to the end of the file and return its number of lines.
+
+        The last two pages are kept from the bytes that were passed over, so
+        showing the end of the file doesn't read it again.
+        """
+        if self.total_lines is not None:
+            return self.total_lines
+        frontier = len(self._index) - 1
+        cursor = self._cursor
+        if cursor is None or cursor.line < frontier * self._every:
+            cursor = self._open(frontier)
+        while not cursor.at_end:
+            cursor.skip_to(cursor.line + self._every)
+        self._note_end(cursor)
+        total = cursor.line
+        last_page = max(total - 1, 0) // self._every
+        # The current block is the last page, unless the file ends at a checkpoint.
+        if total and total % self._every == 0:
+            blocks = [cursor.older_block, cursor.previous_block]
+        else:
+            blocks = [cursor.previous_block, bytes(cursor.block)]
+        for page, block in zip((last_page - 1, last_page), blocks, strict=True):
+            if page >= 0 and block is not None:
+                self._store(page, self._decode(block))
+        return total
+
+    def search(self, pattern: re.Pattern[str], start: int, backward: bool = False) -> int | None:
+        """Find the first line matching ``pattern`` after ``start`` (or the last one before it).
+
+        Returns:
+            The number of the matching line, or None
+        """
+        if backward:
+            found = None
+            for number, line in self._iter_from(0, stop=start):
+                if pattern.search(line):
+                    found = number
+            return found
+        for number, line in self._iter_from(start + 1):
+            if pattern.search(line):
+                return number
+        return None
+
+    def _iter_from(self, start: int, stop: int | None = None) -> Iterator[tuple[int, str]]:
+        """Yield (number, line) from line ``start`` up to (but not including) ``stop``."""
+        page_number, skip = divmod(max(start, 0), self._every)
+        while True:
+            page = self.page(page_number)
+            for offset in range(skip, len(page)):
+                number = page_number * self._every + offset
+                if stop is not None and number >= stop:
+                    return
+                yield number, page[offset]
+            if len(page) < self._every:
+                return
+            page_number += 1
+            skip = 0
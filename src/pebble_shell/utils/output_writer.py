@@ -0,0 +1,159 @@
+"""Buffered output for commands that print a lot of plain text.
+
+Printing through rich parses markup, wraps and resolves styles for every
+call, which dominates the cost of commands like ``cat``, ``grep`` or
+``find`` when they produce many lines. An ``OutputWriter`` collects the
+command's output and writes it in large batches instead: when the console
+is not an interactive display (output to a pipe, a redirect or captured by
+the pipeline executor), or when the command was asked for plain output, the
+text and bytes go straight to the console's file, bypassing rich entirely.
+Otherwise the batches are printed through rich with markup, highlighting
+and emoji disabled, so the text is shown exactly as it is.
+
+Rich capture (``console.capture()``) and recording still see everything,
+since the writer falls back to printing through rich while they are active.
+"""
+
+from __future__ import annotations
+
+import codecs
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from types import TracebackType
+
+    from rich.console import Console
+
+
+# How much output is collected before it is written out.
+OUTPUT_BUFFER_SIZE = 256 * 1024
+
+
+def _bypasses_rich(console: Console, plain: bool) -> bool:
+    """Whether output to the console can be written to its file directly."""
+    if not plain and console.is_terminal:
+        return False
+    # Capturing, recording and quiet consoles need everything to go through rich.
+    return (
+        getattr(console, "_buffer_index", 0) == 0
+        and getattr(console, "record", False) is False
+        and getattr(console, "quiet", False) is False
+    )
+
+
+class OutputWriter:
+    """Write text and bytes to a console in large batches.
+
+    Use as a context manager, or call ``close()`` once done; anything still
+    buffered is written out then. Call ``flush()`` before printing anything
+    else to the console (an error message, say), so output stays in order.
+
+    Args:
+        console: The console to write to.
+        plain: Write directly to the console's file even when it is a terminal.
+        buffer_size: How much output to collect before writing it out.
+    """
+
+    def __init__(
+        self, console: Console, plain: bool = False, buffer_size: int = OUTPUT_BUFFER_SIZE
+    ):
+        self.console = console
+        self.buffer_size = buffer_size
+        self.raw = _bypasses_rich(console, plain)
+        self._binary = getattr(console.file, "buffer", None) if self.raw else None
+        self._encoding = getattr(console.file, "encoding", None) or "utf-8"
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending: list[str] = []
+        self._pending_bytes = bytearray()
+        self._size = 0
+
+    def __enter__(self) -> OutputWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def write(self, data: str | bytes) -> None:
+        """Write text, or UTF-8 encoded bytes.
+
+        Bytes are passed through untouched when writing to a binary stream;
+        otherwise characters split across writes are put back together, and
+        invalid UTF-8 is replaced rather than raising an error.
+        """
+        if isinstance(data, str):
+            if self._binary is not None:
+                self._pending_bytes += data.encode(self._encoding, errors="replace")
+            else:
+                self._pending.append(data)
+        elif self._binary is not None:
+            self._pending_bytes += data
+        else:
+            self._pending.append(self._decoder.decode(data))
+        self._size += len(data)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def write_line(self, line: str) -> None:
+        """Write a line of text, adding the newline."""
+        self.write(line + "\n")
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """Write lines of text, adding the newlines."""
+        for line in lines:
+            self.write(line + "\n")
+
+    def write_chunks(self, chunks: Iterable[bytes]) -> None:
+        """Write a stream of UTF-8 encoded bytes, as it is read."""
+        for chunk in chunks:
+            self.write(chunk)
+
+    def flush(self) -> None:
+        """Write out everything buffered so far."""
+        self._size = 0
+        if self._pending_bytes:
+            data = bytes(self._pending_bytes)
+            self._pending_bytes.clear()
+            self._write_raw(data)
+        if self._pending:
+            text = "".join(self._pending)
+            self._pending.clear()
+            if not text:
+                return
+            if self.raw:
+                self._write_raw(text)
+            else:
+                self.console.print(
+                    text, end="", markup=False, highlight=False, emoji=False, soft_wrap=True
+                )
+
+    def close(self) -> None:
+        """Write out anything still buffered, including an incomplete character."""
+        if self._binary is None:
+            tail = self._decoder.decode(b"", final=True)
+            if tail:
+                self._pending.append(tail)
+        self.flush()
+        if self.raw:
+            try:
+                self.console.file.flush()
+            except BrokenPipeError:
+                self.console.on_broken_pipe()
+
+    def _write_raw(self, data: str | bytes) -> None:
+        file = self.console.file
+        try:
+            if isinstance(data, bytes):
+                assert self._binary is not None
+                # Anything printed through the text layer has to go out first.
+                file.flush()
+                self._binary.write(data)
+            else:
+                file.write(data)
+        except BrokenPipeError:
+            self.console.on_broken_pipe()
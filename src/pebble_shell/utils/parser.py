@@ -4,9 +4,15 @@ from __future__ import annotations
 
 import dataclasses
 import enum
-import glob
 import os
 import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Characters that make an unquoted word a glob pattern (or a brace expansion).
+_GLOB_CHARS = frozenset("*?[{")
 
 
 class CommandType(enum.Enum):
@@ -31,6 +37,9 @@ class ParsedCommand:
     type: CommandType
     target: str | None = None  # For redirection target or next command.
     next_command: ParsedCommand | None = None
+    # Indices of the arguments that are glob patterns; they are expanded
+    # (with ShellParser.expand_globs) when the command runs.
+    glob_args: list[int] = dataclasses.field(default_factory=list)
 
 
 class ShellVariables:
@@ -89,6 +98,9 @@ class ShellParser:
 
     def __init__(self, variables: ShellVariables | None = None):
         self.variables = variables or ShellVariables()
+        # Expands glob patterns (with the matches for each, in order); the
+        # shell sets one that matches against the container's filesystem.
+        self.glob_expander: Callable[[list[str]], list[list[str]]] | None = None
 
     def parse_command_line(self, command_line: str) -> list[ParsedCommand]:
         """Parse a command line into a list of commands with operations.
@@ -172,19 +184,23 @@ class ShellParser:
 
             # Parse the actual command and arguments
             try:
-                tokens = self._parse_with_bash_quotes(cmd)
+                words = self._split_words(cmd)
             except ValueError:
                 # Handle unclosed quotes gracefully
-                tokens = cmd.split()
+                words = [(token, True) for token in cmd.split()]
 
-            if not tokens:
+            if not words:
                 continue
 
-            # Expand globs in arguments
-            expanded_tokens = self._expand_globs(tokens)
-
-            command = expanded_tokens[0]
-            args = expanded_tokens[1:]
+            command = words[0][0]
+            args = [word for word, _ in words[1:]]
+            # Globs are expanded when the command runs, since the commands
+            # before it may change the directory or the files.
+            glob_args = [
+                i
+                for i, (word, globbing) in enumerate(words[1:])
+                if globbing and not word.startswith("-") and _GLOB_CHARS.intersection(word)
+            ]
 
             # Determine command type
             if i < len(pipe_parts) - 1:
@@ -195,7 +211,11 @@ class ShellParser:
                 cmd_type = CommandType.SIMPLE
 
             parsed_cmd = ParsedCommand(
-                command=command, args=args, type=cmd_type, target=redirect_target
+                command=command,
+                args=args,
+                type=cmd_type,
+                target=redirect_target,
+                glob_args=glob_args,
             )
 
             commands.append(parsed_cmd)
@@ -256,30 +276,32 @@ class ShellParser:
 
         return command, None, None
 
-    def _expand_globs(self, tokens: list[str]) -> list[str]:
-        """Expand glob patterns in command tokens."""
-        # For now, we'll use local glob expansion
-        # Remote glob expansion will be handled by individual commands
-        # that have access to the Pebble client
-        expanded: list[str] = []
+    def expand_globs(self, cmd: ParsedCommand) -> ParsedCommand:
+        """Expand the glob patterns in a command's arguments.
 
-        for token in tokens:
-            if "*" in token or "?" in token or "[" in token:
-                try:
-                    # Use glob to expand patterns
-                    matches = glob.glob(token)
-                    if matches:
-                        expanded.extend(sorted(matches))
-                    else:
-                        # No matches, keep original token
-                        expanded.append(token)
-                except Exception:
-                    # Glob failed, keep original
-                    expanded.append(token)
-            else:
-                expanded.append(token)
+        Only arguments with unquoted wildcards or braces are patterns. They
+        are handed to ``glob_expander`` together, so that it can share
+        directory listings between them; without one, they are left for the
+        command to expand.
 
-        return expanded
+        Returns:
+            The command with its patterns replaced by their matches
+        """
+        patterns = cmd.glob_args
+        if self.glob_expander is None or not patterns:
+            return cmd
+
+        expansions = dict(
+            zip(
+                patterns,
+                self.glob_expander([cmd.args[i] for i in patterns]),
+                strict=True,
+            )
+        )
+        expanded: list[str] = []
+        for i, arg in enumerate(cmd.args):
+            expanded.extend(expansions.get(i) or [arg])
+        return dataclasses.replace(cmd, args=expanded, glob_args=[])
 
     def _parse_with_bash_quotes(self, text: str) -> list[str]:
         """Parse command text with bash-like quote handling.
@@ -289,9 +311,19 @@ class ShellParser:
         - Double quotes: allow variable expansion, escape sequences
         - Backslash escaping outside quotes
         """
-        tokens = []
+        return [word for word, _ in self._split_words(text)]
+
+    def _split_words(self, text: str) -> list[tuple[str, bool]]:
+        """Split command text into words, as ``_parse_with_bash_quotes`` does.
+
+        Returns:
+            Each word, and whether it has wildcards or braces outside quotes
+            (so should be glob expanded)
+        """
+        tokens: list[tuple[str, bool]] = []
         current_token = ""
         was_quoted = False
+        globbing = False
         i = 0
 
         while i < len(text):
@@ -381,9 +413,10 @@ class ShellParser:
             # Handle whitespace - end current token
             elif char.isspace():
                 if current_token or was_quoted:
-                    tokens.append(current_token)
+                    tokens.append((current_token, globbing))
                     current_token = ""
                     was_quoted = False
+                    globbing = False
                 i += 1
                 continue
 
@@ -423,11 +456,12 @@ class ShellParser:
             # Regular character
             else:
                 current_token += char
+                globbing = globbing or char in _GLOB_CHARS
                 i += 1
 
         # Add final token
         if current_token or was_quoted:
-            tokens.append(current_token)
+            tokens.append((current_token, globbing))
 
         return tokens
 
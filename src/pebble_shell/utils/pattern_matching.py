@@ -0,0 +1,405 @@
+"""Multi-pattern matching for searching data against many patterns in a single pass.
+
+Searching for thousands of patterns by trying each one in turn (or by a naive
+``a|b|c`` alternation, which the regex engine also tries branch by branch)
+scales with the number of patterns. This module provides:
+
+* ``literal_trie_pattern``, which compiles a set of fixed strings into a regex
+  shaped like a trie, so the (C) regex engine only follows the branches that
+  can still match at each position.
+* ``AhoCorasick``, an automaton that reports *every* pattern occurring in a
+  piece of data (including overlapping ones) in one pass, used to attribute
+  matches to patterns.
+* ``MultiPatternMatcher``, which combines the two: one pass over the data to
+  find matching lines, using a literal prefilter for regular expressions so
+  the full combined regex only runs on lines that could possibly match.
+* ``split_pattern_options`` and ``compile_patterns``, which turn grep-style
+  arguments into a matcher, so that everything searching like grep agrees on
+  what a pattern means.
+"""
+
+from __future__ import annotations
+
+import collections
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+# Literals shorter than this are not worth prefiltering on.
+_MIN_PREFILTER_LITERAL = 2
+
+# Backreferences and named groups cannot be safely combined into one alternation.
+_UNCOMBINABLE = re.compile(r"\\[1-9]|\(\?P[<=]")
+
+
+def literal_trie_pattern(literals: Sequence[bytes]) -> bytes:
+    """Build a regex source matching any of ``literals``, structured as a trie.
+
+    Longer literals are preferred over their prefixes, so ``[b"ab", b"abc"]``
+    becomes ``ab(?:c)?``.
+    """
+    trie: dict[int | None, dict] = {}
+    for literal in literals:
+        node = trie
+        for byte in literal:
+            node = node.setdefault(byte, {})
+        node[None] = {}
+
+    def render(node: dict[int | None, dict]) -> bytes:
+        branches = [
+            re.escape(bytes([byte])) + render(child)
+            for byte, child in sorted((k, v) for k, v in node.items() if k is not None)
+        ]
+        if not branches:
+            return b""
+        if len(branches) == 1 and None not in node:
+            return branches[0]
+        body = b"(?:" + b"|".join(branches) + b")"
+        return body + b"?" if None in node else body
+
+    return render(trie)
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over byte strings."""
+
+    def __init__(self, patterns: Sequence[bytes]):
+        self._goto: list[dict[int, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for byte in pattern:
+                next_state = self._goto[state].get(byte)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][byte] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first construction of the failure links.
+        queue = collections.deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for byte, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and byte not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(byte, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_matches(self, data: bytes) -> Iterator[tuple[int, int]]:
+        """Yield (end offset, pattern index) for every occurrence of every pattern."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        # Empty patterns match everywhere, including before the first byte.
+        for index in output[0]:
+            yield 0, index
+        state = 0
+        for offset, byte in enumerate(data, 1):
+            while state and byte not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(byte, 0)
+            for index in output[state]:
+                yield offset, index
+
+    def matching_patterns(self, data: bytes) -> set[int]:
+        """Return the indexes of all patterns that occur in ``data``."""
+        return {index for _, index in self.iter_matches(data)}
+
+
+def required_literal(pattern: str) -> str | None:
+    """Find a literal substring that every match of ``pattern`` must contain.
+
+    This is deliberately conservative: it only looks at top-level literal runs
+    and gives up (returning None) on anything it does not fully understand,
+    such as top-level alternation or inline flags.
+    """
+    if "(?" in pattern:
+        return None
+    best = ""
+    run: list[str] = []
+
+    def end_run() -> None:
+        nonlocal best
+        if len(run) > len(best):
+            best = "".join(run)
+        run.clear()
+
+    i = 0
+    length = len(pattern)
+    while i < length:
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            if escaped and not escaped.isalnum():
+                run.append(escaped)
+            else:
+                end_run()
+            i += 2
+        elif char == "[":
+            end_run()
+            i += 1
+            if pattern[i : i + 1] == "^":
+                i += 1
+            if pattern[i : i + 1] == "]":
+                i += 1
+            while i < length and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+        elif char == "(":
+            end_run()
+            depth = 0
+            while i < length:
+                if pattern[i] == "\\":
+                    i += 1
+                elif pattern[i] == "[":
+                    close = pattern.find("]", i + 2)
+                    i = close if close >= 0 else length
+                elif pattern[i] == "(":
+                    depth += 1
+                elif pattern[i] == ")":
+                    depth -= 1
+                    if not depth:
+                        break
+                i += 1
+            i += 1
+        elif char == "|":
+            return None
+        elif char in "*?{":
+            # The previous atom is optional (or repeated an unknown number of times).
+            if run:
+                run.pop()
+            end_run()
+            if char == "{":
+                close = pattern.find("}", i)
+                i = close + 1 if close >= 0 else length
+            else:
+                i += 1
+        elif char == "+" or char in ".^$":
+            end_run()
+            i += 1
+        else:
+            run.append(char)
+            i += 1
+    end_run()
+    return best if len(best) >= _MIN_PREFILTER_LITERAL else None
+
+
+class MultiPatternMatcher:
+    """Match lines against any of several patterns in a single pass.
+
+    The ``search`` method has the same shape as ``re.Pattern.search`` on
+    bytes, so this can be used anywhere a compiled regex is expected.
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[str],
+        *,
+        fixed: bool = False,
+        ignore_case: bool = False,
+        word: bool = False,
+        line: bool = False,
+    ):
+        self.patterns = list(patterns)
+        self._ignore_case = ignore_case
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+
+        if fixed:
+            sources = [re.escape(p) for p in self.patterns]
+            literals: list[str | None] = list(self.patterns)
+            combined = literal_trie_pattern([p.encode("utf-8") for p in self.patterns])
+        else:
+            sources = list(self.patterns)
+            literals = [required_literal(p) for p in self.patterns]
+            combined = b"|".join(b"(?:" + s.encode("utf-8") + b")" for s in sources)
+        if not self.patterns:
+            # An empty pattern set (e.g. ``grep -f /dev/null``) matches nothing.
+            combined = rb"(?!)"
+        self._exact = fixed and not (word or line)
+
+        wrapped = [self._wrap(s.encode("utf-8"), word, line) for s in sources]
+        self._each = [re.compile(source, flags) for source in wrapped]
+        if not fixed and any(_UNCOMBINABLE.search(s) for s in sources):
+            self._combined: re.Pattern[bytes] | None = None
+        else:
+            self._combined = re.compile(self._wrap(combined, word, line), flags)
+
+        # A pattern without a usable literal could match any line, which
+        # defeats the prefilter; in that case every line goes to the regex.
+        encoded = [self._fold(lit.encode("utf-8")) if lit else b"" for lit in literals]
+        if fixed:
+            self._unfiltered: list[int] = []
+            self._literal_owner = list(range(len(self.patterns)))
+        else:
+            self._unfiltered = [i for i, lit in enumerate(literals) if not lit]
+            self._literal_owner = [i for i, lit in enumerate(literals) if lit]
+        self._prefilter: re.Pattern[bytes] | None = None
+        if not fixed and self.patterns and not self._unfiltered:
+            self._prefilter = re.compile(literal_trie_pattern(encoded), flags)
+        self._literal_automaton: AhoCorasick | None = None
+        if self._literal_owner:
+            self._literal_automaton = AhoCorasick([encoded[i] for i in self._literal_owner])
+
+    @staticmethod
+    def _wrap(source: bytes, word: bool, line: bool) -> bytes:
+        if word:
+            source = rb"(?<!\w)(?:" + source + rb")(?!\w)"
+        if line:
+            source = rb"^(?:" + source + rb")$"
+        return source
+
+    def _fold(self, data: bytes) -> bytes:
+        return data.lower() if self._ignore_case else data
+
+    def search(
+        self, data: bytes, pos: int = 0, endpos: int | None = None
+    ) -> re.Match[bytes] | None:
+        """Find the first place any pattern matches in ``data[pos:endpos]``."""
+        if endpos is None:
+            endpos = len(data)
+        if self._prefilter is None:
+            return self._search_line(data, pos, endpos)
+        while pos < endpos:
+            hit = self._prefilter.search(data, pos, endpos)
+            if hit is None:
+                return None
+            start = data.rfind(b"\n", pos, hit.start()) + 1 or pos
+            stop = data.find(b"\n", hit.start(), endpos)
+            if stop < 0:
+                stop = endpos
+            match = self._search_line(data, start, stop)
+            if match is not None:
+                return match
+            pos = stop + 1
+        return None
+
+    def _search_line(self, data: bytes, pos: int, endpos: int) -> re.Match[bytes] | None:
+        if self._combined is not None:
+            return self._combined.search(data, pos, endpos)
+        matches = [m for m in (p.search(data, pos, endpos) for p in self._each) if m]
+        return min(matches, key=lambda m: m.start()) if matches else None
+
+    def matching_patterns(self, line: bytes) -> list[int]:
+        """Return the indexes of every pattern that matches ``line``."""
+        candidates = set(self._unfiltered)
+        if self._literal_automaton is not None:
+            found = self._literal_automaton.matching_patterns(self._fold(line))
+            candidates.update(self._literal_owner[i] for i in found)
+        if self._exact:
+            return sorted(candidates)
+        return [i for i in sorted(candidates) if self._each[i].search(line)]
+
+
+def strip_regex_delimiters(pattern: str) -> str:
+    """Remove the ``/.../`` that older versions of grep required around a regex."""
+    if len(pattern) > 2 and pattern.startswith("/") and pattern.endswith("/"):
+        return pattern[1:-1]
+    return pattern
+
+
+def split_pattern_options(
+    args: Sequence[str], value_flags: str = ""
+) -> tuple[list[str], list[str], list[str]]:
+    """Take every ``-e PATTERN`` and ``-f FILE`` out of grep-style arguments.
+
+    The general flag parser keeps only the last value of a repeated option,
+    but grep searches for all of them. Short options may be bundled (``-ie
+    PATTERN``); a letter in ``value_flags`` takes the rest of its bundle as
+    its value, so ``-m5`` is left alone.
+
+    Args:
+        args: The command's arguments
+        value_flags: Short options (other than -e and -f) that take a value
+
+    Returns:
+        A tuple of (patterns, pattern_files, remaining_args)
+
+    Raises:
+        ValueError: If -e or -f is missing its argument
+    """
+    patterns: list[str] = []
+    pattern_files: list[str] = []
+    remaining: list[str] = []
+    index = 0
+
+    def take_value(option: str) -> str:
+        nonlocal index
+        if index >= len(args):
+            raise ValueError(f"option requires an argument -- '{option}'")
+        index += 1
+        return args[index - 1]
+
+    while index < len(args):
+        arg = args[index]
+        index += 1
+        if arg == "--":
+            remaining.extend(args[index - 1 :])
+            break
+        if arg.startswith("--"):
+            name, has_value, value = arg[2:].partition("=")
+            if name not in ("regexp", "file"):
+                remaining.append(arg)
+                continue
+            if not has_value:
+                value = take_value(name)
+            (patterns if name == "regexp" else pattern_files).append(value)
+            continue
+        if len(arg) < 2 or not arg.startswith("-"):
+            remaining.append(arg)
+            continue
+        for pos, letter in enumerate(arg[1:], 1):
+            if letter in value_flags:
+                remaining.append(arg)
+                break
+            if letter in "ef":
+                value = arg[pos + 1 :] or take_value(letter)
+                (patterns if letter == "e" else pattern_files).append(value)
+                if pos > 1:
+                    remaining.append(arg[:pos])
+                break
+        else:
+            remaining.append(arg)
+    return patterns, pattern_files, remaining
+
+
+def compile_patterns(
+    patterns: Sequence[str],
+    *,
+    fixed: bool = False,
+    ignore_case: bool = False,
+    word: bool = False,
+    line: bool = False,
+    per_pattern: bool = False,
+) -> re.Pattern[bytes] | MultiPatternMatcher:
+    """Compile grep-style search patterns for matching bytes.
+
+    A single pattern becomes a plain bytes regex; several patterns (or
+    ``per_pattern``, to count matches for each one) use a matcher that checks
+    them all in one pass. Unless ``fixed``, ``/.../`` delimiters are removed.
+
+    Raises:
+        re.error: If a pattern is not a valid regular expression
+    """
+    if not fixed:
+        patterns = [strip_regex_delimiters(p) for p in patterns]
+    if len(patterns) != 1 or per_pattern:
+        return MultiPatternMatcher(
+            patterns, fixed=fixed, ignore_case=ignore_case, word=word, line=line
+        )
+    expression = re.escape(patterns[0]) if fixed else patterns[0]
+    if word:
+        expression = rf"(?<!\w)(?:{expression})(?!\w)"
+    if line:
+        expression = rf"^(?:{expression})$"
+    re_flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(expression.encode("utf-8"), re_flags)
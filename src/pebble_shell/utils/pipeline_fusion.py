@@ -0,0 +1,920 @@
+"""Rewrite common shell pipelines into fused, streaming operators.
+
+``PipelineExecutor`` normally runs each stage of a pipeline to completion
+and hands its whole output, as one string, to the next stage. For the
+idioms that fill runbooks (``cat f | grep x | wc -l``,
+``sort f | uniq -c | sort -rn | head``, ``grep x f | head -n 1``,
+``ps aux | grep foo``) this module builds a plan instead:
+
+* the first stage becomes a *source* that streams lines, e.g. straight from
+  the files named by ``cat``, ``grep`` or ``sort``;
+* each later stage becomes an *operator* on a stream of lines;
+* a peephole pass replaces operator pairs with cheaper equivalents:
+  ``sort | uniq`` becomes a hash aggregation that only sorts the distinct
+  lines, ``sort | head`` becomes a top-k heap, and a sort feeding a count is
+  dropped;
+* ``ps | grep`` pushes the pattern into ps, which prints the matching rows
+  as plain text as it finds them instead of drawing the whole table.
+
+Each step produces exactly what the command it replaces prints: a grep
+source formats its lines with the grep command's own engine, filters compile
+their patterns as grep does, and counts are made by the same code as wc.
+
+Nothing is materialized between stages, ``head`` stops reading its input
+once it has enough lines, and counting never keeps the lines. A pipeline
+with any stage that has no operator is left to the executor unchanged. The
+``explain`` command prints the plan chosen for a command line.
+"""
+
+from __future__ import annotations
+
+import abc
+import codecs
+import collections
+import dataclasses
+import heapq
+import itertools
+import re
+from typing import TYPE_CHECKING, Any
+
+import ops
+
+from .command_helpers import parse_flags
+from .external_sort import LineKey, SortOptions, external_sort, parse_sort_args
+from .parser import CommandType
+from .pathutils import resolve_path
+from .pattern_matching import MultiPatternMatcher, compile_patterns, split_pattern_options
+from .sed_script import SedScript, parse_sed_args
+from .streaming import iter_lines, iter_remote_chunks
+from .table_builder import get_output_format
+from .text_transform import build_transformer
+from .throughput import MeterDisplay, RateLimiter, ThroughputMeter, format_size, parse_size
+from .word_count import WC_FLAGS, count_chunks, format_counts, selected_columns
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Mapping
+
+    from ..commands import Command
+    from ..shell import PebbleShell
+    from .executor import CommandOutput
+    from .parser import ParsedCommand
+    from .text_transform import ChunkTransformer
+
+# Number of output lines to collect before writing them in one go.
+_OUTPUT_BATCH_LINES = 1000
+
+_DEFAULT_HEAD_LINES = 10
+
+# The grep options that a fused filter understands.
+_GREP_FLAGS: dict[str, type] = {
+    "i": bool,  # ignore case
+    "v": bool,  # select non-matching lines
+    "w": bool,  # match whole words
+    "x": bool,  # match whole lines
+    "E": bool,  # extended regular expression (the default)
+    "F": bool,  # fixed string
+}
+
+# The pv options that a fused meter understands.
+_PV_FLAGS: dict[str, type] = {
+    "s": str,  # size
+    "L": str,  # rate limit
+    "N": str,  # name
+    "i": str,  # update interval
+    "q": bool,  # quiet
+}
+
+# Number of lines between updates of a meter's display.
+_METER_REFRESH_LINES = 1000
+
+_HEAD_COUNT = re.compile(r"^-(?:n)?(\d+)$")
+
+# Commands whose output for several files is not just their lines combined
+# (head prints a header per file).
+_PER_FILE_OUTPUT = ("head",)
+
+
+@dataclasses.dataclass
+class FusionContext:
+    """What a fused pipeline needs from the shell to run."""
+
+    client: Any
+    shell: PebbleShell
+    commands: Mapping[str, Command]
+    output: CommandOutput
+    run_command: Callable[[ParsedCommand, str | None, CommandOutput], int]
+
+
+def _stage_text(stage: ParsedCommand) -> str:
+    return " ".join([stage.command, *stage.args])
+
+
+def _never() -> bool:
+    return False
+
+
+def _read_file_lines(
+    context: FusionContext, name: str, file_path: str, ending: list[bytes]
+) -> Iterator[str]:
+    """Stream the lines of a (possibly compressed) file, reporting a failure to read it.
+
+    The last byte read, if any, is stored in ``ending``.
+    """
+    shell = context.shell
+    path = resolve_path(shell.current_directory, file_path, shell.home_dir)
+
+    def chunks() -> Iterator[bytes]:
+        for chunk in iter_remote_chunks(context.client, path, decompress=True):
+            if chunk:
+                ending[:] = [chunk[-1:]]
+            yield chunk
+
+    try:
+        for line in iter_lines(chunks()):
+            yield line.decode("utf-8", errors="replace")
+    except ops.pebble.PathError as e:
+        if e.kind == "not-found":
+            context.output.write_stderr(f"{name}: {file_path}: No such file or directory\n")
+        else:
+            context.output.write_stderr(f"{name}: {file_path}: {e.message}\n")
+    except (ops.pebble.APIError, ValueError) as e:
+        context.output.write_stderr(f"{name}: {file_path}: {e}\n")
+
+
+class _Operator(abc.ABC):
+    """One step of a fused pipeline, transforming a stream of lines."""
+
+    # The pipeline stages this operator replaces, for ``explain``.
+    stages: list[ParsedCommand]
+
+    # Whether the last line of the input had no newline, once the input has
+    # been read; ``FusedPipeline.run`` connects it to the previous step.
+    input_missing_newline: Callable[[], bool] = staticmethod(_never)
+
+    @abc.abstractmethod
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+
+    def prepare(self, context: FusionContext) -> None:
+        """Get ready to run, with access to the shell (most operators don't need it)."""
+        return
+
+    @abc.abstractmethod
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Transform the stream of lines."""
+
+    def missing_newline(self) -> bool:
+        """Whether the last line of the output has no newline, once it has been consumed.
+
+        Most commands end their output with a newline whatever their input.
+        """
+        return False
+
+    def exit_code(self) -> int:
+        """Exit status of the stage, once the stream has been consumed."""
+        return 0
+
+
+class _Filter(_Operator):
+    """Keep the lines that match a pattern (``grep``)."""
+
+    def __init__(
+        self,
+        stage: ParsedCommand,
+        regex: re.Pattern[bytes] | MultiPatternMatcher,
+        patterns: list[str],
+        invert: bool,
+    ):
+        self.stages = [stage]
+        self.regex = regex
+        self.patterns = patterns
+        self.invert = invert
+        self.selected = False
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        verb = "drop" if self.invert else "keep"
+        return f"filter: {verb} lines matching {self.describe_patterns()}"
+
+    def describe_patterns(self) -> str:
+        """The patterns, as they were given, for ``explain``."""
+        return " or ".join(f"/{pattern}/" for pattern in self.patterns)
+
+    def matches(self, line: str) -> bool:
+        """Whether grep would select the line."""
+        # Match the bytes, as grep does, so \w and friends mean the same.
+        return (self.regex.search(line.encode("utf-8")) is None) is self.invert
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield the selected lines."""
+        matches = self.matches
+        for line in lines:
+            if matches(line):
+                self.selected = True
+                yield line
+
+    def exit_code(self) -> int:
+        """Like grep, fail if no line was selected."""
+        return 0 if self.selected else 1
+
+
+class _Limit(_Operator):
+    """Pass on the first lines and stop reading (``head``)."""
+
+    def __init__(self, stage: ParsedCommand, count: int):
+        self.stages = [stage]
+        self.count = count
+        self.reached_end = False
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        return f"limit: first {self.count} lines, then stop reading the input"
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield the first lines."""
+        passed = 0
+        for line in itertools.islice(lines, self.count):
+            passed += 1
+            yield line
+        # Reading on to see whether the input ends here could mean searching
+        # the rest of a file, so only an input that ran out early is known
+        # to have ended.
+        self.reached_end = passed < self.count
+
+    def missing_newline(self) -> bool:
+        """Like head, keep the input's missing newline if its last line was passed on."""
+        return self.reached_end and self.input_missing_newline()
+
+
+class _Sort(_Operator):
+    """Sort the lines, spilling to disk if needed (``sort``)."""
+
+    def __init__(self, stage: ParsedCommand, options: SortOptions):
+        self.stages = [stage]
+        self.options = options
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        return "sort: external merge sort"
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield the lines in order."""
+        return external_sort(lines, self.options)
+
+
+class _Uniq(_Operator):
+    """Collapse runs of equal adjacent lines (``uniq``)."""
+
+    def __init__(self, stage: ParsedCommand, count: bool, only_repeated: bool, only_unique: bool):
+        self.stages = [stage]
+        self.count = count
+        self.only_repeated = only_repeated
+        self.only_unique = only_unique
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        return "uniq: collapse adjacent equal lines"
+
+    def wanted(self, count: int) -> bool:
+        """Whether a line seen ``count`` times is output."""
+        return not (self.only_repeated and count < 2) and not (self.only_unique and count > 1)
+
+    def render(self, line: str, count: int) -> str:
+        """Format an output line, as the uniq command does."""
+        return f"{count:7} {line}" if self.count else line
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield one line per run of equal lines."""
+        for line, group in itertools.groupby(lines):
+            count = sum(1 for _ in group)
+            if self.wanted(count):
+                yield self.render(line, count)
+
+
+class _Count(_Operator):
+    """Count lines, words and bytes without keeping them (``wc``)."""
+
+    def __init__(self, stage: ParsedCommand, columns: tuple[bool, bool, bool]):
+        self.stages = [stage]
+        self.columns = columns
+        # Set when the count takes the place of a sort, which adds any missing newline.
+        self.complete_lines = False
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        names = [
+            n for n, shown in zip(("lines", "words", "bytes"), self.columns, strict=True) if shown
+        ]
+        return f"count: {', '.join(names)} (streamed, lines are not kept)"
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield the counts as a single line, as wc prints them."""
+
+        def chunks() -> Iterator[bytes]:
+            previous = None
+            for line in lines:
+                if previous is not None:
+                    yield previous + b"\n"
+                previous = line.encode("utf-8")
+            if previous is not None:
+                missing = not self.complete_lines and self.input_missing_newline()
+                yield previous if missing else previous + b"\n"
+
+        yield format_counts(count_chunks(chunks()), self.columns)
+
+
+class _Edit(_Operator):
+    """Run a compiled sed script over the lines (``sed``)."""
+
+    def __init__(self, stage: ParsedCommand, script: SedScript, quiet: bool):
+        self.stages = [stage]
+        self.script = script
+        self.quiet = quiet
+        self.status = 0
+        self.unterminated = False
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        return f"edit: sed script of {len(self.script.commands)} commands, compiled once"
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield the lines the script prints, stopping the input at ``q``."""
+        execution = self.script.run(lines, self.quiet, self.input_missing_newline)
+        pending = ""
+        for piece in execution:
+            # Appended text and multi-line pattern spaces come as one piece.
+            *complete, pending = (pending + piece).split("\n")
+            yield from complete
+        if pending:
+            self.unterminated = True
+            yield pending
+        self.status = execution.exit_code
+
+    def missing_newline(self) -> bool:
+        """Whether sed printed the last line without a newline, as the input had none."""
+        return self.unterminated
+
+    def exit_code(self) -> int:
+        """The status given to ``q`` or ``Q``, if any."""
+        return self.status
+
+
+class _Transform(_Operator):
+    """Run a byte stream transformation over the lines (``tr``, ``expand``, ``fold``...)."""
+
+    def __init__(self, stage: ParsedCommand, make_transformer: Callable[[], ChunkTransformer]):
+        self.stages = [stage]
+        self.make_transformer = make_transformer
+        self.unterminated = False
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        return f"transform: {self.stages[0].command} over the byte stream, in batches of lines"
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield the lines of the transformed stream."""
+
+        def batches() -> Iterator[bytes]:
+            batch: list[str] = []
+            for line in lines:
+                if len(batch) >= _OUTPUT_BATCH_LINES:
+                    yield ("\n".join(batch) + "\n").encode("utf-8", errors="replace")
+                    batch.clear()
+                batch.append(line)
+            if batch:
+                end = "" if self.input_missing_newline() else "\n"
+                yield ("\n".join(batch) + end).encode("utf-8", errors="replace")
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        for data in self.make_transformer().run(batches()):
+            *complete, pending = (pending + decoder.decode(data)).split("\n")
+            yield from complete
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            self.unterminated = True
+            yield pending
+
+    def missing_newline(self) -> bool:
+        """Whether the transformed stream ended without a newline."""
+        return self.unterminated
+
+
+class _Meter(_Operator):
+    """Pass the lines on unchanged, reporting (and optionally limiting) their rate (``pv``)."""
+
+    def __init__(
+        self,
+        stage: ParsedCommand,
+        size: int | None,
+        rate: int | None,
+        name: str,
+        interval: float,
+        quiet: bool,
+        files: list[str],
+    ):
+        self.stages = [stage]
+        self.size = size
+        self.rate = rate
+        self.name = name
+        self.interval = interval
+        self.quiet = quiet
+        self.files = files
+        self._console: Any = None
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        limit = f", limited to {format_size(self.rate)}/s" if self.rate else ""
+        return f"meter: report throughput{limit} (lines pass unchanged)"
+
+    def prepare(self, context: FusionContext) -> None:
+        """Find the console to report on, and the size of any files being read."""
+        shell = context.shell
+        self._console = shell.error_console
+        if self.size is not None or not self.files:
+            return
+        total = 0
+        for file_path in self.files:
+            path = resolve_path(shell.current_directory, file_path, shell.home_dir)
+            try:
+                info = context.client.list_files(path, itself=True)
+            except (ops.pebble.PathError, ops.pebble.APIError):
+                # The source reports files that can't be read.
+                continue
+            if info:
+                total += info[0].size or 0
+        self.size = total or None
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield the lines, counting their bytes and holding them to the rate limit."""
+        meter = ThroughputMeter(self.size)
+        limiter = RateLimiter(self.rate) if self.rate else None
+        with MeterDisplay(self._console, meter, self.name, self.interval, self.quiet) as display:
+            for number, line in enumerate(lines, start=1):
+                count = (len(line) if line.isascii() else len(line.encode("utf-8"))) + 1
+                if limiter is not None:
+                    limiter.throttle(count)
+                meter.update(count)
+                if number % _METER_REFRESH_LINES == 0:
+                    display.refresh(meter)
+                yield line
+            display.refresh(meter)
+
+    def missing_newline(self) -> bool:
+        """The lines pass unchanged, and so does a missing newline."""
+        return self.input_missing_newline()
+
+
+class _HashAggregate(_Operator):
+    """``sort | uniq``: count distinct lines in a hash table, then sort only those."""
+
+    def __init__(self, sort: _Sort, uniq: _Uniq):
+        self.stages = sort.stages + uniq.stages
+        self.sort = sort
+        self.uniq = uniq
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        return "hash aggregate: count distinct lines, then sort only the distinct lines"
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield the distinct lines in sorted order, counted as uniq would."""
+        counts = collections.Counter(lines)
+        options = self.sort.options
+        # Without -s, equal lines are always next to each other after the
+        # sort, so counting them in a table gives the same groups.
+        distinct = sorted(counts, key=LineKey(options), reverse=options.reverse)
+        uniq = self.uniq
+        for line in distinct:
+            if uniq.wanted(counts[line]):
+                yield uniq.render(line, counts[line])
+
+
+class _TopK(_Operator):
+    """``sort | head``: keep only the first lines of the sort in a bounded heap."""
+
+    def __init__(self, sort: _Sort, limit: _Limit):
+        self.stages = sort.stages + limit.stages
+        self.sort = sort
+        self.count = limit.count
+
+    def describe(self) -> str:
+        """Describe the operator for ``explain``."""
+        return f"top-k: heap of the first {self.count} lines in sort order"
+
+    def apply(self, lines: Iterator[str]) -> Iterator[str]:
+        """Yield the first lines in sort order."""
+        options = self.sort.options
+        # nsmallest/nlargest give the same result as sorted(...)[:count],
+        # including the order of equal keys.
+        select = heapq.nlargest if options.reverse else heapq.nsmallest
+        return iter(select(self.count, lines, key=LineKey(options)))
+
+
+class _Source(abc.ABC):
+    """Where a fused pipeline's lines come from (its first stage)."""
+
+    stages: list[ParsedCommand]
+
+    @abc.abstractmethod
+    def describe(self) -> str:
+        """Describe the source for ``explain``."""
+
+    @abc.abstractmethod
+    def lines(self, context: FusionContext) -> Iterator[str]:
+        """Stream the lines."""
+
+    def missing_newline(self) -> bool:
+        """Whether the last line had no newline, once the lines have been read."""
+        return False
+
+
+class _FileSource(_Source):
+    """Lines read straight from files (``cat`` FILE, ``sort`` or ``head`` FILE...)."""
+
+    def __init__(self, stage: ParsedCommand, files: list[str]):
+        self.stages = [stage]
+        self.files = files
+        # The last byte of the files, once they have been read.
+        self.ending: list[bytes] = []
+
+    def describe(self) -> str:
+        """Describe the source for ``explain``."""
+        return f"scan: stream lines of {' '.join(self.files)}"
+
+    def lines(self, context: FusionContext) -> Iterator[str]:
+        """Stream the lines of every file in turn."""
+        name = self.stages[0].command
+        for file_path in self.files:
+            yield from _read_file_lines(context, name, file_path, self.ending)
+
+    def missing_newline(self) -> bool:
+        """Whether the last file that had any data ended without a newline."""
+        return self.ending not in ([], [b"\n"])
+
+
+class _GrepSource(_Source):
+    """``grep PATTERN FILE...``: the lines grep prints, produced as the files are read."""
+
+    def __init__(self, stage: ParsedCommand, grep: _Filter, files: list[str]):
+        self.stages = [stage]
+        self.grep = grep
+        self.files = files
+
+    def describe(self) -> str:
+        """Describe the source for ``explain``."""
+        verb = "not matching" if self.grep.invert else "matching"
+        return (
+            f"grep: stream the lines of {' '.join(self.files)} {verb} "
+            f"{self.grep.describe_patterns()}, formatted by grep"
+        )
+
+    def lines(self, context: FusionContext) -> Iterator[str]:
+        """Yield grep's output lines, reporting any file that can't be read."""
+
+        def report(path: str, error: Exception) -> None:
+            context.output.write_stderr(f"grep: {path}: {error}\n")
+
+        command = context.commands[self.stages[0].command]
+        yield from command.stream_lines(  # type: ignore[attr-defined]
+            context.client, list(self.stages[0].args), report
+        )
+
+
+class _CommandSource(_Source):
+    """Lines of output of a command that has no streaming source."""
+
+    def __init__(self, stage: ParsedCommand):
+        self.stages = [stage]
+        self.unterminated = False
+
+    def describe(self) -> str:
+        """Describe the source for ``explain``."""
+        return f"run: {_stage_text(self.stages[0])} (output is buffered)"
+
+    def lines(self, context: FusionContext) -> Iterator[str]:
+        """Run the command and yield its output lines."""
+        from .executor import CommandOutput
+
+        stage_output = CommandOutput()
+        context.run_command(self.stages[0], None, stage_output)
+        context.output.write_stderr(stage_output.get_stderr())
+        stdout = stage_output.get_stdout()
+        self.unterminated = not stdout.endswith("\n") and bool(stdout)
+        yield from stdout.splitlines()
+
+    def missing_newline(self) -> bool:
+        """Whether the command's output ended without a newline."""
+        return self.unterminated
+
+
+class _ProcessSource:
+    """``ps | grep``: print only the process rows that match, as plain lines.
+
+    Unlike the other sources it has no stream of lines: ps writes the rows
+    itself, and nothing follows it in the plan.
+    """
+
+    def __init__(self, stage: ParsedCommand, grep: _Filter):
+        self.stages = [stage, *grep.stages]
+        self.grep = grep
+
+    def describe(self) -> str:
+        """Describe the source for ``explain``."""
+        verb = "not matching" if self.grep.invert else "matching"
+        return (
+            f"process snapshot: print the rows {verb} {self.grep.describe_patterns()} "
+            f"as they are read, without drawing the table"
+        )
+
+    def run(self, context: FusionContext) -> int:
+        """Run ps with the filter pushed down into its process scan."""
+        import contextlib
+
+        command = context.commands[self.stages[0].command]
+        with (
+            contextlib.redirect_stdout(context.output.stdout),
+            contextlib.redirect_stderr(context.output.stderr),
+        ):
+            return command.execute_filtered(  # type: ignore[attr-defined]
+                context.client,
+                list(self.stages[0].args),
+                self.grep.matches,
+            )
+
+
+@dataclasses.dataclass
+class FusedPipeline:
+    """A pipeline rewritten as a source followed by streaming operators."""
+
+    stages: list[ParsedCommand]
+    source: _Source | _ProcessSource
+    operators: list[_Operator]
+
+    def explain(self) -> list[str]:
+        """Describe the plan, one line per step, with the stages each replaces."""
+        lines = [f"fused plan for {len(self.stages)} stages:"]
+        for number, step in enumerate([self.source, *self.operators], start=1):
+            replaced = " | ".join(_stage_text(stage) for stage in step.stages)
+            lines.append(f"  {number}. {step.describe()}")
+            lines.append(f"       replaces: {replaced}")
+        return lines
+
+    def run(self, context: FusionContext) -> int:
+        """Run the plan, writing the output to ``context.output``.
+
+        Returns:
+            The exit status of the last stage
+        """
+        if isinstance(self.source, _ProcessSource):
+            return self.source.run(context)
+        for operator in self.operators:
+            operator.prepare(context)
+        source_lines = self.source.lines(context)
+        stream: Iterator[str] = source_lines
+        missing_newline = self.source.missing_newline
+        for operator in self.operators:
+            operator.input_missing_newline = missing_newline
+            stream = operator.apply(stream)
+            missing_newline = operator.missing_newline
+        # The last line is held back until the end, when it is known whether
+        # it needs a newline.
+        batch: list[str] = []
+        try:
+            for line in stream:
+                if len(batch) >= _OUTPUT_BATCH_LINES:
+                    context.output.write_stdout("\n".join(batch), end="\n")
+                    batch.clear()
+                batch.append(line)
+        finally:
+            # If a limit stopped early, this closes the file being read.
+            source_lines.close()  # type: ignore[attr-defined]
+        if batch:
+            end = "" if missing_newline() else "\n"
+            context.output.write_stdout("\n".join(batch), end=end)
+        return self.operators[-1].exit_code() if self.operators else 0
+
+
+def _compile_grep(
+    args: list[str],
+) -> tuple[re.Pattern[bytes] | MultiPatternMatcher, list[str], bool, list[str]] | None:
+    """Parse grep arguments into (regex, patterns, invert, files), if a filter can handle them."""
+    try:
+        patterns, pattern_files, args = split_pattern_options(args)
+    except ValueError:
+        return None
+    if pattern_files:
+        return None
+    parsed = parse_flags(args, _GREP_FLAGS)
+    if parsed is None:
+        return None
+    flags, positional = parsed
+    if not patterns:
+        if not positional:
+            return None
+        patterns, positional = [positional[0]], positional[1:]
+    patterns = [line for pattern in patterns for line in pattern.split("\n")]
+    try:
+        regex = compile_patterns(
+            patterns,
+            fixed=flags["F"],
+            ignore_case=flags["i"],
+            word=flags["w"],
+            line=flags["x"],
+        )
+    except re.error:
+        return None
+    return regex, patterns, flags["v"], positional
+
+
+def _parse_head(args: list[str]) -> tuple[int, list[str]] | None:
+    """Parse head arguments (``-n N``, ``-nN``, ``-N`` or ``N``) into (count, files)."""
+    count = _DEFAULT_HEAD_LINES
+    files: list[str] = []
+    arg_iter = iter(args)
+    for arg in arg_iter:
+        match = _HEAD_COUNT.match(arg)
+        if match:
+            count = int(match.group(1))
+        elif arg == "-n":
+            value = next(arg_iter, "")
+            if not value.isdigit():
+                return None
+            count = int(value)
+        elif arg.isdigit():
+            count = int(arg)
+        elif arg.startswith("-"):
+            return None
+        else:
+            files.append(arg)
+    return count, files
+
+
+def _parse_pv(args: list[str], stage: ParsedCommand) -> tuple[_Meter, list[str]] | None:
+    """Parse pv arguments into a meter and the files it names."""
+    parsed = parse_flags(args, _PV_FLAGS)
+    if parsed is None:
+        return None
+    flags, files = parsed
+    try:
+        size = parse_size(flags["s"]) if flags["s"] else None
+        rate = parse_size(flags["L"]) if flags["L"] else None
+        interval = float(flags["i"] or 1)
+    except ValueError:
+        return None
+    if not interval > 0:
+        return None
+    return _Meter(stage, size, rate, flags["N"] or "", interval, flags["q"], files), files
+
+
+def _operator_for(stage: ParsedCommand) -> tuple[_Operator, list[str]] | None:
+    """Build the operator for a stage, with any files it names."""
+    args = stage.args
+    if stage.command == "grep":
+        grep = _compile_grep(args)
+        if grep is None:
+            return None
+        regex, patterns, invert, files = grep
+        return _Filter(stage, regex, patterns, invert), files
+    if stage.command == "sort":
+        try:
+            options, files = parse_sort_args(args)
+        except ValueError:
+            return None
+        return _Sort(stage, options), files
+    if stage.command == "head":
+        head = _parse_head(args)
+        if head is None:
+            return None
+        count, files = head
+        return _Limit(stage, count), files
+    if stage.command == "uniq":
+        if any(arg not in ("-c", "-d", "-u") for arg in args):
+            return None
+        return _Uniq(stage, "-c" in args, "-d" in args, "-u" in args), []
+    if stage.command == "wc":
+        parsed = parse_flags(args, WC_FLAGS)
+        if parsed is None or parsed[1]:
+            return None
+        return _Count(stage, selected_columns(parsed[0])), []
+    if stage.command in ("pv", "pipe_progress"):
+        return _parse_pv(args, stage)
+    if stage.command in ("tr", "expand", "unexpand", "fold"):
+        try:
+            built = build_transformer(stage.command, args)
+        except ValueError:
+            return None
+        if built is None:
+            return None
+        return _Transform(stage, built[0]), built[1]
+    if stage.command == "sed":
+        try:
+            options, files = parse_sed_args(args)
+            if options.in_place is not None or options.separate:
+                return None
+            if any(kind == "f" for kind, _ in options.scripts):
+                return None
+            script = SedScript("\n".join(text for _, text in options.scripts), options.extended)
+        except ValueError:
+            return None
+        return _Edit(stage, script, options.quiet), files
+    return None
+
+
+def _peephole(operators: list[_Operator]) -> list[_Operator]:
+    """Replace pairs of operators with cheaper fused equivalents."""
+    result: list[_Operator] = []
+    for operator in operators:
+        previous = result[-1] if result else None
+        if isinstance(previous, _Sort) and not (
+            previous.options.stable or previous.options.unique
+        ):
+            if isinstance(operator, _Uniq):
+                result[-1] = _HashAggregate(previous, operator)
+                continue
+            if isinstance(operator, _Limit):
+                result[-1] = _TopK(previous, operator)
+                continue
+            if isinstance(operator, _Count):
+                # Order doesn't change a count, so don't sort at all.
+                operator.stages = previous.stages + operator.stages
+                operator.complete_lines = True
+                result[-1] = operator
+                continue
+        result.append(operator)
+    return result
+
+
+def plan_pipeline(
+    stages: list[ParsedCommand], commands: Mapping[str, Command]
+) -> FusedPipeline | None:
+    """Build a fused plan for a pipeline, if every stage can be fused.
+
+    Args:
+        stages: The commands of the pipeline, in order
+        commands: The shell's commands, by name
+
+    Returns:
+        The plan, or None if the pipeline should run stage by stage
+    """
+    if len(stages) < 2 or any(stage.type == CommandType.REDIRECT_IN for stage in stages):
+        return None
+
+    first = stages[0]
+    downstream: list[_Operator] = []
+    for stage in stages[1:]:
+        built = _operator_for(stage)
+        if built is None or built[1]:
+            # Unknown command, unsupported options, or files (which would
+            # make the stage ignore its input).
+            return None
+        downstream.append(built[0])
+
+    source: _Source
+    head: list[_Operator] = []
+    if (
+        first.command == "ps"
+        and len(downstream) == 1
+        and isinstance(downstream[0], _Filter)
+        and callable(getattr(commands.get("ps"), "execute_filtered", None))
+        # Rows are matched as plain text, which only stands in for the table.
+        and get_output_format() == "table"
+        and not any(arg.startswith("--format") for arg in first.args)
+    ):
+        return FusedPipeline(stages, _ProcessSource(first, downstream[0]), [])
+    built = _operator_for(first)
+    # cat (like the unfused command) reads a single file.
+    if first.command == "cat" and len(first.args) == 1 and not first.args[0].startswith("-"):
+        source = _FileSource(first, list(first.args))
+    elif (
+        first.command == "grep"
+        and built is not None
+        and built[1]
+        and isinstance(built[0], _Filter)
+        and callable(getattr(commands.get("grep"), "stream_lines", None))
+    ):
+        source = _GrepSource(first, built[0], built[1])
+    elif (
+        first.command != "grep"
+        and built is not None
+        and (len(built[1]) == 1 or (built[1] and first.command not in _PER_FILE_OUTPUT))
+    ):
+        source = _FileSource(first, built[1])
+        head = [built[0]]
+    else:
+        source = _CommandSource(first)
+    return FusedPipeline(stages, source, _peephole(head + downstream))
+
+
+def explain_pipeline(stages: list[ParsedCommand], commands: Mapping[str, Command]) -> list[str]:
+    """Describe how a pipeline will be run, for the ``explain`` command."""
+    plan = plan_pipeline(stages, commands)
+    if plan is not None:
+        return plan.explain()
+    if len(stages) == 1:
+        return [f"single command: {_stage_text(stages[0])}"]
+    lines = [f"stage by stage ({len(stages)} stages, each output is buffered in full):"]
+    lines.extend(
+        f"  {number}. {_stage_text(stage)}" for number, stage in enumerate(stages, start=1)
+    )
+    return lines
@@ -0,0 +1,229 @@
+"""Run commands inside the container when it has the tools for them.
+
+Most commands pull their input over the Pebble API and do the work locally,
+which is the only option in a bare container. Many containers do ship
+busybox or coreutils, though, and then ``client.exec(["grep", ...])`` moves
+a few kilobytes of results instead of a gigabyte of log. This module
+decides when to do that:
+
+* a capability probe records which binaries can be run in the container.
+  Each binary is probed once, the first time it is needed, and the result
+  is cached for the session (per client);
+* the offload policy runs a command remotely when the binary exists and
+  the input is large: a file of at least ``OFFLOAD_THRESHOLD`` bytes, or a
+  directory, since walking one costs a round trip per entry;
+* commands whose container binary prints differently from the local
+  implementation (``sort``, ``du``, ``wc``, ``find``) only use it on
+  ``--remote``, so that their output doesn't change with the input size;
+* ``--remote`` and ``--local`` override the policy for one command. If the
+  remote run is not possible, or the container's binary rejects the
+  command line (exits with 2 or more before writing any output), the
+  command falls back to its local implementation.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import enum
+import io
+import weakref
+from typing import TYPE_CHECKING, Any
+
+import ops
+
+from .output_writer import OutputWriter
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from ..commands import Command
+
+# Input size from which work is pushed to the container.
+OFFLOAD_THRESHOLD = 8 * 1024 * 1024
+
+# Seconds to wait for a probe to finish.
+_PROBE_TIMEOUT = 10
+
+# How much of a remote command's output is read at a time.
+_READ_SIZE = 64 * 1024
+
+
+class OffloadMode(enum.Enum):
+    """Where the user asked for a command to run."""
+
+    AUTO = "auto"
+    LOCAL = "local"
+    REMOTE = "remote"
+
+
+@dataclasses.dataclass
+class RemoteResult:
+    """Outcome of a command run in the container; its output has been written already."""
+
+    stderr: str
+    exit_code: int
+    wrote_output: bool = False
+
+
+class RemoteCapabilities:
+    """Which binaries can be run in the container, probed lazily."""
+
+    def __init__(self, client: Any):
+        self._client = client
+        self._available: dict[str, bool] = {}
+
+    def has(self, binary: str) -> bool:
+        """Return whether ``binary`` can be run in the container."""
+        if binary not in self._available:
+            self._available[binary] = self._probe(binary)
+        return self._available[binary]
+
+    def _probe(self, binary: str) -> bool:
+        try:
+            process = self._client.exec([binary, "--help"], timeout=_PROBE_TIMEOUT)
+            process.wait_output()
+        except ops.pebble.ExecError:
+            # It ran; busybox applets exit non-zero after printing help.
+            return True
+        except Exception:
+            # Not found (an APIError), or the client can't exec at all.
+            return False
+        return True
+
+
+_capabilities: weakref.WeakKeyDictionary[Any, RemoteCapabilities] = weakref.WeakKeyDictionary()
+
+
+def remote_capabilities(client: Any) -> RemoteCapabilities:
+    """Return the capabilities of the container behind ``client``, cached per client."""
+    try:
+        capabilities = _capabilities.get(client)
+    except TypeError:
+        # Clients that can't be weakly referenced are probed every time.
+        return RemoteCapabilities(client)
+    if capabilities is None:
+        capabilities = _capabilities[client] = RemoteCapabilities(client)
+    return capabilities
+
+
+def split_offload_mode(args: list[str]) -> tuple[OffloadMode, list[str]]:
+    """Remove ``--local`` and ``--remote`` from ``args``.
+
+    Returns:
+        The requested mode (the last one given wins) and the other arguments
+    """
+    mode = OffloadMode.AUTO
+    remaining: list[str] = []
+    for arg in args:
+        if arg == "--local":
+            mode = OffloadMode.LOCAL
+        elif arg == "--remote":
+            mode = OffloadMode.REMOTE
+        else:
+            remaining.append(arg)
+    return mode, remaining
+
+
+def _is_large(client: Any, paths: Iterable[str], threshold: int) -> bool:
+    """Return whether the input is worth offloading; unknown sizes count as small."""
+    total = 0
+    for path in paths:
+        try:
+            info = client.list_files(path, itself=True)[0]
+        except (ops.pebble.Error, TypeError, IndexError):
+            continue
+        if info.type == ops.pebble.FileType.DIRECTORY:
+            return True
+        if isinstance(info.size, int):
+            total += info.size
+            if total >= threshold:
+                return True
+    return False
+
+
+def run_remote(
+    client: Any, argv: list[str], output: OutputWriter, working_dir: str | None = None
+) -> RemoteResult | None:
+    """Run ``argv`` in the container, writing its output as it arrives.
+
+    The output is read as bytes, so output that is not valid UTF-8 is
+    written with replacement characters rather than being cut short.
+
+    Returns:
+        The result, or None if the command could not be started
+    """
+    stderr = io.BytesIO()
+    try:
+        process = client.exec(argv, working_dir=working_dir, encoding=None, stderr=stderr)
+    except (ops.pebble.APIError, ops.pebble.ConnectionError, TypeError):
+        return None
+    wrote_output = False
+
+    def chunks() -> Iterator[bytes]:
+        nonlocal wrote_output
+        for chunk in iter(lambda: process.stdout.read(_READ_SIZE), b""):
+            wrote_output = True
+            yield chunk
+
+    try:
+        output.write_chunks(chunks())
+        process.wait()
+    except ops.pebble.ExecError as e:
+        exit_code = e.exit_code
+    else:
+        exit_code = 0
+    return RemoteResult(
+        stderr.getvalue().decode("utf-8", errors="replace"), exit_code, wrote_output
+    )
+
+
+def offload(
+    command: Command,
+    client: Any,
+    argv: list[str],
+    paths: Iterable[str],
+    mode: OffloadMode,
+    threshold: int = OFFLOAD_THRESHOLD,
+) -> int | None:
+    """Run a command in the container if the policy says so, and print its output.
+
+    Args:
+        command: The command being run (for its console and shell)
+        client: Pebble client
+        argv: The command line to run in the container
+        paths: Resolved paths of the command's input, to judge its size
+        mode: The mode from ``split_offload_mode``
+        threshold: Input size from which to offload in automatic mode
+
+    Returns:
+        The exit code of the remote command, or None if the command should
+        run locally (including when the remote command failed with 2 or
+        more without any output, which is how a binary that doesn't
+        understand the options exits)
+    """
+    if mode == OffloadMode.LOCAL:
+        return None
+    binary = argv[0]
+    if mode == OffloadMode.AUTO and not _is_large(client, paths, threshold):
+        return None
+    if not remote_capabilities(client).has(binary):
+        if mode == OffloadMode.REMOTE:
+            command.console.print(
+                f"{command.name}: {binary} is not available in the container, running locally",
+                markup=False,
+            )
+        return None
+    with OutputWriter(command.console) as output:
+        result = run_remote(client, argv, output, working_dir=command.shell.current_directory)
+    if result is None or (result.exit_code >= 2 and not result.wrote_output):
+        if mode == OffloadMode.REMOTE:
+            command.console.print(
+                f"{command.name}: could not run {binary} in the container, running locally",
+                markup=False,
+            )
+        return None
+    if result.stderr:
+        command.shell.error_console.print(
+            result.stderr, end="", markup=False, highlight=False, soft_wrap=True
+        )
+    return result.exit_code
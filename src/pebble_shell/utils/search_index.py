@@ -0,0 +1,379 @@
+"""Local trigram search index over a remote file tree.
+
+Searching the same large remote trees repeatedly means pulling every file
+each time. A trigram index records, for every three-byte sequence, which
+files contain it; a search then only needs to pull the files that contain
+all of the trigrams of some literal the pattern requires, and re-verify
+those. Trigrams are case-folded (ASCII only, as ``re`` does for bytes), so
+the same index serves case-sensitive and case-insensitive searches.
+Compressed files are indexed by their decompressed text, which is what grep
+searches.
+
+The index is stored locally, one file per indexed root, as a zlib-compressed
+manifest of the indexed files (with their size and modification time, so
+that ``update`` only re-pulls files that have changed) followed by the
+posting lists, which are delta-encoded file ids.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import ops
+
+from .streaming import (
+    DEFAULT_WORKERS,
+    bounded_map,
+    is_binary,
+    iter_remote_chunks,
+    walk_remote_files,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    import shimmer
+
+    PebbleClient = ops.pebble.Client | shimmer.PebbleCliClient
+
+# Version 1 indexes recorded compressed files as binary; they must be rebuilt.
+_MAGIC = b"CASCADE-TRIGRAM-2\n"
+
+
+class SearchIndexError(Exception):
+    """Exception raised when an index file cannot be read."""
+
+
+def default_index_dir() -> Path:
+    """Return the directory where indexes are stored (~/.cache/cascade/index)."""
+    return Path.home() / ".cache" / "cascade" / "index"
+
+
+def client_origin(client: PebbleClient) -> str:
+    """Identify the container a client talks to, so indexes are not mixed up."""
+    return str(getattr(client, "socket_path", "") or "")
+
+
+def index_file(root: str, origin: str = "", index_dir: Path | None = None) -> Path:
+    """Return the path of the index file for ``root``."""
+    digest = hashlib.sha256(f"{origin}\0{root}".encode()).hexdigest()[:32]
+    return (index_dir or default_index_dir()) / f"{digest}.idx"
+
+
+def file_trigrams(chunks: Iterable[bytes]) -> set[bytes] | None:
+    """Collect the case-folded trigrams of a stream of chunks.
+
+    Returns None if the data looks binary (binary files are not indexed).
+    """
+    found: set[bytes] = set()
+    tail = b""
+    first = True
+    for chunk in chunks:
+        if first:
+            if is_binary(chunk):
+                return None
+            first = False
+        data = (tail + chunk).lower()
+        found.update({data[i : i + 3] for i in range(len(data) - 2)})
+        tail = data[-2:]
+    return found
+
+
+def _encode_ids(ids: Iterable[int]) -> bytes:
+    out = bytearray()
+    previous = 0
+    for file_id in ids:
+        delta = file_id - previous
+        previous = file_id
+        while delta >= 0x80:
+            out.append(delta & 0x7F | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def _decode_ids(data: bytes) -> list[int]:
+    ids: list[int] = []
+    value = shift = previous = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += value
+        ids.append(previous)
+        value = shift = 0
+    return ids
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+@dataclasses.dataclass
+class IndexedFile:
+    """A file recorded in the index manifest."""
+
+    path: str
+    size: int
+    mtime: float
+    binary: bool = False
+
+
+@dataclasses.dataclass
+class UpdateStats:
+    """What changed when an index was updated."""
+
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+
+def _mtime(info: ops.pebble.FileInfo) -> float:
+    last_modified = getattr(info, "last_modified", None)
+    return last_modified.timestamp() if last_modified is not None else 0.0
+
+
+class TrigramIndex:
+    """Trigram index of the regular files under a remote directory."""
+
+    def __init__(
+        self,
+        root: str,
+        origin: str = "",
+        files: list[IndexedFile] | None = None,
+        postings: dict[bytes, bytes] | None = None,
+        updated: float | None = None,
+    ):
+        self.root = root
+        self.origin = origin
+        self.files = files or []
+        # Trigram -> delta-encoded ids of the files containing it. Lists are
+        # only decoded when a query (or update) needs them.
+        self._postings = postings or {}
+        self.updated = updated if updated is not None else time.time()
+
+    @property
+    def trigram_count(self) -> int:
+        """Number of distinct trigrams in the index."""
+        return len(self._postings)
+
+    @classmethod
+    def build(
+        cls,
+        client: PebbleClient,
+        root: str,
+        max_workers: int = DEFAULT_WORKERS,
+        on_error: Callable[[str, Exception], None] | None = None,
+    ) -> TrigramIndex:
+        """Pull every file under ``root`` (concurrently) and index it."""
+        index = cls(root, client_origin(client))
+        index._add_files(
+            client,
+            walk_remote_files(client, root, max_workers, on_error),
+            {},
+            max_workers,
+            on_error,
+        )
+        return index
+
+    def update(
+        self,
+        client: PebbleClient,
+        max_workers: int = DEFAULT_WORKERS,
+        on_error: Callable[[str, Exception], None] | None = None,
+    ) -> UpdateStats:
+        """Re-list the tree and re-index only files whose size or mtime changed."""
+        stats = UpdateStats()
+        unlisted: list[str] = []
+
+        def listing_failed(path: str, error: Exception) -> None:
+            unlisted.append(path.rstrip("/") + "/")
+            if on_error is not None:
+                on_error(path, error)
+
+        current = dict(walk_remote_files(client, self.root, max_workers, listing_failed))
+        renumber: dict[int, int] = {}
+        kept: list[IndexedFile] = []
+        for file_id, entry in enumerate(self.files):
+            info = current.get(entry.path)
+            if info is None and entry.path.startswith(tuple(unlisted)):
+                # The directory could not be listed this time; keep what we had.
+                renumber[file_id] = len(kept)
+                kept.append(entry)
+            elif info is None:
+                stats.removed += 1
+            elif info.size == entry.size and _mtime(info) == entry.mtime:
+                renumber[file_id] = len(kept)
+                kept.append(entry)
+                del current[entry.path]
+            else:
+                stats.changed += 1
+        stats.added = len(current) - stats.changed
+        stats.unchanged = len(kept)
+
+        postings: dict[bytes, list[int]] = {}
+        for trigram, encoded in self._postings.items():
+            ids = [renumber[i] for i in _decode_ids(encoded) if i in renumber]
+            if ids:
+                postings[trigram] = ids
+        self.files = kept
+        self._add_files(client, current.items(), postings, max_workers, on_error)
+        self.updated = time.time()
+        return stats
+
+    def _add_files(
+        self,
+        client: PebbleClient,
+        entries: Iterable[tuple[str, ops.pebble.FileInfo]],
+        postings: dict[bytes, list[int]],
+        max_workers: int,
+        on_error: Callable[[str, Exception], None] | None,
+    ) -> None:
+        def index_one(entry: tuple[str, ops.pebble.FileInfo]) -> set[bytes] | Exception | None:
+            try:
+                return file_trigrams(iter_remote_chunks(client, entry[0], decompress=True))
+            except (ops.pebble.PathError, ops.pebble.APIError) as e:
+                return e
+
+        # bounded_map yields in input order, so ids are appended in ascending
+        # order and the posting lists stay sorted.
+        for (path, info), trigrams in bounded_map(index_one, entries, max_workers):
+            if isinstance(trigrams, Exception):
+                if on_error is not None:
+                    on_error(path, trigrams)
+                continue
+            file_id = len(self.files)
+            self.files.append(IndexedFile(path, info.size or 0, _mtime(info), trigrams is None))
+            for trigram in trigrams or ():
+                postings.setdefault(trigram, []).append(file_id)
+        self._postings = {trigram: _encode_ids(ids) for trigram, ids in postings.items()}
+
+    def candidates(self, literal: bytes | None, under: str | None = None) -> list[str]:
+        """Return the text files that may contain ``literal``.
+
+        Args:
+            literal: A string every match must contain, or None if there is
+                no such string (then every text file is a candidate)
+            under: Only return files inside this directory
+
+        Returns:
+            Candidate file paths, in index order
+        """
+        ids: set[int] | None = None
+        if literal is not None and len(literal) >= 3:
+            folded = literal.lower()
+            grams = sorted(
+                {folded[i : i + 3] for i in range(len(folded) - 2)},
+                key=lambda g: len(self._postings.get(g, b"")),
+            )
+            for trigram in grams:
+                encoded = self._postings.get(trigram)
+                if encoded is None:
+                    return []
+                ids = set(_decode_ids(encoded)) if ids is None else ids & set(_decode_ids(encoded))
+                if not ids:
+                    return []
+        prefix = None if under is None else under.rstrip("/") + "/"
+        return [
+            entry.path
+            for file_id, entry in enumerate(self.files)
+            if not entry.binary
+            and (ids is None or file_id in ids)
+            and (prefix is None or entry.path.startswith(prefix) or entry.path == under)
+        ]
+
+    def save(self, path: Path) -> None:
+        """Write the index to ``path`` atomically."""
+        manifest = json.dumps(
+            {
+                "root": self.root,
+                "origin": self.origin,
+                "updated": self.updated,
+                "files": [[f.path, f.size, f.mtime, f.binary] for f in self.files],
+            }
+        ).encode("utf-8")
+        parts = [_MAGIC, _encode_ids([len(manifest)]), manifest]
+        for trigram, encoded in sorted(self._postings.items()):
+            parts.extend((trigram, _encode_ids([len(encoded)]), encoded))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(b"".join(parts)))
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    @classmethod
+    def load(cls, path: Path, manifest_only: bool = False) -> TrigramIndex:
+        """Read an index written by ``save``.
+
+        Raises:
+            SearchIndexError: If the file is not a valid index
+        """
+        try:
+            data = zlib.decompress(path.read_bytes())
+            if not data.startswith(_MAGIC):
+                raise SearchIndexError(f"{path}: not a search index")
+            length, offset = _read_varint(data, len(_MAGIC))
+            manifest = json.loads(data[offset : offset + length])
+            offset += length
+            postings: dict[bytes, bytes] = {}
+            while not manifest_only and offset < len(data):
+                trigram = data[offset : offset + 3]
+                length, offset = _read_varint(data, offset + 3)
+                postings[trigram] = data[offset : offset + length]
+                offset += length
+        except (OSError, zlib.error, ValueError, IndexError) as e:
+            raise SearchIndexError(f"{path}: {e}") from e
+        return cls(
+            manifest["root"],
+            manifest.get("origin", ""),
+            [IndexedFile(*entry) for entry in manifest["files"]],
+            postings,
+            manifest.get("updated"),
+        )
+
+
+def find_indexes(origin: str, index_dir: Path | None = None) -> list[TrigramIndex]:
+    """Load the manifests (without posting lists) of every index for ``origin``."""
+    directory = index_dir or default_index_dir()
+    found: list[TrigramIndex] = []
+    for path in sorted(directory.glob("*.idx")) if directory.is_dir() else []:
+        try:
+            index = TrigramIndex.load(path, manifest_only=True)
+        except SearchIndexError:
+            continue
+        if index.origin == origin:
+            found.append(index)
+    return sorted(found, key=lambda i: i.root)
+
+
+def covering_root(path: str, roots: Iterable[str]) -> str | None:
+    """Return the deepest of ``roots`` that contains ``path``, if any."""
+    best = None
+    for root in roots:
+        prefix = root.rstrip("/") + "/"
+        if (path == root or path.startswith(prefix) or root == "/") and (
+            best is None or len(root) > len(best)
+        ):
+            best = root
+    return best
@@ -0,0 +1,882 @@
+r"""Compile sed scripts once and run them over streams of lines.
+
+``SedScript`` parses a script (the text of all the ``-e`` options, joined
+by newlines) into a flat list of commands, with blocks and branches
+resolved to jumps and regular expressions translated and compiled, and
+``SedScript.run`` applies it to a stream of lines. Input is only read as
+the script asks for it, one line ahead (to know which line is ``$``), and
+``q`` stops reading altogether. A compiled script keeps no state between
+runs, so it can be run over several files at once.
+
+Supported:
+
+* Addresses: ``N``, ``$``, ``/re/``, ``\%re%``, ``first~step``,
+  ``addr1,addr2``, ``addr1,+N``, ``addr1,~N``, ``0,/re/`` and ``!``.
+* Commands: ``{ }``, ``s``, ``y``, ``d``, ``D``, ``p``, ``P``, ``n``,
+  ``N``, ``a``, ``i``, ``c``, ``=``, ``q``, ``Q``, ``h``, ``H``, ``g``,
+  ``G``, ``x``, ``z``, ``b``, ``t``, ``T``, ``:`` and ``#``.
+* ``s`` flags: ``g``, ``p``, a number, ``i``/``I`` and ``m``/``M``; the
+  replacement may use ``&``, ``\1``-``\9``, ``\n`` and the GNU case
+  conversions ``\U``, ``\L``, ``\u``, ``\l`` and ``\E``.
+
+Regular expressions are POSIX basic ones, or extended ones with
+``extended=True`` (``-E``), including bracket classes such as
+``[[:space:]]``.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import re
+import string
+from typing import TYPE_CHECKING
+
+from .command_helpers import parse_flags
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+_POSIX_CLASSES = {
+    "alpha": "a-zA-Z",
+    "digit": "0-9",
+    "alnum": "0-9a-zA-Z",
+    "upper": "A-Z",
+    "lower": "a-z",
+    "space": " \\t\\n\\r\\f\\v",
+    "blank": " \\t",
+    "punct": re.escape(string.punctuation),
+    "xdigit": "0-9A-Fa-f",
+    "cntrl": "\\x00-\\x1f\\x7f",
+    "print": "\\x20-\\x7e",
+    "graph": "\\x21-\\x7e",
+}
+
+# Characters that are special in a basic regular expression only when escaped.
+_BRE_ESCAPED_SPECIALS = "(){}|+?"
+
+_REGEX_ESCAPES = {
+    "<": r"\b(?=\w)",
+    ">": r"\b(?<=\w)",
+    "`": r"\A",
+    "'": r"\Z",
+    "n": r"\n",
+    "t": r"\t",
+}
+
+# Commands that take no arguments.
+_SIMPLE_COMMANDS = "dDpPnNgGhHxz="
+
+_UNSUPPORTED_COMMANDS = "rRwWelFv"
+
+
+def _translate_bracket(pattern: str, start: int) -> tuple[str, int]:
+    """Translate the bracket expression at ``start``; return it and the position after it."""
+    pos = start + 1
+    parts = ["["]
+    if pattern.startswith("^", pos):
+        parts.append("^")
+        pos += 1
+    if pattern.startswith("]", pos):
+        parts.append(r"\]")
+        pos += 1
+    while pos < len(pattern) and pattern[pos] != "]":
+        if pattern.startswith("[:", pos):
+            end = pattern.find(":]", pos + 2)
+            name = pattern[pos + 2 : end]
+            if end < 0 or name not in _POSIX_CLASSES:
+                raise ValueError(f"invalid character class: {pattern[pos:]!r}")
+            parts.append(_POSIX_CLASSES[name])
+            pos = end + 2
+            continue
+        char = pattern[pos]
+        if char == "\\":
+            following = pattern[pos + 1 : pos + 2]
+            if following in ("n", "t", "\\", "]"):
+                parts.append("\\" + following)
+                pos += 2
+                continue
+            # Otherwise a backslash is an ordinary character in a bracket.
+            parts.append(r"\\")
+        elif char in "[&~|":
+            parts.append("\\" + char)
+        else:
+            parts.append(char)
+        pos += 1
+    if pos >= len(pattern):
+        raise ValueError("unterminated bracket expression")
+    parts.append("]")
+    return "".join(parts), pos + 1
+
+
+def translate_regex(pattern: str, extended: bool = False, multiline: bool = False) -> str:
+    """Translate a POSIX (basic or extended) regular expression to Python syntax.
+
+    Raises:
+        ValueError: If the pattern is malformed
+    """
+    out: list[str] = []
+    pos = 0
+    length = len(pattern)
+    while pos < length:
+        char = pattern[pos]
+        if char == "\\" and pos + 1 < length:
+            following = pattern[pos + 1]
+            pos += 2
+            if not extended and following in _BRE_ESCAPED_SPECIALS:
+                out.append(following)
+            elif following in _REGEX_ESCAPES:
+                out.append(_REGEX_ESCAPES[following])
+            elif following.isdigit() or following in "wWsSbB":
+                out.append("\\" + following)
+            else:
+                out.append(re.escape(following))
+            continue
+        if char == "[":
+            bracket, pos = _translate_bracket(pattern, pos)
+            out.append(bracket)
+            continue
+        at_start = not out or out[-1] in ("(", "|", "^")
+        if not extended and char in _BRE_ESCAPED_SPECIALS:
+            out.append("\\" + char)
+        elif char == "*" and at_start:
+            out.append(r"\*")
+        elif char == "^" and not extended and not at_start:
+            out.append(r"\^")
+        elif char == "$":
+            at_end = pos + 1 == length or pattern.startswith(
+                ("\\)", "\\|") if not extended else (")", "|"), pos + 1
+            )
+            if at_end or extended:
+                out.append("$" if multiline else r"\Z")
+            else:
+                out.append(r"\$")
+        else:
+            out.append(char)
+        pos += 1
+    return "".join(out)
+
+
+def _compile_replacement(text: str, groups: int) -> str | Callable[[re.Match[str]], str]:
+    """Compile the replacement of an ``s`` command.
+
+    Returns a template for ``re.Match.expand`` or, if the replacement
+    converts case, a function of the match.
+    """
+    parts: list[tuple[str, str | int]] = []
+    pos = 0
+    while pos < len(text):
+        char = text[pos]
+        if char == "\\" and pos + 1 < len(text):
+            following = text[pos + 1]
+            pos += 2
+            if following.isdigit():
+                if int(following) > groups:
+                    raise ValueError(f"invalid reference \\{following} on `s' command's RHS")
+                parts.append(("group", int(following)))
+            elif following in "LUluE":
+                parts.append(("case", following))
+            else:
+                parts.append(("text", {"n": "\n", "t": "\t"}.get(following, following)))
+        elif char == "&":
+            parts.append(("group", 0))
+            pos += 1
+        else:
+            parts.append(("text", char))
+            pos += 1
+
+    if not any(kind == "case" for kind, _ in parts):
+        return "".join(
+            f"\\g<{value}>" if kind == "group" else str(value).replace("\\", "\\\\")
+            for kind, value in parts
+        )
+
+    def replace(match: re.Match[str]) -> str:
+        out: list[str] = []
+        mode = once = ""
+        for kind, value in parts:
+            if kind == "case":
+                if value in "lu":
+                    once = str(value)
+                else:
+                    mode = "" if value == "E" else str(value)
+                continue
+            piece = (match.group(value) or "") if kind == "group" else str(value)
+            if mode == "U":
+                piece = piece.upper()
+            elif mode == "L":
+                piece = piece.lower()
+            if once and piece:
+                piece = (piece[0].upper() if once == "u" else piece[0].lower()) + piece[1:]
+                once = ""
+            out.append(piece)
+        return "".join(out)
+
+    return replace
+
+
+@dataclasses.dataclass
+class _Address:
+    """One address of a command; ``relative`` and ``multiple`` only end a range."""
+
+    line: int | None = None
+    step: int = 0
+    last: bool = False
+    regex: re.Pattern[str] | None = None
+    relative: int | None = None
+    multiple: int | None = None
+
+    def matches(self, pattern_space: str, line_number: int, is_last: bool) -> bool:
+        """Whether the address selects the current line."""
+        if self.regex is not None:
+            return self.regex.search(pattern_space) is not None
+        if self.last:
+            return is_last
+        assert self.line is not None
+        if self.step:
+            return line_number >= self.line and (line_number - self.line) % self.step == 0
+        return line_number == self.line
+
+
+@dataclasses.dataclass
+class _Command:
+    """A compiled command; which fields are used depends on ``name``."""
+
+    name: str
+    first: _Address | None = None
+    second: _Address | None = None
+    negate: bool = False
+    # Text of a, i and c; label of b, t, T and :.
+    text: str = ""
+    # Where '{' goes when it doesn't match, and where b, t and T jump to.
+    jump: int = 0
+    regex: re.Pattern[str] | None = None
+    replacement: str | Callable[[re.Match[str]], str] = ""
+    occurrence: int = 1
+    replace_all: bool = False
+    print_result: bool = False
+    table: dict[int, str] = dataclasses.field(default_factory=dict)
+    exit_code: int = 0
+
+
+class _ScriptParser:
+    """Parse the text of a script into commands."""
+
+    def __init__(self, text: str, extended: bool):
+        self._text = text
+        self._pos = 0
+        self._extended = extended
+        self._last_regex: re.Pattern[str] | None = None
+
+    def _peek(self) -> str:
+        return self._text[self._pos : self._pos + 1]
+
+    def _skip(self, characters: str) -> None:
+        while self._pos < len(self._text) and self._text[self._pos] in characters:
+            self._pos += 1
+
+    def _number(self) -> int:
+        start = self._pos
+        self._skip("0123456789")
+        if start == self._pos:
+            raise ValueError(f"expected a number at char {self._pos + 1}")
+        return int(self._text[start : self._pos])
+
+    def _delimited(self, delimiter: str) -> str:
+        """Read up to an unescaped ``delimiter``, which is consumed."""
+        out: list[str] = []
+        while self._pos < len(self._text):
+            char = self._text[self._pos]
+            if char == "\\" and self._pos + 1 < len(self._text):
+                following = self._text[self._pos + 1]
+                out.append(following if following == delimiter else char + following)
+                self._pos += 2
+                continue
+            self._pos += 1
+            if char == delimiter:
+                return "".join(out)
+            out.append(char)
+        raise ValueError(f"unterminated address regex or `s' command: {self._text!r}")
+
+    def _regex(self, pattern: str, flags: str) -> re.Pattern[str]:
+        if not pattern:
+            if self._last_regex is None:
+                raise ValueError("no previous regular expression")
+            return self._last_regex
+        options = re.IGNORECASE if "I" in flags.upper() else 0
+        multiline = "M" in flags.upper()
+        if multiline:
+            options |= re.MULTILINE
+        try:
+            regex = re.compile(translate_regex(pattern, self._extended, multiline), options)
+        except re.error as e:
+            raise ValueError(f"invalid regular expression {pattern!r}: {e}") from None
+        self._last_regex = regex
+        return regex
+
+    def _address(self) -> _Address | None:
+        char = self._peek()
+        if char.isdigit():
+            line = self._number()
+            if self._peek() == "~":
+                self._pos += 1
+                return _Address(line=line, step=self._number())
+            return _Address(line=line)
+        if char == "$":
+            self._pos += 1
+            return _Address(last=True)
+        if char in ("/", "\\"):
+            self._pos += 1
+            delimiter = "/"
+            if char == "\\":
+                delimiter = self._peek()
+                self._pos += 1
+            pattern = self._delimited(delimiter)
+            start = self._pos
+            self._skip("IM")
+            return _Address(regex=self._regex(pattern, self._text[start : self._pos]))
+        return None
+
+    def _addresses(self) -> tuple[_Address | None, _Address | None]:
+        first = self._address()
+        if first is None:
+            return None, None
+        second = None
+        self._skip(" \t")
+        if self._peek() == ",":
+            self._pos += 1
+            self._skip(" \t")
+            if self._peek() == "+":
+                self._pos += 1
+                second = _Address(relative=self._number())
+            elif self._peek() == "~":
+                self._pos += 1
+                second = _Address(multiple=self._number())
+            else:
+                second = self._address()
+                if second is None or second.step:
+                    raise ValueError("unexpected `,'")
+        if first.line == 0 and not first.step and (second is None or second.regex is None):
+            raise ValueError("invalid usage of line address 0")
+        return first, second
+
+    def _end_of_command(self) -> None:
+        self._skip(" \t")
+        char = self._peek()
+        if char in ("", "}", "#"):
+            return
+        if char in (";", "\n"):
+            self._pos += 1
+            return
+        raise ValueError(f"extra characters after command: {self._text[self._pos :]!r}")
+
+    def _label(self) -> str:
+        self._skip(" \t")
+        start = self._pos
+        while self._pos < len(self._text) and self._text[self._pos] not in ";\n}":
+            self._pos += 1
+        label = self._text[start : self._pos].strip()
+        if self._peek() in (";", "\n"):
+            self._pos += 1
+        return label
+
+    def _command_text(self) -> str:
+        """Read the text of a, i or c, in either the one-line or the classic form."""
+        self._skip(" \t")
+        if self._peek() == "\\":
+            self._pos += 1
+            if self._peek() == "\n":
+                self._pos += 1
+        out: list[str] = []
+        while self._pos < len(self._text):
+            char = self._text[self._pos]
+            self._pos += 1
+            if char == "\\" and self._pos < len(self._text):
+                out.append(self._text[self._pos])
+                self._pos += 1
+            elif char == "\n":
+                break
+            else:
+                out.append(char)
+        return "".join(out)
+
+    def _substitute(self, command: _Command) -> None:
+        delimiter = self._peek()
+        if delimiter in ("", "\n", "\\"):
+            raise ValueError("unterminated `s' command")
+        self._pos += 1
+        pattern = self._delimited(delimiter)
+        replacement = self._delimited(delimiter)
+        flags = ""
+        while (char := self._peek()) and char in "gpiImM0123456789we":
+            if char.isdigit():
+                command.occurrence = self._number()
+                if command.occurrence == 0:
+                    raise ValueError("number option to `s' command may not be zero")
+                continue
+            if char in "we":
+                raise ValueError(f"unsupported `s' command flag: {char}")
+            if char == "g":
+                command.replace_all = True
+            elif char == "p":
+                command.print_result = True
+            else:
+                flags += char
+            self._pos += 1
+        command.regex = self._regex(pattern, flags)
+        command.replacement = _compile_replacement(replacement, command.regex.groups)
+
+    def _transliterate(self, command: _Command) -> None:
+        delimiter = self._peek()
+        self._pos += 1
+        source = self._delimited(delimiter).replace("\\n", "\n").replace("\\\\", "\\")
+        target = self._delimited(delimiter).replace("\\n", "\n").replace("\\\\", "\\")
+        if len(source) != len(target):
+            raise ValueError("strings for `y' command are different lengths")
+        command.table = str.maketrans(source, target)
+
+    def parse(self) -> list[_Command]:
+        commands: list[_Command] = []
+        blocks: list[int] = []
+        labels: dict[str, int] = {}
+        while True:
+            self._skip(" \t\n;")
+            if self._pos >= len(self._text):
+                break
+            if self._peek() == "#":
+                newline = self._text.find("\n", self._pos)
+                self._pos = len(self._text) if newline < 0 else newline
+                continue
+            first, second = self._addresses()
+            self._skip(" \t")
+            negate = False
+            while self._peek() == "!":
+                negate = True
+                self._pos += 1
+                self._skip(" \t")
+            name = self._peek()
+            if not name:
+                raise ValueError("missing command")
+            self._pos += 1
+            command = _Command(name, first, second, negate)
+            if name == "{":
+                blocks.append(len(commands))
+            elif name == "}":
+                if first is not None or negate:
+                    raise ValueError("} doesn't want any addresses")
+                if not blocks:
+                    raise ValueError("unexpected `}'")
+                commands[blocks.pop()].jump = len(commands) + 1
+                self._end_of_command()
+            elif name in "aic":
+                command.text = self._command_text()
+            elif name == ":":
+                if first is not None:
+                    raise ValueError(": doesn't want any addresses")
+                label = self._label()
+                if not label:
+                    raise ValueError('":" lacks a label')
+                labels[label] = len(commands)
+            elif name in "btT":
+                command.text = self._label()
+            elif name == "s":
+                self._substitute(command)
+                self._end_of_command()
+            elif name == "y":
+                self._transliterate(command)
+                self._end_of_command()
+            elif name in "qQ":
+                if second is not None:
+                    raise ValueError(f"command only uses one address: {name}")
+                self._skip(" \t")
+                if self._peek().isdigit():
+                    command.exit_code = self._number()
+                self._end_of_command()
+            elif name in _SIMPLE_COMMANDS:
+                self._end_of_command()
+            elif name in _UNSUPPORTED_COMMANDS:
+                raise ValueError(f"unsupported command: {name}")
+            else:
+                raise ValueError(f"unknown command: `{name}'")
+            commands.append(command)
+        if blocks:
+            raise ValueError("unmatched `{'")
+        for command in commands:
+            if command.name in "btT":
+                if command.text and command.text not in labels:
+                    raise ValueError(f"can't find label for jump to `{command.text}'")
+                command.jump = labels[command.text] if command.text else len(commands)
+        return commands
+
+
+def _matches(regex: re.Pattern[str], text: str) -> Iterator[re.Match[str]]:
+    """The matches ``s///g`` replaces: as GNU sed, an empty match right after a match is skipped."""
+    end = -1
+    for match in regex.finditer(text):
+        if match.start() == match.end() == end:
+            continue
+        end = match.end()
+        yield match
+
+
+def _substitute(command: _Command, text: str) -> str | None:
+    """Apply an ``s`` command, returning the new text or None if nothing matched."""
+    regex = command.regex
+    assert regex is not None
+    replacement = command.replacement
+    if command.occurrence == 1 and not command.replace_all:
+        new, count = regex.subn(replacement, text, count=1)
+        return new if count else None
+    pieces: list[str] = []
+    pos = 0
+    for number, match in enumerate(_matches(regex, text), start=1):
+        if number < command.occurrence:
+            continue
+        pieces.append(text[pos : match.start()])
+        pieces.append(
+            match.expand(replacement) if isinstance(replacement, str) else replacement(match)
+        )
+        pos = match.end()
+        if not command.replace_all:
+            break
+    if not pieces:
+        return None
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+class SedExecution:
+    """One run of a script over a stream of lines; iterate over it for the output.
+
+    Each piece of output ends with a newline, except that, as with GNU sed,
+    the last input line is printed without one if it had none (and the
+    newline is added back if anything is printed after it). Once the output
+    has been consumed, ``exit_code`` is the status given to ``q`` or ``Q``
+    (or 0), and ``quit`` is whether one of them stopped the run before the
+    end of the input.
+    """
+
+    def __init__(
+        self,
+        commands: list[_Command],
+        lines: Iterable[str],
+        quiet: bool,
+        missing_newline: Callable[[], bool] | None = None,
+    ):
+        self._commands = commands
+        self._lines = iter(lines)
+        self._quiet = quiet
+        self._missing_newline = missing_newline
+        self.exit_code = 0
+        self.quit = False
+
+    def _selects(
+        self,
+        index: int,
+        command: _Command,
+        pattern_space: str,
+        line_number: int,
+        is_last: bool,
+        active: list[bool],
+        range_end: list[int],
+    ) -> bool:
+        """Whether the addresses of a command select the current line."""
+        first, second = command.first, command.second
+        assert first is not None
+        if second is None:
+            return first.matches(pattern_space, line_number, is_last)
+        if active[index]:
+            if second.regex is not None:
+                active[index] = not second.matches(pattern_space, line_number, is_last)
+            elif second.last:
+                active[index] = not is_last
+            else:
+                active[index] = line_number < range_end[index]
+            return True
+        if not first.matches(pattern_space, line_number, is_last):
+            return False
+        if second.regex is not None or second.last:
+            active[index] = not is_last
+        else:
+            if second.relative is not None:
+                end = line_number + second.relative
+            elif second.multiple is not None:
+                multiple = second.multiple
+                end = -(-line_number // multiple) * multiple if multiple > 0 else line_number
+            else:
+                assert second.line is not None
+                end = second.line
+            range_end[index] = end
+            active[index] = line_number < end
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        owed = False
+        for piece in self._run():
+            if owed:
+                yield "\n"
+            owed = not piece.endswith("\n")
+            yield piece
+
+    def _last_newline(self) -> str:
+        """The newline to print after the last line: none if the input didn't end in one."""
+        missing = self._missing_newline is not None and self._missing_newline()
+        return "" if missing else "\n"
+
+    def _run(self) -> Iterator[str]:
+        """Run the script, printing the last line without a newline if it had none."""
+        commands = self._commands
+        count = len(commands)
+        quiet = self._quiet
+        lines = self._lines
+        active = [
+            command.first is not None and command.first.line == 0 and not command.first.step
+            for command in commands
+        ]
+        range_end = [0] * count
+        pending = next(lines, None)
+        if pending is None:
+            return
+        pattern_space = pending
+        pending = next(lines, None)
+        # What ends the pattern and hold spaces: only the last input line
+        # can lack a newline, and that moves with the text (x, g, h and so on).
+        line_end = "\n" if pending is not None else self._last_newline()
+        hold_end = "\n"
+        line_number = 1
+        hold = ""
+        substituted = False
+        restart = False
+        while True:
+            appended: list[str] = []
+            autoprint = not quiet
+            stop = False
+            pc = 0
+            while pc < count:
+                command = commands[pc]
+                name = command.name
+                if command.first is not None:
+                    selected = self._selects(
+                        pc,
+                        command,
+                        pattern_space,
+                        line_number,
+                        pending is None,
+                        active,
+                        range_end,
+                    )
+                    if selected is command.negate:
+                        pc = command.jump if name == "{" else pc + 1
+                        continue
+                elif command.negate:
+                    pc = command.jump if name == "{" else pc + 1
+                    continue
+                pc += 1
+                if name == "s":
+                    new = _substitute(command, pattern_space)
+                    if new is not None:
+                        pattern_space = new
+                        substituted = True
+                        if command.print_result:
+                            yield pattern_space + line_end
+                elif name == "p":
+                    yield pattern_space + line_end
+                elif name == "d":
+                    autoprint = False
+                    break
+                elif name == "b":
+                    pc = command.jump
+                elif name in ("t", "T"):
+                    # t branches if there was a substitution, T if there wasn't.
+                    if substituted is (name == "t"):
+                        pc = command.jump
+                    substituted = False
+                elif name in ("{", "}", ":"):
+                    pass
+                elif name in ("n", "N"):
+                    if pending is None:
+                        # No more input: end here, printing unless -n.
+                        stop = True
+                        break
+                    if name == "n" and not quiet:
+                        yield pattern_space + line_end
+                    yield from appended
+                    appended = []
+                    line = pending
+                    pending = next(lines, None)
+                    line_end = "\n" if pending is not None else self._last_newline()
+                    line_number += 1
+                    substituted = False
+                    pattern_space = line if name == "n" else pattern_space + "\n" + line
+                elif name == "y":
+                    pattern_space = pattern_space.translate(command.table)
+                elif name == "a":
+                    appended.append(command.text + "\n")
+                elif name == "i":
+                    yield command.text + "\n"
+                elif name == "c":
+                    # In a range, the text replaces the whole range, at its end.
+                    if command.second is None or command.negate or not active[pc - 1]:
+                        yield command.text + "\n"
+                    autoprint = False
+                    break
+                elif name == "D":
+                    newline = pattern_space.find("\n")
+                    autoprint = False
+                    if newline >= 0:
+                        pattern_space = pattern_space[newline + 1 :]
+                        restart = True
+                    break
+                elif name == "P":
+                    first, found, _ = pattern_space.partition("\n")
+                    yield first + (found or line_end)
+                elif name == "=":
+                    yield f"{line_number}\n"
+                elif name in ("q", "Q"):
+                    self.exit_code = command.exit_code
+                    self.quit = stop = True
+                    line_end = "\n"
+                    if name == "Q":
+                        autoprint = False
+                        appended = []
+                    break
+                elif name == "h":
+                    hold, hold_end = pattern_space, line_end
+                elif name == "H":
+                    hold, hold_end = hold + "\n" + pattern_space, line_end
+                elif name == "g":
+                    pattern_space, line_end = hold, hold_end
+                elif name == "G":
+                    pattern_space, line_end = pattern_space + "\n" + hold, hold_end
+                elif name == "x":
+                    pattern_space, hold = hold, pattern_space
+                    line_end, hold_end = hold_end, line_end
+                elif name == "z":
+                    pattern_space = ""
+            if autoprint:
+                yield pattern_space + line_end
+            yield from appended
+            if stop:
+                return
+            if restart:
+                restart = False
+                continue
+            if pending is None:
+                return
+            pattern_space = pending
+            pending = next(lines, None)
+            line_end = "\n" if pending is not None else self._last_newline()
+            line_number += 1
+            substituted = False
+
+
+class SedScript:
+    """A compiled sed script.
+
+    Args:
+        text: The script; several ``-e`` expressions are joined by newlines
+        extended: Use extended regular expressions (``-E``)
+
+    Raises:
+        ValueError: If the script is not valid
+    """
+
+    def __init__(self, text: str, extended: bool = False):
+        self.commands = _ScriptParser(text, extended).parse()
+        # A first line of "#n" is the same as -n.
+        self.quiet = text == "#n" or text.startswith("#n\n")
+
+    def run(
+        self,
+        lines: Iterable[str],
+        quiet: bool = False,
+        missing_newline: Callable[[], bool] | None = None,
+    ) -> SedExecution:
+        """Run the script over ``lines`` (without their newlines).
+
+        ``missing_newline`` is called once the input is exhausted, to ask
+        whether its last line had no newline.
+        """
+        return SedExecution(self.commands, lines, quiet or self.quiet, missing_newline)
+
+
+@dataclasses.dataclass
+class SedOptions:
+    """The options of a ``sed`` command line."""
+
+    # The pieces of the script, in command line order: ("e", TEXT) for an
+    # expression and ("f", PATH) for a script file.
+    scripts: list[tuple[str, str]]
+    quiet: bool = False
+    extended: bool = False
+    separate: bool = False
+    # The backup suffix for -i ("" for no backup), or None to write to stdout.
+    in_place: str | None = None
+
+
+def parse_sed_args(args: list[str]) -> tuple[SedOptions, list[str]]:
+    """Parse ``sed`` command line arguments.
+
+    Without ``-e`` or ``-f``, the first argument that is not an option is
+    the script.
+
+    Returns:
+        The options and the remaining (file) arguments
+
+    Raises:
+        ValueError: If an option is invalid or there is no script
+    """
+    # -e and -f may be repeated, and -i takes an optional attached suffix,
+    # so these are handled before parse_flags sees the rest.
+    scripts: list[tuple[str, str]] = []
+    in_place: str | None = None
+    rest: list[str] = []
+    arg_iter = iter(args)
+    for arg in arg_iter:
+        if arg == "--":
+            rest.append(arg)
+            rest.extend(arg_iter)
+        elif arg in ("-e", "--expression", "-f", "--file"):
+            value = next(arg_iter, None)
+            if value is None:
+                raise ValueError(f"option requires an argument: {arg}")
+            scripts.append(("e" if arg in ("-e", "--expression") else "f", value))
+        elif arg.startswith(("--expression=", "--file=")):
+            name, value = arg[2:].split("=", 1)
+            scripts.append((name[0], value))
+        elif arg.startswith("-i") or arg == "--in-place" or arg.startswith("--in-place="):
+            in_place = arg[2:] if arg.startswith("-i") else arg.partition("=")[2]
+        elif arg.startswith("-e") and len(arg) > 2:
+            scripts.append(("e", arg[2:]))
+        else:
+            rest.append(arg)
+
+    parsed = parse_flags(
+        rest,
+        {
+            "n": bool,  # don't print the pattern space automatically
+            "quiet": bool,
+            "silent": bool,
+            "E": bool,  # extended regular expressions
+            "r": bool,
+            "regexp-extended": bool,
+            "s": bool,  # separate files
+            "separate": bool,
+        },
+    )
+    if parsed is None:
+        raise ValueError("invalid option")
+    flags, files = parsed
+    if files and files[0] == "--":
+        files = files[1:]
+    if not scripts:
+        if not files:
+            raise ValueError("no script specified")
+        scripts = [("e", files.pop(0))]
+    options = SedOptions(
+        scripts=scripts,
+        quiet=flags["n"] or flags["quiet"] or flags["silent"],
+        extended=flags["E"] or flags["r"] or flags["regexp-extended"],
+        separate=flags["s"] or flags["separate"] or in_place is not None,
+        in_place=in_place,
+    )
+    return options, files
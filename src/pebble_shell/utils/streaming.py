@@ -0,0 +1,487 @@
+"""Streaming and concurrent I/O helpers for working with large remote files and trees.
+
+The Pebble files API hands back a file-like object for each pull, so rather
+than reading whole files into memory, commands that may be pointed at large
+logs or directory trees should read through these helpers: files are read in
+fixed-size binary chunks, directory trees are listed one level at a time with
+the listings issued concurrently, and per-file work can be fanned out over a
+bounded thread pool so that only a limited number of files are in flight.
+
+Files compressed with gzip, bzip2, xz or lzma can be read through an
+incremental decompressor (see ``iter_decompressed``), which is chosen by
+sniffing the magic bytes at the start of the file, so line-oriented
+commands can stream through compressed logs without inflating them in
+memory.
+"""
+
+from __future__ import annotations
+
+import bz2
+import collections
+import concurrent.futures
+import itertools
+import lzma
+import os
+import zlib
+from typing import TYPE_CHECKING, TypeVar
+
+import ops
+
+if TYPE_CHECKING:
+    import threading
+    from collections.abc import Callable, Iterable, Iterator
+
+    import shimmer
+
+    PebbleClient = ops.pebble.Client | shimmer.PebbleCliClient
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Size of each read from a pulled file.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Upper bound for adaptive reads of large files (see iter_remote_chunks).
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Number of concurrent Pebble requests (pulls or listings) to have in flight.
+DEFAULT_WORKERS = 8
+
+# How many bytes of the start of a file to inspect when deciding if it is binary.
+BINARY_SNIFF_SIZE = 8192
+
+# Largest piece of output produced from one step of a decompressor, so that
+# highly compressed input never inflates into one huge buffer.
+DECOMPRESSED_CHUNK_SIZE = 256 * 1024
+
+# Magic bytes at the start of each compressed format that can be read (see
+# detect_compression for the further header checks).
+COMPRESSION_MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "bzip2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "lzma": b"\x5d\x00\x00",
+}
+
+# File name suffixes that usually mean a compressed file.
+COMPRESSED_SUFFIXES = (".gz", ".tgz", ".z", ".bz2", ".tbz2", ".xz", ".txz", ".lzma")
+
+# Bytes needed to check a header: the 13-byte header of the lzma format is
+# the longest.
+_HEADER_SIZE = 13
+
+# What follows "BZh" and the block size digit: the magic of the first block,
+# or of the end of the stream if it is empty.
+_BZIP2_BLOCK_MAGIC = (b"1AY&SY", b"\x17rE8P\x90")
+
+# The lzma properties byte encodes lc + lp * 9 + pb * 45, with pb at most 4.
+_LZMA_MAX_PROPERTIES = 9 * 5 * 5
+
+# Largest uncompressed size lzma headers give in practice (256 GiB), as
+# checked by xz; larger values are more likely to be arbitrary bytes.
+_LZMA_MAX_KNOWN_SIZE = 1 << 38
+
+
+def iter_remote_chunks(
+    client: PebbleClient,
+    path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stop: threading.Event | None = None,
+    max_chunk_size: int | None = None,
+    decompress: bool = False,
+) -> Iterator[bytes]:
+    """Read a remote file as a stream of binary chunks.
+
+    The file is opened when iteration starts, so PathError and APIError are
+    raised from the first ``next()`` call rather than from this function.
+    Closing the generator early (or setting ``stop``) stops the read without
+    pulling the rest of the file.
+
+    Args:
+        client: Pebble client
+        path: Path of the remote file
+        chunk_size: Number of bytes to request per read
+        stop: Optional event; reading stops at the next chunk boundary once set
+        max_chunk_size: If given, the read size doubles after every full
+            chunk up to this limit, so small files are read in small reads
+            and large files in large ones
+        decompress: If true, a compressed file is decompressed as it is read
+            (see ``iter_decompressed``); other files are read unchanged
+
+    Yields:
+        Chunks of the file, each at most ``chunk_size`` (or ``max_chunk_size``) bytes
+    """
+
+    def read() -> Iterator[bytes]:
+        nonlocal chunk_size
+        with client.pull(path, encoding=None) as file:
+            while stop is None or not stop.is_set():
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                if max_chunk_size is not None and len(chunk) == chunk_size:
+                    chunk_size = min(chunk_size * 2, max_chunk_size)
+                yield chunk
+
+    if decompress:
+        yield from iter_decompressed(read())
+    else:
+        yield from read()
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Split a stream of chunks into lines, without the trailing newline.
+
+    Lines that straddle chunk boundaries are joined back together. A final
+    line without a trailing newline is still yielded.
+    """
+    pending = b""
+    for chunk in chunks:
+        if pending:
+            chunk = pending + chunk
+        lines = chunk.split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def iter_decoded_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split a stream of chunks into lines of text, without their line endings.
+
+    A carriage return before the newline is dropped too, and invalid UTF-8 is
+    replaced rather than raising an error.
+    """
+    for line in iter_lines(chunks):
+        yield line.decode("utf-8", errors="replace").removesuffix("\r")
+
+
+def iter_byte_range(
+    chunks: Iterable[bytes], skip: int = 0, length: int | None = None
+) -> Iterator[bytes]:
+    """Restrict a stream of chunks to ``length`` bytes starting at offset ``skip``.
+
+    Skipped bytes still have to be read (pulls cannot seek), but once
+    ``length`` bytes have been yielded the underlying stream is closed, so
+    the rest of a remote file is not pulled.
+    """
+    iterator = iter(chunks)
+    try:
+        for chunk in iterator:
+            if skip:
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    continue
+                chunk = chunk[skip:]
+                skip = 0
+            if length is not None:
+                if len(chunk) >= length:
+                    if length:
+                        yield chunk[:length]
+                    return
+                length -= len(chunk)
+            yield chunk
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+class ChunkReader:
+    """A read-only binary file over a stream of chunks, for parsers that want a file.
+
+    Only ``read`` is provided, so the chunks are consumed as the parser asks
+    for data rather than joined up front.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes (fewer only at the end), or everything left."""
+        if size < 0:
+            data = self._pending[self._pos :] + b"".join(self._chunks)
+            self._pending, self._pos = b"", 0
+            return data
+        while len(self._pending) - self._pos < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._pending = self._pending[self._pos :] + chunk
+            self._pos = 0
+        data = self._pending[self._pos : self._pos + size]
+        self._pos += len(data)
+        return data
+
+    def close(self) -> None:
+        """Stop reading the stream."""
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def is_binary(chunk: bytes) -> bool:
+    """Guess whether data is binary by looking for NUL bytes in its first block."""
+    return b"\0" in chunk[:BINARY_SNIFF_SIZE]
+
+
+def detect_compression(head: bytes) -> str | None:
+    """Identify the compression format of data from its first few bytes.
+
+    Besides the magic bytes, the fields that follow them are checked, so
+    that text or binary files that happen to start the same way are not
+    taken for compressed ones: the compression method of gzip, the block
+    magic of bzip2 and the properties, dictionary size and uncompressed
+    size of lzma.
+
+    Returns:
+        "gzip", "bzip2", "xz" or "lzma", or None if the data isn't compressed
+    """
+    if head.startswith(COMPRESSION_MAGIC["gzip"]):
+        # Deflate is the only method, and the top three flag bits are reserved.
+        if head[2:3] == b"\x08" and len(head) > 3 and not head[3] & 0xE0:
+            return "gzip"
+        return None
+    if head.startswith(COMPRESSION_MAGIC["bzip2"]):
+        if head[3:4] and head[3:4] in b"123456789" and head[4:10] in _BZIP2_BLOCK_MAGIC:
+            return "bzip2"
+        return None
+    if head.startswith(COMPRESSION_MAGIC["xz"]):
+        return "xz"
+    if head.startswith(COMPRESSION_MAGIC["lzma"]) and _is_lzma_header(head):
+        return "lzma"
+    return None
+
+
+def _is_lzma_header(head: bytes) -> bool:
+    """Whether data starts with a plausible header of the legacy lzma format."""
+    if len(head) < _HEADER_SIZE or head[0] >= _LZMA_MAX_PROPERTIES:
+        return False
+    # The dictionary size is 2^n or 2^n + 2^(n-1), as written by lzma and xz.
+    dictionary_size = int.from_bytes(head[1:5], "little")
+    lowest_bit = dictionary_size & -dictionary_size
+    if dictionary_size not in (lowest_bit, lowest_bit * 3):
+        return False
+    uncompressed_size = int.from_bytes(head[5:13], "little")
+    return uncompressed_size == (1 << 64) - 1 or uncompressed_size < _LZMA_MAX_KNOWN_SIZE
+
+
+def has_compressed_suffix(path: str) -> bool:
+    """Whether a file name looks like that of a compressed file."""
+    return path.lower().endswith(COMPRESSED_SUFFIXES)
+
+
+class _Decoder:
+    """An incremental decompressor for one gzip member, or bzip2, xz or lzma stream."""
+
+    def __init__(self, file_format: str):
+        self.file_format = file_format
+        if file_format == "gzip":
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif file_format == "bzip2":
+            self._other = bz2.BZ2Decompressor()
+        elif file_format == "xz":
+            self._other = lzma.LZMADecompressor(lzma.FORMAT_XZ)
+        elif file_format == "lzma":
+            self._other = lzma.LZMADecompressor(lzma.FORMAT_ALONE)
+        else:
+            raise ValueError(f"unknown compression format: {file_format}")
+
+    @property
+    def eof(self) -> bool:
+        return self._zlib.eof if self.file_format == "gzip" else self._other.eof
+
+    @property
+    def unused_data(self) -> bytes:
+        return self._zlib.unused_data if self.file_format == "gzip" else self._other.unused_data
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        """Decompress ``data``, yielding at most DECOMPRESSED_CHUNK_SIZE bytes at a time."""
+        if self.file_format == "gzip":
+            while not self._zlib.eof:
+                output = self._zlib.decompress(data, DECOMPRESSED_CHUNK_SIZE)
+                data = self._zlib.unconsumed_tail
+                if output:
+                    yield output
+                if not data and len(output) < DECOMPRESSED_CHUNK_SIZE:
+                    return
+            return
+        output = self._other.decompress(data, DECOMPRESSED_CHUNK_SIZE)
+        while True:
+            if output:
+                yield output
+            if self._other.eof or self._other.needs_input:
+                return
+            output = self._other.decompress(b"", DECOMPRESSED_CHUNK_SIZE)
+
+
+def iter_decompressed(chunks: Iterable[bytes], file_format: str | None = None) -> Iterator[bytes]:
+    """Decompress a stream of chunks incrementally, in constant memory.
+
+    The format is sniffed from the header at the start of the data unless it
+    is given; data that isn't compressed is passed through unchanged, as is
+    sniffed data that fails to decode in its first chunk (a file that only
+    looks like it is compressed). Concatenated gzip members and bzip2 or xz
+    streams (as written by parallel compressors) are all decompressed, and
+    NUL padding between them is skipped.
+
+    Raises:
+        ValueError: If the data is corrupt or truncated (raised when the
+            problem is reached, after the output before it has been yielded)
+    """
+    iterator = iter(chunks)
+    try:
+        head = b""
+        for chunk in iterator:
+            head += chunk
+            if len(head) >= _HEADER_SIZE:
+                break
+        sniffed = file_format is None
+        if file_format is None:
+            file_format = detect_compression(head)
+            if file_format is None:
+                if head:
+                    yield head
+                yield from iterator
+                return
+
+        decoder = _Decoder(file_format)
+        started = False
+        produced = False
+        try:
+            for data in itertools.chain((head,), iterator):
+                while data:
+                    if decoder.eof:
+                        data = data.lstrip(b"\0")
+                        if not data:
+                            break
+                        decoder = _Decoder(file_format)
+                    started = True
+                    for output in decoder.feed(data):
+                        produced = True
+                        yield output
+                    data = decoder.unused_data if decoder.eof else b""
+        except (zlib.error, lzma.LZMAError, OSError, EOFError) as e:
+            if sniffed and not produced and data is head:
+                # Not compressed after all: nothing but the first chunk has been read.
+                yield head
+                yield from iterator
+                return
+            raise ValueError(f"invalid {file_format} data: {e}") from e
+        if started and not decoder.eof:
+            raise ValueError(f"{file_format} data is truncated")
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def walk_remote_files(
+    client: PebbleClient,
+    root: str,
+    max_workers: int = DEFAULT_WORKERS,
+    on_error: Callable[[str, Exception], None] | None = None,
+    include_dirs: bool = False,
+) -> Iterator[tuple[str, ops.pebble.FileInfo]]:
+    """Walk a remote directory tree, yielding every regular file beneath it.
+
+    The tree is walked breadth first: all of the directories at one depth are
+    listed concurrently before moving to the next depth. Within a directory,
+    files are yielded in name order. Symbolic links are not followed.
+    With ``include_dirs``, the directories beneath ``root`` are yielded too,
+    in name order among the files and always before their contents.
+
+    If ``root`` is itself a regular file, just that file is yielded.
+
+    Args:
+        client: Pebble client
+        root: Directory (or file) to walk
+        max_workers: Maximum number of concurrent listings
+        on_error: Called with the path and exception when a listing fails
+        include_dirs: Also yield the directories
+
+    Yields:
+        Tuples of (path, FileInfo) for each regular file (and directory)
+    """
+
+    def list_dir(path: str) -> list[ops.pebble.FileInfo] | Exception:
+        try:
+            return client.list_files(path)
+        except (ops.pebble.PathError, ops.pebble.APIError) as e:
+            return e
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        level = [root]
+        first = True
+        while level:
+            next_level: list[str] = []
+            for directory, listing in zip(level, pool.map(list_dir, level), strict=True):
+                if isinstance(listing, Exception):
+                    if on_error is not None:
+                        on_error(directory, listing)
+                    continue
+                if (
+                    first
+                    and len(listing) == 1
+                    and listing[0].type == ops.pebble.FileType.FILE
+                    and os.path.normpath(getattr(listing[0], "path", "") or "")
+                    == os.path.normpath(directory)
+                ):
+                    # Pebble lists a file path as the file itself.
+                    yield directory, listing[0]
+                    continue
+                for info in sorted(listing, key=lambda i: i.name):
+                    if info.name in (".", ".."):
+                        continue
+                    path = os.path.join(directory, info.name)
+                    if info.type == ops.pebble.FileType.DIRECTORY:
+                        next_level.append(path)
+                        if include_dirs:
+                            yield path, info
+                    elif info.type == ops.pebble.FileType.FILE:
+                        yield path, info
+            level = next_level
+            first = False
+
+
+def bounded_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = DEFAULT_WORKERS,
+    window: int | None = None,
+) -> Iterator[tuple[T, R]]:
+    """Apply ``func`` to each item on a thread pool, yielding results in input order.
+
+    At most ``window`` items are in flight (submitted but not yet yielded) at
+    any time, so ``items`` can be a lazy, unbounded iterator and memory use
+    stays bounded. If the consumer stops iterating early, work that has not
+    started yet is cancelled; ``func`` should watch a shared event if it is
+    long-running and needs to stop promptly.
+
+    Args:
+        func: Function to apply to each item
+        items: Items to process
+        max_workers: Number of worker threads
+        window: Maximum number of items in flight (default: twice ``max_workers``)
+
+    Yields:
+        Tuples of (item, result)
+    """
+    window = window or max_workers * 2
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    pending: collections.deque[tuple[T, concurrent.futures.Future[R]]] = collections.deque()
+    try:
+        for item in items:
+            pending.append((item, pool.submit(func, item)))
+            if len(pending) >= window:
+                done_item, future = pending.popleft()
+                yield done_item, future.result()
+        while pending:
+            done_item, future = pending.popleft()
+            yield done_item, future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
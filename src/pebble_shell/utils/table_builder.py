@@ -1,14 +1,132 @@
-"""Table builder utilities for creating Rich tables with consistent styling across Cascade commands."""
+"""Table builder utilities for creating Rich tables with consistent styling across Cascade commands.
+
+Tables can also be written out in a machine-readable format (JSON, JSON
+Lines, CSV or TSV), chosen with a command's ``--format`` option or
+shell-wide with ``set_output_format``. Rows are then written as they are
+added, without building the Rich table at all, and keep their types:
+numbers stay numbers, and markup and styles are dropped.
+
+Very large tables are not laid out in one go either: once a table that is
+printed with ``output_to`` has ``VIRTUAL_TABLE_ROWS`` rows, its column widths
+are fixed from those rows, and it is drawn a page of rows at a time as more
+are added. On a terminal, each screenful waits for a key, like ``more``.
+"""
 
 from __future__ import annotations
 
+import contextlib
+import copy
+import csv
+import dataclasses
+import json
+import re
 from typing import TYPE_CHECKING, Any
 
+from rich.errors import MarkupError
+from rich.measure import Measurement
+from rich.protocol import is_renderable
+from rich.segment import Segment, Segments
+from rich.text import Text
+
+from .output_writer import OutputWriter
 from .theme import get_theme
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from rich.console import Console, RenderableType
     from rich.table import Table
 
+    from .. import PebbleShell
+
+
+# The formats a table can be written in; "table" draws it with Rich.
+OUTPUT_FORMATS = ("table", "json", "jsonl", "csv", "tsv")
+
+_output_format = "table"
+
+# Tables with this many rows are drawn a page at a time, with the column
+# widths measured from these first rows, rather than laid out all at once.
+VIRTUAL_TABLE_ROWS = 200
+
+# How many rows of a large table are drawn at a time, when not on a terminal.
+VIRTUAL_PAGE_ROWS = 100
+
+_NUMBER = re.compile(r"-?\d+(\.\d+)?")
+
+
+def get_output_format() -> str:
+    """Get the shell-wide format for tables."""
+    return _output_format
+
+
+def set_output_format(output_format: str) -> None:
+    """Set the shell-wide format for tables.
+
+    Raises:
+        ValueError: If the format is not one of OUTPUT_FORMATS
+    """
+    global _output_format
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"invalid format '{output_format}' (choose from {', '.join(OUTPUT_FORMATS)})"
+        )
+    _output_format = output_format
+
+
+def split_output_format(
+    args: list[str], shell: PebbleShell | None = None
+) -> tuple[str, list[str]] | None:
+    """Remove ``--format=FORMAT`` (or ``--format FORMAT``) from ``args``.
+
+    Args:
+        args: Command arguments
+        shell: Shell instance for error reporting
+
+    Returns:
+        The requested format (the shell-wide one if none was given) and the
+        other arguments, or None if the format is invalid
+    """
+    output_format = get_output_format()
+    remaining: list[str] = []
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg == "--format":
+            value = next(args_iter, "")
+        elif arg.startswith("--format="):
+            value = arg.removeprefix("--format=")
+        else:
+            remaining.append(arg)
+            continue
+        if value not in OUTPUT_FORMATS:
+            if shell:
+                shell.console.print(
+                    get_theme().error_text(
+                        f"Invalid format '{value}': choose from {', '.join(OUTPUT_FORMATS)}"
+                    )
+                )
+            return None
+        output_format = value
+    return output_format, remaining
+
+
+def _plain_value(value: Any, numeric: bool) -> Any:
+    """Convert a cell to a plain value: text without markup or styles, or a number."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, Text):
+        text = value.plain
+    elif isinstance(value, str):
+        text = value
+        if "[" in text:
+            with contextlib.suppress(MarkupError):
+                text = Text.from_markup(text).plain
+    else:
+        text = str(value)
+    if numeric and _NUMBER.fullmatch(text.strip()):
+        return float(text) if "." in text else int(text)
+    return text
+
 
 class TableBuilder:
     """Builder for Rich tables with consistent styling patterns."""
@@ -16,6 +134,20 @@ class TableBuilder:
     def __init__(self, table: Table):
         """Initialize with a pre-configured table."""
         self._table = table
+        # The column headers, and whether each column holds numbers.
+        self._columns: list[tuple[str, bool]] = []
+        self._console: Console | None = None
+        self._format = "table"
+        self._writer: OutputWriter | None = None
+        self._csv_writer: Any = None
+        self._rows_written = 0
+        # Once the table is being drawn a page at a time: the rows not drawn yet.
+        self._page: Table | None = None
+        self._pages_drawn = 0
+        self._bottom_edge: list[Segment] = []
+        self._page_rows = VIRTUAL_PAGE_ROWS
+        # Set when the user quits paging through a large table: later rows are dropped.
+        self.stopped = False
 
     def add_column(
         self,
@@ -28,6 +160,7 @@ class TableBuilder:
     ) -> TableBuilder:
         """Add a column to the table with specified styling."""
         self._table.add_column(name, style=style, justify=justify, no_wrap=no_wrap, **kwargs)
+        self._columns.append((name, justify == "right"))
         return self
 
     def primary_id_column(self, name: str) -> TableBuilder:
@@ -51,18 +184,186 @@ class TableBuilder:
         column_style = style or get_theme().numeric
         return self.add_column(name, style=column_style, justify="right", no_wrap=True)
 
+    def output_to(self, console: Console, output_format: str | None = None) -> TableBuilder:
+        """Set where the table is printed, and in which format.
+
+        In any format but "table", the rows are written to the console as
+        they are added, rather than collected into the Rich table.
+
+        Args:
+            console: The console to print to
+            output_format: One of OUTPUT_FORMATS (by default, the shell-wide format)
+        """
+        self._console = console
+        self._format = output_format or get_output_format()
+        return self
+
+    @property
+    def streaming(self) -> bool:
+        """Whether rows are written out as they are added, rather than drawn as a table."""
+        return self._format != "table"
+
     def add_row(self, *values: str | Any) -> TableBuilder:
-        """Add a row to the table."""
-        self._table.add_row(*values)
+        """Add a row to the table.
+
+        Values that Rich can't render, like numbers, are shown as strings,
+        but are kept as they are in machine-readable formats.
+        """
+        if self.streaming:
+            self._write_row(values)
+            return self
+        cells = [
+            value if value is None or is_renderable(value) else str(value) for value in values
+        ]
+        if self._page is not None:
+            self._add_page_row(cells)
+        else:
+            self._table.add_row(*cells)
+            if self._console is not None and self._table.row_count >= VIRTUAL_TABLE_ROWS:
+                self._start_pages()
         return self
 
     @property
     def row_count(self) -> int:
         """Get the number of rows in the table."""
+        if self.streaming:
+            return self._rows_written
+        if self._page is not None:
+            return self._rows_written + self._page.row_count
         return self._table.row_count
 
+    def print(self, wrap: Callable[[Table], RenderableType] | None = None) -> None:
+        """Print the table, or finish writing its rows when they are being written out.
+
+        Args:
+            wrap: Optionally, wraps the Rich table (in a Panel, say) before printing
+                it; ignored once the table is too large to be laid out at once
+        """
+        assert self._console is not None, "output_to() must be called first"
+        if self._page is not None:
+            if self._page.row_count and not self.stopped:
+                self._draw_page()
+            self._console.print(Segments(self._bottom_edge), end="")
+            self._bottom_edge = []
+            return
+        if not self.streaming:
+            self._console.print(self._table if wrap is None else wrap(self._table))
+            return
+        writer = self._start()
+        if self._format == "json":
+            writer.write("\n]\n" if self._rows_written else "]\n")
+        writer.close()
+
+    def _start_pages(self) -> None:
+        """Switch to drawing the table a page at a time, starting with the rows so far."""
+        assert self._console is not None
+        console = self._console
+        options = console.options
+        columns = []
+        for column in self._table.columns:
+            width = column.width
+            if width is None:
+                width = max(
+                    Measurement.get(console, options, cell).maximum
+                    for cell in (column.header, *column.cells)
+                )
+            columns.append(dataclasses.replace(column, width=width, _cells=[]))
+        rows = list(zip(*(column.cells for column in self._table.columns), strict=True))
+        page = self._page = copy.copy(self._table)
+        page.columns = columns
+        page.rows = []
+        if console.is_terminal and not console.is_dumb_terminal:
+            self._page_rows = max(console.size.height - 1, 1)
+        for row in rows:
+            self._add_page_row(list(row))
+
+    def _add_page_row(self, cells: list[Any]) -> None:
+        assert self._page is not None
+        if self.stopped:
+            return
+        self._page.add_row(*cells)
+        if self._page.row_count >= self._page_rows:
+            self._draw_page()
+
+    def _draw_page(self) -> None:
+        """Draw the rows collected so far, continuing the table drawn before them."""
+        assert self._console is not None and self._page is not None
+        console = self._console
+        page = self._page
+        if self._pages_drawn and self._prompt_for_more():
+            self.stopped = True
+            return
+        lines = console.render_lines(page, console.options, pad=False, new_lines=True)
+        if page.box is not None and page.show_edge:
+            # Leave the edges out between pages, so they join up into one table.
+            if self._pages_drawn:
+                lines = lines[1:]
+            self._bottom_edge = lines.pop() if lines else []
+        console.print(Segments(segment for line in lines for segment in line), end="")
+        self._rows_written += page.row_count
+        self._pages_drawn += 1
+        # Every page after the first continues the table, without its header.
+        self._page = copy.copy(page)
+        self._page.columns = [dataclasses.replace(column, _cells=[]) for column in page.columns]
+        self._page.rows = []
+        self._page.show_header = False
+        self._page.title = None
+
+    def _prompt_for_more(self) -> bool:
+        """On a terminal, wait before drawing the next screenful of rows.
+
+        Returns:
+            True if the user asked to quit
+        """
+        assert self._console is not None
+        console = self._console
+        if not console.is_terminal or console.is_dumb_terminal:
+            return False
+        console.print("[dim]--More--[/dim]", end="")
+        try:
+            return input().lower() == "q"
+        except (EOFError, KeyboardInterrupt):
+            return True
+
+    def _start(self) -> OutputWriter:
+        """Start writing the table out, with its header."""
+        if self._writer is not None:
+            return self._writer
+        assert self._console is not None, "output_to() must be called first"
+        writer = self._writer = OutputWriter(self._console, plain=True)
+        if self._format == "json":
+            writer.write("[")
+        elif self._format in ("csv", "tsv"):
+            delimiter = "," if self._format == "csv" else "\t"
+            self._csv_writer = csv.writer(writer, delimiter=delimiter, lineterminator="\n")
+            self._csv_writer.writerow(name for name, _ in self._columns)
+        return writer
+
+    def _write_row(self, values: tuple[Any, ...]) -> None:
+        writer = self._start()
+        row = [
+            _plain_value(value, numeric)
+            for value, (_, numeric) in zip(values, self._columns, strict=False)
+        ]
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(row)
+        else:
+            record = json.dumps(
+                dict(zip((name for name, _ in self._columns), row, strict=False)),
+                ensure_ascii=False,
+            )
+            if self._format == "json":
+                writer.write(f"\n  {record}" if not self._rows_written else f",\n  {record}")
+            else:
+                writer.write(record + "\n")
+        self._rows_written += 1
+
     def build(self) -> Table:
-        """Return the configured Rich table."""
+        """Return the configured Rich table.
+
+        Once a table printed with ``output_to`` is drawn a page at a time, this
+        only holds its first ``VIRTUAL_TABLE_ROWS`` rows.
+        """
         return self._table
 
     def __rich_console__(self, console, options):
@@ -0,0 +1,647 @@
+r"""Streaming byte transformations for tr, expand, unexpand, fold and line endings.
+
+Each transformation is a ``ChunkTransformer``: it is fed the chunks of a
+stream one at a time and returns the transformed bytes for each, carrying
+whatever state it needs (the current column, a ``\r`` at the end of a
+chunk, a partial line) across chunk boundaries. This means a file of any
+size can be transformed as it is read, and the output can be printed or
+pushed back as it is produced.
+
+The work is done with C-level bytes operations wherever possible:
+``bytes.translate`` with a 256-entry table for tr, ``bytes.replace`` for
+line endings, and ``split``/``join`` with precomputed tab-stop widths for
+expand and unexpand. Lines are only walked byte by byte when they contain
+characters that move the column unusually (tab, backspace, carriage
+return) and have to be folded.
+
+Like the GNU tools, the transformations work on bytes, and count one
+column per byte.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import re
+from typing import TYPE_CHECKING
+
+from .command_helpers import parse_flags
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from ..shell import PebbleShell
+
+_DEFAULT_TAB_SIZE = 8
+
+_DEFAULT_FOLD_WIDTH = 80
+
+# tr character classes, as the bytes they contain.
+_TR_CLASSES: dict[bytes, bytes] = {
+    b"alnum": bytes(b for b in range(128) if chr(b).isalnum()),
+    b"alpha": bytes(b for b in range(128) if chr(b).isalpha()),
+    b"blank": b"\t ",
+    b"cntrl": bytes([*range(32), 127]),
+    b"digit": b"0123456789",
+    b"graph": bytes(range(33, 127)),
+    b"lower": bytes(range(ord("a"), ord("z") + 1)),
+    b"print": bytes(range(32, 127)),
+    b"punct": bytes(b for b in range(33, 127) if not chr(b).isalnum()),
+    b"space": b"\t\n\v\f\r ",
+    b"upper": bytes(range(ord("A"), ord("Z") + 1)),
+    b"xdigit": b"0123456789ABCDEFabcdef",
+}
+
+_TR_ESCAPES = {
+    ord("a"): 7,
+    ord("b"): 8,
+    ord("f"): 12,
+    ord("n"): 10,
+    ord("r"): 13,
+    ord("t"): 9,
+    ord("v"): 11,
+    ord("\\"): 92,
+}
+
+_TR_REPEAT = re.compile(rb"\[(\\?.)\*(\d*)\]", re.DOTALL)
+
+# Characters that don't move the column by exactly one.
+_COLUMN_CONTROL = re.compile(rb"[\t\b\r]")
+
+_BLANK_RUN = re.compile(rb"[ \t]+")
+
+
+def _advance(column: int, text: bytes) -> int:
+    """The column after ``text`` (which has no tabs), where a backspace goes back one."""
+    if b"\b" not in text:
+        return column + len(text)
+    for byte in text:
+        column = max(column - 1, 0) if byte == 8 else column + 1
+    return column
+
+
+class ChunkTransformer:
+    """A transformation of a byte stream, fed one chunk at a time.
+
+    A transformer holds the state of one stream, so use a new one for each.
+    """
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Transform the next chunk, returning the output it completes."""
+        raise NotImplementedError
+
+    def flush(self) -> bytes:
+        """Return any output held back, at the end of the stream."""
+        return b""
+
+    def run(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Transform a whole stream, yielding the non-empty pieces of output."""
+        for chunk in chunks:
+            output = self.feed(chunk)
+            if output:
+                yield output
+        output = self.flush()
+        if output:
+            yield output
+
+
+class _LineTransformer(ChunkTransformer):
+    """A transformer of whole lines: a partial line is held until its end arrives."""
+
+    def __init__(self) -> None:
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Transform the lines the chunk completes."""
+        data = self._pending + chunk if self._pending else chunk
+        end = data.rfind(b"\n") + 1
+        self._pending = data[end:]
+        return self.transform_lines(data[:end]) if end else b""
+
+    def flush(self) -> bytes:
+        """Transform a final line that has no newline."""
+        pending, self._pending = self._pending, b""
+        return self.transform_lines(pending) if pending else b""
+
+    def transform_lines(self, data: bytes) -> bytes:
+        """Transform some whole lines (the last may be missing its newline)."""
+        return b"\n".join([self.transform_line(line) for line in data.split(b"\n")])
+
+    def transform_line(self, line: bytes) -> bytes:
+        """Transform one line, without its newline."""
+        raise NotImplementedError
+
+
+def _expand_tr_set(text: bytes) -> list[tuple[bytes, bool]]:
+    """Split a tr set into pieces, each a run of bytes or a ``[c*]`` fill."""
+    pieces: list[tuple[bytes, bool]] = []
+    current = bytearray()
+    i = 0
+
+    def element(at: int) -> tuple[int, int]:
+        # One (possibly escaped) byte: its value and the index after it.
+        if text[at] != ord("\\") or at + 1 >= len(text):
+            return text[at], at + 1
+        octal = re.match(rb"[0-7]{1,3}", text[at + 1 :])
+        if octal:
+            return int(octal.group(), 8) & 0xFF, at + 1 + len(octal.group())
+        return _TR_ESCAPES.get(text[at + 1], text[at + 1]), at + 2
+
+    while i < len(text):
+        if text.startswith(b"[:", i):
+            end = text.find(b":]", i + 2)
+            if end != -1 and text[i + 2 : end] in _TR_CLASSES:
+                current += _TR_CLASSES[text[i + 2 : end]]
+                i = end + 2
+                continue
+        if text.startswith(b"[=", i) and text.startswith(b"=]", i + 3):
+            current.append(text[i + 2])
+            i += 5
+            continue
+        repeat = _TR_REPEAT.match(text, i)
+        if repeat:
+            value, _ = element(repeat.start(1))
+            digits = repeat.group(2)
+            count = int(digits, 8 if digits.startswith(b"0") else 10) if digits else 0
+            if count:
+                current += bytes([value]) * count
+            else:
+                pieces.append((bytes(current), False))
+                pieces.append((bytes([value]), True))
+                current = bytearray()
+            i = repeat.end()
+            continue
+        value, i = element(i)
+        if i < len(text) - 1 and text[i] == ord("-"):
+            last, after = element(i + 1)
+            if last < value:
+                raise ValueError(
+                    f"range-endpoints of '{chr(value)}-{chr(last)}' are in reverse collating "
+                    "sequence order"
+                )
+            current += bytes(range(value, last + 1))
+            i = after
+        else:
+            current.append(value)
+    pieces.append((bytes(current), False))
+    return pieces
+
+
+def parse_tr_set(text: str, fill_to: int | None = None) -> bytes:
+    r"""Expand a tr set (ranges, classes, escapes and repeats) into its bytes.
+
+    Args:
+        text: The set, e.g. ``a-z``, ``[:upper:]``, ``\n\t`` or ``[x*3]``
+        fill_to: For the second set, the length of the first: a ``[c*]``
+            repeat is as long as needed to make the sets the same length
+
+    Raises:
+        ValueError: If the set is not valid
+    """
+    pieces = _expand_tr_set(text.encode("utf-8", errors="surrogateescape"))
+    fixed = sum(len(piece) for piece, fill in pieces if not fill)
+    result = bytearray()
+    for piece, fill in pieces:
+        if not fill:
+            result += piece
+        elif fill_to is None:
+            raise ValueError("the [c*] repeat construct may not appear in string1")
+        else:
+            result += piece * max(0, fill_to - fixed)
+            fixed = fill_to
+    return bytes(result)
+
+
+class TranslateBytes(ChunkTransformer):
+    """Translate, delete and squeeze bytes (``tr``).
+
+    Args:
+        table: A 256-byte translation table, or None to translate nothing
+        delete: Bytes to delete (after translating)
+        squeeze: Bytes whose repeats are squeezed to one (after deleting)
+    """
+
+    def __init__(self, table: bytes | None, delete: bytes = b"", squeeze: bytes = b""):
+        self._table = table
+        self._delete = delete
+        self._squeeze = frozenset(squeeze)
+        self._repeats = (
+            re.compile(
+                b"([" + b"".join(re.escape(bytes([b])) for b in sorted(self._squeeze)) + b"])\\1+"
+            )
+            if squeeze
+            else None
+        )
+        self._last: int | None = None
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Translate a chunk, squeezing repeats that continue from the last one."""
+        data = chunk.translate(self._table, self._delete)
+        if self._repeats is None or not data:
+            return data
+        data = self._repeats.sub(rb"\1", data)
+        if self._last is not None and data[0] == self._last:
+            data = data[1:]
+            if not data:
+                return data
+        self._last = data[-1] if data[-1] in self._squeeze else None
+        return data
+
+    @classmethod
+    def for_sets(
+        cls,
+        set1: str,
+        set2: str | None,
+        delete: bool = False,
+        squeeze: bool = False,
+        complement: bool = False,
+    ) -> TranslateBytes:
+        """Build the transformer for a tr command line.
+
+        Args:
+            set1: The first set
+            set2: The second set, if given
+            delete: Delete the bytes of the first set (``-d``)
+            squeeze: Squeeze repeats of the last set given (``-s``)
+            complement: Use the bytes not in the first set (``-c``)
+
+        Raises:
+            ValueError: If the sets are not valid for the options
+        """
+        first = parse_tr_set(set1)
+        if complement:
+            excluded = set(first)
+            first = bytes(b for b in range(256) if b not in excluded)
+        if delete:
+            if set2 is not None and not squeeze:
+                raise ValueError("extra operand: only one string may be given when deleting")
+            squeezed = parse_tr_set(set2) if set2 is not None else b""
+            return cls(None, first, squeezed)
+        if set2 is None:
+            if not squeeze:
+                raise ValueError("missing operand after the first set")
+            return cls(None, b"", first)
+        second = parse_tr_set(set2, len(first))
+        if not second:
+            raise ValueError("when not truncating set1, string2 must be non-empty")
+        second = second[: len(first)] + second[-1:] * (len(first) - len(second))
+        table = bytearray(range(256))
+        for source, target in zip(first, second, strict=True):
+            table[source] = target
+        return cls(bytes(table), b"", second if squeeze else b"")
+
+
+class TabStops:
+    """Tab stop positions, as given to ``-t``: an interval, or a list of columns.
+
+    Raises:
+        ValueError: If the specification is not valid
+    """
+
+    def __init__(self, spec: str = str(_DEFAULT_TAB_SIZE)):
+        try:
+            values = [int(value) for value in re.split(r"[,\s]+", spec.strip()) if value]
+        except ValueError:
+            raise ValueError(f"tab size contains invalid character(s): '{spec}'") from None
+        if not values or any(value < 0 for value in values):
+            raise ValueError(f"invalid tab size: '{spec}'")
+        if any(b <= a for a, b in itertools.pairwise(values)):
+            raise ValueError("tab sizes must be ascending")
+        if len(values) == 1:
+            if not values[0]:
+                raise ValueError("tab size cannot be 0")
+            self.size: int | None = values[0]
+            self.stops: list[int] = []
+            # Columns to the next stop, by column modulo the tab size.
+            self._widths = [values[0] - column for column in range(values[0])]
+        else:
+            self.size = None
+            self.stops = values
+            self._widths = [
+                values[bisect.bisect_right(values, column)] - column
+                for column in range(values[-1])
+            ]
+
+    def width(self, column: int) -> int:
+        """The columns from ``column`` to the next stop (one, past a list's last stop)."""
+        if self.size is not None:
+            return self._widths[column % self.size]
+        return self._widths[column] if column < len(self._widths) else 1
+
+    def stops_between(self, start: int, end: int) -> list[int]:
+        """The stops after column ``start``, up to and including ``end``."""
+        if self.size is not None:
+            first = (start // self.size + 1) * self.size
+            return list(range(first, end + 1, self.size))
+        return self.stops[
+            bisect.bisect_right(self.stops, start) : bisect.bisect_right(self.stops, end)
+        ]
+
+
+class ExpandTabs(ChunkTransformer):
+    """Replace tabs with spaces up to the next tab stop (``expand``).
+
+    Args:
+        tab_stops: Where the tab stops are
+        initial_only: Only expand tabs in the blanks at the start of a line
+    """
+
+    def __init__(self, tab_stops: TabStops, initial_only: bool = False):
+        self._tab_stops = tab_stops
+        self._initial_only = initial_only
+        self._column = 0
+        self._initial = True
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Expand the tabs in a chunk, continuing from the column the last one ended at."""
+        output: list[bytes] = []
+        for number, segment in enumerate(chunk.split(b"\n")):
+            if number:
+                output.append(b"\n")
+                self._column = 0
+                self._initial = True
+            if self._initial_only:
+                if not self._initial:
+                    output.append(segment)
+                    continue
+                rest = segment.lstrip(b" \t")
+                lead = segment[: len(segment) - len(rest)]
+                output.append(self._expand(lead))
+                output.append(rest)
+                self._initial = not rest
+            elif b"\t" in segment:
+                output.append(self._expand(segment))
+            else:
+                output.append(segment)
+                self._column = _advance(self._column, segment)
+        return b"".join(output)
+
+    def _expand(self, text: bytes) -> bytes:
+        width = self._tab_stops.width
+        column = self._column
+        pieces = text.split(b"\t")
+        output = [pieces[0]]
+        column = _advance(column, pieces[0])
+        for piece in pieces[1:]:
+            spaces = width(column)
+            output.append(b" " * spaces)
+            output.append(piece)
+            column = _advance(column + spaces, piece)
+        self._column = column
+        return b"".join(output)
+
+
+class UnexpandTabs(_LineTransformer):
+    """Replace runs of blanks that reach a tab stop with tabs (``unexpand``).
+
+    Args:
+        tab_stops: Where the tab stops are
+        all_blanks: Convert every run of blanks, not just the ones starting a line
+    """
+
+    def __init__(self, tab_stops: TabStops, all_blanks: bool = False):
+        super().__init__()
+        self._tab_stops = tab_stops
+        self._all_blanks = all_blanks
+
+    def transform_line(self, line: bytes) -> bytes:
+        """Convert the blanks in one line."""
+        if self._all_blanks:
+            if b"\t" not in line and b"  " not in line:
+                return line
+            runs = _BLANK_RUN.finditer(line)
+        else:
+            first = _BLANK_RUN.match(line)
+            if first is None:
+                return line
+            runs = iter([first])
+
+        output: list[bytes] = []
+        column = position = 0
+        for run in runs:
+            output.append(line[position : run.start()])
+            column = _advance(column, line[position : run.start()])
+            position = run.end()
+            blanks = run.group()
+            start = column
+            for byte in blanks:
+                column += self._tab_stops.width(column) if byte == 9 else 1
+            stops = self._tab_stops.stops_between(start, column)
+            if blanks == b" " or not stops:
+                output.append(blanks)
+            else:
+                output.append(b"\t" * len(stops) + b" " * (column - stops[-1]))
+        output.append(line[position:])
+        return b"".join(output)
+
+
+class FoldLines(_LineTransformer):
+    """Break lines longer than a width (``fold``).
+
+    Args:
+        width: The maximum width of a line
+        count_bytes: Count bytes, rather than columns (so tabs count as one)
+        break_at_spaces: Break after the last blank that fits, where there is one
+    """
+
+    def __init__(
+        self,
+        width: int = _DEFAULT_FOLD_WIDTH,
+        count_bytes: bool = False,
+        break_at_spaces: bool = False,
+    ):
+        super().__init__()
+        if width < 1:
+            raise ValueError(f"invalid number of columns: '{width}'")
+        self._width = width
+        self._count_bytes = count_bytes
+        self._break_at_spaces = break_at_spaces
+
+    def transform_line(self, line: bytes) -> bytes:
+        """Fold one line."""
+        if self._count_bytes or _COLUMN_CONTROL.search(line) is None:
+            return line if len(line) <= self._width else self._fold_bytes(line)
+        return self._fold_columns(line)
+
+    def _break(self, piece: bytes | bytearray) -> int:
+        """Where to break a piece that is too long: after its last blank, or 0 for none."""
+        if not self._break_at_spaces:
+            return 0
+        return max(piece.rfind(b" "), piece.rfind(b"\t")) + 1
+
+    def _fold_bytes(self, line: bytes) -> bytes:
+        """Fold a line in which every byte is one column wide."""
+        width = self._width
+        pieces: list[bytes] = []
+        start = 0
+        while len(line) - start > width:
+            end = start + (self._break(line[start : start + width]) or width)
+            pieces.append(line[start:end])
+            start = end
+        pieces.append(line[start:])
+        return b"\n".join(pieces)
+
+    def _advance(self, column: int, byte: int) -> int:
+        if byte == 9:
+            return column + _DEFAULT_TAB_SIZE - column % _DEFAULT_TAB_SIZE
+        if byte == 8:
+            return max(column - 1, 0)
+        if byte == 13:
+            return 0
+        return column + 1
+
+    def _fold_columns(self, line: bytes) -> bytes:
+        """Fold a line with tabs, backspaces or carriage returns, byte by byte."""
+        pieces: list[bytes] = []
+        current = bytearray()
+        column = 0
+        for byte in line:
+            while True:
+                advanced = self._advance(column, byte)
+                if advanced <= self._width or not current:
+                    break
+                end = self._break(current) or len(current)
+                pieces.append(bytes(current[:end]))
+                del current[:end]
+                column = 0
+                for kept in current:
+                    column = self._advance(column, kept)
+            current.append(byte)
+            column = advanced
+        pieces.append(bytes(current))
+        return b"\n".join(pieces)
+
+
+class DosToUnix(ChunkTransformer):
+    r"""Convert ``\r\n`` line endings to ``\n`` (``dos2unix``)."""
+
+    def __init__(self) -> None:
+        self._carriage_return = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        r"""Convert a chunk, holding back a final ``\r`` in case a ``\n`` follows."""
+        if self._carriage_return:
+            chunk = b"\r" + chunk
+        self._carriage_return = chunk.endswith(b"\r")
+        if self._carriage_return:
+            chunk = chunk[:-1]
+        return self.convert(chunk)
+
+    def flush(self) -> bytes:
+        r"""Return a ``\r`` that ended the stream."""
+        return b"\r" if self._carriage_return else b""
+
+    @staticmethod
+    def convert(data: bytes) -> bytes:
+        """Convert the line endings in some data."""
+        return data.replace(b"\r\n", b"\n")
+
+
+class UnixToDos(DosToUnix):
+    r"""Convert ``\n`` line endings to ``\r\n``, leaving existing ``\r\n`` alone (``unix2dos``)."""
+
+    @staticmethod
+    def convert(data: bytes) -> bytes:
+        """Convert the line endings in some data."""
+        return data.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+
+
+# The options of each command, as given to parse_flags.
+TRANSFORM_FLAGS: dict[str, dict[str, type]] = {
+    "tr": {
+        "d": bool,  # delete characters
+        "s": bool,  # squeeze repeats
+        "c": bool,  # complement first set
+        "C": bool,  # complement first set (same as -c)
+    },
+    "expand": {
+        "t": str,  # tab stops
+        "i": bool,  # initial tabs only
+    },
+    "unexpand": {
+        "t": str,  # tab stops
+        "a": bool,  # convert all blanks
+        "first-only": bool,  # only convert initial blanks
+    },
+    "fold": {
+        "w": str,  # width
+        "b": bool,  # count bytes instead of columns
+        "s": bool,  # break at spaces
+    },
+    "dos2unix": {},
+    "unix2dos": {},
+}
+
+
+def build_transformer(
+    command: str, args: list[str], shell: PebbleShell | None = None
+) -> tuple[Callable[[], ChunkTransformer], list[str]] | None:
+    """Parse the command line of a transforming command.
+
+    Args:
+        command: One of the commands in ``TRANSFORM_FLAGS``
+        args: The command's arguments
+        shell: Shell to report invalid options to
+
+    Returns:
+        A function making a new transformer (one is needed per stream), and
+        the file arguments; or None if the options couldn't be parsed
+
+    Raises:
+        ValueError: If an option value or operand is not valid
+    """
+    parsed = parse_flags(args, TRANSFORM_FLAGS[command], shell)
+    if parsed is None:
+        return None
+    flags, positional = parsed
+
+    make: Callable[[], ChunkTransformer]
+    if command == "tr":
+        delete, squeeze = flags["d"], flags["s"]
+        complement = flags["c"] or flags["C"]
+        if delete:
+            set_count = 2 if squeeze else 1
+        elif squeeze and len(positional) == 1:
+            set_count = 1
+        else:
+            set_count = 2
+        if len(positional) < set_count:
+            raise ValueError("missing operand")
+        set1, set2 = positional[0], positional[1] if set_count == 2 else None
+        files = positional[set_count:]
+
+        def make() -> ChunkTransformer:
+            return TranslateBytes.for_sets(set1, set2, delete, squeeze, complement)
+
+    elif command in ("expand", "unexpand"):
+        tab_stops = TabStops(flags["t"] or str(_DEFAULT_TAB_SIZE))
+        files = positional
+        if command == "expand":
+            initial_only = flags["i"]
+
+            def make() -> ChunkTransformer:
+                return ExpandTabs(tab_stops, initial_only)
+
+        else:
+            # As with GNU unexpand, giving tab stops implies -a.
+            all_blanks = (flags["a"] or flags["t"] is not None) and not flags["first-only"]
+
+            def make() -> ChunkTransformer:
+                return UnexpandTabs(tab_stops, all_blanks)
+
+    elif command == "fold":
+        width_text = flags["w"] or str(_DEFAULT_FOLD_WIDTH)
+        if not width_text.isdigit():
+            raise ValueError(f"invalid number of columns: '{width_text}'")
+        width, count_bytes, break_at_spaces = int(width_text), flags["b"], flags["s"]
+        files = positional
+
+        def make() -> ChunkTransformer:
+            return FoldLines(width, count_bytes, break_at_spaces)
+
+    else:
+        make, files = (DosToUnix if command == "dos2unix" else UnixToDos), positional
+
+    # Build one now, so that invalid operands are reported before any file is read.
+    make()
+    return make, files
@@ -0,0 +1,271 @@
+"""Measure, and optionally limit, the rate of data flowing through a stream.
+
+``ThroughputMeter`` counts the bytes that pass and works out the average
+rate since the start, the current rate over the last few seconds, and the
+time left when the total size is known. ``RateLimiter`` is a token bucket
+that sleeps just long enough to hold a stream to a given rate, and
+``meter_chunks`` puts both around a stream of chunks without changing it.
+``MeterDisplay`` shows a meter's status while the stream flows.
+"""
+
+from __future__ import annotations
+
+import collections
+import time
+from typing import TYPE_CHECKING
+
+from rich.progress import BarColumn, Progress, ProgressColumn, TextColumn
+from rich.text import Text
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from rich.console import Console
+    from rich.progress import Task
+
+# The current rate is measured over (roughly) this many seconds.
+RATE_WINDOW = 5.0
+
+# The most a rate limiter lets through at once, in seconds' worth of data.
+BURST_SECONDS = 0.1
+
+_UNITS = ["B", "KiB", "MiB", "GiB", "TiB", "PiB"]
+
+_SIZE_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(value: str) -> int:
+    """Parse a size or rate such as ``512``, ``64K`` or ``1.5M`` (powers of 1024).
+
+    Raises:
+        ValueError: If the value is not a positive size
+    """
+    text = value.strip().upper().removesuffix("B").removesuffix("I")
+    multiplier = _SIZE_SUFFIXES.get(text[-1:], 1)
+    if multiplier > 1:
+        text = text[:-1]
+    number = float(text) * multiplier
+    if not 0 < number < float("inf") or int(number) <= 0:
+        raise ValueError(value)
+    return int(number)
+
+
+def format_size(size: float) -> str:
+    """Format a number of bytes with three significant digits, as in ``1.50MiB``."""
+    unit = 0
+    while size >= 1000 and unit < len(_UNITS) - 1:
+        size /= 1024
+        unit += 1
+    if not unit:
+        return f"{size:.0f}{_UNITS[0]}"
+    if size >= 100:
+        return f"{size:.0f}{_UNITS[unit]}"
+    return f"{size:.{2 if size < 10 else 1}f}{_UNITS[unit]}"
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration as ``H:MM:SS``."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+class ThroughputMeter:
+    """Track the bytes that have passed through a stream, and how fast.
+
+    Args:
+        total: Expected number of bytes, if known, for the percentage and ETA
+        clock: Source of the time, in seconds
+    """
+
+    def __init__(self, total: int | None = None, clock: Callable[[], float] = time.monotonic):
+        self.total = total
+        self.bytes = 0
+        self._clock = clock
+        self.started = clock()
+        self._samples: collections.deque[tuple[float, int]] = collections.deque(
+            [(self.started, 0)]
+        )
+
+    def update(self, count: int) -> None:
+        """Record that ``count`` more bytes have passed."""
+        self.bytes += count
+        now = self._clock()
+        self._samples.append((now, self.bytes))
+        # Keep one sample at least RATE_WINDOW old, to measure the current rate from.
+        while len(self._samples) > 2 and now - self._samples[1][0] >= RATE_WINDOW:
+            self._samples.popleft()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the meter started."""
+        return self._clock() - self.started
+
+    @property
+    def average_rate(self) -> float:
+        """Bytes per second since the start."""
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def current_rate(self) -> float:
+        """Bytes per second over the last ``RATE_WINDOW`` seconds or so."""
+        then, count = self._samples[0]
+        elapsed = self._clock() - then
+        return (self.bytes - count) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def percentage(self) -> float | None:
+        """How much of the total has passed, if the total is known."""
+        if not self.total:
+            return None
+        return min(100.0, 100.0 * self.bytes / self.total)
+
+    @property
+    def eta(self) -> float | None:
+        """Seconds until the total has passed at the average rate, if that can be known."""
+        rate = self.average_rate
+        if not self.total or rate <= 0:
+            return None
+        return max(self.total - self.bytes, 0) / rate
+
+    def status(self, final: bool = False) -> str:
+        """Describe the progress so far, in the style of ``pv``.
+
+        For example ``1.50MiB 0:00:03 [ 512KiB/s] [avg 500KiB/s] 45% ETA 0:00:04``.
+        The ``final`` status, for when the stream has ended, only has the
+        size, the time taken and the average rate.
+        """
+        parts = [format_size(self.bytes), format_duration(self.elapsed)]
+        if not final:
+            parts.append(f"[{format_size(self.current_rate):>7}/s]")
+        parts.append(f"[avg {format_size(self.average_rate)}/s]")
+        percentage = self.percentage
+        if percentage is not None and not final:
+            parts.append(f"{percentage:3.0f}%")
+            eta = self.eta
+            if eta is not None:
+                parts.append(f"ETA {format_duration(eta)}")
+        return " ".join(parts)
+
+
+class RateLimiter:
+    """Hold a stream to at most ``rate`` bytes per second.
+
+    A token bucket: up to ``BURST_SECONDS`` worth of data may pass at once,
+    and beyond that ``throttle`` sleeps until the data is due.
+    """
+
+    def __init__(
+        self,
+        rate: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self._clock = clock
+        self._sleep = sleep
+        self._capacity = max(rate * BURST_SECONDS, 1.0)
+        self._tokens = self._capacity
+        self._updated = clock()
+
+    def throttle(self, count: int) -> None:
+        """Wait until ``count`` more bytes may pass."""
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= count
+        if self._tokens < 0:
+            self._sleep(-self._tokens / self.rate)
+
+    def chunk_size(self, preferred: int) -> int:
+        """The largest chunk to read at once so that the rate stays smooth."""
+        return max(1, min(preferred, int(self._capacity)))
+
+
+def meter_chunks(
+    chunks: Iterable[bytes],
+    meter: ThroughputMeter,
+    limiter: RateLimiter | None = None,
+    on_update: Callable[[ThroughputMeter], None] | None = None,
+) -> Iterator[bytes]:
+    """Pass ``chunks`` through unchanged, counting them and holding them to the limit.
+
+    Chunks bigger than the limiter's burst are passed on in pieces, so that
+    the output flows evenly rather than in long pauses and bursts.
+    """
+    for chunk in chunks:
+        pieces = [chunk]
+        if limiter is not None:
+            size = limiter.chunk_size(len(chunk))
+            pieces = [chunk[i : i + size] for i in range(0, len(chunk), size)]
+        for piece in pieces:
+            if limiter is not None:
+                limiter.throttle(len(piece))
+            meter.update(len(piece))
+            if on_update is not None:
+                on_update(meter)
+            yield piece
+
+
+class _StatusColumn(ProgressColumn):
+    """A progress column showing a meter's status."""
+
+    def __init__(self, meter: ThroughputMeter):
+        super().__init__()
+        self._meter = meter
+
+    def render(self, task: Task) -> Text:
+        """Render the meter's current status."""
+        return Text(self._meter.status())
+
+
+class MeterDisplay:
+    """Show a meter's status on a console while a stream flows, then its final status.
+
+    The live display is only shown on a terminal, and is redrawn every
+    ``interval`` seconds; the final status is always printed unless
+    ``quiet`` is set. Use as a context manager, calling ``refresh`` as data
+    passes.
+    """
+
+    def __init__(
+        self,
+        console: Console,
+        meter: ThroughputMeter,
+        name: str = "",
+        interval: float = 1.0,
+        quiet: bool = False,
+    ):
+        self._console = console
+        self._meter = meter
+        self._name = name
+        self._quiet = quiet
+        self._progress = Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            _StatusColumn(meter),
+            console=console,
+            transient=True,
+            disable=quiet or not console.is_terminal,
+            refresh_per_second=1 / interval,
+        )
+        self._task = self._progress.add_task(name, total=meter.total)
+
+    def __enter__(self) -> MeterDisplay:
+        self._progress.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._progress.stop()
+        if not self._quiet:
+            prefix = f"{self._name}: " if self._name else ""
+            self._console.print(
+                prefix + self._meter.status(final=True), markup=False, highlight=False
+            )
+
+    def refresh(self, meter: ThroughputMeter) -> None:
+        """Bring the display up to date with the meter (an ``on_update`` callback)."""
+        self._progress.update(self._task, completed=meter.bytes)
@@ -0,0 +1,59 @@
+"""Count lines, words and bytes the way ``wc`` does.
+
+The wc command, wc reading piped input and the count step of a fused
+pipeline all use these, so they report the same numbers in the same format:
+words are runs of non-whitespace, sizes are in bytes (not decoded
+characters), and a last line without a newline is still counted as a line.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+# The options wc understands, for parse_flags.
+WC_FLAGS: dict[str, type] = {
+    "l": bool,  # lines
+    "w": bool,  # words
+    "c": bool,  # bytes
+}
+
+
+def selected_columns(flags: Mapping[str, Any]) -> tuple[bool, bool, bool]:
+    """Work out which of lines, words and bytes to show: those asked for, or all three."""
+    columns = (bool(flags["l"]), bool(flags["w"]), bool(flags["c"]))
+    return columns if any(columns) else (True, True, True)
+
+
+def count_chunks(chunks: Iterable[bytes]) -> tuple[int, int, int]:
+    """Count the lines, words and bytes in a stream without keeping it.
+
+    A word split across two chunks is counted once.
+
+    Returns:
+        A tuple of (lines, words, bytes)
+    """
+    lines = words = size = 0
+    in_word = False
+    last = b"\n"
+    for chunk in chunks:
+        if not chunk:
+            continue
+        lines += chunk.count(b"\n")
+        words += len(chunk.split())
+        size += len(chunk)
+        if in_word and not chunk[:1].isspace():
+            words -= 1
+        last = chunk[-1:]
+        in_word = not last.isspace()
+    if last != b"\n":
+        lines += 1
+    return lines, words, size
+
+
+def format_counts(counts: Sequence[int], columns: Sequence[bool], name: str = "") -> str:
+    """Format the selected counts as wc prints them, followed by the file name if any."""
+    text = " ".join(f"{count:8}" for count, shown in zip(counts, columns, strict=True) if shown)
+    return f"{text} {name}" if name else text
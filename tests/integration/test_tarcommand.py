@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import io
+import tarfile
 from typing import TYPE_CHECKING
 
 import pytest
@@ -65,3 +67,25 @@ def test_execute_list_nonexistent(
         result = command.execute(client=client, args=["-tf", "/nonexistent/archive.tar"])
     # Should fail for nonexistent file
     assert result == 1
+
+
+def test_execute_extract_absolute_member(
+    client: ops.pebble.Client,
+    command: pebble_shell.commands.TarCommand,
+    tmp_path,
+):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        info = tarfile.TarInfo("/etc/absolute.txt")
+        info.size = 5
+        tar.addfile(info, io.BytesIO(b"hello"))
+    client.push(f"{tmp_path}/absolute.tar", archive.getvalue(), make_dirs=True)
+
+    with command.shell.console.capture() as capture:
+        result = command.execute(
+            client=client, args=["-xf", f"{tmp_path}/absolute.tar", "-C", f"{tmp_path}/out"]
+        )
+    assert result == 0
+    assert "Removing leading '/'" in capture.get()
+    with client.pull(f"{tmp_path}/out/etc/absolute.txt") as f:
+        assert f.read() == "hello"
@@ -0,0 +1,88 @@
+"""Shared fixtures for unit tests."""
+
+from __future__ import annotations
+
+import datetime
+import io
+import os
+
+import ops
+import pytest
+
+
+class DictClient:
+    """A client serving and storing files in a dict, recording what it is asked to do.
+
+    Directories are implied by the paths of the files in them; ``empty_dirs``
+    adds directories with nothing in them.
+    """
+
+    def __init__(self, files: dict[str, bytes], empty_dirs: tuple[str, ...] = ()):
+        self.files = files
+        self.empty_dirs = set(empty_dirs)
+        self.pulls = 0
+        self.pushed: dict[str, list[bytes]] = {}
+        self.push_options: dict[str, dict] = {}
+        self.made_dirs: list[str] = []
+        self.listed: list[str] = []
+
+    def _info(self, path: str, file_type: ops.pebble.FileType) -> ops.pebble.FileInfo:
+        return ops.pebble.FileInfo(
+            path=path,
+            name=os.path.basename(path),
+            type=file_type,
+            size=len(self.files[path]) if file_type == ops.pebble.FileType.FILE else None,
+            permissions=0o640,
+            last_modified=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+            user_id=1000,
+            user="app",
+            group_id=1000,
+            group="app",
+        )
+
+    def list_files(self, path: str, *, itself: bool = False):
+        self.listed.append(path)
+        if path in self.files:
+            return [self._info(path, ops.pebble.FileType.FILE)]
+        entries = set(self.files) | self.empty_dirs
+        children = sorted({p for p in entries if p.startswith(path + "/")})
+        if path in self.empty_dirs:
+            return [self._info(path, ops.pebble.FileType.DIRECTORY)] if itself else []
+        if not children:
+            raise ops.pebble.PathError("not-found", f"stat {path}: no such file or directory")
+        if itself:
+            return [self._info(path, ops.pebble.FileType.DIRECTORY)]
+        names = sorted({p[len(path) + 1 :].split("/")[0] for p in children})
+        return [
+            self._info(
+                f"{path}/{name}",
+                ops.pebble.FileType.FILE
+                if f"{path}/{name}" in self.files
+                else ops.pebble.FileType.DIRECTORY,
+            )
+            for name in names
+        ]
+
+    def pull(self, path: str, *, encoding=None):
+        if path not in self.files:
+            raise ops.pebble.PathError("not-found", f"stat {path}: no such file or directory")
+        self.pulls += 1
+        return io.BytesIO(self.files[path])
+
+    def push(self, path: str, source, **kwargs):
+        self.push_options[path] = kwargs
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        chunks = self.pushed[path] = []
+        while chunk := source.read(4096):
+            chunks.append(chunk)
+        self.files[path] = b"".join(chunks)
+
+    def make_dir(self, path: str, *, make_parents: bool = False):
+        self.made_dirs.append(path)
+
+
+@pytest.fixture
+def dict_client() -> type[DictClient]:
+    """Return a class creating clients that serve files from a dict."""
+    return DictClient
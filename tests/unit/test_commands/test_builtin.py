@@ -1,22 +1,34 @@
 """Tests for builtin commands."""
 
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
 from unittest.mock import MagicMock, Mock, patch
 
 import ops
 import pytest
+from rich.console import Console
 
 from pebble_shell.commands.builtin import (
     CdCommand,
     CutCommand,
     EchoCommand,
     EnvCommand,
+    ExplainCommand,
     GrepCommand,
+    HexdumpCommand,
     IdCommand,
+    JqCommand,
     PwdCommand,
+    Sha256sumCommand,
     SortCommand,
     UlimitCommand,
     WcCommand,
     WhoamiCommand,
+    YqCommand,
 )
 
 
@@ -86,6 +98,8 @@ class TestSortCommand:
         """Create SortCommand instance."""
         mock_shell = Mock()
         mock_shell.console = Mock()
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/root"
         return SortCommand(mock_shell)
 
     @pytest.fixture
@@ -101,7 +115,8 @@ banana
 cherry
 """
 
-        mock_file.read.return_value = test_content  # Return string, not bytes
+        # Return string, not bytes; the file is read in chunks until empty.
+        mock_file.read.side_effect = [test_content, ""]
         client.pull = MagicMock()
         client.pull.return_value.__enter__.return_value = mock_file
         client.pull.return_value.__exit__.return_value = None
@@ -115,6 +130,7 @@ cherry
 
         # Verify console output
         command.shell.console.print.assert_called()
+        assert command.shell.console.print.call_args[0][0] == "apple\nbanana\ncherry\nzebra\n"
 
     @patch("pebble_shell.commands.builtin.resolve_path")
     def test_execute_reverse_sort(self, mock_resolve_path, command, mock_client):
@@ -124,6 +140,7 @@ cherry
 
         # Verify console output
         command.shell.console.print.assert_called()
+        assert command.shell.console.print.call_args[0][0] == "zebra\ncherry\nbanana\napple\n"
 
     @patch("pebble_shell.commands.builtin.resolve_path")
     def test_execute_numeric_sort(self, mock_resolve_path, command, mock_client):
@@ -133,13 +150,63 @@ cherry
         # Mock numeric content
         mock_file = MagicMock()
         numeric_content = "10\n2\n100\n3\n"
-        mock_file.read.return_value = numeric_content  # Return string, not bytes
+        mock_file.read.side_effect = [numeric_content, ""]  # Return string, not bytes
         mock_client.pull.return_value.__enter__.return_value = mock_file
 
         command.execute(mock_client, ["-n", "numbers.txt"])
 
         # Verify console output
         command.shell.console.print.assert_called()
+        assert command.shell.console.print.call_args[0][0] == "2\n3\n10\n100\n"
+
+    def test_execute_key_fields(self, command, mock_client):
+        """Test sort command with several -k keys and a separator."""
+        mock_file = MagicMock()
+        mock_file.read.side_effect = ["b:2\na:10\nb:1\na:9\n", ""]
+        mock_client.pull.return_value.__enter__.return_value = mock_file
+
+        result = command.execute(mock_client, ["-t", ":", "-k", "1,1", "-k", "2nr", "in.txt"])
+
+        assert result == 0
+        assert command.shell.console.print.call_args[0][0] == "a:10\na:9\nb:2\nb:1\n"
+
+    def test_execute_remote_drops_local_options(self, command, mock_client):
+        """Test --remote passes on the sort options but not -S, -T or --parallel."""
+        mock_client.exec.return_value.stdout = io.BytesIO(b"b\na\n")
+
+        args = ["--remote", "-S", "1M", "-T", "/tmp", "--parallel", "2", "-t", ":", "-r", "f"]
+        result = command.execute(mock_client, args)
+
+        assert result == 0
+        argv = mock_client.exec.call_args[0][0]
+        assert argv == ["sort", "-t", ":", "-r", "f"]
+        mock_client.pull.assert_not_called()
+
+    def test_execute_remote_drops_attached_local_options(self, command, mock_client):
+        """Test --remote also drops -S and -T given with their values attached."""
+        mock_client.exec.return_value.stdout = io.BytesIO(b"a\n")
+
+        result = command.execute(mock_client, ["--remote", "-S1G", "-T/tmp", "-n", "f"])
+
+        assert result == 0
+        assert mock_client.exec.call_args[0][0] == ["sort", "-n", "f"]
+
+    def test_execute_large_file_sorts_locally(self, command, mock_client):
+        """Test a large file is sorted locally unless --remote is given."""
+        mock_client.list_files.return_value = [Mock(type=ops.pebble.FileType.FILE, size=1 << 40)]
+
+        assert command.execute(mock_client, ["test.txt"]) == 0
+
+        mock_client.exec.assert_not_called()
+        assert command.shell.console.print.call_args[0][0] == "apple\nbanana\ncherry\nzebra\n"
+
+    def test_execute_missing_file(self, command, mock_client):
+        """Test sort command with a file that does not exist."""
+        mock_client.pull.side_effect = ops.pebble.PathError("not-found", "not found")
+
+        result = command.execute(mock_client, ["missing.txt"])
+
+        assert result == 1
 
     def test_execute_no_files(self, command, mock_client):
         """Test sort command with no files."""
@@ -424,6 +491,40 @@ class TestEnvCommand:
         command.shell.console.print.assert_called()
 
 
+class TestExplainCommand:
+    """Test cases for ExplainCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create ExplainCommand instance."""
+        mock_shell = Mock()
+        mock_shell.console = Mock()
+        mock_shell.commands = {}
+        return ExplainCommand(mock_shell)
+
+    def test_fused_pipeline(self, command):
+        """Test explaining a pipeline that is fused."""
+        result = command.execute(Mock(), ["sort access.log | uniq -c | sort -rn | head"])
+
+        assert result == 0
+        text = command.shell.console.print.call_args[0][0]
+        assert text.startswith("fused plan for 4 stages:")
+        assert "hash aggregate" in text
+        assert "top-k" in text
+
+    def test_several_pipelines(self, command):
+        """Test each pipeline of a command line is explained once."""
+        command.execute(Mock(), ["cat a | wc -l; ls | tail"])
+
+        text = command.shell.console.print.call_args[0][0]
+        assert text.count("fused plan") == 1
+        assert text.count("stage by stage") == 1
+
+    def test_no_args(self, command):
+        """Test explain with nothing to explain."""
+        assert command.execute(Mock(), []) == 1
+
+
 class TestWhoamiCommand:
     """Test cases for WhoamiCommand."""
 
@@ -600,18 +701,15 @@ class TestGrepCommand:
     def mock_client(self):
         """Create mock client."""
         client = Mock()
-        mock_file = MagicMock()
 
-        test_content = """line 1: hello world
+        test_content = b"""line 1: hello world
 line 2: foo bar
 line 3: hello again
 line 4: goodbye world
 """
 
-        mock_file.read.return_value = test_content  # Return string, not bytes
-        client.pull = MagicMock()
-        client.pull.return_value.__enter__.return_value = mock_file
-        client.pull.return_value.__exit__.return_value = None
+        # grep streams the file in chunks, so hand back a real file-like object.
+        client.pull.side_effect = lambda path, **kwargs: io.BytesIO(test_content)
         return client
 
     @patch("pebble_shell.commands.builtin.resolve_path")
@@ -629,6 +727,25 @@ line 4: goodbye world
         assert "3:line 3: hello again" in output
         assert "foo bar" not in output
 
+    @pytest.mark.parametrize(
+        ("args", "lines", "repeat", "expected"),
+        [
+            (["-c", "/^$/"], b"a\nb\n", 1, "0\n"),
+            (["-c", "-x", "/x*/"], b"a\nb\n", 1, "0\n"),
+            (["-c", "/^$/"], b"abc\n", 300_000, "0\n"),
+            (["-c", "/^$/"], b"abc\n\n", 100_000, "100000\n"),
+        ],
+    )
+    def test_execute_empty_line_pattern(self, command, args, lines, repeat, expected):
+        """Test a pattern matching empty lines doesn't count the end of each chunk."""
+        client = Mock()
+        client.pull.side_effect = lambda path, **kwargs: io.BytesIO(lines * repeat)
+        command.console = Console(file=io.StringIO(), width=200, color_system=None)
+
+        command.execute(client, [*args, "test.txt"])
+
+        assert command.console.file.getvalue() == expected
+
     def test_execute_no_matches(self, command, mock_client, capsys):
         """Test grep command with no matches."""
         result = command.execute(mock_client, ["notfound", "test.txt"])
@@ -661,17 +778,12 @@ line 4: goodbye world
         """Test grep command with multiple files."""
         client = Mock()
 
-        def mock_pull(path):
-            mock_file = MagicMock()
+        def mock_pull(path, **kwargs):
             if "file1" in path:
-                mock_file.read.return_value = "hello world\nfoo bar\n"  # Return string, not bytes
-            else:
-                mock_file.read.return_value = "hello again\ngoodbye\n"  # Return string, not bytes
-            return mock_file
+                return io.BytesIO(b"hello world\nfoo bar\n")
+            return io.BytesIO(b"hello again\ngoodbye\n")
 
-        client.pull.side_effect = lambda path: MagicMock(
-            __enter__=lambda _: mock_pull(path), __exit__=lambda *_: None
-        )
+        client.pull.side_effect = mock_pull
 
         command.execute(client, ["hello", "file1.txt", "file2.txt"])
 
@@ -682,6 +794,287 @@ line 4: goodbye world
         assert any("file1.txt:1:hello world" in line for line in output_lines)
         assert any("file2.txt:1:hello again" in line for line in output_lines)
 
+    @staticmethod
+    def _output(command) -> str:
+        calls = command.shell.console.print.call_args_list
+        return "".join(str(call.args[0]) + call.kwargs.get("end", "\n") for call in calls)
+
+    def test_execute_invert_and_count(self, command, mock_client):
+        """Test grep -v -c counts the non-matching lines."""
+        result = command.execute(mock_client, ["-v", "-c", "hello", "test.txt"])
+
+        assert result == 0
+        assert self._output(command) == "2\n"
+
+    def test_execute_context(self, command, mock_client):
+        """Test grep -A prints trailing context lines."""
+        command.execute(mock_client, ["-A", "1", "foo", "test.txt"])
+
+        assert self._output(command) == "2:line 2: foo bar\n3-line 3: hello again\n"
+
+    def test_execute_max_count(self, command, mock_client):
+        """Test grep -m stops after the requested number of matches."""
+        command.execute(mock_client, ["-m", "1", "hello", "test.txt"])
+
+        assert self._output(command) == "1:line 1: hello world\n"
+
+    def test_execute_quiet(self, command, mock_client):
+        """Test grep -q prints nothing and reports via the exit code."""
+        assert command.execute(mock_client, ["-q", "hello", "test.txt"]) == 0
+        assert command.execute(mock_client, ["-q", "nothere", "test.txt"]) == 1
+
+    def test_execute_pattern_file_with_counts(self, command):
+        """Test grep -f matches any pattern and --pattern-counts reports each one."""
+        files = {
+            "/test/dir/patterns": b"hello\nfoo\nmissing\n",
+            "/test/dir/test.txt": b"hello world\nfoo bar\nhello foo\nbye\n",
+        }
+        client = Mock()
+        client.pull.side_effect = lambda path, **kwargs: io.BytesIO(files[path])
+
+        result = command.execute(client, ["-f", "patterns", "--pattern-counts", "test.txt"])
+
+        assert result == 0
+        assert self._output(command) == (
+            "1:hello world\n2:foo bar\n3:hello foo\n      2 hello\n      2 foo\n      0 missing\n"
+        )
+
+    def test_execute_several_explicit_patterns(self, command, mock_client):
+        """Test every -e pattern is searched for, not just the last one."""
+        result = command.execute(mock_client, ["-e", "foo", "-e", "goodbye", "test.txt"])
+
+        assert result == 0
+        assert self._output(command) == "2:line 2: foo bar\n4:line 4: goodbye world\n"
+
+    def test_execute_patterns_and_pattern_file(self, command):
+        """Test -e patterns are combined with the patterns in -f files."""
+        files = {"/test/dir/patterns": b"hello\n", "/test/dir/test.txt": b"hello\nfoo\nbar\n"}
+        client = Mock()
+        client.pull.side_effect = lambda path, **kwargs: io.BytesIO(files[path])
+
+        result = command.execute(client, ["-c", "-f", "patterns", "-ebar", "test.txt"])
+
+        assert result == 0
+        assert self._output(command) == "2\n"
+
+    def test_execute_piped(self, command, mock_client):
+        """Test piped input is searched like a file, without line numbers unless -n."""
+        data = "alpha\nBeta\ngamma\nbeta\n"
+
+        assert command.execute_piped(mock_client, ["-i", "-e", "beta", "-e", "alp"], data) == 0
+        assert self._output(command) == "alpha\nBeta\nbeta\n"
+        command.shell.console.print.reset_mock()
+
+        assert command.execute_piped(mock_client, ["-n", "/^g/"], data) == 0
+        assert self._output(command) == "3:gamma\n"
+        command.shell.console.print.reset_mock()
+
+        assert command.execute_piped(mock_client, ["-l", "beta"], data) == 0
+        assert self._output(command) == "(standard input)\n"
+        mock_client.pull.assert_not_called()
+
+    def test_execute_piped_with_files(self, command, mock_client):
+        """Test files named on the command line are searched instead of the input."""
+        assert command.execute_piped(mock_client, ["foo", "test.txt"], "foo\n") == 0
+        assert self._output(command) == "2:line 2: foo bar\n"
+
+    def test_execute_empty_pattern_file(self, command, mock_client):
+        """Test an empty pattern file matches nothing."""
+        files = {"/test/dir/empty": b"", "/test/dir/test.txt": b"hello\n"}
+        mock_client.pull.side_effect = lambda path, **kwargs: io.BytesIO(files[path])
+
+        assert command.execute(mock_client, ["-f", "empty", "test.txt"]) == 1
+        command.shell.console.print.assert_not_called()
+
+    def test_execute_binary_file(self, command):
+        """Test binary files are reported rather than printed."""
+        client = Mock()
+        client.pull.side_effect = lambda path, **kwargs: io.BytesIO(b"\x7fELF\x00hello\n")
+
+        command.execute(client, ["hello", "/bin/prog"])
+
+        assert self._output(command) == "Binary file /bin/prog matches\n"
+
+    def test_execute_recursive_files_with_matches(self, command):
+        """Test grep -rl walks the tree and lists matching files."""
+        client = Mock()
+
+        def info(path, file_type):
+            file_info = Mock(spec=ops.pebble.FileInfo)
+            file_info.path = path
+            file_info.name = path.rsplit("/", 1)[-1]
+            file_info.type = file_type
+            return file_info
+
+        tree = {
+            "/logs": [
+                info("/logs/a.log", ops.pebble.FileType.FILE),
+                info("/logs/old", ops.pebble.FileType.DIRECTORY),
+            ],
+            "/logs/old": [info("/logs/old/b.log", ops.pebble.FileType.FILE)],
+        }
+        contents = {"/logs/a.log": b"nothing here\n", "/logs/old/b.log": b"an error\n"}
+        client.list_files.side_effect = lambda path: tree[path]
+        client.pull.side_effect = lambda path, **kwargs: io.BytesIO(contents[path])
+
+        result = command.execute(client, ["-rl", "error", "/logs"])
+
+        assert result == 0
+        assert self._output(command) == "/logs/old/b.log\n"
+
+
+def _listing(*names: str) -> list[Mock]:
+    """Create the entries of a directory listing with the given names."""
+    listing = []
+    for name in names:
+        info = Mock(spec=ops.pebble.FileInfo)
+        info.name = name
+        listing.append(info)
+    return listing
+
+
+class _LocalTreeClient:
+    """A client serving a local directory tree, running commands with the local tools."""
+
+    def list_files(self, path, itself=False):
+        def info(file_path):
+            file_info = Mock(spec=ops.pebble.FileInfo)
+            file_info.path = file_path
+            file_info.name = os.path.basename(file_path)
+            file_info.size = os.path.getsize(file_path)
+            is_dir = os.path.isdir(file_path)
+            file_info.type = ops.pebble.FileType.DIRECTORY if is_dir else ops.pebble.FileType.FILE
+            return file_info
+
+        if itself or not os.path.isdir(path):
+            return [info(path)]
+        return [info(os.path.join(path, name)) for name in sorted(os.listdir(path))]
+
+    def pull(self, path, encoding="utf-8"):
+        if encoding is None:
+            return open(path, "rb")
+        return open(path, encoding=encoding)
+
+    def exec(self, command, working_dir=None, encoding="utf-8", stderr=None, **kwargs):
+        result = subprocess.run(  # noqa: S603
+            command, cwd=working_dir, capture_output=True, check=False
+        )
+        process = Mock()
+        process.stdout = io.BytesIO(result.stdout)
+        if stderr is not None:
+            stderr.write(result.stderr)
+        if result.returncode:
+            error = ops.pebble.ExecError(command, result.returncode, None, None)
+            process.wait.side_effect = process.wait_output.side_effect = error
+        return process
+
+
+@pytest.mark.skipif(shutil.which("grep") is None, reason="needs a native grep")
+class TestGrepOffload:
+    """Test grep prints the same whether it searches locally or in the container."""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        (tmp_path / "app.log").write_text(
+            "INFO start\nerror: disk full\nfoo bar\nbaar\nabc\nERROR again\nfoo.bar\n"
+        )
+        (tmp_path / "other.log").write_text("nothing\nbar none\n")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "notes.txt").write_text("bar in notes\n")
+        return tmp_path
+
+    @staticmethod
+    def _run(tree, args):
+        shell = Mock()
+        shell.current_directory = str(tree)
+        shell.home_dir = str(tree)
+        shell.console = Console(file=io.StringIO(), width=1000, color_system=None)
+        shell.error_console = Console(file=io.StringIO(), width=1000, color_system=None)
+        exit_code = GrepCommand(shell).execute(_LocalTreeClient(), args)
+        return exit_code, shell.console.file.getvalue()
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ["-i", "error", "app.log"],
+            ["-e", "foo", "-e", "/ba+r/", "app.log"],
+            ["-w", "-c", "foo", "app.log"],
+            ["-v", "-x", "abc", "app.log"],
+            ["-A", "1", "disk", "app.log"],
+            ["-l", "bar", "app.log", "other.log"],
+            ["/^[a-c]+$/", "app.log"],
+            ["-F", "o.b", "app.log"],
+        ],
+    )
+    def test_offloaded_output_matches_local(self, tree, args):
+        """Test the container's grep is given options that select the same lines."""
+        local = self._run(tree, ["--local", *args])
+        remote = self._run(tree, ["--remote", *args])
+
+        assert local[1]
+        assert remote == local
+
+    @pytest.mark.parametrize("mode", ["--local", "--remote"])
+    @pytest.mark.parametrize(
+        ("args", "expected"),
+        [
+            (["-m", "0", "bar", "app.log"], ""),
+            (["-c", "-m", "0", "bar", "app.log"], ""),
+            (["-L", "-m", "0", "bar", "app.log"], "{tree}/app.log\n"),
+        ],
+    )
+    def test_max_count_zero(self, tree, mode, args, expected):
+        """Test -m 0 selects nothing and fails, as GNU grep does."""
+        assert self._run(tree, [mode, *args]) == (1, expected.format(tree=tree))
+
+    def test_python_only_syntax_runs_locally(self, tree):
+        """Test a pattern the container's grep would read differently is searched locally."""
+        exit_code, output = self._run(tree, ["--remote", r"/\bbar\b/", "app.log", "other.log"])
+
+        assert exit_code == 0
+        assert output == (
+            "grep: the container's grep can't run this search, running locally\n"
+            f"{tree}/app.log:3:foo bar\n"
+            f"{tree}/app.log:7:foo.bar\n"
+            f"{tree}/other.log:2:bar none\n"
+        )
+
+    def test_include_runs_locally(self, tree):
+        """Test --include and --exclude, which busybox grep lacks, are searched locally."""
+        local = self._run(tree, ["--local", "-r", "--include=*.txt", "bar", "."])
+        exit_code, output = self._run(tree, ["--remote", "-r", "--include=*.txt", "bar", "."])
+
+        assert exit_code == 0
+        assert output == (
+            "grep: the container's grep can't run this search, running locally\n" + local[1]
+        )
+
+    def test_native_args_use_short_options(self, tree, monkeypatch):
+        """Test context and count options are given in the forms busybox grep accepts."""
+        argvs = []
+        monkeypatch.setattr(
+            "pebble_shell.commands.builtin.grep.offload",
+            lambda command, client, argv, paths, mode: argvs.append(argv),
+        )
+        self._run(tree, ["--remote", "-m", "2", "-B", "1", "-A", "3", "bar", "app.log"])
+
+        assert argvs[0] == [
+            "grep",
+            "-E",
+            "-n",
+            "-h",
+            "-m",
+            "2",
+            "-B",
+            "1",
+            "-A",
+            "3",
+            "-e",
+            "bar",
+            "--",
+            f"{tree}/app.log",
+        ]
+
 
 class TestWcCommand:
     """Test cases for WcCommand."""
@@ -699,17 +1092,11 @@ class TestWcCommand:
     def mock_client(self):
         """Create mock client."""
         client = Mock()
-        mock_file = MagicMock()
 
-        test_content = """line 1
-line 2 with more words
-line 3
-"""
+        test_content = "line 1\nline 2 with more wörds\nline 3\n".encode()
 
-        mock_file.read.return_value = test_content  # Return string, not bytes
-        client.pull = MagicMock()
-        client.pull.return_value.__enter__.return_value = mock_file
-        client.pull.return_value.__exit__.return_value = None
+        # wc streams the file in chunks, so hand back a real file-like object.
+        client.pull.side_effect = lambda path, **kwargs: io.BytesIO(test_content)
         return client
 
     def test_execute_default(self, command, mock_client, capsys):
@@ -725,6 +1112,25 @@ line 3
         assert any("9" in line for line in output_lines)  # words (corrected count)
         assert any("test.txt" in line for line in output_lines)
 
+    def test_execute_large_file_counts_locally(self, command, mock_client):
+        """Test a large file is counted locally unless --remote is given."""
+        mock_client.list_files.return_value = [Mock(type=ops.pebble.FileType.FILE, size=1 << 40)]
+
+        assert command.execute(mock_client, ["-l", "test.txt"]) == 0
+
+        mock_client.exec.assert_not_called()
+        command.shell.console.print.assert_called_with("       3 /test/dir/test.txt")
+
+    def test_execute_remote_passes_resolved_paths(self, command, mock_client):
+        """Test --remote runs wc on the flags and the resolved paths."""
+        mock_client.exec.return_value.stdout = io.BytesIO(b"3 /test/dir/test.txt\n")
+
+        assert command.execute(mock_client, ["--remote", "-l", "test.txt"]) == 0
+
+        argv = mock_client.exec.call_args[0][0]
+        assert argv == ["wc", "-l", "--", "/test/dir/test.txt"]
+        mock_client.pull.assert_not_called()
+
     def test_execute_lines_only(self, command, mock_client, capsys):
         """Test wc command with -l option."""
         command.execute(mock_client, ["-l", "test.txt"])
@@ -755,8 +1161,8 @@ line 3
         command.shell.console.print.assert_called()
         print_calls = command.shell.console.print.call_args_list
         output_lines = [str(call[0][0]) for call in print_calls]
-        # Should show character count
-        assert any("test.txt" in line for line in output_lines)
+        # Should show the byte count, not the number of characters
+        assert output_lines == ["      38 /test/dir/test.txt"]
 
     def test_execute_no_files(self, command, mock_client, capsys):
         """Test wc command with no files."""
@@ -777,3 +1183,319 @@ line 3
         print_calls = command.shell.console.print.call_args_list
         output_lines = [str(call[0][0]) for call in print_calls]
         assert any("Invalid option" in line for line in output_lines)
+
+
+class TestSha256sumCommand:
+    """Test cases for Sha256sumCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create Sha256sumCommand instance."""
+        mock_shell = Mock()
+        mock_shell.console = Mock()
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/root"
+        return Sha256sumCommand(mock_shell)
+
+    @staticmethod
+    def _client(files: dict[str, bytes]) -> Mock:
+        def pull(path, **kwargs):
+            if path not in files:
+                raise ops.pebble.PathError("not-found", f"open {path}: no such file")
+            return io.BytesIO(files[path])
+
+        client = Mock()
+        client.pull.side_effect = pull
+        return client
+
+    @staticmethod
+    def _output(command) -> list[str]:
+        return [str(call[0][0]) for call in command.shell.console.print.call_args_list]
+
+    def test_hash_files_in_order(self, command):
+        """Test digests are printed in argument order, with errors in place."""
+        client = self._client({"/a": b"a", "/b": b"b"})
+
+        assert command.execute(client, ["/b", "/missing", "/a", "--tag"]) == 1
+        assert self._output(command) == [
+            f"SHA256 (/b) = {hashlib.sha256(b'b').hexdigest()}",
+            "sha256sum: /missing: No such file or directory",
+            f"SHA256 (/a) = {hashlib.sha256(b'a').hexdigest()}",
+        ]
+
+    def test_check(self, command):
+        """Test verifying a checksum manifest."""
+        manifest = (
+            f"{hashlib.sha256(b'a').hexdigest()}  /a\n"
+            f"{hashlib.sha256(b'x').hexdigest()}  /b\n"
+            "not a checksum line\n"
+        )
+        client = self._client({"/a": b"a", "/b": b"b", "/sums": manifest.encode()})
+
+        assert command.execute(client, ["-c", "/sums"]) == 1
+        assert self._output(command) == [
+            "/a: OK",
+            "/b: FAILED",
+            "sha256sum: WARNING: 1 line improperly formatted",
+            "sha256sum: WARNING: 1 computed checksum did NOT match",
+        ]
+
+    def test_check_in_manifest_order(self, command):
+        """Test results are printed in manifest order when a file is listed twice."""
+        manifest = (
+            f"SHA1 (/a) = {hashlib.sha1(b'a').hexdigest()}\n"  # noqa: S324
+            f"{hashlib.sha256(b'x').hexdigest()}  /b\n"
+            f"{hashlib.sha256(b'a').hexdigest()}  /a\n"
+        )
+        client = self._client({"/a": b"a", "/b": b"b", "/sums": manifest.encode()})
+
+        assert command.execute(client, ["-c", "/sums"]) == 1
+        assert self._output(command)[:3] == ["/a: OK", "/b: FAILED", "/a: OK"]
+        assert [call.args[0] for call in client.pull.call_args_list].count("/a") == 1
+
+    def test_directory_without_recursion(self, command):
+        """Test a directory is reported as one unless -r is given."""
+        client = self._client({"/a": b"a"})
+        pull = client.pull.side_effect
+
+        def pull_file(path, **kwargs):
+            if path == "/dir":
+                raise ops.pebble.PathError("generic-file-error", "can only read a regular file")
+            return pull(path, **kwargs)
+
+        client.pull.side_effect = pull_file
+        client.list_files.side_effect = lambda path, **kwargs: [
+            Mock(
+                type=ops.pebble.FileType.DIRECTORY if path == "/dir" else ops.pebble.FileType.FILE
+            )
+        ]
+
+        assert command.execute(client, ["-j", "2", "/dir", "/a"]) == 1
+        assert self._output(command) == [
+            "sha256sum: /dir: Is a directory",
+            f"{hashlib.sha256(b'a').hexdigest()}  /a",
+        ]
+
+    def test_check_tagged_lines_locally(self, command):
+        """Test -c reads tag names such as SHA3-256 and is never run in the container."""
+        manifest = (
+            f"SHA3-256 (/a) = {hashlib.sha3_256(b'a').hexdigest()}\n"
+            f"BLAKE2b (/b) = {hashlib.blake2b(b'b').hexdigest()}\n"
+            "ROT13 (/a) = 00\n"
+        )
+        client = self._client({"/a": b"a", "/b": b"b", "/sums": manifest.encode()})
+        client.list_files.return_value = [Mock(type=ops.pebble.FileType.FILE, size=1 << 40)]
+
+        assert command.execute(client, ["-c", "/sums"]) == 0
+        assert self._output(command) == [
+            "/a: OK",
+            "/b: OK",
+            "sha256sum: WARNING: 1 line improperly formatted",
+        ]
+        client.exec.assert_not_called()
+
+
+class TestHexdumpCommand:
+    """Test cases for HexdumpCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create HexdumpCommand instance."""
+        mock_shell = Mock()
+        mock_shell.console = Mock()
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/root"
+        return HexdumpCommand(mock_shell)
+
+    @staticmethod
+    def _output(command) -> list[str]:
+        return [
+            line
+            for call in command.shell.console.print.call_args_list
+            for line in str(call[0][0]).split("\n")
+        ]
+
+    def test_canonical_with_squeeze(self, command):
+        """Test -C output, with repeated lines collapsed."""
+        client = Mock()
+        client.pull.return_value = io.BytesIO(b"hello" + bytes(43))
+
+        assert command.execute(client, ["-C", "/f"]) == 0
+        assert self._output(command) == [
+            "00000000  68 65 6c 6c 6f 00 00 00  00 00 00 00 00 00 00 00  |hello...........|",
+            "00000010  00 00 00 00 00 00 00 00  00 00 00 00 00 00 00 00  |................|",
+            "*",
+            "00000030",
+        ]
+
+    def test_skip_and_length(self, command):
+        """Test -s and -n select part of the file and stop reading early."""
+        client = Mock()
+        client.pull.return_value = io.BytesIO(bytes(range(256)) * 1024)
+
+        assert command.execute(client, ["-x", "-s", "0x10", "-n", "4", "/f"]) == 0
+        assert self._output(command) == ["0000010    1110    1312", "0000014"]
+        assert client.pull.return_value.closed
+
+
+class TestJqCommand:
+    """Test cases for JqCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create JqCommand instance with a console that can be captured."""
+        mock_shell = Mock()
+        mock_shell.console = Console(force_terminal=False, width=200)
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/root"
+        return JqCommand(mock_shell)
+
+    @pytest.fixture
+    def client(self):
+        """Create a client serving an NDJSON log."""
+        client = Mock()
+        records = [
+            b'{"level": "info", "msg": "started"}',
+            b'{"level": "error", "msg": "failed", "code": 2}',
+            b'{"level": "error", "msg": "retried", "code": 3}',
+        ]
+        client.pull.side_effect = lambda *args, **kwargs: io.BytesIO(b"\n".join(records))
+        client.list_files.return_value = _listing("log", "events.ndjson", "f", "length")
+        return client
+
+    def _run(self, command, client, args: list[str]) -> tuple[int, str]:
+        with command.console.capture() as capture:
+            result = command.execute(client, args)
+        return result, capture.get()
+
+    def test_filter_ndjson(self, command, client):
+        """Test the filter is run over each record, with compact and raw output."""
+        result, output = self._run(
+            command, client, ["-c", 'select(.level == "error") | {msg, code}', "/log"]
+        )
+        assert result == 0
+        assert output == '{"msg":"failed","code":2}\n{"msg":"retried","code":3}\n'
+
+        _, output = self._run(command, client, ["-r", ".msg", "/log"])
+        assert output == "started\nfailed\nretried\n"
+
+    def test_slurp(self, command, client):
+        """Test -s filters all the records as one array."""
+        _, output = self._run(command, client, ["-s", "map(.code // 0) | add", "/log"])
+        assert output == "5\n"
+
+    def test_file_then_keypath(self, command, client):
+        """Test the original form, with the file before a key path."""
+        _, output = self._run(command, client, ["/log", ".msg"])
+        assert output == '"started"\n"failed"\n"retried"\n'
+
+    @pytest.mark.parametrize(
+        ("args", "expected"),
+        [
+            (["-s", "length", "events.ndjson"], "3\n"),
+            (
+                ["-c", "keys", "f"],
+                '["level","msg"]\n["code","level","msg"]\n["code","level","msg"]\n',
+            ),
+            (["not", "f"], "false\nfalse\nfalse\n"),
+            (["-r", 'if .level == "error" then .msg else "ok" end', "f"], "ok\nfailed\nretried\n"),
+            # A single argument naming a file is the file, even if it would compile.
+            (
+                ["-c", "length"],
+                '{"level":"info","msg":"started"}\n'
+                '{"level":"error","msg":"failed","code":2}\n'
+                '{"level":"error","msg":"retried","code":3}\n',
+            ),
+        ],
+    )
+    def test_filter_forms(self, command, client, args, expected):
+        """Test filters that don't start with a path are told apart from file names."""
+        result, output = self._run(command, client, args)
+        assert result == 0
+        assert output == expected
+
+    @pytest.mark.parametrize(
+        ("args", "message"),
+        [
+            ([], "No file specified"),
+            (["keys"], "No file specified"),
+            ([".a |", "/log"], "Invalid filter: .a |"),
+            ([".msg.x", "/log"], "Key path error"),
+        ],
+    )
+    def test_errors(self, command, client, args, message):
+        """Test errors are reported with a non-zero exit code."""
+        result, output = self._run(command, client, args)
+        assert result == 1
+        assert message in output
+
+
+class TestYqCommand:
+    """Test cases for YqCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create YqCommand instance with a console that can be captured."""
+        mock_shell = Mock()
+        mock_shell.console = Console(force_terminal=False, width=200)
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/root"
+        return YqCommand(mock_shell)
+
+    @pytest.fixture
+    def client(self):
+        """Create a client serving a multi-document manifest."""
+        client = Mock()
+        manifest = (
+            b"kind: Service\nmetadata: {name: web}\n"
+            b"---\nkind: Deployment\nmetadata: {name: web, labels: {app: web}}\n"
+            b"---\nkind: Deployment\nmetadata: {name: worker}\n"
+        )
+        client.pull.side_effect = lambda *args, **kwargs: io.BytesIO(manifest)
+        client.list_files.return_value = _listing("m.yaml")
+        return client
+
+    def _run(self, command, client, args: list[str]) -> tuple[int, str]:
+        with command.console.capture() as capture:
+            result = command.execute(client, args)
+        return result, capture.get()
+
+    def test_filter_documents(self, command, client):
+        """Test the filter is run over each document."""
+        result, output = self._run(
+            command, client, ['select(.kind == "Deployment") | .metadata.name', "/m.yaml"]
+        )
+        assert result == 0
+        assert output == "web\n---\nworker\n"
+
+    def test_document_index_and_json(self, command, client):
+        """Test -d loads only one document, and -o json prints JSON."""
+        _, output = self._run(command, client, ["-d", "1", "-o", "json", ".metadata", "/m.yaml"])
+        assert json.loads(output) == {"name": "web", "labels": {"app": "web"}}
+
+    def test_file_then_keypath(self, command, client):
+        """Test the original form, with the file before a key path."""
+        _, output = self._run(command, client, ["/m.yaml", ".metadata"])
+        assert output.split("---\n")[1] == "name: web\nlabels:\n  app: web\n"
+
+    def test_filter_without_path(self, command, client):
+        """Test a filter that doesn't start with a path comes before the file too."""
+        result, output = self._run(
+            command, client, ['if .kind == "Service" then "svc" else .kind end', "m.yaml"]
+        )
+        assert result == 0
+        assert output == "svc\n---\nDeployment\n---\nDeployment\n"
+
+    @pytest.mark.parametrize(
+        ("args", "message"),
+        [
+            ([], "No file specified"),
+            (["-o", "xml", ".", "/m.yaml"], "Unknown output format"),
+            ([".kind.x", "/m.yaml"], "Key path error"),
+        ],
+    )
+    def test_errors(self, command, client, args, message):
+        """Test errors are reported with a non-zero exit code."""
+        result, output = self._run(command, client, args)
+        assert result == 1
+        assert message in output
@@ -0,0 +1,254 @@
+"""Tests for data processing commands."""
+
+from __future__ import annotations
+
+import os
+from unittest.mock import Mock
+
+import pytest
+from rich.console import Console
+
+from pebble_shell.commands.data_processing import DdCommand, OdCommand, SplitCommand
+
+
+class TestDdCommand:
+    """Test cases for DdCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create DdCommand instance with a console that can be captured."""
+        mock_shell = Mock()
+        mock_shell.console = Console(force_terminal=False, width=200)
+        mock_shell.error_console = mock_shell.console
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/home/user"
+        return DdCommand(mock_shell)
+
+    def _run(self, command, client, args: list[str]) -> tuple[int, str]:
+        with command.console.capture() as capture:
+            result = command.execute(client, args)
+        return result, capture.get()
+
+    def test_skip_and_count_blocks(self, command, dict_client):
+        """Test only the requested blocks from the middle of the input are copied."""
+        data = bytes(range(256)) * 40
+        client = dict_client({"/in": data})
+
+        result, output = self._run(
+            command, client, ["if=/in", "of=/out", "bs=1K", "skip=2", "count=3"]
+        )
+
+        assert result == 0
+        assert client.files["/out"] == data[2048:5120]
+        assert "3+0 records in\n3+0 records out\n3072 bytes (3.1 kB, 3.0 KiB) copied" in output
+
+    def test_partial_records_and_sync(self, command, dict_client):
+        """Test a short last block is a partial record, padded by conv=sync."""
+        client = dict_client({"/in": b"0123456789ab"})
+
+        result, output = self._run(command, client, ["if=/in", "of=/out", "bs=5", "conv=sync"])
+
+        assert result == 0
+        assert client.files["/out"] == b"0123456789ab\0\0\0"
+        assert "2+1 records in\n3+0 records out" in output
+
+    def test_conversions(self, command, dict_client):
+        """Test conversions are applied to the copied data."""
+        client = dict_client({"/in": b"Hello World\n"})
+
+        _, output = self._run(command, client, ["if=/in", "conv=ucase", "status=none"])
+        assert output == "HELLO WORLD\n"
+
+        self._run(command, client, ["if=/in", "of=/e", "conv=ebcdic"])
+        _, output = self._run(command, client, ["if=/e", "conv=ascii,lcase", "status=none"])
+        assert output == "hello world\n"
+
+    def test_swab_across_blocks(self, command, dict_client):
+        """Test conv=swab pairs bytes across blocks and keeps a final odd byte."""
+        client = dict_client({"/in": b"abcdefg"})
+
+        result, output = self._run(command, client, ["if=/in", "of=/out", "bs=3", "conv=swab"])
+
+        assert result == 0
+        assert client.files["/out"] == b"badcfeg"
+        assert "2+1 records in\n2+1 records out\n7 bytes" in output
+
+    def test_byte_counts(self, command, dict_client):
+        """Test skip= and count= can be given in bytes."""
+        client = dict_client({"/in": b"Hello World\n"})
+
+        _, output = self._run(
+            command,
+            client,
+            ["if=/in", "iflag=skip_bytes,count_bytes", "skip=6", "count=3", "status=none"],
+        )
+
+        assert output == "Wor"
+
+    def test_seek_and_notrunc(self, command, dict_client):
+        """Test the existing output is kept before seek=, and after the data with notrunc."""
+        client = dict_client({"/in": b"abcd", "/out": b"0123456789"})
+
+        self._run(command, client, ["if=/in", "of=/out", "bs=2", "seek=1", "conv=notrunc"])
+        assert client.files["/out"] == b"01abcd6789"
+
+        self._run(command, client, ["if=/in", "of=/out", "bs=2", "seek=1"])
+        assert client.files["/out"] == b"01abcd"
+
+        self._run(command, client, ["if=/in", "of=/new", "bs=3", "seek=1"])
+        assert client.files["/new"] == b"\0\0\0abcd"
+
+    @pytest.mark.parametrize(
+        ("args", "message"),
+        [
+            (["if=/missing"], "No such file or directory"),
+            (["if=/in", "bs=1Q"], "invalid number: '1Q'"),
+            (["if=/in", "conv=block"], "invalid conversion: 'block'"),
+            (["if=/in", "of=/in", "conv=excl"], "File exists"),
+        ],
+    )
+    def test_errors(self, command, dict_client, args, message):
+        """Test invalid operands and files are reported."""
+        result, output = self._run(command, dict_client({"/in": b"x"}), args)
+
+        assert result == 1
+        assert message in output
+
+
+class TestOdCommand:
+    """Test cases for OdCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create OdCommand instance with a console that can be captured."""
+        mock_shell = Mock()
+        mock_shell.console = Console(force_terminal=False, width=200)
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/home/user"
+        return OdCommand(mock_shell)
+
+    def _run(self, command, client, args: list[str]) -> tuple[int, str]:
+        with command.console.capture() as capture:
+            result = command.execute(client, args)
+        return result, capture.get()
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            ["-An", "-tx1", "-j1", "-N2", "/in"],
+            ["-A", "n", "-t", "x1", "-j", "1", "-N", "2", "/in"],
+        ],
+    )
+    def test_attached_and_separate_values(self, command, dict_client, args):
+        """Test option values may be attached to the option or follow it."""
+        result, output = self._run(command, dict_client({"/in": b"abcd"}), args)
+
+        assert (result, output) == (0, " 62 63\n")
+
+    def test_width_without_value(self, command, dict_client):
+        """Test -w on its own puts 32 bytes on a line, as GNU od does."""
+        result, output = self._run(command, dict_client({"/in": bytes(40)}), ["-w", "-An", "/in"])
+
+        assert result == 0
+        assert [len(line.split()) for line in output.splitlines()] == [16, 4]
+
+
+class TestSplitCommand:
+    """Test cases for SplitCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create SplitCommand instance with a console that can be captured."""
+        mock_shell = Mock()
+        mock_shell.console = Console(force_terminal=False, width=200)
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/home/user"
+        return SplitCommand(mock_shell)
+
+    @pytest.fixture
+    def client(self, dict_client):
+        """Create a client with ten lines of input."""
+        return dict_client({"/in": b"".join(b"line%d\n" % i for i in range(10))})
+
+    def _pieces(self, client) -> list[bytes]:
+        return [data for path, data in sorted(client.files.items()) if path.startswith("/p")]
+
+    @pytest.mark.parametrize(
+        ("args", "sizes"),
+        [
+            (["-l", "3"], [18, 18, 18, 6]),
+            (["-b", "16"], [16, 16, 16, 12]),
+            (["-C", "14"], [12, 12, 12, 12, 12]),
+            (["-n", "3"], [20, 20, 20]),
+            (["-n", "l/3"], [24, 18, 18]),
+        ],
+    )
+    def test_split_modes(self, command, client, args, sizes):
+        """Test each mode cuts the input into the expected pieces, in order."""
+        result = command.execute(client, [*args, "/in", "/p"])
+
+        assert result == 0
+        assert [len(piece) for piece in self._pieces(client)] == sizes
+        assert b"".join(self._pieces(client)) == client.files["/in"]
+
+    def test_long_lines_are_split(self, command, dict_client):
+        """Test -C splits lines longer than the size across pieces."""
+        client = dict_client({"/in": b"aa\nbbbbbbbbbb\nc\nd\n"})
+
+        command.execute(client, ["-C", "5", "/in", "/p"])
+
+        assert self._pieces(client) == [b"aa\n", b"bbbbb", b"bbbbb", b"\nc\nd\n"]
+
+    def test_chunks_create_empty_pieces(self, command, dict_client):
+        """Test -n always creates the requested number of files."""
+        client = dict_client({"/in": b"ab"})
+
+        with command.console.capture() as capture:
+            command.execute(client, ["-n", "4", "-d", "--verbose", "/in", "/p"])
+
+        assert self._pieces(client) == [b"a", b"b", b"", b""]
+        assert "creating file '/p03'" in capture.get()
+
+    @pytest.mark.parametrize(
+        ("args", "data", "pieces"),
+        [
+            (["-n", "4"], b"0123456789", [b"01", b"23", b"45", b"6789"]),
+            (["-n", "l/5"], b"a\nb\n", [b"a\n", b"", b"b\n", b"", b""]),
+            (["-n", "l/3"], b"a\nbb\ncccc\n", [b"a\nbb\n", b"cccc\n", b""]),
+        ],
+    )
+    def test_chunks_match_gnu(self, command, dict_client, args, data, pieces):
+        """Test -n gives the remainder to the last piece and places lines as GNU split does."""
+        client = dict_client({"/in": data})
+
+        command.execute(client, [*args, "/in", "/p"])
+
+        assert self._pieces(client) == pieces
+
+    def test_local_output(self, command, client, tmp_path):
+        """Test --local writes the pieces to the local machine."""
+        result = command.execute(client, ["--local", "-l", "4", "/in", str(tmp_path / "x")])
+
+        assert result == 0
+        assert sorted(os.listdir(tmp_path)) == ["xaa", "xab", "xac"]
+        assert (tmp_path / "xac").read_bytes() == b"line8\nline9\n"
+
+    def test_suffixes_exhausted(self, command, client):
+        """Test running out of suffixes is an error, after writing the pieces so far."""
+        with command.console.capture() as capture:
+            result = command.execute(client, ["-a", "1", "-d", "-b", "5", "/in", "/p"])
+
+        assert result == 1
+        assert "output file suffixes exhausted" in capture.get()
+        assert b"".join(self._pieces(client)) == client.files["/in"][:50]
+
+    def test_suffixes_widen(self, command, dict_client):
+        """Test the suffixes grow like GNU split's when -a isn't given."""
+        client = dict_client({"/in": b"x" * 652})
+
+        result = command.execute(client, ["-b", "1", "/in", "/p"])
+
+        assert result == 0
+        names = sorted(path for path in client.files if path.startswith("/p"))
+        assert len(names) == 652
+        assert names[648:] == ["/pyy", "/pyz", "/pzaaa", "/pzaab"]
@@ -1,13 +1,18 @@
 """Tests for filesystem commands."""
 
+import gzip
+import io
+import json
 from datetime import datetime
 from unittest.mock import MagicMock, Mock
 
 import pytest
-from ops.pebble import FileInfo, PathError
+from ops.pebble import FileInfo, FileType, PathError
+from rich.console import Console
 
 from pebble_shell.commands.filesystem_read import (
     CatCommand,
+    DiffCommand,
     FindCommand,
     HeadCommand,
     ListCommand,
@@ -16,6 +21,12 @@ from pebble_shell.commands.filesystem_read import (
 )
 
 
+def _printed(command) -> str:
+    """Put back together the text printed to a mock console."""
+    calls = command.shell.console.print.call_args_list
+    return "".join(str(call.args[0]) + call.kwargs.get("end", "\n") for call in calls)
+
+
 class TestListCommand:
     """Test cases for ListCommand."""
 
@@ -77,6 +88,16 @@ class TestListCommand:
         args, _kwargs = command.shell.console.print.call_args
         assert "cannot list directory:" in args[0]
 
+    @pytest.mark.parametrize("args", [["-h"], ["-l", "-h"]])
+    def test_execute_json_sizes_in_bytes(self, command, mock_client, args):
+        """Test -h doesn't change the sizes written as JSON."""
+        command.shell.console = Console(file=io.StringIO(), force_terminal=False)
+
+        assert command.execute(mock_client, [*args, "--format=json", "/"]) == 0
+
+        records = json.loads(command.shell.console.file.getvalue())
+        assert records[0]["Size"] == 1024
+
 
 class TestCatCommand:
     """Test cases for CatCommand."""
@@ -159,6 +180,20 @@ class TestCatCommand:
         assert result == 1
         assert command.shell.console.print.called
 
+    def test_execute_streams_when_not_a_terminal(self, command):
+        """Test cat copies files unrendered when its output isn't a terminal."""
+        command.console = command.shell.console = Console(file=io.StringIO(), width=40)
+        content = b"x = '[bold]'  # " + b"long comment " * 10 + b"\n\xff\n"
+        client = Mock()
+        client.pull.side_effect = lambda path, **kwargs: io.BytesIO(
+            gzip.compress(content) if path.endswith(".gz") else content
+        )
+
+        assert command.execute(client, ["/src/app.py"]) == 0
+        assert command.execute(client, ["/src/app.py.gz"]) == 0
+        text = content.decode(errors="replace")
+        assert command.console.file.getvalue() == text * 2
+
 
 class TestHeadCommand:
     """Test cases for HeadCommand."""
@@ -188,34 +223,27 @@ class TestHeadCommand:
         """Test head command with default number of lines."""
         command.execute(mock_client, ["/var/test.txt"])
 
-        # Should display first 10 lines, each printed separately
-        calls = command.shell.console.print.call_args_list
-        assert len(calls) == 10
-        for i, call in enumerate(calls):
-            assert f"Line {i + 1}" in str(call[0][0])
+        # Should display the first 10 lines, written out in one batch
+        assert _printed(command) == "".join(f"Line {i}\n" for i in range(1, 11))
 
     def test_execute_custom_lines(self, command, mock_client):
         """Test head command with custom number of lines."""
         command.execute(mock_client, ["/var/test.txt", "5"])
 
-        # Should display first 5 lines, each printed separately
-        calls = command.shell.console.print.call_args_list
-        assert len(calls) == 5
-        for i, call in enumerate(calls):
-            assert f"Line {i + 1}" in str(call[0][0])
+        # Should display the first 5 lines
+        assert _printed(command) == "".join(f"Line {i}\n" for i in range(1, 6))
 
     def test_execute_invalid_lines(self, command, mock_client):
         """Test head command with invalid number of lines."""
         command.execute(mock_client, ["/var/test.txt", "invalid"])
 
         # When "invalid" is not a digit, it gets treated as a second file
-        # The command will try to read both "/var/test.txt" and "invalid" files
-        # The first file has 20 lines, and command prints first 10 lines of first file
-        # Then it tries to read "invalid" file which will fail
-        calls = command.shell.console.print.call_args_list
-
-        # Should have called print multiple times - 10 for the first file, then a filename header, then an error
-        assert len(calls) >= 10
+        # The mock client serves the same 20 lines for both files, so the command
+        # prints a header and the first 10 lines for each
+        first_lines = "".join(f"Line {i}\n" for i in range(1, 11))
+        assert _printed(command) == (
+            f"==> /var/test.txt <==\n{first_lines}==> /invalid <==\n{first_lines}"
+        )
 
 
 class TestTailCommand:
@@ -236,7 +264,8 @@ class TestTailCommand:
         client = Mock()
         mock_file = MagicMock()
         content = "\n".join([f"Line {i}" for i in range(1, 21)])
-        mock_file.read.return_value = content.encode()
+        # The file is read in chunks until an empty read.
+        mock_file.read.side_effect = [content.encode(), b""]
         mock_context = MagicMock()
         mock_context.__enter__.return_value = mock_file
         client.pull.return_value = mock_context
@@ -246,21 +275,25 @@ class TestTailCommand:
         """Test tail command with default number of lines."""
         command.execute(mock_client, ["/var/test.txt"])
 
-        # Should display last 10 lines (11-20), each printed separately
-        calls = command.shell.console.print.call_args_list
-        assert len(calls) == 10
-        for i, call in enumerate(calls):
-            assert f"Line {i + 11}" in str(call[0][0])
+        # Should display the last 10 lines (11-20)
+        assert _printed(command) == "".join(f"Line {i}\n" for i in range(11, 21))
 
     def test_execute_custom_lines(self, command, mock_client):
         """Test tail command with custom number of lines."""
         command.execute(mock_client, ["/var/test.txt", "3"])
 
-        # Should display last 3 lines (18-20), each printed separately
-        calls = command.shell.console.print.call_args_list
-        assert len(calls) == 3
-        for i, call in enumerate(calls):
-            assert f"Line {i + 18}" in str(call[0][0])
+        # Should display the last 3 lines (18-20)
+        assert _printed(command) == "".join(f"Line {i}\n" for i in range(18, 21))
+
+    def test_execute_compressed_file(self, command, mock_client):
+        """Test tail decompresses a gzip file as it reads it."""
+        content = "".join(f"Line {i}\n" for i in range(1, 21)).encode()
+        mock_file = mock_client.pull.return_value.__enter__.return_value
+        mock_file.read.side_effect = [gzip.compress(content), b""]
+
+        command.execute(mock_client, ["/var/test.txt.gz", "2"])
+
+        assert _printed(command) == "Line 19\nLine 20\n"
 
 
 class TestFindCommand:
@@ -427,3 +460,115 @@ class TestStatCommand:
                 error_found = True
                 break
         assert error_found, f"Expected error message not found in {calls}"
+
+
+class TestDiffCommand:
+    """Test cases for DiffCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create DiffCommand instance."""
+        mock_shell = Mock()
+        mock_shell.console = Mock()
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/root"
+        return DiffCommand(mock_shell)
+
+    @staticmethod
+    def _client(files: dict[str, bytes]) -> Mock:
+        """Create a client serving the given files, with directories implied by their paths."""
+
+        def info(path: str, file_type: FileType) -> FileInfo:
+            return FileInfo(
+                path=path,
+                name=path.rsplit("/", 1)[-1],
+                type=file_type,
+                size=len(files[path]) if file_type == FileType.FILE else None,
+                permissions=0o644,
+                last_modified=datetime(2023, 1, 1, 12, 0, 0),
+                user_id=0,
+                user="root",
+                group_id=0,
+                group="root",
+            )
+
+        def list_files(path, itself=False):
+            if path in files:
+                return [info(path, FileType.FILE)]
+            if itself and any(p.startswith(path + "/") for p in files):
+                return [info(path, FileType.DIRECTORY)]
+            children = {
+                f"{path}/{name.split('/')[0]}"
+                for name in (p[len(path) + 1 :] for p in files if p.startswith(path + "/"))
+            }
+            if not children:
+                raise PathError("not-found", f"stat {path}: no such file or directory")
+            return [
+                info(child, FileType.FILE if child in files else FileType.DIRECTORY)
+                for child in children
+            ]
+
+        client = Mock()
+        client.list_files.side_effect = list_files
+        client.pull.side_effect = lambda path, **kwargs: io.BytesIO(files[path])
+        return client
+
+    @staticmethod
+    def _output(command) -> str:
+        return "\n".join(str(call[0][0]) for call in command.shell.console.print.call_args_list)
+
+    def test_identical_files_by_size_and_hash(self, command):
+        """Test identical files are detected without a line diff."""
+        client = self._client({"/a": b"same\n", "/b": b"same\n"})
+
+        assert command.execute(client, ["/a", "/b"]) == 0
+        assert self._output(command) == "Files are identical"
+
+    def test_different_sizes_short_circuit(self, command):
+        """Test files of different sizes are reported by -q without being pulled."""
+        client = self._client({"/a": b"one\n", "/b": b"three\n"})
+
+        assert command.execute(client, ["-q", "/a", "/b"]) == 1
+        assert self._output(command) == "Files /a and /b differ"
+        client.pull.assert_not_called()
+
+    def test_unified(self, command):
+        """Test -U prints a unified diff with the requested context."""
+        client = self._client({"/a": b"1\n2\n3\n4\n", "/b": b"1\n2\nx\n4\n"})
+
+        assert command.execute(client, ["-U", "1", "/a", "/b"]) == 1
+        assert self._output(command) == "--- /a\n+++ /b\n@@ -2,3 +2,3 @@\n 2\n-3\n+x\n 4"
+
+    def test_unified_default_context(self, command):
+        """Test plain -u shows three lines of context."""
+        client = self._client({"/a": b"1\n2\n3\n4\n5\n", "/b": b"1\n2\n3\n4\nx\n"})
+
+        assert command.execute(client, ["-u", "/a", "/b"]) == 1
+        assert self._output(command) == ("--- /a\n+++ /b\n@@ -2,4 +2,4 @@\n 2\n 3\n 4\n-5\n+x")
+
+    def test_file_and_directory(self, command):
+        """Test a file compared with a directory uses the file of that name in it."""
+        client = self._client({"/a/big": b"1\n", "/b/big": b"1\n", "/b/other": b"2\n"})
+
+        assert command.execute(client, ["/a/big", "/b"]) == 0
+        assert self._output(command) == "Files are identical"
+        for call in client.list_files.call_args_list:
+            assert call.kwargs == {"itself": True}
+
+    def test_recursive(self, command):
+        """Test -r joins both trees and honours --exclude."""
+        client = self._client(
+            {
+                "/a/same": b"s\n",
+                "/b/same": b"s\n",
+                "/a/changed": b"old\n",
+                "/b/changed": b"new\n",
+                "/a/extra/file": b"e\n",
+                "/a/cache.pyc": b"c",
+            }
+        )
+
+        assert command.execute(client, ["-r", "--exclude", "*.pyc", "/a", "/b"]) == 1
+        assert self._output(command) == (
+            "diff -r /a/changed /b/changed\n1c1\n< old\n---\n> new\nOnly in /a: extra"
+        )
@@ -0,0 +1,145 @@
+"""Tests for other utility commands."""
+
+from __future__ import annotations
+
+import io
+from unittest.mock import Mock
+
+import pytest
+from rich.console import Console
+
+from pebble_shell.commands.other_utils import SedCommand, StringsCommand
+
+
+class TestSedCommand:
+    """Test cases for SedCommand."""
+
+    @pytest.fixture
+    def command(self):
+        """Create SedCommand instance with a console that can be captured."""
+        mock_shell = Mock()
+        mock_shell.console = Console(force_terminal=False, width=200)
+        mock_shell.current_directory = "/etc"
+        mock_shell.home_dir = "/root"
+        return SedCommand(mock_shell)
+
+    @pytest.fixture
+    def client(self, dict_client):
+        """Create a client with two config files."""
+        return dict_client(
+            {
+                "/etc/a.conf": b"port=80\nhost=a\n",
+                "/etc/b.conf": b"host=b\n",
+                "/etc/script.sed": b"s/host/name/\n",
+            }
+        )
+
+    def _run(self, command, client, args: list[str]) -> tuple[int, str]:
+        with command.console.capture() as capture:
+            result = command.execute(client, args)
+        return result, capture.get()
+
+    def test_prints_edited_stream(self, command, client):
+        """Test the files are edited as one stream and printed."""
+        result, output = self._run(command, client, ["-n", "-e", "s/=/: /p", "a.conf", "b.conf"])
+
+        assert result == 0
+        assert output == "port: 80\nhost: a\nhost: b\n"
+
+    def test_quit_status_and_script_file(self, command, client):
+        """Test a script can come from a file, and q sets the exit status."""
+        result, output = self._run(
+            command, client, ["-f", "script.sed", "-e", "1q3", "b.conf", "a.conf"]
+        )
+
+        assert (result, output) == (3, "name=b\n")
+
+    def test_in_place_pushes_only_changed_files(self, command, client):
+        """Test -i writes back (and backs up) only the files that change."""
+        result, _ = self._run(
+            command, client, ["-i.orig", "s/port=80/port=8080/", "a.conf", "b.conf"]
+        )
+
+        assert result == 0
+        assert sorted(client.pushed) == ["/etc/a.conf", "/etc/a.conf.orig"]
+        assert client.files["/etc/a.conf"] == b"port=8080\nhost=a\n"
+        assert client.files["/etc/a.conf.orig"] == b"port=80\nhost=a\n"
+
+    def test_in_place_keeps_missing_final_newline(self, command, dict_client):
+        """Test editing a file without a final newline doesn't add one."""
+        client = dict_client({"/etc/c": b"one\ntwo"})
+
+        result, _ = self._run(command, client, ["-i", "s/o/0/g", "c"])
+
+        assert result == 0
+        assert client.files["/etc/c"] == b"0ne\ntw0"
+
+    @pytest.mark.parametrize(
+        ("script", "expected"),
+        [
+            ("p", "a\na\nb\nb"),
+            ("2d", "a\n"),
+            ("$d", "a\n"),
+            ("/a/!d", "a\n"),
+            ("n;d", "a\n"),
+            ("=", "1\na\n2\nb"),
+            ("$=", "a\n2\nb"),
+            ("a X", "a\nX\nb\nX\n"),
+            ("i X", "X\na\nX\nb"),
+            ("c X", "X\nX\n"),
+            ("2q", "a\nb\n"),
+            ("s/b/B/p", "a\nB\nB"),
+            ("x", "\na\n"),
+            ("h;G", "a\na\nb\nb"),
+            ("G", "a\n\nb\n\n"),
+            ("$!N;P;D", "a\nb"),
+        ],
+    )
+    def test_missing_final_newline(self, command, dict_client, script, expected):
+        """Test the last line is printed without a newline only where GNU sed does so."""
+        client = dict_client({"/etc/c": b"a\nb"})
+
+        result, output = self._run(command, client, [script, "c"])
+
+        assert (result, output) == (0, expected)
+
+    def test_in_place_deleting_last_line_without_newline(self, command, dict_client):
+        """Test -i keeps the newline of a line that is now the last one."""
+        client = dict_client({"/etc/c": b"one\ntwo"})
+
+        result, _ = self._run(command, client, ["-i", "$d", "c"])
+
+        assert result == 0
+        assert client.files["/etc/c"] == b"one\n"
+
+    def test_missing_file(self, command, client):
+        """Test a file that can't be read is reported, and the rest are still edited."""
+        result, output = self._run(command, client, ["-i", "s/b/B/", "missing", "b.conf"])
+
+        assert result == 1
+        assert "sed: can't read missing: No such file or directory" in output
+        assert client.files["/etc/b.conf"] == b"host=B\n"
+
+    def test_invalid_script(self, command, client):
+        """Test an invalid script is reported before any file is read."""
+        result, output = self._run(command, client, ["s/a/b", "a.conf"])
+
+        assert result == 1
+        assert "sed:" in output
+
+
+class TestStringsCommand:
+    """Test cases for StringsCommand."""
+
+    def test_tabs_are_written_as_they_are(self, dict_client):
+        """Test a tab in a string is written as a tab, not expanded, as GNU does."""
+        mock_shell = Mock()
+        mock_shell.console = Console(file=io.StringIO(), force_terminal=False)
+        mock_shell.current_directory = "/"
+        mock_shell.home_dir = "/root"
+        command = StringsCommand(mock_shell)
+
+        result = command.execute(dict_client({"/bin": b"\x00BMP\t\x01\x02name\x00"}), ["/bin"])
+
+        assert result == 0
+        assert command.console.file.getvalue() == "BMP\t\nname\n"
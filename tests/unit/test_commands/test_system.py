@@ -87,6 +87,22 @@ proc /proc proc rw,nosuid,nodev,noexec,relatime 0 0
         assert "ext4" in output
         assert "tmpfs" in output
 
+    def test_execute_csv(self, command, mock_client):
+        """Test df --format=csv writes plain rows, without drawing a table."""
+        result = command.execute(mock_client, ["--format=csv"])
+
+        assert result == 0
+        assert command._test_output.getvalue().splitlines()[:3] == [
+            "Device,Mount Point,Type",
+            "/dev/sda1,/,ext4",
+            "/dev/sda2,/home,ext4",
+        ]
+
+    def test_execute_invalid_format(self, command, mock_client):
+        """Test an unknown output format is rejected."""
+        assert command.execute(mock_client, ["--format", "xml"]) == 1
+        assert "Invalid format 'xml'" in command._test_output.getvalue()
+
     def test_execute_error(self, command, mock_client):
         """Test df command with error."""
         mock_client.pull.side_effect = Exception("Permission denied")
@@ -249,6 +265,25 @@ class TestProcessCommand:
         assert "[kthreadd]" in output
         assert "python3 -c print('hello')" in output
 
+    def test_execute_filtered_rows(self, command, mock_client):
+        """Test a filter sees each whole row, and matching rows print as plain lines."""
+        seen: list[str] = []
+
+        def match(row: str) -> bool:
+            seen.append(row)
+            return "12" in row or "kthread" in row
+
+        result = command.execute_filtered(mock_client, [], match)
+
+        assert result == 0
+        assert seen == ["1 /sbin/init", "2 [kthreadd]", "123 python3 -c print('hello')"]
+        assert command._test_output.getvalue() == ("2 [kthreadd]\n123 python3 -c print('hello')\n")
+
+    def test_execute_filtered_no_match(self, command, mock_client):
+        """Test a filter that selects no process fails, like grep."""
+        assert command.execute_filtered(mock_client, [], lambda row: False) == 1
+        assert command._test_output.getvalue() == ""
+
     def test_execute_no_processes(self, command, mock_client):
         """Test ps command with no processes."""
         mock_client.list_files.return_value = []
@@ -429,6 +464,27 @@ class TestDuCommand:
         output = command._test_output.getvalue()
         assert len(output) > 0  # Should have some output
 
+    def test_execute_csv_runs_locally(self, command, mock_client):
+        """Test --format=csv is written locally even with --remote."""
+        var = Mock()
+        var.name = "var"
+        var.type = ops.pebble.FileType.DIRECTORY
+        log = Mock()
+        log.name = "log"
+        log.type = ops.pebble.FileType.FILE
+        log.size = 10
+        mock_client.list_files.side_effect = lambda path, **kwargs: [var] if path == "/" else [log]
+
+        result = command.execute(mock_client, ["--remote", "--format=csv", "/var"])
+
+        assert result == 0
+        mock_client.exec.assert_not_called()
+        assert command._test_output.getvalue().splitlines() == [
+            "du: the container's du can't write csv, running locally",
+            "Size,Path",
+            "10,/var",
+        ]
+
     def test_execute_error(self, command, mock_client):
         """Test handling execution errors."""
         mock_client.list_files.side_effect = Exception("Permission denied")
@@ -0,0 +1,80 @@
+"""Tests for text processing commands."""
+
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+from rich.console import Console
+
+from pebble_shell.commands.text_utils import Dos2unixCommand, FoldCommand, TrCommand
+
+
+def _command(command_class):
+    mock_shell = Mock()
+    mock_shell.console = Console(force_terminal=False, width=200)
+    mock_shell.current_directory = "/srv"
+    mock_shell.home_dir = "/root"
+    return command_class(mock_shell)
+
+
+def _run(command, client, args: list[str]) -> tuple[int, str]:
+    with command.console.capture() as capture:
+        result = command.execute(client, args)
+    return result, capture.get()
+
+
+class TestTransformCommands:
+    """Test cases for the commands that transform files as byte streams."""
+
+    @pytest.fixture
+    def client(self, dict_client):
+        """Create a client with a DOS text file."""
+        return dict_client({"/srv/notes.txt": b"first line\r\nsecond, longer line\r\n"})
+
+    def test_prints_transformed_file(self, client):
+        """Test tr prints the translated file."""
+        result, output = _run(_command(TrCommand), client, ["-d", "\\r", "notes.txt"])
+
+        assert result == 0
+        assert output == "first line\nsecond, longer line\n"
+
+    def test_fold_width(self, client):
+        """Test fold breaks lines at the given width."""
+        result, output = _run(_command(FoldCommand), client, ["-w", "12", "-s", "notes.txt"])
+
+        assert result == 0
+        assert output.replace("\r", "").split("\n")[:3] == [
+            "first line",
+            "second, ",
+            "longer line",
+        ]
+
+    def test_in_place_conversion(self, client):
+        """Test dos2unix pushes the converted file, keeping its permissions and owner."""
+        result, output = _run(_command(Dos2unixCommand), client, ["notes.txt"])
+
+        assert result == 0
+        assert "converted notes.txt" in output
+        assert client.files["/srv/notes.txt"] == b"first line\nsecond, longer line\n"
+        options = client.push_options["/srv/notes.txt"]
+        assert (options["permissions"], options["user_id"], options["group_id"]) == (
+            0o640,
+            1000,
+            1000,
+        )
+
+    def test_missing_file(self, client):
+        """Test a file that can't be read is reported."""
+        result, output = _run(_command(Dos2unixCommand), client, ["missing.txt"])
+
+        assert result == 1
+        assert "dos2unix: missing.txt" in output
+        assert "/srv/missing.txt" not in client.files
+
+    def test_invalid_operand(self, client):
+        """Test invalid options are reported before any file is read."""
+        result, output = _run(_command(FoldCommand), client, ["-w", "x", "notes.txt"])
+
+        assert result == 1
+        assert "fold: invalid number of columns" in output
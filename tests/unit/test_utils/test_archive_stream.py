@@ -0,0 +1,243 @@
+"""Tests for streaming archive creation and extraction."""
+
+from __future__ import annotations
+
+import io
+import tarfile
+
+import ops
+import pytest
+
+from pebble_shell.utils import archive_stream
+from pebble_shell.utils.archive_stream import (
+    ArWriter,
+    CpioWriter,
+    MemberExtractor,
+    RemotePushStream,
+    SizedReader,
+    TarWriter,
+    collect_members,
+    iter_ar_headers,
+    iter_cpio_members,
+    write_members,
+)
+
+_FILES = {
+    "/app/a.txt": b"alpha\n",
+    "/app/sub/big.bin": bytes(range(256)) * 40,
+    "/app/sub/c.txt": b"c" * 3,
+}
+
+
+def _write(writer_factory, paths, client):
+    errors: list[tuple[str, str]] = []
+    sink = io.BytesIO()
+    writer = writer_factory(sink)
+    members = collect_members(client, paths, lambda path, message: errors.append((path, message)))
+    write_members(writer, client, members, lambda path, message: errors.append((path, message)))
+    writer.close()
+    return sink.getvalue(), errors
+
+
+class TestWriters:
+    """Test the archive formats."""
+
+    @pytest.mark.parametrize("compression", [None, "gz", "xz"])
+    def test_tar(self, compression, monkeypatch, dict_client) -> None:
+        """Test a directory tree is archived, with large files streamed."""
+        monkeypatch.setattr(archive_stream, "PREFETCH_FILE_SIZE", 100)
+        data, errors = _write(
+            lambda sink: TarWriter(sink, compression),
+            ["/app", "/missing"],
+            dict_client(dict(_FILES)),
+        )
+
+        assert errors == [("/missing", "No such file or directory")]
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            assert tar.getnames() == [
+                "/app",
+                "/app/a.txt",
+                "/app/sub",
+                "/app/sub/big.bin",
+                "/app/sub/c.txt",
+            ]
+            member = tar.getmember("/app/a.txt")
+            assert (member.mode, member.uname, member.uid) == (0o640, "app", 1000)
+            assert tar.extractfile("/app/sub/big.bin").read() == _FILES["/app/sub/big.bin"]
+
+    def test_tar_nested_directories(self, dict_client) -> None:
+        """Test every directory in the tree is archived, including empty ones."""
+        client = dict_client(dict(_FILES), empty_dirs=("/app/sub/empty", "/app/tmp"))
+        data, errors = _write(lambda sink: TarWriter(sink, None), ["/app"], client)
+
+        assert errors == []
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            assert tar.getnames() == [
+                "/app",
+                "/app/a.txt",
+                "/app/sub",
+                "/app/tmp",
+                "/app/sub/big.bin",
+                "/app/sub/c.txt",
+                "/app/sub/empty",
+            ]
+            assert tar.getmember("/app/sub/empty").isdir()
+            assert tar.getmember("/app/tmp").isdir()
+
+    def test_cpio_newc(self, dict_client) -> None:
+        """Test the cpio headers, names and padding."""
+        data, _ = _write(CpioWriter, ["/app/a.txt"], dict_client(dict(_FILES)))
+
+        assert data.startswith(b"070701")
+        namesize = int(data[94:102], 16)
+        assert data[110 : 110 + namesize] == b"app/a.txt\0"
+        assert int(data[54:62], 16) == len(_FILES["/app/a.txt"])
+        assert b"TRAILER!!!\0" in data
+        assert len(data) % 4 == 0
+
+    def test_cpio_round_trip(self, dict_client) -> None:
+        """Test a cpio archive can be read back as a stream, skipping unread data."""
+        data, _ = _write(CpioWriter, ["/app"], dict_client(dict(_FILES)))
+
+        contents = {}
+        for header, reader in iter_cpio_members(io.BytesIO(data)):
+            if header.name.endswith("c.txt"):
+                contents[header.name] = reader.read()
+            else:
+                contents[header.name] = header.size
+        assert contents == {
+            "app": 0,
+            "app/a.txt": 6,
+            "app/sub": 0,
+            "app/sub/big.bin": 10240,
+            "app/sub/c.txt": b"ccc",
+        }
+
+    def test_ar_round_trip(self, dict_client) -> None:
+        """Test an ar archive with a long member name can be listed again."""
+        files = {"/o/a.o": b"abc", "/o/a_very_long_object_name.o": b"defg"}
+        client = dict_client(files)
+        data, _ = _write(lambda sink: ArWriter(sink, list(files)), list(files), client)
+
+        headers = list(iter_ar_headers(io.BytesIO(data)))
+        assert [(h.name, h.size, h.mode) for h in headers] == [
+            ("a.o", 3, 0o100640),
+            ("a_very_long_object_name.o", 4, 0o100640),
+        ]
+
+    def test_ar_rejects_other_files(self) -> None:
+        """Test listing something that isn't an ar archive fails."""
+        with pytest.raises(ValueError, match="not recognized"):
+            list(iter_ar_headers(io.BytesIO(b"hello")))
+
+
+class TestSizedReader:
+    """Test reading files that change while they are archived."""
+
+    def test_shrunk_file_is_padded(self) -> None:
+        """Test a file shorter than its listed size is padded with NUL bytes."""
+        reader = SizedReader(io.BytesIO(b"abc"), 5)
+        assert reader.read(5) == b"abc\0\0"
+        assert reader.changed
+
+    def test_grown_file_is_cut_off(self) -> None:
+        """Test a file longer than its listed size is truncated."""
+        progress: list[int] = []
+        reader = SizedReader(io.BytesIO(b"abcdef"), 4, progress.append)
+        assert reader.read(-1) == b"abcd"
+        assert reader.changed
+        assert sum(progress) == 4
+
+
+class TestRemotePushStream:
+    """Test pushing an archive while it is written."""
+
+    def test_data_is_pushed_in_chunks(self, dict_client) -> None:
+        """Test the push receives everything written, without it being held in one buffer."""
+        client = dict_client({})
+        with RemotePushStream(client, "/out.tar", chunk_size=1000, depth=2) as stream:
+            for _ in range(10):
+                stream.write(b"x" * 700)
+
+        assert b"".join(client.pushed["/out.tar"]) == b"x" * 7000
+        assert max(len(chunk) for chunk in client.pushed["/out.tar"]) <= 1000
+
+    def test_push_error_is_raised(self, dict_client) -> None:
+        """Test a failed push surfaces in the writer."""
+        client = dict_client({})
+
+        def push(path, source, *, make_dirs=False):
+            raise ops.pebble.PathError("permission-denied", "open /out.tar: permission denied")
+
+        client.push = push
+        with (
+            pytest.raises(ops.pebble.PathError),
+            RemotePushStream(client, "/out.tar", chunk_size=10, depth=1) as stream,
+        ):
+            for _ in range(100):
+                stream.write(b"y" * 10)
+
+    def test_abandoned_push(self, dict_client) -> None:
+        """Test a push is abandoned if writing the archive fails."""
+        client = dict_client({})
+        with (
+            pytest.raises(RuntimeError),
+            RemotePushStream(client, "/out.tar", chunk_size=10) as stream,
+        ):
+            stream.write(b"z" * 25)
+            raise RuntimeError("failed")
+
+        assert "/out.tar" in client.pushed  # the push started, but was never completed
+
+
+class TestMemberExtractor:
+    """Test writing extracted members to the container."""
+
+    def test_directories_are_created_once(self, dict_client) -> None:
+        """Test each parent directory is created once, including implied parents."""
+        client = dict_client({})
+        with MemberExtractor(client, lambda path, message: None) as extractor:
+            for name in ("a", "b", "c"):
+                extractor.write(f"/x/y/{name}", io.BytesIO(name.encode()), 1)
+            extractor.make_dir("/x")
+            extractor.write("/x/z", io.BytesIO(b"z"), 1)
+
+        assert client.made_dirs == ["/x/y"]
+        assert extractor.extracted == 4
+        assert client.files["/x/y/b"] == b"b"
+
+    def test_existing_files_are_kept(self, dict_client) -> None:
+        """Test existing files are found with one listing per directory, and skipped."""
+        client = dict_client({"/d/old": b"old", "/d/other": b""})
+        with MemberExtractor(client, lambda path, message: None, overwrite=False) as extractor:
+            assert not extractor.write("/d/old", io.BytesIO(b"new"), 3)
+            assert extractor.write("/d/new", io.BytesIO(b"new"), 3)
+
+        assert client.files["/d/old"] == b"old"
+        assert client.listed == ["/d"]
+        assert extractor.extracted == 1
+
+    def test_large_member_is_streamed(self, monkeypatch, dict_client) -> None:
+        """Test a member over the buffer size is pushed straight from its source."""
+        monkeypatch.setattr(archive_stream, "EXTRACT_BUFFER_SIZE", 4)
+        client = dict_client({})
+        source = io.BytesIO(b"0123456789")
+        with MemberExtractor(client, lambda path, message: None) as extractor:
+            extractor.write("/big", source, 10)
+
+        assert client.files["/big"] == b"0123456789"
+
+    def test_push_errors_are_reported(self, dict_client) -> None:
+        """Test a failed push is reported and not counted."""
+        client = dict_client({})
+
+        def push(path, source, **kwargs):
+            raise ops.pebble.PathError("permission-denied", f"open {path}: permission denied")
+
+        client.push = push
+        errors: list[tuple[str, str]] = []
+        with MemberExtractor(client, lambda *error: errors.append(error)) as extractor:
+            extractor.write("/ro/file", io.BytesIO(b"x"), 1)
+
+        assert errors == [("/ro/file", "Permission denied")]
+        assert extractor.extracted == 0
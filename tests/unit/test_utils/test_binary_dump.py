@@ -0,0 +1,96 @@
+"""Tests for binary dump utilities."""
+
+from __future__ import annotations
+
+import pytest
+
+from pebble_shell.utils.binary_dump import (
+    CHAR_TABLE,
+    dump_lines,
+    find_strings,
+    hex_bytes,
+    parse_byte_count,
+    printable,
+    table_bytes,
+    words,
+)
+
+
+def _hex_line(address: int, line: bytes) -> str:
+    return f"{address:04x} {line.hex()}"
+
+
+class TestFormatting:
+    """Test the line formatting helpers."""
+
+    def test_hex_bytes(self) -> None:
+        """Test hex bytes, optionally grouped."""
+        assert hex_bytes(b"\x00\x01\xff") == "00 01 ff"
+        assert hex_bytes(bytes(range(10)), 4) == "00 01 02 03  04 05 06 07  08 09"
+
+    def test_printable(self) -> None:
+        """Test non-printable bytes become dots."""
+        assert printable(b"ab\x00\n\x7f\xffz") == "ab....z"
+
+    def test_words_native_order_and_padding(self) -> None:
+        """Test words are read in native order and a partial word is zero padded."""
+        data = (0x1234).to_bytes(2, "little") + b"\x05"
+        assert words(data, 2, " %04x") == " 1234 0005"
+        assert words(b"\xff\xff", 2, " %d", signed=True) == " -1"
+        assert words(b"\xff\xff", 2, " %d") == " 65535"
+
+    def test_table_bytes(self) -> None:
+        """Test per-byte lookup formatting."""
+        assert table_bytes(b"a\n\0\x80", CHAR_TABLE, " %3s") == "   a  \\n  \\0 200"
+
+    def test_parse_byte_count(self) -> None:
+        """Test decimal, hex and octal counts and size suffixes."""
+        assert parse_byte_count("100") == 100
+        assert parse_byte_count("0x10") == 16
+        assert parse_byte_count("010") == 8
+        assert parse_byte_count("2k") == 2048
+        assert parse_byte_count("1b") == 512
+        assert parse_byte_count("1MB") == 1000000
+        with pytest.raises(ValueError, match="invalid byte count"):
+            parse_byte_count("12q")
+
+
+class TestDumpLines:
+    """Test dump_lines function."""
+
+    def test_lines_independent_of_chunking(self) -> None:
+        """Test output lines do not depend on how the input is chunked."""
+        data = bytes(range(40))
+        whole = list(dump_lines([data], 16, [_hex_line], squeeze=False))
+        pieces = [data[i : i + 3] for i in range(0, len(data), 3)]
+        assert list(dump_lines(pieces, 16, [_hex_line], squeeze=False)) == whole
+        assert whole[-1] == "0020 2021222324252627"
+
+    def test_squeeze_repeated_lines(self) -> None:
+        """Test runs of identical lines collapse to a single '*'."""
+        data = b"a" * 4 + b"\0" * 16 + b"b" * 4
+        lines = list(dump_lines([data], 4, [_hex_line], offset=8, end_address="{:04x}".format))
+        assert lines == ["0008 61616161", "000c 00000000", "*", "001c 62626262", "0020"]
+
+    def test_several_renderers(self) -> None:
+        """Test every renderer produces a line for each block."""
+        lines = list(dump_lines([b"ab"], 16, [_hex_line, lambda a, line: printable(line)]))
+        assert lines == ["0000 6162", "ab"]
+
+
+class TestFindStrings:
+    """Test find_strings function."""
+
+    def test_strings_and_offsets(self) -> None:
+        """Test runs of printable characters are found with their offsets."""
+        data = b"\0abc\0hello\tworld\x01xyzw"
+        assert list(find_strings([data])) == [(5, b"hello\tworld"), (17, b"xyzw")]
+        assert next(find_strings([data], min_length=3, offset=100)) == (101, b"abc")
+
+    def test_runs_across_chunks(self) -> None:
+        """Test results do not depend on the chunk boundaries."""
+        data = b"\0" + b"long string " * 20 + b"\0\0tail"
+        expected = list(find_strings([data]))
+        for size in (1, 5, 64):
+            chunks = [data[i : i + size] for i in range(0, len(data), size)]
+            assert list(find_strings(chunks)) == expected
@@ -0,0 +1,74 @@
+"""Tests for parallel block compression."""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import os
+
+import pytest
+
+from pebble_shell.utils import block_compression
+from pebble_shell.utils.block_compression import (
+    iter_blocks,
+    parallel_compress,
+    split_compression_level,
+)
+
+_DECOMPRESSORS = {"gzip": gzip.decompress, "bzip2": bz2.decompress, "xz": lzma.decompress}
+
+
+class TestSplitCompressionLevel:
+    """Test reading the compression level options."""
+
+    @pytest.mark.parametrize(
+        ("args", "expected"),
+        [
+            (["file"], (6, ["file"])),
+            (["-1", "file"], (1, ["file"])),
+            (["-9k", "file"], (9, ["-k", "file"])),
+            (["-k3v", "-5"], (5, ["-kv"])),
+            (["--fast"], (1, [])),
+            (["--best", "-p", "4"], (9, ["-p", "4"])),
+            (["-p4", "file"], (6, ["-p", "4", "file"])),
+            (["-3kp", "2", "-5"], (5, ["-k", "-p", "2"])),
+            (["-p", "-5"], (6, ["-p", "-5"])),
+        ],
+    )
+    def test_levels(self, args, expected) -> None:
+        """Test levels are removed from the arguments, keeping other options."""
+        assert split_compression_level(args, 6) == expected
+
+
+class TestParallelCompress:
+    """Test compressing blocks in parallel."""
+
+    def test_iter_blocks(self) -> None:
+        """Test chunks of any size are regrouped into fixed-size blocks."""
+        assert list(iter_blocks([b"ab", b"cdefg", b"h"], 3)) == [b"abc", b"def", b"gh"]
+
+    @pytest.mark.parametrize("file_format", ["gzip", "bzip2", "xz"])
+    def test_multiple_blocks_round_trip(self, file_format, monkeypatch) -> None:
+        """Test the concatenated blocks decompress to the original data, in order."""
+        monkeypatch.setitem(block_compression.BLOCK_SIZES, file_format, 1000)
+        data = os.urandom(2500) + b"x" * 4000
+        chunks = [data[i : i + 700] for i in range(0, len(data), 700)]
+
+        compressed = list(parallel_compress(chunks, file_format, level=1, workers=3))
+
+        assert len(compressed) == 7
+        assert _DECOMPRESSORS[file_format](b"".join(compressed)) == data
+
+    def test_small_input_is_one_stream(self) -> None:
+        """Test an input smaller than a block is compressed as a single member."""
+        compressed = list(parallel_compress([b"hello ", b"world"], "gzip"))
+
+        assert len(compressed) == 1
+        assert gzip.decompress(compressed[0]) == b"hello world"
+
+    def test_empty_input(self) -> None:
+        """Test an empty input still gives a valid, empty file."""
+        compressed = b"".join(parallel_compress([], "bzip2"))
+
+        assert bz2.decompress(compressed) == b""
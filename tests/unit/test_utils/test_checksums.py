@@ -0,0 +1,151 @@
+"""Tests for checksum utilities."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+from unittest.mock import Mock
+
+import pytest
+from ops.pebble import PathError
+
+from pebble_shell.utils.checksums import (
+    BsdSum,
+    ChecksumEntry,
+    Crc32,
+    SysvSum,
+    checksum_file,
+    checksum_files,
+    is_supported,
+    parse_checksum_line,
+    tag_name,
+    verify_checksums,
+)
+
+
+def _client(files: dict[str, bytes]) -> Mock:
+    def pull(path, **kwargs):
+        if path not in files:
+            raise PathError("not-found", f"open {path}: no such file or directory")
+        return io.BytesIO(files[path])
+
+    client = Mock()
+    client.pull.side_effect = pull
+    return client
+
+
+def _bsd_reference(data: bytes) -> int:
+    checksum = 0
+    for byte in data:
+        checksum = (checksum >> 1) + ((checksum & 1) << 15)
+        checksum = (checksum + byte) & 0xFFFF
+    return checksum
+
+
+class TestSumAlgorithms:
+    """Test the legacy sum algorithms."""
+
+    def test_bsd_matches_reference_across_chunks(self) -> None:
+        """Test feeding the BSD sum in pieces gives the one-shot result."""
+        data = bytes(range(256)) * 50
+        checksum = BsdSum()
+        for start in range(0, len(data), 1000):
+            checksum.update(data[start : start + 1000])
+        assert checksum.checksum == _bsd_reference(data)
+        assert checksum.summary() == f"{_bsd_reference(data):05d}    13"
+
+    def test_sysv_folds_large_totals(self) -> None:
+        """Test the System V sum folds the byte total like GNU sum -s."""
+        checksum = SysvSum()
+        checksum.update(b"x" * 5000)
+        # 5000 * 0x78 = 600000 -> (600000 & 0xffff) + (600000 >> 16) = 10185
+        assert checksum.summary() == "10185 10"
+
+    @pytest.mark.parametrize(
+        ("chunks", "summary"),
+        [
+            ([b"hello\n"], "3015617425 6"),
+            ([b"hello ", b"world"], "1135714720 11"),
+            ([], "4294967295 0"),
+            ([b"x" * 300], "3786917833 300"),
+        ],
+    )
+    def test_crc_matches_posix_cksum(self, chunks: list[bytes], summary: str) -> None:
+        """Test the CRC and byte count are those printed by POSIX cksum."""
+        checksum = Crc32()
+        for chunk in chunks:
+            checksum.update(chunk)
+        assert checksum.summary() == summary
+
+
+class TestChecksumFiles:
+    """Test checksum_file and checksum_files."""
+
+    def test_several_algorithms_from_one_read(self) -> None:
+        """Test every requested algorithm is computed from a single pull."""
+        client = _client({"/a": b"data"})
+
+        result = checksum_file(client, "/a", ["md5", "sha256", "crc"])
+
+        assert result.size == 4
+        assert result.hexdigest("md5") == hashlib.md5(b"data").hexdigest()  # noqa: S324
+        assert result.hexdigest("sha256") == hashlib.sha256(b"data").hexdigest()
+        assert client.pull.call_count == 1
+
+    def test_results_in_order_with_errors(self) -> None:
+        """Test results come back in input order, with errors in place."""
+        client = _client({f"/{i}": str(i).encode() for i in range(20)})
+        paths = [f"/{i}" for i in range(20)] + ["/missing"]
+
+        results = list(checksum_files(client, paths, ["sha1"], max_workers=4))
+
+        assert [path for path, _ in results] == paths
+        assert isinstance(results[-1][1], PathError)
+        assert results[3][1].hexdigest("sha1") == hashlib.sha1(b"3").hexdigest()  # noqa: S324
+
+    def test_is_supported(self) -> None:
+        """Test supported and unsupported algorithm names."""
+        assert is_supported("sha256")
+        assert is_supported("bsd")
+        assert not is_supported("shake_128")
+        assert not is_supported("rot13")
+        assert tag_name("sha256") == "SHA256"
+        assert tag_name("blake2b") == "BLAKE2b"
+        assert tag_name("sha3_256") == "SHA3-256"
+
+
+class TestChecksumLines:
+    """Test parse_checksum_line and verify_checksums."""
+
+    def test_parse_plain_and_tagged(self) -> None:
+        """Test both checksum line formats."""
+        assert parse_checksum_line("ABCD  some file") == ChecksumEntry("abcd", "some file")
+        assert parse_checksum_line("abcd *bin") == ChecksumEntry("abcd", "bin")
+        assert parse_checksum_line("SHA256 (f (1)) = ab") == ChecksumEntry("ab", "f (1)", "sha256")
+        assert parse_checksum_line("\\abcd  a\\nb") == ChecksumEntry("abcd", "a\nb")
+        assert parse_checksum_line("not a checksum") is None
+
+    def test_parse_tag_names(self) -> None:
+        """Test tag names map to hashlib names, and unknown ones make the line invalid."""
+        assert parse_checksum_line("SHA3-256 (f) = ab") == ChecksumEntry("ab", "f", "sha3_256")
+        assert parse_checksum_line("BLAKE2b (f) = ab") == ChecksumEntry("ab", "f", "blake2b")
+        assert parse_checksum_line("SHA512-224 (f) = ab").algorithm == "sha512_224"
+        assert parse_checksum_line("ROT13 (f) = ab") is None
+        assert parse_checksum_line("CRC (f) = ab") is None
+
+    def test_verify_reads_each_file_once(self) -> None:
+        """Test a file listed with several algorithms is only pulled once."""
+        client = _client({"/a": b"data"})
+        md5 = hashlib.md5(b"data").hexdigest()  # noqa: S324
+        entries = [
+            (ChecksumEntry(md5, "a", "md5"), "/a"),
+            (ChecksumEntry(hashlib.sha256(b"data").hexdigest(), "a"), "/a"),
+            (ChecksumEntry("00", "a", "sha1"), "/a"),
+            (ChecksumEntry(md5, "gone"), "/gone"),
+        ]
+
+        results = list(verify_checksums(client, entries, "sha256"))
+
+        assert [result for _, result in results[:3]] == [True, True, False]
+        assert isinstance(results[3][1], PathError)
+        assert client.pull.call_count == 2
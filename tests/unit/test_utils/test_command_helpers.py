@@ -278,7 +278,7 @@ class TestSafeReadFileLines:
         """Test successful reading of file lines."""
         client = Mock()
         file_mock = Mock()
-        file_mock.read.return_value = "line1\nline2\nline3"
+        file_mock.read.side_effect = ["line1\nline2\nline3", ""]
 
         # Set up the context manager properly
         context_manager = MagicMock()
@@ -294,7 +294,7 @@ class TestSafeReadFileLines:
         """Test reading lines from binary content."""
         client = Mock()
         file_mock = Mock()
-        file_mock.read.return_value = b"line1\nline2"
+        file_mock.read.side_effect = [b"line1\nline2", b""]
 
         # Set up the context manager properly
         context_manager = MagicMock()
@@ -4,7 +4,10 @@ from unittest.mock import MagicMock, Mock, patch
 
 import ops
 import pytest
+from rich.console import Console
 
+from pebble_shell.commands.builtin.grep import GrepCommand
+from pebble_shell.commands.other_utils import EgrepCommand, FgrepCommand, PvCommand
 from pebble_shell.utils.executor import CommandOutput, PipelineExecutor
 from pebble_shell.utils.parser import CommandType, ParsedCommand
 
@@ -227,6 +230,21 @@ class TestPipelineExecutor:
         assert content == "file content"
         executor.client.pull.assert_called_once_with("/var/input.txt")
 
+    def test_globs_expanded_when_each_command_runs(self, executor, mock_commands, monkeypatch):
+        """Test a glob sees the directory left by the commands before it."""
+        state = {"cwd": "/"}
+        mock_commands["cd"] = Mock()
+        mock_commands["cd"].execute.side_effect = lambda client, args: state.update(cwd=args[0])
+        monkeypatch.setattr(
+            executor.parser,
+            "glob_expander",
+            lambda patterns: [[f"{state['cwd']}/{pattern}"] for pattern in patterns],
+        )
+
+        executor.execute_pipeline(executor.parser.parse_command_line("cd /var/log; ls *.log"))
+
+        mock_commands["ls"].execute.assert_called_once_with(executor.client, ["/var/log/*.log"])
+
     def test_handle_piped_sort(self, executor):
         """Test handling sort with piped input."""
         output = CommandOutput()
@@ -253,6 +271,15 @@ class TestPipelineExecutor:
         lines = result.strip().split("\n")
         assert lines == ["zebra", "banana", "apple"]
 
+    def test_handle_piped_sort_bad_key(self, executor):
+        """Test sort fails on a key specification it can't read."""
+        output = CommandOutput()
+        cmd = ParsedCommand(command="sort", args=["-k", "x"], type=CommandType.SIMPLE)
+
+        assert executor._handle_piped_text_command(cmd, "b\na\n", output) == 1
+        assert output.get_stderr() == "sort: invalid key specification: 'x'\n"
+        assert output.get_stdout() == ""
+
     def test_handle_piped_cut(self, executor):
         """Test handling cut with piped input."""
         output = CommandOutput()
@@ -290,43 +317,116 @@ class TestPipelineExecutor:
         result = output.get_stderr()
         assert "field specification required" in result
 
-    def test_handle_piped_grep_regex(self, executor):
-        """Test handling grep with regex pattern."""
+    @pytest.mark.parametrize(
+        ("command", "args", "error"),
+        [
+            ("tr", [], "tr: missing operand"),
+            ("fold", ["-w", "x"], "fold: invalid number of columns: 'x'"),
+            ("tr", ["-q", "a", "b"], "tr: invalid option"),
+        ],
+    )
+    def test_handle_piped_transform_error(self, executor, command, args, error):
+        """Test tr, expand, unexpand and fold fail on arguments they can't use."""
         output = CommandOutput()
-        cmd = ParsedCommand(command="grep", args=["/^test/"], type=CommandType.SIMPLE)
+        cmd = ParsedCommand(command=command, args=args, type=CommandType.SIMPLE)
 
-        pipe_input = "test line\nanother line\ntest again"
+        assert executor._handle_piped_text_command(cmd, "text\n", output) == 1
+        assert output.get_stderr() == f"{error}\n"
+        assert output.get_stdout() == ""
 
-        executor._handle_piped_text_command(cmd, pipe_input, output)
+    @pytest.fixture
+    def grep_executor(self, executor, mock_shell):
+        """Use the real grep command, printing to whatever stdout is at the time."""
+        mock_shell.console = Console(width=200, color_system=None)
+        executor.commands["grep"] = GrepCommand(mock_shell)
+        executor.commands["egrep"] = EgrepCommand(mock_shell)
+        executor.commands["fgrep"] = FgrepCommand(mock_shell)
+        return executor
+
+    def _pipe_to_grep(self, executor, args, pipe_input, command="grep"):
+        output = CommandOutput()
+        cmd = ParsedCommand(command=command, args=args, type=CommandType.SIMPLE)
+        exit_code = executor._run_command(cmd, pipe_input, output)
+        return exit_code, output.get_stdout()
 
-        result = output.get_stdout()
-        lines = result.strip().split("\n")
-        assert len(lines) == 2
-        assert all(line.startswith("test") for line in lines)
+    def test_handle_piped_grep_regex(self, grep_executor):
+        """Test handling grep with regex pattern."""
+        exit_code, result = self._pipe_to_grep(
+            grep_executor, ["/^test/"], "test line\nanother line\ntest again"
+        )
 
-    def test_handle_piped_grep_invalid_regex(self, executor):
-        """Test handling grep with invalid regex."""
-        output = CommandOutput()
-        cmd = ParsedCommand(command="grep", args=["/[invalid/"], type=CommandType.SIMPLE)
+        assert exit_code == 0
+        assert result == "test line\ntest again\n"
 
-        pipe_input = "test line"
+    def test_handle_piped_grep_plain_pattern_is_a_regex(self, grep_executor):
+        """Piped input is searched with the same regular expressions as files."""
+        exit_code, result = self._pipe_to_grep(
+            grep_executor, ["^t.*n$"], "test again\nanother line\ntest line"
+        )
 
-        executor._handle_piped_text_command(cmd, pipe_input, output)
+        assert exit_code == 0
+        assert result == "test again\n"
 
-        result = output.get_stderr()
-        assert "invalid pattern" in result
+    def test_handle_piped_grep_flags(self, grep_executor):
+        """Flags before the pattern are options, not the pattern."""
+        pipe_input = "Test line\nanother line\nTEST again"
 
-    def test_handle_piped_grep_no_pattern(self, executor):
-        """Test handling grep without pattern."""
+        assert self._pipe_to_grep(grep_executor, ["-i", "test"], pipe_input) == (
+            0,
+            "Test line\nTEST again\n",
+        )
+        assert self._pipe_to_grep(grep_executor, ["-vn", "test", "-i"], pipe_input) == (
+            0,
+            "2:another line\n",
+        )
+        assert self._pipe_to_grep(
+            grep_executor, ["-c", "-e", "Test", "-e", "TEST"], pipe_input
+        ) == (
+            0,
+            "2\n",
+        )
+
+    @pytest.mark.parametrize("pipe_input", ["line 1\nline 2", "line 1\n", ""])
+    def test_handle_piped_pv(self, executor, mock_shell, pipe_input):
+        """Test pv passes its input on unchanged, reporting the amount on stderr."""
+        mock_shell.console = Console(width=200, color_system=None)
+        mock_shell.error_console = Console(width=200, color_system=None, stderr=True)
+        executor.commands["pv"] = PvCommand(mock_shell)
         output = CommandOutput()
-        cmd = ParsedCommand(command="grep", args=[], type=CommandType.SIMPLE)
+        cmd = ParsedCommand(command="pv", args=["-N", "in"], type=CommandType.PIPE)
+
+        assert executor._run_command(cmd, pipe_input, output) == 0
+        assert output.get_stdout() == pipe_input
+        assert f"in: {len(pipe_input)}B" in output.get_stderr()
+
+    @pytest.mark.parametrize(
+        ("command", "pattern", "expected"),
+        [("egrep", "a.c|^x+$", "abc\na.c\nxx\n"), ("fgrep", "a.c", "a.c\n")],
+    )
+    def test_handle_piped_egrep_fgrep(self, grep_executor, command, pattern, expected):
+        """Test egrep and fgrep search piped input as grep -E and grep -F do."""
+        assert self._pipe_to_grep(grep_executor, [pattern], "abc\na.c\nxx\n", command) == (
+            0,
+            expected,
+        )
 
-        pipe_input = "test line"
+    def test_handle_piped_grep_no_match(self, grep_executor):
+        """No selected lines gives exit status 1."""
+        assert self._pipe_to_grep(grep_executor, ["absent"], "test line") == (1, "")
 
-        executor._handle_piped_text_command(cmd, pipe_input, output)
+    def test_handle_piped_grep_invalid_regex(self, grep_executor):
+        """Test handling grep with invalid regex."""
+        exit_code, result = self._pipe_to_grep(grep_executor, ["/[invalid/"], "test line")
 
-        result = output.get_stderr()
-        assert "missing pattern" in result
+        assert exit_code == 1
+        assert "invalid pattern" in result
+
+    def test_handle_piped_grep_no_pattern(self, grep_executor):
+        """Test handling grep without pattern."""
+        exit_code, result = self._pipe_to_grep(grep_executor, [], "test line")
+
+        assert exit_code == 1
+        assert "Usage" in result
 
     def test_show_help(self, executor):
         """Test showing help information."""
@@ -0,0 +1,126 @@
+"""Tests for external merge sort utilities."""
+
+from __future__ import annotations
+
+import pytest
+
+from pebble_shell.utils.external_sort import (
+    KeySpec,
+    SortOptions,
+    external_sort,
+    parse_buffer_size,
+    parse_sort_args,
+)
+
+
+def _sort(lines: list[str], args: list[str]) -> list[str]:
+    options, files = parse_sort_args(args)
+    assert files == []
+    return list(external_sort(lines, options))
+
+
+class TestParseSortArgs:
+    """Test parsing sort command lines."""
+
+    def test_repeated_keys(self) -> None:
+        """Test several -k options are all kept, in order."""
+        options, files = parse_sort_args(["-t", ",", "-k2,2n", "--key=1.3", "-k", "3r", "f.txt"])
+        assert files == ["f.txt"]
+        assert options.separator == ","
+        assert options.keys == (
+            KeySpec(2, end_field=2, numeric=True),
+            KeySpec(1, start_char=3),
+            KeySpec(3, reverse=True),
+        )
+
+    @pytest.mark.parametrize(
+        "args", [["-t:"], ["-t", ":"], ["--field-separator=:"], ["-t,", "-t:"]]
+    )
+    def test_separator(self, args: list[str]) -> None:
+        """Test the field separator may be attached to -t, as with -k."""
+        options, files = parse_sort_args([*args, "-k3,3n", "/etc/passwd"])
+        assert files == ["/etc/passwd"]
+        assert options.separator == ":"
+        assert options.keys == (KeySpec(3, end_field=3, numeric=True),)
+
+    def test_global_modifiers_apply_to_plain_keys(self) -> None:
+        """Test -n and -r apply to keys without modifiers of their own."""
+        options, _ = parse_sort_args(["-n", "-r", "-k2", "-k3f"])
+        assert options.keys[0] == KeySpec(2, numeric=True, reverse=True)
+        assert options.keys[1] == KeySpec(3, fold_case=True)
+
+    @pytest.mark.parametrize(
+        "args", [["-k", "0"], ["-k", "x"], ["-t", "ab"], ["-tab"], ["-k"], ["-t"]]
+    )
+    def test_invalid(self, args: list[str]) -> None:
+        """Test invalid options raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_sort_args(args)
+
+    def test_buffer_size(self) -> None:
+        """Test buffer sizes default to kibibytes."""
+        assert parse_buffer_size("10") == 10240
+        assert parse_buffer_size("100b") == 100
+        assert parse_buffer_size("2M") == 2 * 1024**2
+        with pytest.raises(ValueError):
+            parse_buffer_size("50%")
+
+
+class TestExternalSort:
+    """Test sorting with keys and spilled runs."""
+
+    def test_default_is_code_point_order(self) -> None:
+        """Test plain sorting compares code points, like LC_ALL=C."""
+        assert _sort(["b", "B", "a", "A"], []) == ["A", "B", "a", "b"]
+
+    def test_numeric(self) -> None:
+        """Test numeric comparison, with non-numbers sorting as zero."""
+        assert _sort(["10", "-2", "x", "2.5", "1"], ["-n"]) == ["-2", "x", "1", "2.5", "10"]
+
+    def test_human(self) -> None:
+        """Test human-readable sizes compare by suffix, then number."""
+        assert _sort(["1G", "900M", "2K", "10"], ["-h"]) == ["10", "2K", "900M", "1G"]
+
+    def test_fields_and_mixed_reverse(self) -> None:
+        """Test keys on separated fields, one of them reversed."""
+        lines = ["b:2", "a:10", "b:1", "a:9"]
+        assert _sort(lines, ["-t", ":", "-k1,1", "-k2nr"]) == ["a:10", "a:9", "b:2", "b:1"]
+
+    def test_blank_separated_fields(self) -> None:
+        """Test fields without -t, with leading blanks ignored by -b."""
+        lines = ["x   c", "y a", "z  b"]
+        assert _sort(lines, ["-k2b"]) == ["y a", "z  b", "x   c"]
+
+    def test_unique_and_fold_case(self) -> None:
+        """Test -u keeps the first of each group of lines with equal keys."""
+        assert _sort(["b", "A", "a", "B"], ["-f", "-u"]) == ["A", "b"]
+
+    def test_stable(self) -> None:
+        """Test -s keeps input order for equal keys."""
+        lines = ["1 b", "0 z", "1 a"]
+        assert _sort(lines, ["-s", "-k1,1"]) == ["0 z", "1 b", "1 a"]
+        assert _sort(lines, ["-k1,1"]) == ["0 z", "1 a", "1 b"]
+
+    @pytest.mark.parametrize("reverse", [False, True])
+    def test_spilled_runs_are_merged(self, tmp_path, reverse: bool) -> None:
+        """Test input larger than the buffer is sorted through temporary runs."""
+        # A scrambled order, with some duplicate keys to check stability.
+        lines = [f"{i * 7919 % 1009} {i}" for i in range(5000)]
+        options = SortOptions(
+            keys=(KeySpec(1, end_field=1, numeric=True, reverse=reverse),),
+            reverse=reverse,
+            stable=True,
+            buffer_size=4096,
+            temp_dir=str(tmp_path),
+        )
+        result = list(external_sort(lines, options))
+        expected = sorted(lines, key=lambda line: int(line.split()[0]), reverse=reverse)
+        assert result == expected
+        # The temporary runs are removed once the merge is done.
+        assert list(tmp_path.iterdir()) == []
+
+    def test_parallel_runs(self, tmp_path) -> None:
+        """Test runs can be sorted in worker processes."""
+        lines = [str(i) for i in range(3000, 0, -1)]
+        options = SortOptions(buffer_size=2048, temp_dir=str(tmp_path), parallel=2)
+        assert list(external_sort(lines, options)) == sorted(lines)
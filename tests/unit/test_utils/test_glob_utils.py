@@ -2,17 +2,50 @@
 
 from __future__ import annotations
 
+from typing import ClassVar
 from unittest.mock import Mock
 
 import ops
+import pytest
 
 from pebble_shell.utils.glob_utils import (
+    GlobError,
+    RemoteGlobExpander,
+    expand_braces,
     expand_globs_in_tokens,
     expand_remote_globs,
     expand_remote_globs_recursive,
 )
 
 
+def _tree_client(tree: dict) -> Mock:
+    """Create a client whose filesystem is a nested dict, with None for a file."""
+
+    def list_files(path: str):
+        node = tree
+        for name in filter(None, path.split("/")):
+            if not isinstance(node, dict) or name not in node:
+                raise ops.pebble.PathError("not-found", f"{path}: not found")
+            node = node[name]
+        if not isinstance(node, dict):
+            raise ops.pebble.PathError("generic-file-error", f"{path}: not a directory")
+        entries = []
+        for name, child in node.items():
+            info = Mock(spec=ops.pebble.FileInfo)
+            info.name = name
+            info.type = (
+                ops.pebble.FileType.DIRECTORY
+                if isinstance(child, dict)
+                else ops.pebble.FileType.FILE
+            )
+            entries.append(info)
+        return entries
+
+    client = Mock()
+    client.list_files.side_effect = list_files
+    return client
+
+
 class TestExpandRemoteGlobs:
     """Test expand_remote_globs function."""
 
@@ -152,11 +185,13 @@ class TestExpandRemoteGlobsRecursive:
         client.list_files.assert_called_once_with("/home")
         assert result == ["/home/test.txt"]
 
-    def test_invalid_recursive_pattern(self) -> None:
-        """Test with invalid recursive pattern (multiple **)."""
-        client = Mock()
-        result = expand_remote_globs_recursive(client, "**/**/**.txt", "/home")
-        assert result == ["**/**/**.txt"]
+    def test_multiple_recursive_patterns(self) -> None:
+        """Test with more than one ** in the pattern."""
+        client = _tree_client(
+            {"home": {"a": {"logs": {"x.txt": None}, "y.txt": None}, "logs": {"z.txt": None}}}
+        )
+        result = expand_remote_globs_recursive(client, "**/logs/**/*.txt", "/home")
+        assert result == ["/home/a/logs/x.txt", "/home/logs/z.txt"]
 
     def test_recursive_file_search(self) -> None:
         """Test recursive file search."""
@@ -239,7 +274,8 @@ class TestExpandRemoteGlobsRecursive:
         client.list_files.side_effect = mock_list_files
 
         result = expand_remote_globs_recursive(client, "**", "/home")
-        expected = ["/home/subdir1", "/home/subdir1/nested", "/home/subdir2"]
+        # Like bash with globstar, the directory itself is matched too.
+        expected = ["/home/", "/home/subdir1", "/home/subdir1/nested", "/home/subdir2"]
         assert result == expected
 
     def test_recursive_path_error(self) -> None:
@@ -388,3 +424,72 @@ class TestExpandGlobsInTokens:
         assert "/backup" in result
         assert "/data/doc.txt" in result
         assert "/data/app.log" in result
+
+
+class TestRemoteGlobExpander:
+    """Test RemoteGlobExpander."""
+
+    _TREE: ClassVar[dict] = {
+        "var": {
+            "log": {
+                "app": {"app-1.log": None, "app-2.log": None, "other.log": None},
+                "web": {"app-3.log": None, ".app-4.log": None},
+                ".hidden": {"app-5.log": None},
+                "syslog": None,
+            }
+        }
+    }
+
+    def test_wildcards_in_any_segment(self) -> None:
+        """Test each distinct directory is listed once, whatever segment the wildcard is in."""
+        client = _tree_client(self._TREE)
+        expander = RemoteGlobExpander(client)
+        assert expander.glob("/var/log/*/app-*.log") == [
+            "/var/log/app/app-1.log",
+            "/var/log/app/app-2.log",
+            "/var/log/web/app-3.log",
+        ]
+        assert expander.glob("/var/log/*/app-1.log") == ["/var/log/app/app-1.log"]
+        listed = sorted(call.args[0] for call in client.list_files.call_args_list)
+        assert listed == ["/var/log", "/var/log/app", "/var/log/web"]
+
+    def test_relative_pattern(self) -> None:
+        """Test relative patterns are matched in the base directory and stay relative."""
+        client = _tree_client(self._TREE)
+        expander = RemoteGlobExpander(client)
+        assert expander.glob("app/*-1.log", "/var/log") == ["app/app-1.log"]
+        assert expander.glob("*/", "/var/log") == ["app/", "web/"]
+        assert expander.glob("~/.*/*", "/", home_dir="/var/log") == ["~/.hidden/app-5.log"]
+
+    def test_expand_braces(self) -> None:
+        """Test alternatives are expanded in order, leaving braces without commas."""
+        assert expand_braces("a{b,c{d,e}}f") == ["abf", "acdf", "acef"]
+        assert expand_braces("find {} x{1,2}") == ["find {} x1", "find {} x2"]
+        assert expand_braces("{a}") == ["{a}"]
+
+    def test_expand_words(self) -> None:
+        """Test words are expanded like bash, keeping alternatives that match nothing."""
+        client = _tree_client(self._TREE)
+        expander = RemoteGlobExpander(client)
+        assert expander.expand("/var/log/{web,app}/app-[13].log") == [
+            "/var/log/web/app-3.log",
+            "/var/log/app/app-1.log",
+        ]
+        assert expander.expand("{syslog,*.gz,x}", "/var/log") == ["syslog", "*.gz", "x"]
+
+    def test_globstar_matches_start_directory(self) -> None:
+        """Test a final ** matches the directory it starts from, as in bash with globstar."""
+        expander = RemoteGlobExpander(_tree_client(self._TREE))
+        assert expander.glob("/var/log/web/**") == ["/var/log/web/", "/var/log/web/app-3.log"]
+        assert expander.glob("/var/log/**/") == ["/var/log/", "/var/log/app/", "/var/log/web/"]
+        assert expander.glob("/var/log/*/**/") == ["/var/log/app/", "/var/log/web/"]
+        assert expander.glob("/var/log/w*/**") == ["/var/log/web", "/var/log/web/app-3.log"]
+        assert expander.glob("**", "/var/log/web") == ["app-3.log"]
+        assert expander.glob("/var/log/missing/**") == []
+        assert expander.glob("/var/log/syslog/**") == []
+
+    def test_max_matches(self) -> None:
+        """Test a pattern matching too many paths is an error."""
+        expander = RemoteGlobExpander(_tree_client(self._TREE), max_matches=2)
+        with pytest.raises(GlobError, match="more than 2 matches"):
+            expander.glob("/var/log/**")
@@ -0,0 +1,162 @@
+"""Tests for streaming JSON values and jq-style filters."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from pebble_shell.utils.json_query import compile_filter, iter_json_values, split_filter_args
+
+_RECORD = {
+    "level": "error",
+    "count": 5,
+    "user": {"name": "ada", "roles": ["admin", "dev"]},
+    "items": [{"id": 1}, {"id": 2}, {"id": 3}],
+}
+
+
+def _run(expression: str, value=_RECORD) -> list:
+    return list(compile_filter(expression)(value))
+
+
+class TestIterJsonValues:
+    """Test parsing a stream of chunks as a sequence of values."""
+
+    def test_values_split_across_chunks(self):
+        """Test values, literals, numbers and characters may be split anywhere."""
+        text = '{"a": 1}\n{"b": [1, 2]} 123 true\n[1]{"x": "é"} null'
+        data = text.encode()
+        expected = [{"a": 1}, {"b": [1, 2]}, 123, True, [1], {"x": "é"}, None]
+
+        for size in (1, 2, 3, 7, len(data)):
+            chunks = [data[i : i + size] for i in range(0, len(data), size)]
+            assert list(iter_json_values(chunks)) == expected
+
+    def test_ndjson_records(self):
+        """Test NDJSON is read one record at a time."""
+        records = [{"n": i} for i in range(1000)]
+        data = "".join(json.dumps(record) + "\n" for record in records).encode()
+
+        values = iter_json_values(data[i : i + 100] for i in range(0, len(data), 100))
+
+        assert next(values) == {"n": 0}
+        assert list(values) == records[1:]
+
+    def test_every_split_offset(self):
+        """Test a stream splits into the same values wherever the chunks are cut."""
+        text = (
+            '{"a": 1.5, "b": [1e3, -2.25E-2, 10], "c": "\\u00e9\\ud83d\\ude00"}\n'
+            '[1.5, {"x": 1e+3}, true, null, -0.5]\n'
+            '{"n": 12345678.125, "s": "x\\ny", "t": false}\n'
+            "42\n-7.5e-1\n"
+        )
+        data = text.encode()
+        expected = list(iter_json_values([data]))
+
+        for first in range(1, len(data)):
+            assert list(iter_json_values([data[:first], data[first:]])) == expected
+            for second in range(first + 1, len(data), 7):
+                chunks = [data[:first], data[first:second], data[second:]]
+                assert list(iter_json_values(chunks)) == expected
+
+    @pytest.mark.parametrize("text", ['{"a": 1}\nnope', '{"a": 1}}', '{"a": ', "[1, 2"])
+    def test_invalid(self, text):
+        """Test invalid or truncated input is an error."""
+        with pytest.raises(ValueError):
+            list(iter_json_values([text.encode()]))
+
+
+class TestCompileFilter:
+    """Test compiling and running filters."""
+
+    @pytest.mark.parametrize(
+        ("expression", "expected"),
+        [
+            (".", [_RECORD]),
+            (".user.name", ["ada"]),
+            ('."level"', ["error"]),
+            (".items[1].id", [2]),
+            (".items.0.id", [1]),
+            (".items[-1]", [{"id": 3}]),
+            (".items[1:] | length", [2]),
+            (".items[].id", [1, 2, 3]),
+            (".missing.deeper", [None]),
+            (".count + 1, .count * 2", [6, 10]),
+            ('.count > 3 and .level != "info"', [True]),
+            ('.missing // "default"', ["default"]),
+            ("[.items[] | select(.id >= 2) | .id]", [[2, 3]]),
+            (".items | map(.id) | add", [6]),
+            ("{level, name: .user.name}", [{"level": "error", "name": "ada"}]),
+            ("{(.level): .count}", [{"error": 5}]),
+            ('.user.roles | join(",")', ["admin,dev"]),
+            ("keys", [["count", "items", "level", "user"]]),
+            ('.user | has("name"), has("age")', [True, False]),
+            ('.level | test("^err") and startswith("e")', [True]),
+            (".level | ascii_upcase", ["ERROR"]),
+            ('.user.roles | contains(["dev"])', [True]),
+            (".count | tostring", ["5"]),
+            ("empty", []),
+            ("-.count", [-5]),
+            ('if .count > 3 then "many" else "few" end', ["many"]),
+            ('if .count > 9 then "a" elif .level == "error" then "b" else "c" end', ["b"]),
+            ("if .missing then 1 end", [_RECORD]),
+            ("[.items[] | if .id == (1, 2) then .id else empty end]", [[1, 2]]),
+        ],
+    )
+    def test_filters(self, expression, expected):
+        """Test each filter produces the expected outputs."""
+        assert _run(expression) == expected
+
+    def test_select(self):
+        """Test select passes on only the inputs matching its condition."""
+        run = compile_filter('select(.level == "error" and .count >= 5) | .user.name')
+
+        assert list(run(_RECORD)) == ["ada"]
+        assert list(run({**_RECORD, "count": 1})) == []
+        assert list(run({"level": "info"})) == []
+
+    def test_equality_does_not_mix_booleans_and_numbers(self):
+        """Test true is not equal to 1, unlike in Python."""
+        assert _run(".a == 1", {"a": True}) == [False]
+        assert _run(".a == 1.0", {"a": 1}) == [True]
+
+    def test_runtime_errors(self):
+        """Test errors only affect the input, and ? suppresses them."""
+        run = compile_filter(".user.name")
+
+        with pytest.raises(ValueError, match="Cannot index string"):
+            list(run({"user": "ada"}))
+        assert list(run({"user": {"name": "x"}})) == ["x"]
+        assert _run(".level[]?") == []
+
+    @pytest.mark.parametrize(
+        "expression",
+        ["if . then 1", "if . 1 end", "foo", ".a |", "select(.a", ".a ==", "{(.a)}", "!"],
+    )
+    def test_invalid_filters(self, expression):
+        """Test invalid filters are rejected when compiled."""
+        with pytest.raises(ValueError):
+            compile_filter(expression)
+
+
+class TestSplitFilterArgs:
+    """Test telling the filter apart from the files."""
+
+    @pytest.mark.parametrize(
+        ("args", "files", "expected"),
+        [
+            ([], set(), (".", [])),
+            ([".a", "f"], {"f"}, (".a", ["f"])),
+            (["length", "f", "g"], {"f", "g"}, ("length", ["f", "g"])),
+            (["keys", "keys"], {"keys"}, ("keys", ["keys"])),
+            (["keys"], set(), ("keys", [])),
+            (["keys"], {"keys"}, (".", ["keys"])),
+            (["data.json", ".a"], {"data.json"}, (".a", ["data.json"])),
+            (["data.json"], set(), (".", ["data.json"])),
+            ([".a |", "f"], {"f"}, (".a |", ["f"])),
+        ],
+    )
+    def test_forms(self, args, files, expected):
+        """Test both jq FILTER FILE... and the older jq FILE [FILTER] are accepted."""
+        assert split_filter_args(args, files.__contains__) == expected
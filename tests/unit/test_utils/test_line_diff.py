@@ -0,0 +1,89 @@
+"""Tests for line diff utilities."""
+
+from __future__ import annotations
+
+import difflib
+import random
+
+from pebble_shell.utils.line_diff import diff_opcodes, format_normal, format_unified
+
+
+def _apply(a: list[int], b: list[int]) -> list[int]:
+    """Check the opcodes cover both sequences and rebuild b from them."""
+    result: list[int] = []
+    i = j = 0
+    for tag, i1, i2, j1, j2 in diff_opcodes(a, b):
+        assert (i1, j1) == (i, j)
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+        result.extend(b[j1:j2])
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    return result
+
+
+class TestDiffOpcodes:
+    """Test diff_opcodes function."""
+
+    def test_identical(self) -> None:
+        """Test identical sequences produce a single equal opcode."""
+        assert diff_opcodes([1, 2, 3], [1, 2, 3]) == [("equal", 0, 3, 0, 3)]
+
+    def test_empty(self) -> None:
+        """Test inserting into and deleting everything from an empty sequence."""
+        assert diff_opcodes([], ["a"]) == [("insert", 0, 0, 0, 1)]
+        assert diff_opcodes(["a"], []) == [("delete", 0, 1, 0, 0)]
+
+    def test_random_sequences(self) -> None:
+        """Test the opcodes are always a valid edit script."""
+        rng = random.Random(42)  # noqa: S311
+        for _ in range(300):
+            a = [rng.randint(0, 4) for _ in range(rng.randint(0, 40))]
+            b = [rng.randint(0, 4) for _ in range(rng.randint(0, 40))]
+            assert _apply(a, b) == b
+
+    def test_large_input_with_few_changes(self) -> None:
+        """Test a large input with scattered edits keeps everything else equal."""
+        a = [f"line {i}\n" for i in range(50000)]
+        b = list(a)
+        b[100] = "changed\n"
+        del b[40000]
+
+        changes = [op for op in diff_opcodes(a, b) if op[0] != "equal"]
+
+        assert changes == [("replace", 100, 101, 100, 101), ("delete", 40000, 40001, 40000, 40000)]
+
+
+class TestFormats:
+    """Test format_normal and format_unified functions."""
+
+    def test_normal(self) -> None:
+        """Test the default diff output format."""
+        a = [b"one\n", b"two\n", b"three\n", b"four\n"]
+        b = [b"one\n", b"2\n", b"three\n", b"four\n", b"five"]
+
+        lines = list(format_normal(a, b, diff_opcodes(a, b)))
+
+        assert lines == [
+            "2c2",
+            "< two",
+            "---",
+            "> 2",
+            "4a5",
+            "> five",
+            "\\ No newline at end of file",
+        ]
+
+    def test_unified_matches_difflib(self) -> None:
+        """Test unified output agrees with difflib for simple input."""
+        a = [f"{i}\n".encode() for i in range(30)]
+        b = list(a)
+        b[3] = b"x\n"
+        b.insert(20, b"new\n")
+
+        ours = list(format_unified(a, b, diff_opcodes(a, b), "a", "b", 2))
+        expected = difflib.unified_diff(
+            [x.decode() for x in a], [x.decode() for x in b], "a", "b", n=2, lineterm=""
+        )
+
+        assert ours == [line.rstrip("\n") for line in expected]
@@ -0,0 +1,73 @@
+"""Tests for lazily indexed access to the lines of a remote file."""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+import ops
+import pytest
+
+from pebble_shell.utils.line_index import LineIndex
+
+_LINES = [f"line {i}" for i in range(100)]
+
+
+def _index(
+    dict_client, text: str, checkpoint_lines: int = 8, cached_pages: int = 2
+) -> tuple[LineIndex, Any]:
+    client = dict_client({"/f": text.encode()})
+    return LineIndex(client, "/f", checkpoint_lines, cached_pages), client
+
+
+class TestLineIndex:
+    """Test reading lines by number."""
+
+    @pytest.mark.parametrize(("start", "count"), [(0, 5), (6, 5), (95, 10), (40, 1), (120, 3)])
+    def test_lines(self, dict_client, start, count) -> None:
+        """Test any range of lines can be read, across page boundaries."""
+        index, _ = _index(dict_client, "\n".join(_LINES) + "\n")
+        assert index.lines(start, count) == _LINES[start : start + count]
+
+    def test_forward_reads_continue_the_stream(self, dict_client) -> None:
+        """Test moving forward reuses the open pull, and the total is unknown until the end."""
+        index, client = _index(dict_client, "\n".join(_LINES))
+        index.lines(0, 10)
+        index.lines(50, 10)
+        assert client.pulls == 1
+        assert index.total_lines is None
+        assert index.known_lines == 64
+
+    def test_going_back_skips_to_a_checkpoint(self, dict_client) -> None:
+        """Test a page that is no longer cached is read again from its checkpoint."""
+        index, client = _index(dict_client, "\n".join(_LINES))
+        index.lines(90, 5)
+        assert index.lines(20, 3) == _LINES[20:23]
+        assert (client.pulls, index.reopened) == (2, 1)
+
+    @pytest.mark.parametrize("text", ["\n".join(_LINES), "\n".join(_LINES[:96]) + "\n", ""])
+    def test_count_lines_keeps_the_last_pages(self, dict_client, text) -> None:
+        """Test going to the end reads the file once, and the end can then be shown."""
+        index, client = _index(dict_client, text)
+        expected = text.splitlines()
+
+        assert index.count_lines() == len(expected)
+        assert index.lines(len(expected) - 12, 12) == expected[-12:]
+        assert client.pulls == 1
+
+    def test_search(self, dict_client) -> None:
+        """Test searching forward and backward from a line."""
+        index, _ = _index(dict_client, "\n".join(_LINES))
+        pattern = re.compile(r"line \d5$")
+
+        assert index.search(pattern, 0) == 15
+        assert index.search(pattern, 15) == 25
+        assert index.search(pattern, 60, backward=True) == 55
+        assert index.search(pattern, 95) is None
+        assert index.search(pattern, 15, backward=True) is None
+
+    def test_missing_file(self, dict_client) -> None:
+        """Test a missing file raises PathError when it is first read."""
+        index = LineIndex(dict_client({}), "/missing")
+        with pytest.raises(ops.pebble.PathError):
+            index.lines(0, 1)
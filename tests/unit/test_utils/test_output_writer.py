@@ -0,0 +1,70 @@
+"""Tests for buffered command output."""
+
+from __future__ import annotations
+
+import io
+
+from rich.console import Console
+
+from pebble_shell.utils.output_writer import OutputWriter
+
+
+def _binary_console() -> tuple[Console, io.BytesIO]:
+    """Create a console writing to a text stream over a bytes buffer, like stdout."""
+    raw = io.BytesIO()
+    stream = io.TextIOWrapper(raw, encoding="utf-8", write_through=False)
+    return Console(file=stream, width=80), raw
+
+
+class TestOutputWriter:
+    """Test where and how the output is written."""
+
+    def test_bytes_pass_through_unchanged(self):
+        """Test bytes are written as is to a binary stream, in order with text."""
+        console, raw = _binary_console()
+        with OutputWriter(console) as writer:
+            assert writer.raw
+            writer.write_line("[bold]text[/bold]")
+            writer.write(b"\xff\xfe bytes\n")
+            writer.flush()
+            console.print("printed")
+            writer.write_lines(["a", "b"])
+
+        assert raw.getvalue() == b"[bold]text[/bold]\n\xff\xfe bytes\nprinted\na\nb\n"
+
+    def test_bytes_decoded_for_text_stream(self):
+        """Test bytes written to a text stream are decoded across writes."""
+        console = Console(file=io.StringIO(), width=80)
+        with OutputWriter(console) as writer:
+            writer.write_chunks([b"caf\xc3", b"\xa9 \xff", b"\xe2\x82"])
+
+        assert console.file.getvalue() == "café ��"
+
+    def test_batches(self):
+        """Test output is only written once the buffer fills, or on close."""
+        console = Console(file=io.StringIO(), width=80)
+        writer = OutputWriter(console, buffer_size=10)
+        writer.write_line("12345")
+        assert console.file.getvalue() == ""
+        writer.write_line("67890")
+        assert console.file.getvalue() == "12345\n67890\n"
+        writer.write("x")
+        writer.close()
+        assert console.file.getvalue() == "12345\n67890\nx"
+
+    def test_capture_goes_through_rich(self):
+        """Test captured output is printed through rich, without interpreting markup."""
+        console = Console(file=io.StringIO(), width=80)
+        with console.capture() as capture, OutputWriter(console) as writer:
+            assert not writer.raw
+            writer.write_line("[red]x[/red] :smile:")
+            writer.write(b"\xc3\xa9\n")
+
+        assert capture.get() == "[red]x[/red] :smile:\né\n"
+        assert console.file.getvalue() == ""
+
+    def test_terminal(self):
+        """Test a terminal is printed to through rich unless plain output is asked for."""
+        console = Console(file=io.StringIO(), force_terminal=True, width=80)
+        assert not OutputWriter(console).raw
+        assert OutputWriter(console, plain=True).raw
@@ -206,25 +206,61 @@ class TestShellParser:
         assert commands[0].command == "echo"
         assert commands[0].args == ["Hello", "testuser"]
 
-    @patch("glob.glob")
-    def test_parse_glob_expansion(self, mock_glob, parser):
+    def test_parse_glob_expansion(self, parser):
         """Test glob expansion in parsing."""
-        mock_glob.return_value = ["file1.txt", "file2.txt"]
+        expanded: list[list[str]] = []
+
+        def expander(patterns: list[str]) -> list[list[str]]:
+            expanded.append(patterns)
+            return [["file1.txt", "file2.txt"]]
+
+        parser.glob_expander = expander
         commands = parser.parse_command_line("ls *.txt")
 
         assert len(commands) == 1
-        assert commands[0].command == "ls"
-        assert commands[0].args == ["file1.txt", "file2.txt"]
+        assert commands[0].args == ["*.txt"]
+        assert expanded == []  # not until the command runs
+
+        command = parser.expand_globs(commands[0])
+        assert command.command == "ls"
+        assert command.args == ["file1.txt", "file2.txt"]
+        assert expanded == [["*.txt"]]
 
-    @patch("glob.glob")
-    def test_parse_glob_no_matches(self, mock_glob, parser):
-        """Test glob with no matches."""
-        mock_glob.return_value = []
+    def test_parse_glob_no_expander(self, parser):
+        """Test patterns are left for the command when there is no glob expander."""
         commands = parser.parse_command_line("ls *.nonexistent")
 
         assert len(commands) == 1
         assert commands[0].command == "ls"
-        assert commands[0].args == ["*.nonexistent"]  # Keep original if no matches
+        assert parser.expand_globs(commands[0]).args == ["*.nonexistent"]
+
+    def test_parse_glob_quoted(self, parser):
+        """Test quoted and escaped wildcards, and options, are not expanded."""
+        expanded: list[list[str]] = []
+
+        def expander(patterns: list[str]) -> list[list[str]]:
+            expanded.append(patterns)
+            return [[f"<{pattern}>"] for pattern in patterns]
+
+        parser.glob_expander = expander
+        commands = parser.parse_command_line(
+            "find . -name '*.py' -o -name \\*.pyc -o -name \"{a,b}\" -x* /var/{log,run}/*.log"
+        )
+
+        assert parser.expand_globs(commands[0]).args == [
+            ".",
+            "-name",
+            "*.py",
+            "-o",
+            "-name",
+            "*.pyc",
+            "-o",
+            "-name",
+            "{a,b}",
+            "-x*",
+            "</var/{log,run}/*.log>",
+        ]
+        assert expanded == [["/var/{log,run}/*.log"]]
 
     def test_set_and_get_variable(self, parser):
         """Test setting and getting variables."""
@@ -0,0 +1,173 @@
+"""Tests for multi-pattern matching utilities."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from pebble_shell.utils.pattern_matching import (
+    AhoCorasick,
+    MultiPatternMatcher,
+    compile_patterns,
+    literal_trie_pattern,
+    required_literal,
+    split_pattern_options,
+    strip_regex_delimiters,
+)
+
+
+class TestLiteralTriePattern:
+    """Test literal_trie_pattern function."""
+
+    def test_shared_prefix(self) -> None:
+        """Test literals sharing a prefix are merged, preferring the longest."""
+        regex = re.compile(literal_trie_pattern([b"ab", b"abc", b"b"]))
+
+        assert [m.group() for m in regex.finditer(b"abcab b")] == [b"abc", b"ab", b"b"]
+
+    def test_special_characters_escaped(self) -> None:
+        """Test regex metacharacters in literals match literally."""
+        regex = re.compile(literal_trie_pattern([b"a.b", b"(x)"]))
+
+        assert regex.search(b"axb") is None
+        assert regex.search(b"a.b") is not None
+        assert regex.search(b"f(x)") is not None
+
+
+class TestAhoCorasick:
+    """Test AhoCorasick class."""
+
+    def test_overlapping_matches(self) -> None:
+        """Test every occurrence is reported, including overlapping ones."""
+        automaton = AhoCorasick([b"he", b"she", b"his", b"hers"])
+
+        assert sorted(automaton.iter_matches(b"ushers")) == [(4, 0), (4, 1), (6, 3)]
+
+    def test_matching_patterns(self) -> None:
+        """Test the set of patterns present is reported."""
+        automaton = AhoCorasick([b"error", b"warn", b"fatal"])
+
+        assert automaton.matching_patterns(b"warning: error") == {0, 1}
+        assert automaton.matching_patterns(b"all good") == set()
+
+
+class TestRequiredLiteral:
+    """Test required_literal function."""
+
+    def test_plain_literal(self) -> None:
+        """Test the longest literal run is found."""
+        assert required_literal(r"error: \d+ timeout") == " timeout"
+
+    def test_optional_character_dropped(self) -> None:
+        """Test a quantified character is not treated as required."""
+        assert required_literal("colou?r") == "colo"
+
+    def test_alternation_gives_up(self) -> None:
+        """Test top-level alternation has no required literal."""
+        assert required_literal("foo|bar") is None
+
+    def test_too_short(self) -> None:
+        """Test single-character literals are not used."""
+        assert required_literal(r"a\d") is None
+
+
+class TestMultiPatternMatcher:
+    """Test MultiPatternMatcher class."""
+
+    def test_fixed_strings(self) -> None:
+        """Test fixed strings are matched literally."""
+        matcher = MultiPatternMatcher(["a.b", "xyz"], fixed=True)
+
+        assert matcher.search(b"one\naxb\n") is None
+        assert matcher.search(b"one\na.b\n") is not None
+        assert matcher.matching_patterns(b"a.b xyz") == [0, 1]
+
+    def test_regex_with_prefilter(self) -> None:
+        """Test regexes are only matched on lines containing their literal."""
+        matcher = MultiPatternMatcher([r"err(or)?: \d+", r"time.*out"])
+
+        match = matcher.search(b"ok\nerr: x\nerror: 42\n")
+        assert match is not None
+        assert match.group() == b"error: 42"
+        assert matcher.matching_patterns(b"timed out, error: 1") == [0, 1]
+
+    def test_ignore_case_and_word(self) -> None:
+        """Test case folding and whole-word matching apply to every pattern."""
+        matcher = MultiPatternMatcher(["warn", "fail"], fixed=True, ignore_case=True, word=True)
+
+        assert matcher.matching_patterns(b"WARN: Failed") == [0]
+
+    def test_backreference(self) -> None:
+        """Test patterns that cannot be combined are still matched."""
+        matcher = MultiPatternMatcher([r"(ab)\1", "zz"])
+
+        assert matcher.search(b"abab") is not None
+        assert matcher.search(b"ab") is None
+
+    def test_no_patterns(self) -> None:
+        """Test an empty pattern set matches nothing."""
+        assert MultiPatternMatcher([]).search(b"anything") is None
+
+
+class TestPatternOptions:
+    """Test cases for turning grep-style arguments into a matcher."""
+
+    def test_every_pattern_is_kept(self) -> None:
+        """Test repeated -e and -f options are all collected, in order."""
+        args = ["-e", "foo", "-i", "--regexp=bar", "-ebaz", "-f", "p1", "-fp2", "file"]
+
+        assert split_pattern_options(args) == (["foo", "bar", "baz"], ["p1", "p2"], ["-i", "file"])
+
+    def test_bundled_options(self) -> None:
+        """Test -e at the end of a bundle of flags takes the next argument."""
+        assert split_pattern_options(["-ie", "foo", "-vefoo"]) == (
+            ["foo", "foo"],
+            [],
+            ["-i", "-v"],
+        )
+
+    def test_value_flags_are_left_alone(self) -> None:
+        """Test the value of another option is not mistaken for -e or -f."""
+        assert split_pattern_options(["-m", "1", "-mef", "x"], value_flags="m") == (
+            [],
+            [],
+            ["-m", "1", "-mef", "x"],
+        )
+
+    def test_end_of_options(self) -> None:
+        """Test nothing after -- is treated as an option."""
+        assert split_pattern_options(["--", "-e", "x"]) == ([], [], ["--", "-e", "x"])
+
+    def test_missing_argument(self) -> None:
+        """Test -e without a pattern is an error."""
+        with pytest.raises(ValueError, match="requires an argument"):
+            split_pattern_options(["foo", "-e"])
+
+    def test_strip_regex_delimiters(self) -> None:
+        """Test only a pattern wrapped in slashes loses them."""
+        assert strip_regex_delimiters("/a.b/") == "a.b"
+        assert strip_regex_delimiters("/a.b") == "/a.b"
+        assert strip_regex_delimiters("//") == "//"
+
+    def test_compile_single_pattern(self) -> None:
+        """Test one pattern becomes a plain regex with grep's options applied."""
+        regex = compile_patterns(["/err.r/"], ignore_case=True, word=True)
+
+        assert isinstance(regex, re.Pattern)
+        assert regex.search(b"an ERROR here") is not None
+        assert regex.search(b"errors") is None
+
+    def test_compile_fixed_keeps_slashes(self) -> None:
+        """Test a fixed string is matched exactly, slashes and all."""
+        regex = compile_patterns(["/tmp/"], fixed=True)
+
+        assert regex.search(b"cd /tmp/x") is not None
+        assert regex.search(b"tmp") is None
+
+    def test_compile_several_patterns(self) -> None:
+        """Test several patterns are matched in one pass."""
+        matcher = compile_patterns(["foo", "bar"])
+
+        assert isinstance(matcher, MultiPatternMatcher)
+        assert matcher.search(b"a bar") is not None
@@ -0,0 +1,334 @@
+"""Tests for pipeline fusion."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+from unittest.mock import Mock, patch
+
+import ops
+import pytest
+from rich.console import Console
+
+from pebble_shell.commands import (
+    CatCommand,
+    ExpandCommand,
+    FoldCommand,
+    GrepCommand,
+    HeadCommand,
+    SedCommand,
+    SortCommand,
+    TrCommand,
+    UniqCommand,
+    WcCommand,
+)
+from pebble_shell.utils.executor import CommandOutput, PipelineExecutor
+from pebble_shell.utils.parser import ShellParser
+from pebble_shell.utils.pipeline_fusion import (
+    FusionContext,
+    explain_pipeline,
+    plan_pipeline,
+)
+
+_LOG = b"b\na\nc\na\nb\na\nx ERROR y\nx ERROR z\n"
+
+_MIXED = "Alpha beta\nnaïve café\nERROR one\nerror two\n\tindented\tline\nalpha\nalpha\n".encode()
+
+
+def _stages(command_line: str):
+    first = ShellParser().parse_command_line(command_line)[0]
+    stages = [first]
+    while stages[-1].next_command is not None:
+        stages.append(stages[-1].next_command)
+    return stages
+
+
+@pytest.fixture
+def context():
+    """Create a fusion context whose client serves a few files."""
+    files = {"/logs/app.log": _LOG, "/logs/n.txt": b"10\n9\n100\n1\n"}
+
+    def pull(path, encoding="utf-8"):
+        if path not in files:
+            raise ops.pebble.PathError("not-found", f"stat {path}: no such file")
+        return io.BytesIO(files[path])
+
+    client = Mock()
+    client.pull.side_effect = pull
+    shell = Mock()
+    shell.current_directory = "/logs"
+    shell.home_dir = "/root"
+    return FusionContext(
+        client=client,
+        shell=shell,
+        commands={"grep": GrepCommand(shell)},
+        output=CommandOutput(),
+        run_command=Mock(return_value=0),
+    )
+
+
+def _run(command_line: str, context: FusionContext) -> tuple[int, str]:
+    plan = plan_pipeline(_stages(command_line), context.commands)
+    assert plan is not None
+    return plan.run(context), context.output.get_stdout()
+
+
+class TestPlanPipeline:
+    """Test which pipelines are fused, and how."""
+
+    def test_single_command_is_not_fused(self) -> None:
+        """Test a command without a pipe is left alone."""
+        assert plan_pipeline(_stages("sort app.log"), {}) is None
+
+    @pytest.mark.parametrize(
+        "command_line",
+        ["cat app.log | tail -n 2", "cat app.log | grep -c x", "cat app.log | sort other.log"],
+    )
+    def test_unsupported_stage_is_not_fused(self, command_line: str) -> None:
+        """Test unknown commands, options or file arguments prevent fusion."""
+        assert plan_pipeline(_stages(command_line), {}) is None
+
+    def test_rewrites(self) -> None:
+        """Test sort | uniq and sort | head are rewritten, and sorting before wc is dropped."""
+        text = "\n".join(explain_pipeline(_stages("sort app.log | uniq -c | sort -rn | head"), {}))
+        assert "hash aggregate" in text
+        assert "top-k" in text
+        text = "\n".join(explain_pipeline(_stages("cat app.log | sort | wc -l"), {}))
+        assert "sort" not in text.split("replaces")[-2]
+        assert "count: lines" in text
+
+    def test_cat_of_several_files_runs_cat(self) -> None:
+        """Test cat with more than one file is run as the command, not read as a source."""
+        text = "\n".join(explain_pipeline(_stages("cat app.log n.txt | wc -l"), {}))
+        assert "run: cat app.log n.txt" in text
+        assert "stream lines" not in text
+
+    def test_explain_unfused(self) -> None:
+        """Test pipelines that are not fused are described stage by stage."""
+        lines = explain_pipeline(_stages("ls | tail"), {})
+        assert lines[0].startswith("stage by stage")
+
+
+class TestFusedPipeline:
+    """Test running fused pipelines."""
+
+    def test_filter_and_count(self, context) -> None:
+        """Test cat | grep | wc -l counts matching lines."""
+        assert _run("cat app.log | grep ERROR | wc -l", context) == (0, "       2\n")
+
+    def test_hash_aggregate_top_k(self, context) -> None:
+        """Test the classic frequency count gives the same result as the full pipeline."""
+        exit_code, stdout = _run("sort app.log | uniq -c | sort -rn | head -n 2", context)
+        assert exit_code == 0
+        assert stdout == "      3 a\n      2 b\n"
+
+    def test_top_k_numeric(self, context) -> None:
+        """Test sort -n | head keeps the smallest numbers."""
+        assert _run("sort -n n.txt | head -2", context) == (0, "1\n9\n")
+
+    def test_filter_and_limit(self, context) -> None:
+        """Test grep FILE | head only returns the first selected lines."""
+        exit_code, stdout = _run("grep -v ERROR app.log | head -n 1", context)
+        assert (exit_code, stdout) == (0, "1:b\n")
+
+    def test_filter_without_matches_fails(self, context) -> None:
+        """Test a final grep that selects nothing exits with status 1."""
+        assert _run("cat app.log | grep nothing", context) == (1, "")
+
+    def test_missing_file(self, context) -> None:
+        """Test a file that can't be read is reported on stderr."""
+        assert _run("cat missing.log | wc -l", context) == (0, "       0\n")
+        assert "cat: missing.log: No such file or directory" in context.output.get_stderr()
+
+    def test_command_source(self, context) -> None:
+        """Test a first stage without a streaming source is run by the executor."""
+
+        def run_command(cmd, pipe_input, output):
+            output.write_stdout("one\ntwo\nthree\n")
+            return 0
+
+        context.run_command = run_command
+        assert _run("echo x | grep -i T", context) == (0, "two\nthree\n")
+
+    def test_meter_passes_lines_through(self, context) -> None:
+        """Test pv between stages passes the lines on and reports what passed."""
+        console = Console(file=io.StringIO(), width=200)
+        context.shell.error_console = console
+
+        assert _run("cat app.log | pv -N logs | grep ERROR", context) == (
+            0,
+            "x ERROR y\nx ERROR z\n",
+        )
+        assert console.file.getvalue().startswith("logs: 32B 0:00:00 [avg ")
+
+    def test_edit(self, context) -> None:
+        """Test sed runs as a streaming stage, and its q status is the pipeline's."""
+        assert _run("grep ERROR app.log | sed -n 's/x ERROR //p'", context) == (0, "7:y\n8:z\n")
+        assert _run("cat app.log | sed '2q4' | wc -l", context)[0] == 0
+        assert _run("cat n.txt | sed -e 1d -e '2q4'", context)[0] == 4
+
+    def test_transform(self, context) -> None:
+        """Test tr runs as a streaming stage, and may join lines."""
+        assert _run("grep ERROR app.log | tr a-z A-Z", context) == (
+            0,
+            "7:X ERROR Y\n8:X ERROR Z\n",
+        )
+        context.output = CommandOutput()
+        assert _run("cat n.txt | tr -d '\\n'", context) == (0, "1091001")
+
+    def test_process_filter_is_pushed_down(self, context) -> None:
+        """Test ps | grep runs ps with a command line filter."""
+        ps = Mock()
+        ps.execute_filtered.return_value = 0
+        context.commands = {"ps": ps}
+
+        assert _run("ps aux | grep -i NGINX", context) == (0, "")
+
+        _, args, match = ps.execute_filtered.call_args[0]
+        assert args == ["aux"]
+        assert match("www-data 42 0.0 0.1 nginx: worker process")
+        assert not match("root 1 0.0 0.1 /usr/bin/python3")
+
+    def test_process_filter_needs_table_output(self, context) -> None:
+        """Test ps | grep is not fused when ps would print JSON or CSV."""
+        ps = Mock()
+        context.commands = {"ps": ps}
+
+        plan = plan_pipeline(_stages("ps aux --format=csv | grep x"), context.commands)
+
+        assert plan is not None
+        assert "process snapshot" not in "\n".join(plan.explain())
+
+
+class TestFusedMatchesUnfused:
+    """Test fused pipelines print exactly what running each stage in turn prints."""
+
+    @pytest.fixture
+    def executor(self):
+        """Create an executor with the real text commands, reading a few files."""
+        files = {"/logs/app.log": _LOG, "/logs/mixed.log": _MIXED, "/logs/open.log": b"ab\nc"}
+
+        def pull(path, encoding="utf-8"):
+            if path not in files:
+                raise ops.pebble.PathError("not-found", f"stat {path}: no such file")
+            if encoding is None:
+                return io.BytesIO(files[path])
+            return io.StringIO(files[path].decode(encoding))
+
+        shell = Mock()
+        shell.client = Mock()
+        shell.client.pull.side_effect = pull
+        shell.current_directory = "/logs"
+        shell.home_dir = "/root"
+        # Print to whatever stdout is at the time, as the shell's console does.
+        shell.console = Console(width=1000, color_system=None)
+        shell.error_console = Console(file=io.StringIO())
+        commands = {
+            command.name: command
+            for command in (
+                cls(shell)
+                for cls in (
+                    CatCommand,
+                    ExpandCommand,
+                    FoldCommand,
+                    GrepCommand,
+                    HeadCommand,
+                    SedCommand,
+                    SortCommand,
+                    TrCommand,
+                    UniqCommand,
+                    WcCommand,
+                )
+            )
+        }
+        return PipelineExecutor(commands, Mock(), shell)
+
+    @staticmethod
+    def _fused(executor, command_line: str) -> tuple[int, str]:
+        plan = plan_pipeline(_stages(command_line), executor.commands)
+        assert plan is not None
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = executor._run_fused_pipeline(plan)
+        return exit_code, stdout.getvalue()
+
+    @staticmethod
+    def _unfused(executor, command_line: str) -> tuple[int, str]:
+        stdout = io.StringIO()
+        with (
+            patch("pebble_shell.utils.pipeline_fusion.plan_pipeline", return_value=None),
+            contextlib.redirect_stdout(stdout),
+        ):
+            exit_code = executor._execute_pipeline(_stages(command_line))
+        return exit_code, stdout.getvalue()
+
+    @staticmethod
+    def _alone(executor, command_line: str) -> tuple[int, str]:
+        stage = _stages(command_line)[0]
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = executor.commands[stage.command].execute(executor.client, stage.args)
+        return exit_code, stdout.getvalue()
+
+    @pytest.mark.parametrize(
+        "stage",
+        [
+            "grep error",
+            "grep -i error",
+            "grep -v -w alpha",
+            "grep -x alpha",
+            "grep -e ERROR -e café",
+            "grep -F .",
+            "grep '/^[a-z]+$/'",
+            "grep nothing",
+            "wc",
+            "wc -l",
+            "wc -w",
+            "wc -c",
+            "sort",
+            "sort -r",
+            "tr a-z A-Z",
+            "fold -w 4",
+            "expand -t 2",
+        ],
+    )
+    def test_piped_stage(self, executor, stage: str) -> None:
+        """Test each stage that reads piped input gives the same output fused."""
+        command_line = f"cat mixed.log | {stage}"
+
+        assert self._fused(executor, command_line) == self._unfused(executor, command_line)
+
+    @pytest.mark.parametrize("stage", ["wc -c", "wc", "tr a-z A-Z", "sort", "grep c"])
+    def test_missing_final_newline(self, executor, stage: str) -> None:
+        """Test a file that doesn't end in a newline gives the same output fused."""
+        command_line = f"cat open.log | {stage}"
+
+        assert self._fused(executor, command_line) == self._unfused(executor, command_line)
+
+    def test_missing_final_newline_passed_on(self, executor) -> None:
+        """Test head and sed keep the missing newline, and a dropped sort adds it back."""
+        assert self._fused(executor, "cat open.log | head -n 5") == (0, "ab\nc")
+        assert self._fused(executor, "cat open.log | sed s/c/C/") == (0, "ab\nC")
+        assert self._fused(executor, "cat open.log | sed 2d | wc -c") == (0, "       3\n")
+        assert self._fused(executor, "sort open.log | wc -c") == (0, "       5\n")
+
+    @pytest.mark.parametrize("stage", ["head 3", "uniq -c", "sed s/a/A/g", "sort -f"])
+    def test_file_stage(self, executor, stage: str) -> None:
+        """Test stages fed from cat print what they print reading the file themselves."""
+        # (The console expands tabs, so this file has none.)
+        fused = self._fused(executor, f"cat app.log | {stage}")
+
+        assert fused == self._alone(executor, f"{stage} app.log")
+
+    @pytest.mark.parametrize(
+        "grep",
+        ["grep a mixed.log", "grep -i -e error -e beta mixed.log", "grep a app.log mixed.log"],
+    )
+    def test_grep_source(self, executor, grep: str) -> None:
+        """Test grep FILE as a first stage keeps grep's line numbers and file names."""
+        _, standalone = self._alone(executor, grep)
+        lines = standalone.splitlines(keepends=True)
+
+        assert self._fused(executor, f"{grep} | head -n 2") == (0, "".join(lines[:2]))
+        size = len(standalone.encode())
+        assert self._fused(executor, f"{grep} | wc -c") == (0, f"{size:8}\n")
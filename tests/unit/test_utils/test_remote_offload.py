@@ -0,0 +1,167 @@
+"""Tests for running commands inside the container."""
+
+from __future__ import annotations
+
+import io
+from unittest.mock import Mock
+
+import ops
+import pytest
+from rich.console import Console
+
+from pebble_shell.utils.remote_offload import (
+    OffloadMode,
+    RemoteCapabilities,
+    offload,
+    remote_capabilities,
+    split_offload_mode,
+)
+
+
+def _file(size: int, file_type=ops.pebble.FileType.FILE):
+    info = Mock()
+    info.size = size
+    info.type = file_type
+    return info
+
+
+def _client(
+    size: int = 0,
+    file_type=ops.pebble.FileType.FILE,
+    available: bool = True,
+    stdout: bytes = b"remote output\n",
+    stderr: bytes = b"",
+    exit_code: int = 0,
+):
+    """Create a client serving one file of ``size`` bytes."""
+    client = Mock()
+    client.list_files.return_value = [_file(size, file_type)]
+
+    def exec_(argv, **kwargs):
+        if argv[1:] == ["--help"]:
+            if not available:
+                raise ops.pebble.APIError({}, 500, "Internal Server Error", "not found")
+            return Mock()
+        kwargs["stderr"].write(stderr)
+        process = Mock()
+        process.stdout = io.BytesIO(stdout)
+        if exit_code:
+            process.wait.side_effect = ops.pebble.ExecError(argv, exit_code, None, None)
+        return process
+
+    client.exec.side_effect = exec_
+    return client
+
+
+@pytest.fixture
+def command():
+    """Create a command whose output is captured."""
+    command = Mock()
+    command.name = "grep"
+    command.console = Console(record=True, width=200)
+    command.shell.current_directory = "/var/log"
+    command.shell.error_console = Console(record=True, width=200)
+    return command
+
+
+class TestSplitOffloadMode:
+    """Test removing --local and --remote from the arguments."""
+
+    @pytest.mark.parametrize(
+        ("args", "mode", "remaining"),
+        [
+            (["-c", "x", "f"], OffloadMode.AUTO, ["-c", "x", "f"]),
+            (["--remote", "x", "f"], OffloadMode.REMOTE, ["x", "f"]),
+            (["--remote", "x", "--local"], OffloadMode.LOCAL, ["x"]),
+        ],
+    )
+    def test_split(self, args, mode, remaining) -> None:
+        """Test the mode is extracted and the other arguments are kept in order."""
+        assert split_offload_mode(args) == (mode, remaining)
+
+
+class TestRemoteCapabilities:
+    """Test probing for binaries in the container."""
+
+    def test_probe_is_cached(self) -> None:
+        """Test each binary is probed once per client."""
+        client = _client()
+        capabilities = remote_capabilities(client)
+        assert capabilities.has("grep")
+        assert remote_capabilities(client).has("grep")
+        assert client.exec.call_count == 1
+
+    def test_exit_status_counts_as_available(self) -> None:
+        """Test a binary that exits non-zero after printing help is available."""
+        client = Mock()
+        client.exec.return_value.wait_output.side_effect = ops.pebble.ExecError(
+            ["grep", "--help"], 1, "", "usage"
+        )
+        assert RemoteCapabilities(client).has("grep")
+
+    def test_missing_binary(self) -> None:
+        """Test a binary that can't be started is not available."""
+        assert not RemoteCapabilities(_client(available=False)).has("grep")
+
+
+class TestOffload:
+    """Test the offload policy."""
+
+    def test_small_input_runs_locally(self, command) -> None:
+        """Test small files are processed locally without probing."""
+        client = _client(size=100)
+        assert offload(command, client, ["grep", "x", "f"], ["/f"], OffloadMode.AUTO) is None
+        client.exec.assert_not_called()
+
+    def test_large_input_runs_remotely(self, command) -> None:
+        """Test large files are processed in the container, in the shell's directory."""
+        client = _client(size=100)
+        exit_code = offload(command, client, ["grep", "x", "f"], ["/f"], OffloadMode.AUTO, 50)
+        assert exit_code == 0
+        assert command.console.export_text() == "remote output\n"
+        assert client.exec.call_args.kwargs["working_dir"] == "/var/log"
+
+    def test_directory_runs_remotely(self, command) -> None:
+        """Test a directory is always worth offloading."""
+        client = _client(file_type=ops.pebble.FileType.DIRECTORY)
+        assert offload(command, client, ["du", "/d"], ["/d"], OffloadMode.AUTO) == 0
+
+    def test_local_mode(self, command) -> None:
+        """Test --local never touches the container."""
+        client = _client(size=10**10)
+        assert offload(command, client, ["grep", "x", "f"], ["/f"], OffloadMode.LOCAL) is None
+        client.exec.assert_not_called()
+
+    def test_remote_mode_falls_back(self, command) -> None:
+        """Test --remote without the binary falls back to the local implementation."""
+        client = _client(available=False)
+        assert offload(command, client, ["grep", "x", "f"], ["/f"], OffloadMode.REMOTE) is None
+        assert "running locally" in command.console.export_text()
+
+    def test_exit_code_and_stderr(self, command) -> None:
+        """Test the remote exit code and error output are passed through."""
+        client = _client(stdout=b"f:1:x\n", stderr=b"grep: g: No such file\n", exit_code=2)
+        assert offload(command, client, ["grep", "x", "f", "g"], ["/f"], OffloadMode.REMOTE) == 2
+        assert command.console.export_text() == "f:1:x\n"
+        assert command.shell.error_console.export_text() == "grep: g: No such file\n"
+
+    def test_rejected_options_fall_back(self, command) -> None:
+        """Test a remote failure without output runs the command locally instead."""
+        client = _client(stdout=b"", stderr=b"grep: unrecognized option\n", exit_code=2)
+        assert offload(command, client, ["grep", "x", "f"], ["/f"], OffloadMode.REMOTE) is None
+        assert "running locally" in command.console.export_text()
+        assert command.shell.error_console.export_text() == ""
+
+    def test_no_match_is_not_a_failure(self, command) -> None:
+        """Test exit status 1 without output (grep found nothing) is passed through."""
+        client = _client(stdout=b"", exit_code=1)
+        assert offload(command, client, ["grep", "x", "f"], ["/f"], OffloadMode.REMOTE) == 1
+
+    def test_output_not_utf8(self, command) -> None:
+        """Test output that is not valid UTF-8 is written in full, with replacements."""
+        client = _client(stdout=b"caf\xe9\n" + b"x" * 100_000 + b"\nend\n")
+        assert offload(command, client, ["grep", "x", "f"], ["/f"], OffloadMode.REMOTE) == 0
+        text = command.console.export_text()
+        assert text.startswith("caf\ufffd\n")
+        assert text.endswith("\nend\n")
+        assert client.exec.call_args.kwargs["encoding"] is None
@@ -0,0 +1,150 @@
+"""Tests for the trigram search index."""
+
+from __future__ import annotations
+
+import datetime
+import gzip
+import io
+from unittest.mock import Mock
+
+import ops
+import pytest
+
+from pebble_shell.utils.search_index import (
+    SearchIndexError,
+    TrigramIndex,
+    covering_root,
+    file_trigrams,
+    find_indexes,
+    index_file,
+)
+
+
+class _Tree:
+    """A minimal in-memory remote tree for a mocked client."""
+
+    def __init__(self, files: dict[str, bytes]):
+        self.files = files
+        self.pulled: list[str] = []
+        self.client = Mock(spec=["pull", "list_files"])
+        self.client.pull.side_effect = self._pull
+        self.client.list_files.side_effect = self._list
+
+    def _pull(self, path: str, **kwargs) -> io.BytesIO:
+        self.pulled.append(path)
+        return io.BytesIO(self.files[path])
+
+    def _list(self, path: str) -> list[Mock]:
+        entries: dict[str, ops.pebble.FileType] = {}
+        for file_path in self.files:
+            if not file_path.startswith(path + "/"):
+                continue
+            name, _, rest = file_path[len(path) + 1 :].partition("/")
+            entries[name] = ops.pebble.FileType.DIRECTORY if rest else ops.pebble.FileType.FILE
+        listing = []
+        for name, file_type in entries.items():
+            info = Mock()
+            info.name = name
+            info.path = f"{path}/{name}"
+            info.type = file_type
+            info.size = len(self.files.get(info.path, b""))
+            info.last_modified = datetime.datetime(2024, 1, 1)
+            listing.append(info)
+        return listing
+
+
+@pytest.fixture
+def tree() -> _Tree:
+    return _Tree(
+        {
+            "/app/main.py": b"import logging\nlogger = logging.getLogger()\n",
+            "/app/lib/util.py": b"def helper():\n    return 42\n",
+            "/app/lib/data.bin": b"\x00\x01logging",
+            "/app/logs/old.log.gz": gzip.compress(b"warning: disk full\n"),
+        }
+    )
+
+
+class TestFileTrigrams:
+    """Test file_trigrams function."""
+
+    def test_across_chunks_and_folded(self) -> None:
+        """Test trigrams spanning chunks are found and case is folded."""
+        assert file_trigrams([b"AB", b"CD"]) == {b"abc", b"bcd"}
+
+    def test_binary(self) -> None:
+        """Test binary data is not indexed."""
+        assert file_trigrams([b"\x00abc"]) is None
+
+
+class TestTrigramIndex:
+    """Test TrigramIndex class."""
+
+    def test_candidates(self, tree: _Tree) -> None:
+        """Test only files containing the literal's trigrams are candidates."""
+        index = TrigramIndex.build(tree.client, "/app")
+
+        assert index.candidates(b"getLogger") == ["/app/main.py"]
+        assert index.candidates(b"GETLOGGER") == ["/app/main.py"]
+        assert index.candidates(b"nowhere") == []
+        # No usable literal: every text file is a candidate.
+        assert index.candidates(None) == [
+            "/app/main.py",
+            "/app/lib/util.py",
+            "/app/logs/old.log.gz",
+        ]
+        assert index.candidates(None, under="/app/lib") == ["/app/lib/util.py"]
+
+    def test_compressed_files_indexed_by_text(self, tree: _Tree) -> None:
+        """Test a compressed file is a candidate for the text grep finds in it."""
+        index = TrigramIndex.build(tree.client, "/app")
+
+        assert index.candidates(b"disk full") == ["/app/logs/old.log.gz"]
+
+    def test_save_and_load(self, tree: _Tree, tmp_path) -> None:
+        """Test an index survives a round trip through its file."""
+        index = TrigramIndex.build(tree.client, "/app")
+        path = index_file("/app", index_dir=tmp_path)
+        index.save(path)
+
+        loaded = TrigramIndex.load(path)
+
+        assert loaded.root == "/app"
+        assert loaded.trigram_count == index.trigram_count
+        assert loaded.candidates(b"helper") == ["/app/lib/util.py"]
+        assert [i.root for i in find_indexes("", tmp_path)] == ["/app"]
+
+    def test_load_invalid(self, tmp_path) -> None:
+        """Test a corrupt index file raises SearchIndexError."""
+        path = tmp_path / "broken.idx"
+        path.write_bytes(b"not an index")
+
+        with pytest.raises(SearchIndexError):
+            TrigramIndex.load(path)
+
+    def test_update_only_pulls_changed_files(self, tree: _Tree) -> None:
+        """Test update re-pulls changed and new files and drops removed ones."""
+        index = TrigramIndex.build(tree.client, "/app")
+        tree.files["/app/lib/util.py"] = b"def helper():\n    return getLogger\n"
+        tree.files["/app/new.py"] = b"getLogger\n"
+        del tree.files["/app/lib/data.bin"]
+        tree.pulled.clear()
+
+        stats = index.update(tree.client)
+
+        assert sorted(tree.pulled) == ["/app/lib/util.py", "/app/new.py"]
+        assert (stats.added, stats.changed, stats.removed, stats.unchanged) == (1, 1, 1, 2)
+        assert sorted(index.candidates(b"getLogger")) == [
+            "/app/lib/util.py",
+            "/app/main.py",
+            "/app/new.py",
+        ]
+
+
+def test_covering_root() -> None:
+    """Test the deepest index containing a path is chosen."""
+    roots = ["/", "/var", "/var/log"]
+
+    assert covering_root("/var/log/syslog", roots) == "/var/log"
+    assert covering_root("/variable", roots) == "/"
+    assert covering_root("/etc", ["/var"]) is None
@@ -0,0 +1,127 @@
+"""Tests for compiling and running sed scripts."""
+
+from __future__ import annotations
+
+import pytest
+
+from pebble_shell.utils.sed_script import SedScript, parse_sed_args, translate_regex
+
+_LINES = ["alpha", "beta", "gamma", "delta", "epsilon"]
+
+
+def _sed(script: str, lines=_LINES, quiet: bool = False, extended: bool = False) -> str:
+    return "".join(SedScript(script, extended).run(lines, quiet))
+
+
+class TestTranslateRegex:
+    """Test converting POSIX regular expressions to Python ones."""
+
+    @pytest.mark.parametrize(
+        ("pattern", "extended", "expected"),
+        [
+            (r"a\(b\)*\{2\}", False, r"a(b)*{2}"),
+            (r"a(b)+|c", False, r"a\(b\)\+\|c"),
+            (r"a(b)+|c", True, r"a(b)+|c"),
+            (r"[[:digit:]]x$", False, r"[0-9]x\Z"),
+            (r"\<word\>", True, r"\b(?=\w)word\b(?<=\w)"),
+        ],
+    )
+    def test_translate(self, pattern, extended, expected):
+        """Test BRE and ERE syntax is rewritten."""
+        assert translate_regex(pattern, extended) == expected
+
+
+class TestSedScript:
+    """Test running scripts over lines."""
+
+    @pytest.mark.parametrize(
+        ("script", "quiet", "expected"),
+        [
+            ("s/a/A/", False, "Alpha\nbetA\ngAmma\ndeltA\nepsilon\n"),
+            ("s/a/A/g", False, "AlphA\nbetA\ngAmmA\ndeltA\nepsilon\n"),
+            ("s/a/A/2", False, "alphA\nbeta\ngammA\ndelta\nepsilon\n"),
+            ("2,3d", False, "alpha\ndelta\nepsilon\n"),
+            ("/beta/,/delta/p", True, "beta\ngamma\ndelta\n"),
+            ("$p", True, "epsilon\n"),
+            ("1~2d", False, "beta\ndelta\n"),
+            ("2,+1!d", False, "beta\ngamma\n"),
+            ("0,/a/s//X/", False, "Xlpha\nbeta\ngamma\ndelta\nepsilon\n"),
+            ("y/abc/ABC/;3q", False, "AlphA\nBetA\ngAmmA\n"),
+            ("3Q", False, "alpha\nbeta\n"),
+            ("=", True, "1\n2\n3\n4\n5\n"),
+            ("2i\\\nnew", True, "new\n"),
+            ("$!N;s/\\n/+/", False, "alpha+beta\ngamma+delta\nepsilon\n"),
+            ("1h;1!H;$!d;x;s/\\n/,/g", False, "alpha,beta,gamma,delta,epsilon\n"),
+            ("s/\\(.\\)\\(.*\\)/\\u\\1\\2/", False, "Alpha\nBeta\nGamma\nDelta\nEpsilon\n"),
+            (":a;s/^.\\{1,6\\}$/ &/;ta;3q", False, "  alpha\n   beta\n  gamma\n"),
+            ("s/a*/<&>/g;2q", False, "<a>l<>p<>h<a>\n<>b<>e<>t<a>\n"),
+            ("s/m*/-/2;3!d", False, "g-amma\n"),
+        ],
+    )
+    def test_scripts(self, script, quiet, expected):
+        """Test each script gives the same output as GNU sed."""
+        assert _sed(script, quiet=quiet) == expected
+
+    def test_extended(self):
+        """Test -E makes groups and alternation special."""
+        assert _sed("s/(al|ga)(.)/<\\2\\1>/", extended=True).split("\n")[:3] == [
+            "<pal>ha",
+            "beta",
+            "<mga>ma",
+        ]
+
+    def test_quit_stops_reading(self):
+        """Test q stops reading the input and sets the exit status."""
+        read: list[int] = []
+
+        def lines():
+            for number in range(1_000_000):
+                read.append(number)
+                yield str(number)
+
+        execution = SedScript("2q5").run(lines())
+
+        assert "".join(execution) == "0\n1\n"
+        assert (execution.quit, execution.exit_code) == (True, 5)
+        assert len(read) <= 3
+
+    def test_runs_are_independent(self):
+        """Test range state is not shared between runs of the same script."""
+        script = SedScript("/beta/,/nothing/d")
+
+        assert "".join(script.run(["alpha", "beta", "gamma"])) == "alpha\n"
+        assert "".join(script.run(["gamma", "alpha"])) == "gamma\nalpha\n"
+
+    @pytest.mark.parametrize("script", ["s/a/b", "3,", "k", "b nowhere", "{p", "p}", "w out"])
+    def test_invalid_scripts(self, script):
+        """Test invalid or unsupported scripts are rejected when compiled."""
+        with pytest.raises(ValueError):
+            SedScript(script)
+
+
+class TestParseSedArgs:
+    """Test parsing sed command lines."""
+
+    def test_script_and_files(self):
+        """Test the first argument is the script without -e or -f."""
+        options, files = parse_sed_args(["-n", "p", "a", "b"])
+
+        assert (options.scripts, options.quiet, options.in_place) == ([("e", "p")], True, None)
+        assert files == ["a", "b"]
+
+    def test_repeated_and_attached_options(self):
+        """Test -e and -f keep their order, and -i takes an attached backup suffix."""
+        options, files = parse_sed_args(
+            ["-e", "p", "-f", "x.sed", "-es/a/b/", "-i.bak", "-E", "f"]
+        )
+
+        assert options.scripts == [("e", "p"), ("f", "x.sed"), ("e", "s/a/b/")]
+        assert (options.in_place, options.extended) == (".bak", True)
+        assert files == ["f"]
+
+        assert parse_sed_args(["-i", "p", "f"])[0].in_place == ""
+
+    def test_missing_script(self):
+        """Test a command line without a script is an error."""
+        with pytest.raises(ValueError):
+            parse_sed_args(["-n"])
@@ -0,0 +1,296 @@
+"""Tests for streaming utilities."""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import threading
+from unittest.mock import Mock
+
+import ops
+import pytest
+
+from pebble_shell.utils import streaming
+from pebble_shell.utils.streaming import (
+    ChunkReader,
+    bounded_map,
+    detect_compression,
+    is_binary,
+    iter_byte_range,
+    iter_decompressed,
+    iter_lines,
+    iter_remote_chunks,
+    walk_remote_files,
+)
+
+
+def _info(path: str, file_type: ops.pebble.FileType) -> Mock:
+    info = Mock(spec=ops.pebble.FileInfo)
+    info.path = path
+    info.name = path.rsplit("/", 1)[-1]
+    info.type = file_type
+    return info
+
+
+class TestIterRemoteChunks:
+    """Test iter_remote_chunks function."""
+
+    def test_reads_in_chunks(self) -> None:
+        """Test the file is read in chunks of the requested size."""
+        client = Mock()
+        client.pull.return_value = io.BytesIO(b"abcdefghij")
+
+        chunks = list(iter_remote_chunks(client, "/file", chunk_size=4))
+
+        assert chunks == [b"abcd", b"efgh", b"ij"]
+        client.pull.assert_called_once_with("/file", encoding=None)
+
+    def test_stop_event(self) -> None:
+        """Test reading stops once the stop event is set."""
+        client = Mock()
+        client.pull.return_value = io.BytesIO(b"abcdefghij")
+        stop = threading.Event()
+
+        chunks = iter_remote_chunks(client, "/file", chunk_size=4, stop=stop)
+        assert next(chunks) == b"abcd"
+        stop.set()
+        assert list(chunks) == []
+
+
+class TestIterLines:
+    """Test iter_lines function."""
+
+    def test_lines_across_chunks(self) -> None:
+        """Test lines split across chunk boundaries are rejoined."""
+        assert list(iter_lines([b"one\ntw", b"o\nthr", b"ee"])) == [b"one", b"two", b"three"]
+
+    def test_trailing_newline(self) -> None:
+        """Test a trailing newline does not produce an empty final line."""
+        assert list(iter_lines([b"a\nb\n"])) == [b"a", b"b"]
+
+
+class TestIterByteRange:
+    """Test iter_byte_range function."""
+
+    def test_skip_and_length_across_chunks(self) -> None:
+        """Test the range is cut out of the stream whatever the chunk boundaries."""
+        chunks = [b"abcd", b"efgh", b"ijkl"]
+        assert b"".join(iter_byte_range(chunks, 3, 6)) == b"defghi"
+        assert b"".join(iter_byte_range(chunks, 4)) == b"efghijkl"
+        assert b"".join(iter_byte_range(chunks, 20, 5)) == b""
+
+    def test_stops_reading_after_length(self) -> None:
+        """Test the underlying stream is closed once enough has been read."""
+        client = Mock()
+        client.pull.return_value = io.BytesIO(b"x" * 100)
+        chunks = iter_remote_chunks(client, "/file", chunk_size=10)
+
+        assert b"".join(iter_byte_range(chunks, 5, 10)) == b"x" * 10
+        assert client.pull.return_value.closed
+
+
+class TestChunkReader:
+    """Test ChunkReader class."""
+
+    def test_reads_across_chunks(self) -> None:
+        """Test reads of any size are served from the chunks as they are needed."""
+        chunks = iter([b"abc", b"defg", b"h"])
+        reader = ChunkReader(chunks)
+
+        assert reader.read(2) == b"ab"
+        assert reader.read(4) == b"cdef"
+        assert next(chunks) == b"h"
+        assert reader.read(5) == b"g"
+        assert reader.read(5) == b""
+
+    def test_read_all(self) -> None:
+        """Test a negative size reads everything left."""
+        reader = ChunkReader([b"abc", b"def"])
+
+        assert reader.read(1) == b"a"
+        assert reader.read() == b"bcdef"
+
+
+class TestIsBinary:
+    """Test is_binary function."""
+
+    def test_text(self) -> None:
+        """Test text data is not binary."""
+        assert not is_binary(b"hello\nworld\n")
+
+    def test_nul_byte(self) -> None:
+        """Test data containing NUL is binary."""
+        assert is_binary(b"\x7fELF\x00\x01")
+
+
+class TestWalkRemoteFiles:
+    """Test walk_remote_files function."""
+
+    def test_walks_tree(self) -> None:
+        """Test all regular files in the tree are found, level by level."""
+        tree = {
+            "/root": [
+                _info("/root/b.txt", ops.pebble.FileType.FILE),
+                _info("/root/sub", ops.pebble.FileType.DIRECTORY),
+                _info("/root/a.txt", ops.pebble.FileType.FILE),
+                _info("/root/link", ops.pebble.FileType.SYMLINK),
+            ],
+            "/root/sub": [_info("/root/sub/c.txt", ops.pebble.FileType.FILE)],
+        }
+        client = Mock()
+        client.list_files.side_effect = lambda path: tree[path]
+
+        paths = [path for path, _ in walk_remote_files(client, "/root")]
+
+        assert paths == ["/root/a.txt", "/root/b.txt", "/root/sub/c.txt"]
+
+    def test_include_dirs(self) -> None:
+        """Test directories, including empty ones, come before their contents."""
+        tree = {
+            "/root": [
+                _info("/root/sub", ops.pebble.FileType.DIRECTORY),
+                _info("/root/a.txt", ops.pebble.FileType.FILE),
+            ],
+            "/root/sub": [
+                _info("/root/sub/empty", ops.pebble.FileType.DIRECTORY),
+                _info("/root/sub/c.txt", ops.pebble.FileType.FILE),
+            ],
+            "/root/sub/empty": [],
+        }
+        client = Mock()
+        client.list_files.side_effect = lambda path: tree[path]
+
+        paths = [path for path, _ in walk_remote_files(client, "/root", include_dirs=True)]
+
+        assert paths == ["/root/a.txt", "/root/sub", "/root/sub/c.txt", "/root/sub/empty"]
+
+    def test_root_is_file(self) -> None:
+        """Test a file root yields just that file."""
+        client = Mock()
+        client.list_files.return_value = [_info("/etc/hosts", ops.pebble.FileType.FILE)]
+
+        assert [path for path, _ in walk_remote_files(client, "/etc/hosts")] == ["/etc/hosts"]
+
+    def test_listing_error(self) -> None:
+        """Test listing errors are reported and the walk continues."""
+        client = Mock()
+        client.list_files.side_effect = ops.pebble.PathError("permission-denied", "denied")
+        errors: list[str] = []
+
+        result = list(walk_remote_files(client, "/secret", on_error=lambda p, e: errors.append(p)))
+
+        assert result == []
+        assert errors == ["/secret"]
+
+
+class TestBoundedMap:
+    """Test bounded_map function."""
+
+    def test_preserves_order(self) -> None:
+        """Test results are yielded in input order."""
+        results = list(bounded_map(lambda x: x * 2, range(20), max_workers=4, window=3))
+
+        assert results == [(i, i * 2) for i in range(20)]
+
+    def test_early_stop_limits_submitted_work(self) -> None:
+        """Test only a bounded window of items is consumed ahead of the caller."""
+        consumed: list[int] = []
+
+        def items():
+            for i in range(1000):
+                consumed.append(i)
+                yield i
+
+        results = bounded_map(lambda x: x, items(), max_workers=2, window=4)
+        assert next(results) == (0, 0)
+        results.close()
+
+        assert len(consumed) <= 5
+
+
+def _split(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class TestIterDecompressed:
+    """Test iter_decompressed function."""
+
+    @pytest.mark.parametrize(
+        ("compress", "file_format"),
+        [
+            (gzip.compress, "gzip"),
+            (bz2.compress, "bzip2"),
+            (lzma.compress, "xz"),
+            (lambda data: lzma.compress(data, format=lzma.FORMAT_ALONE), "lzma"),
+        ],
+    )
+    def test_formats_are_sniffed(self, compress, file_format) -> None:
+        """Test each format is recognised and decompressed across tiny chunks."""
+        compressed = compress(b"hello world\n" * 100)
+
+        assert detect_compression(compressed) == file_format
+        assert detect_compression(compress(b"")) == file_format
+        assert b"".join(iter_decompressed(_split(compressed, 3))) == b"hello world\n" * 100
+
+    def test_plain_data_is_unchanged(self) -> None:
+        """Test data without a known magic number passes straight through."""
+        assert list(iter_decompressed([b"BZh", b"ello"])) == [b"BZhello"]
+        assert list(iter_decompressed([])) == []
+
+    @pytest.mark.parametrize(
+        "head",
+        [
+            b"BZh9 is the bzip2 magic\n",
+            b"\x1f\x8b\x01\x00 gzip magic, unknown method",
+            b"\x5d\x00\x00\x12\x34\x56\x78" + b"\x00" * 16,
+            b"\x5d\x00\x00\x80\x00" + b"\xff" * 7 + b"\x01",
+        ],
+    )
+    def test_lookalike_headers_are_not_compressed(self, head) -> None:
+        """Test files that start like a compressed format but aren't one pass through."""
+        assert detect_compression(head) is None
+        assert b"".join(iter_decompressed([head, b"rest\n"])) == head + b"rest\n"
+
+    def test_first_chunk_that_fails_to_decode_passes_through(self) -> None:
+        """Test sniffed data that isn't valid in its first chunk is output unchanged."""
+        text = b"BZh91AY&SY is how a bzip2 block starts\n"
+
+        assert detect_compression(text) == "bzip2"
+        assert b"".join(iter_decompressed([text, b"more text\n"])) == text + b"more text\n"
+
+    def test_concatenated_members(self) -> None:
+        """Test every member of a multi-member file is decompressed, skipping NUL padding."""
+        compressed = gzip.compress(b"one\n") + gzip.compress(b"two\n") + b"\0" * 8
+
+        assert b"".join(iter_decompressed([compressed])) == b"one\ntwo\n"
+
+    def test_output_is_bounded(self, monkeypatch) -> None:
+        """Test highly compressed data is inflated a limited amount at a time."""
+        monkeypatch.setattr(streaming, "DECOMPRESSED_CHUNK_SIZE", 1000)
+        compressed = bz2.compress(b"x" * 100_000)
+
+        output = list(iter_decompressed([compressed]))
+
+        assert max(len(chunk) for chunk in output) <= 1000
+        assert sum(len(chunk) for chunk in output) == 100_000
+
+    def test_truncated_data(self) -> None:
+        """Test a truncated file raises ValueError after the data before the cut."""
+        compressed = gzip.compress(b"abc" * 10_000)[:-20]
+
+        with pytest.raises(ValueError, match="truncated"):
+            list(iter_decompressed([compressed]))
+
+    def test_wrong_format(self) -> None:
+        """Test data that isn't in the requested format raises ValueError."""
+        with pytest.raises(ValueError, match="invalid gzip data"):
+            list(iter_decompressed([b"plain text"], "gzip"))
+
+    def test_remote_file(self) -> None:
+        """Test iter_remote_chunks can decompress a file as it is pulled."""
+        client = Mock()
+        client.pull.return_value = io.BytesIO(gzip.compress(b"log line\n"))
+
+        assert list(iter_remote_chunks(client, "/log.gz", decompress=True)) == [b"log line\n"]
@@ -1,7 +1,14 @@
 """Tests for table builder utilities."""
 
+import io
+import json
+
+import pytest
 from rich import box
+from rich.console import Console
 from rich.table import Table
+from rich.text import Text
+from src.pebble_shell.utils import table_builder
 from src.pebble_shell.utils.table_builder import (
     TableBuilder,
     add_file_columns,
@@ -14,6 +21,7 @@ from src.pebble_shell.utils.table_builder import (
     create_network_table,
     create_standard_table,
     create_system_table,
+    split_output_format,
 )
 
 
@@ -330,3 +338,126 @@ class TestIntegration:
         count_col = table.columns[2]
         assert count_col.justify == "right"
         assert count_col.style == "cyan"
+
+
+_ROWS = [(1, "[green]init[/green]", "[red] 0.5[/red]"), (42, Text("a,b"), "12")]
+
+
+class TestOutputFormats:
+    """Test writing tables in machine-readable formats."""
+
+    @staticmethod
+    def _write(output_format: str, rows: list[tuple]) -> str:
+        console = Console(file=io.StringIO(), width=80)
+        builder = (
+            create_standard_table()
+            .output_to(console, output_format)
+            .primary_id_column("PID")
+            .data_column("Command")
+            .numeric_column("CPU")
+        )
+        for row in rows:
+            builder.add_row(*row)
+        assert builder.streaming == (output_format != "table")
+        assert builder.build().row_count == (len(rows) if output_format == "table" else 0)
+        builder.print()
+        return console.file.getvalue()
+
+    def test_json_lines(self):
+        """Test each row is a JSON object, with numbers kept and markup dropped."""
+        lines = self._write("jsonl", _ROWS).splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"PID": 1, "Command": "init", "CPU": 0.5},
+            {"PID": 42, "Command": "a,b", "CPU": 12},
+        ]
+
+    def test_json(self):
+        """Test the rows are written as a JSON array, even when there are none."""
+        assert json.loads(self._write("json", _ROWS))[1] == {
+            "PID": 42,
+            "Command": "a,b",
+            "CPU": 12,
+        }
+        assert json.loads(self._write("json", [])) == []
+
+    @pytest.mark.parametrize(
+        ("output_format", "expected"),
+        [
+            ("csv", 'PID,Command,CPU\n1,init,0.5\n42,"a,b",12\n'),
+            ("tsv", "PID\tCommand\tCPU\n1\tinit\t0.5\n42\ta,b\t12\n"),
+        ],
+    )
+    def test_delimited(self, output_format, expected):
+        """Test CSV and TSV output has a header row and quotes where needed."""
+        assert self._write(output_format, _ROWS) == expected
+
+    def test_table(self):
+        """Test the table format draws the table, showing numbers as text."""
+        output = self._write("table", _ROWS)
+        assert "PID" in output
+        assert "42" in output
+
+    def test_split_output_format(self, monkeypatch):
+        """Test --format is taken from the arguments, defaulting to the shell-wide format."""
+        assert split_output_format(["-a", "--format", "csv", "x"]) == ("csv", ["-a", "x"])
+        assert split_output_format(["--format=jsonl"]) == ("jsonl", [])
+        assert split_output_format(["--format=xml"]) is None
+        monkeypatch.setattr(table_builder, "_output_format", "tsv")
+        assert split_output_format(["x"]) == ("tsv", ["x"])
+
+    def test_set_output_format(self, monkeypatch):
+        """Test the shell-wide format must be a known one."""
+        monkeypatch.setattr(table_builder, "_output_format", "table")
+        table_builder.set_output_format("json")
+        assert table_builder.get_output_format() == "json"
+        with pytest.raises(ValueError, match="invalid format"):
+            table_builder.set_output_format("xml")
+
+
+class TestLargeTables:
+    """Test large tables are drawn a page at a time."""
+
+    @staticmethod
+    def _table(console: Console, create=create_enhanced_table) -> TableBuilder:
+        builder = (
+            create("Processes")
+            .output_to(console)
+            .primary_id_column("PID")
+            .data_column("Command")
+            .numeric_column("CPU")
+        )
+        for i in range(12):
+            builder.add_row(i, "cmd" * (i % 4), f"{i / 3:.1f}")
+        return builder
+
+    @pytest.mark.parametrize("create", [create_enhanced_table, create_standard_table])
+    def test_pages_join_up(self, monkeypatch, create):
+        """Test a table drawn in pages looks the same as one laid out at once."""
+        console = Console(file=io.StringIO(), width=60)
+        self._table(console, create).print()
+        expected = console.file.getvalue()
+
+        monkeypatch.setattr(table_builder, "VIRTUAL_TABLE_ROWS", 5)
+        monkeypatch.setattr(table_builder, "VIRTUAL_PAGE_ROWS", 5)
+        console = Console(file=io.StringIO(), width=60)
+        builder = self._table(console, create)
+        # Full pages are drawn as the rows are added; rows 10 and 11 are left.
+        assert "3.0" in console.file.getvalue()
+        assert "3.3" not in console.file.getvalue()
+        assert builder.row_count == 12
+        builder.print()
+        assert console.file.getvalue() == expected
+
+    def test_terminal_pages(self, monkeypatch):
+        """Test each screenful waits for a key on a terminal, and q stops the table."""
+        monkeypatch.setattr(table_builder, "VIRTUAL_TABLE_ROWS", 5)
+        answers = iter(["", "q"])
+        monkeypatch.setattr("builtins.input", lambda: next(answers))
+        console = Console(file=io.StringIO(), width=60, height=5, force_terminal=True)
+        builder = self._table(console)
+        assert builder.stopped
+        builder.print()
+        output = console.file.getvalue()
+        assert output.count("--More--") == 2
+        assert "7" in output
+        assert "8" not in output
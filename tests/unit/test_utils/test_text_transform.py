@@ -0,0 +1,158 @@
+"""Tests for streaming byte transformations."""
+
+from __future__ import annotations
+
+import pytest
+
+from pebble_shell.utils.text_transform import (
+    DosToUnix,
+    TabStops,
+    UnixToDos,
+    build_transformer,
+    parse_tr_set,
+)
+
+
+def _run(command: str, args: list[str], data: bytes) -> bytes:
+    """Transform ``data`` split into chunks of every size, checking they all agree."""
+    outputs = set()
+    for size in (1, 2, 3, 7, len(data) or 1):
+        result = build_transformer(command, args)
+        assert result is not None
+        transformer = result[0]()
+        chunks = [data[i : i + size] for i in range(0, len(data), size)]
+        outputs.add(b"".join(transformer.run(chunks)))
+    assert len(outputs) == 1
+    return outputs.pop()
+
+
+class TestParseTrSet:
+    """Test expanding tr sets."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("a-e", b"abcde"),
+            ("[:digit:]x", b"0123456789x"),
+            ("\\n\\t\\\\\\101", b"\n\t\\A"),
+            ("[x*3]y", b"xxxy"),
+            ("[=a=]", b"a"),
+        ],
+    )
+    def test_sets(self, text, expected):
+        """Test ranges, classes, escapes and repeats."""
+        assert parse_tr_set(text) == expected
+
+    def test_fill(self):
+        """Test [c*] fills the second set to the length of the first."""
+        assert parse_tr_set("a[-*]z", fill_to=5) == b"a---z"
+
+    def test_reversed_range(self):
+        """Test a range that runs backwards is an error."""
+        with pytest.raises(ValueError, match="reverse"):
+            parse_tr_set("z-a")
+
+
+class TestTranslate:
+    """Test the tr transformation."""
+
+    @pytest.mark.parametrize(
+        ("args", "data", "expected"),
+        [
+            (["a-z", "A-Z"], b"hello, world\n", b"HELLO, WORLD\n"),
+            (["abc", "x"], b"aabbcc-d", b"xxxxxx-d"),
+            (["-d", "l\\n"], b"hello\nworld\n", b"heoword"),
+            (["-s", " "], b"a   b    c ", b"a b c "),
+            (["-s", "a-z", "A-Z"], b"aabbxx  yy", b"ABX  Y"),
+            (["-cs", "[:alnum:]", "[\\n*]"], b"one, two;  three", b"one\ntwo\nthree"),
+            (["-ds", "0-9", " "], b"a1 2  3b", b"a b"),
+        ],
+    )
+    def test_tr(self, args, data, expected):
+        """Test translating, deleting and squeezing, across chunk boundaries."""
+        assert _run("tr", args, data) == expected
+
+    @pytest.mark.parametrize("args", [["a-z"], ["-d"], ["z-a", "x"]])
+    def test_invalid(self, args):
+        """Test missing or invalid sets are rejected."""
+        with pytest.raises(ValueError):
+            build_transformer("tr", args)
+
+
+class TestTabs:
+    """Test expand and unexpand."""
+
+    def test_tab_stops(self):
+        """Test widths to the next stop for an interval and a list."""
+        assert [TabStops("4").width(column) for column in (0, 1, 3, 4)] == [4, 3, 1, 4]
+        stops = TabStops("2,5")
+        assert [stops.width(column) for column in (0, 2, 4, 5, 9)] == [2, 3, 1, 1, 1]
+        assert stops.stops_between(0, 5) == [2, 5]
+
+    @pytest.mark.parametrize("spec", ["0", "x", "4,2"])
+    def test_invalid_tab_stops(self, spec):
+        """Test zero, non-numeric and descending tab stops are rejected."""
+        with pytest.raises(ValueError):
+            TabStops(spec)
+
+    @pytest.mark.parametrize(
+        ("args", "data", "expected"),
+        [
+            ([], b"\ta\tbc\n12345678\tx\n", b"        a       bc\n12345678        x\n"),
+            (["-t", "4"], b"ab\tc\td", b"ab  c   d"),
+            (["-t", "2,5"], b"\ta\tb\tc", b"  a  b c"),
+            (["-i"], b"\t a\tb\n", b"         a\tb\n"),
+        ],
+    )
+    def test_expand(self, args, data, expected):
+        """Test tabs are expanded to the tab stops."""
+        assert _run("expand", args, data) == expected
+
+    @pytest.mark.parametrize(
+        ("args", "data", "expected"),
+        [
+            ([], b"                a       b\n", b"\t\ta       b\n"),
+            (["-a"], b"          a       b  c\n", b"\t  a\t  b  c\n"),
+            (["-t", "4"], b"    a   b c\n", b"\ta\tb c\n"),
+        ],
+    )
+    def test_unexpand(self, args, data, expected):
+        """Test runs of blanks reaching a tab stop become tabs."""
+        assert _run("unexpand", args, data) == expected
+
+
+class TestFold:
+    """Test the fold transformation."""
+
+    @pytest.mark.parametrize(
+        ("args", "data", "expected"),
+        [
+            (["-w", "4"], b"abcdefghij\nab\n", b"abcd\nefgh\nij\nab\n"),
+            (["-w", "7", "-s"], b"the quick brown fox", b"the \nquick \nbrown \nfox"),
+            (["-w", "10"], b"a\tbcdefghi", b"a\tbc\ndefghi"),
+            (["-b", "-w", "3"], b"a\tbcd", b"a\tb\ncd"),
+        ],
+    )
+    def test_fold(self, args, data, expected):
+        """Test lines are broken at the width, counting columns or bytes."""
+        assert _run("fold", args, data) == expected
+
+    def test_invalid_width(self):
+        """Test a width that is not a positive number is rejected."""
+        with pytest.raises(ValueError):
+            build_transformer("fold", ["-w", "0"])
+
+
+class TestLineEndings:
+    """Test dos2unix and unix2dos."""
+
+    def test_carriage_return_split_across_chunks(self):
+        r"""Test a \r\n split between chunks is still converted."""
+        assert b"".join(DosToUnix().run([b"a\r", b"\nb\r", b"\r\n", b"c\r"])) == b"a\nb\r\nc\r"
+
+    def test_round_trip(self):
+        """Test existing CRLF endings are not doubled."""
+        data = b"a\nb\r\nc\n"
+        assert _run("unix2dos", [], data) == b"a\r\nb\r\nc\r\n"
+        assert b"".join(UnixToDos().run([b"a\r\n"])) == b"a\r\n"
+        assert _run("dos2unix", [], b"a\r\nb\r\nc\r\n") == b"a\nb\nc\n"
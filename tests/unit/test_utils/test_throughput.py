@@ -0,0 +1,104 @@
+"""Tests for throughput measurement and rate limiting."""
+
+from __future__ import annotations
+
+import pytest
+
+from pebble_shell.utils.throughput import (
+    RateLimiter,
+    ThroughputMeter,
+    format_size,
+    meter_chunks,
+    parse_size,
+)
+
+
+class _Clock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TestSizes:
+    """Test parsing and formatting sizes."""
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [("512", 512), ("64K", 65536), ("1.5m", 1572864), ("2GiB", 2 * 1024**3)],
+    )
+    def test_parse_size(self, value, expected) -> None:
+        """Test sizes and rates may have binary suffixes."""
+        assert parse_size(value) == expected
+
+    @pytest.mark.parametrize("value", ["abc", "-100", "0", "", "inf"])
+    def test_parse_invalid_size(self, value) -> None:
+        """Test values that aren't positive sizes are rejected."""
+        with pytest.raises(ValueError):
+            parse_size(value)
+
+    @pytest.mark.parametrize(
+        ("size", "expected"),
+        [(0, "0B"), (999, "999B"), (1536, "1.50KiB"), (50 * 1024**2, "50.0MiB")],
+    )
+    def test_format_size(self, size, expected) -> None:
+        """Test sizes are shown with three significant digits."""
+        assert format_size(size) == expected
+
+
+class TestThroughputMeter:
+    """Test measuring a stream."""
+
+    def test_rates_and_eta(self) -> None:
+        """Test the average rate covers the whole run and the current rate the recent past."""
+        clock = _Clock()
+        meter = ThroughputMeter(total=4000, clock=clock)
+        for _ in range(10):
+            clock.now += 1
+            meter.update(100)
+        clock.now += 1
+        meter.update(1000)
+
+        assert meter.average_rate == pytest.approx(2000 / 11)
+        # The last 5 seconds or so: 400 + 1000 bytes over 5 seconds.
+        assert meter.current_rate == pytest.approx(1400 / 5)
+        assert meter.percentage == 50
+        assert meter.eta == pytest.approx(2000 / (2000 / 11))
+        assert meter.status() == "1.95KiB 0:00:11 [   280B/s] [avg 182B/s]  50% ETA 0:00:11"
+        assert meter.status(final=True) == "1.95KiB 0:00:11 [avg 182B/s]"
+
+    def test_unknown_total(self) -> None:
+        """Test there is no percentage or ETA without a total."""
+        meter = ThroughputMeter(clock=_Clock())
+        meter.update(10)
+        assert meter.percentage is None
+        assert meter.eta is None
+
+
+class TestRateLimiter:
+    """Test limiting the rate of a stream."""
+
+    def test_chunks_are_held_to_the_rate(self) -> None:
+        """Test a stream is slowed to the limit and split into small pieces."""
+        clock = _Clock()
+        limiter = RateLimiter(1000, clock=clock, sleep=clock.sleep)
+        meter = ThroughputMeter(clock=clock)
+
+        pieces = list(meter_chunks([b"x" * 2500, b"y" * 500], meter, limiter))
+
+        assert b"".join(pieces) == b"x" * 2500 + b"y" * 500
+        assert max(len(piece) for piece in pieces) == 100
+        # Everything beyond the first 100 byte burst waits for its turn.
+        assert clock.now - 100.0 == pytest.approx(2.9)
+        assert meter.bytes == 3000
+
+    def test_invalid_rate(self) -> None:
+        """Test a rate must be positive."""
+        with pytest.raises(ValueError):
+            RateLimiter(0)
@@ -0,0 +1,46 @@
+"""Tests for wc-style counting."""
+
+from __future__ import annotations
+
+import pytest
+
+from pebble_shell.utils.word_count import count_chunks, format_counts, selected_columns
+
+
+class TestCountChunks:
+    """Test counting lines, words and bytes in a stream."""
+
+    def test_counts_bytes_not_characters(self) -> None:
+        """Test sizes are in bytes, so multi-byte characters count in full."""
+        assert count_chunks(["naïve café\n".encode()]) == (1, 2, 13)
+
+    @pytest.mark.parametrize(
+        "chunks",
+        [
+            [b"one two\nthree\n"],
+            [b"one t", b"wo\nthr", b"ee\n"],
+            [b"one ", b"two", b"\n", b"three\n"],
+        ],
+    )
+    def test_chunk_boundaries(self, chunks: list[bytes]) -> None:
+        """Test a word split across chunks is counted once."""
+        assert count_chunks(chunks) == (2, 3, 14)
+
+    def test_last_line_without_newline(self) -> None:
+        """Test a final line without a newline still counts as a line."""
+        assert count_chunks([b"a\nb"]) == (2, 2, 3)
+        assert count_chunks([]) == (0, 0, 0)
+
+
+class TestFormatCounts:
+    """Test formatting counts as wc prints them."""
+
+    def test_selected_columns(self) -> None:
+        """Test only the requested counts are shown, or all of them by default."""
+        assert selected_columns({"l": False, "w": False, "c": False}) == (True, True, True)
+        assert selected_columns({"l": False, "w": True, "c": True}) == (False, True, True)
+
+    def test_format(self) -> None:
+        """Test counts are right-aligned and followed by the file name."""
+        assert format_counts((3, 9, 40), (True, False, True), "f.txt") == "       3       40 f.txt"
+        assert format_counts((3, 9, 40), (False, True, False)) == "       9"